@@ -16,6 +16,11 @@ from typing import Dict, Any
 # Adicionar o diretório src ao path para imports
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
+# Ativado antes dos demais imports para que eles apareçam no relatório
+from src.startup_profiler import startup_profiler
+if "--startup-report" in sys.argv:
+    startup_profiler.start()
+
 # Imports essenciais (sempre carregados)
 from src.controllers import MenuManager, CourseController, SessionManager
 from src.config_manager import ConfigManager
@@ -27,24 +32,39 @@ from src.error_tracker import ErrorTracker
 from src.error_handler import ErrorHandler
 from src.security import SecureInput
 from src.theming import AdvancedThemeManager, ThemeCustomizer
+from src.execution import get_execution_service
+from src.exercises.reference_cache import get_reference_cache
+from src.storage import get_learner_store
+from src.performance import get_tiered_cache
 
 # Lazy imports (carregados sob demanda)
-from src.modules.module_loader import module_loader  # Para módulos do curso
-from src.module_loader import LazyModuleLoader  # Para componentes do sistema
-from src.progressive_projects import ProgressiveProjectsSystem
-from src.methodical_debugging import MethodicalDebuggingSystem
+from src.modules.module_loader import module_loader, DEFAULT_MEMORY_BUDGET_MB  # Para módulos do curso
+from src.modules.prefetcher import ModulePrefetcher
+from src.module_loader import LazyModuleLoader, LazyImport, LazyProxy  # Para componentes do sistema
+ProgressiveProjectsSystem = LazyImport("src.progressive_projects", "ProgressiveProjectsSystem")
+MethodicalDebuggingSystem = LazyImport("src.methodical_debugging", "MethodicalDebuggingSystem")
+
+# Analytics e Offline (importados no primeiro uso)
+AdvancedAnalytics = LazyImport("src.analytics.advanced_analytics", "AdvancedAnalytics")
+AnalyticsDashboard = LazyImport("src.analytics.analytics_dashboard", "AnalyticsDashboard")
+ConnectivityManager = LazyImport("src.offline.connectivity_manager", "ConnectivityManager")
+OfflineResourceManager = LazyImport("src.offline.resource_cache", "OfflineResourceManager")
+OfflineOnlineSync = LazyImport("src.offline.sync_manager", "OfflineOnlineSync")
 
-# Analytics e Offline imports
-from src.analytics.advanced_analytics import AdvancedAnalytics
-from src.analytics.analytics_dashboard import AnalyticsDashboard
-from src.offline.connectivity_manager import ConnectivityManager
-from src.offline.resource_cache import ResourceCache, OfflineResourceManager
-from src.offline.sync_manager import OfflineOnlineSync
+# Code Review (importado no primeiro uso)
+CodeAnalysisEngine = LazyImport("src.code_review.analysis_engine", "CodeAnalysisEngine")
+CodeReviewDashboard = LazyImport("src.code_review.code_review_dashboard", "CodeReviewDashboard")
+ExerciseCodeReviewer = LazyImport("src.code_review.exercise_integration", "ExerciseCodeReviewer")
 
-# Code Review imports
-from src.code_review.analysis_engine import CodeAnalysisEngine
-from src.code_review.code_review_dashboard import CodeReviewDashboard
-from src.code_review.exercise_integration import ExerciseCodeReviewer
+# Componentes entregues aos controladores como LazyProxy: só são criados
+# quando um menu realmente os usa
+DEFERRED_COMPONENTS = (
+    'gamification', 'review', 'glossary', 'certificate', 'interactive_demos',
+    'adaptive_session', 'debug_session', 'analytics', 'tutor', 'progressive_projects',
+    'methodical_debugging', 'sync_manager', 'advanced_analytics', 'analytics_dashboard',
+    'connectivity_manager', 'offline_manager', 'offline_sync', 'code_analysis_engine',
+    'code_review_dashboard', 'exercise_code_reviewer'
+)
 
 
 class PythonCourse:
@@ -53,10 +73,12 @@ class PythonCourse:
     def __init__(self):
         """Inicializa todos os componentes do curso"""
         # Inicializa componentes básicos
-        self._initialize_core_components()
+        with startup_profiler.section("componentes básicos"):
+            self._initialize_core_components()
         
         # Inicializa sistemas avançados
-        self._initialize_advanced_systems()
+        with startup_profiler.section("sistemas avançados"):
+            self._initialize_advanced_systems()
         
         # Configura integrações
         self._setup_integrations()
@@ -65,14 +87,15 @@ class PythonCourse:
         self._setup_menu_options()
         
         # Inicializa controladores
-        self._initialize_controllers()
+        with startup_profiler.section("controladores"):
+            self._initialize_controllers()
     
     def _initialize_core_components(self) -> None:
         """Inicializa componentes básicos do sistema"""
-        self.config = ConfigManager()
+        self.config = startup_profiler.timed(ConfigManager)()
         
         # Inicializa sistema avançado de temas
-        self.advanced_theme_manager = AdvancedThemeManager()
+        self.advanced_theme_manager = startup_profiler.timed(AdvancedThemeManager)()
         
         # Carrega tema salvo
         saved_theme = self.config.get("display.current_theme", "light")
@@ -87,22 +110,36 @@ class PythonCourse:
         
         # Componentes básicos
         self.theme_manager = ThemeManager()  # Mantém compatibilidade
-        self.progress = ProgressManager()
-        self.logger = CourseLogger()
-        self.error_tracker = ErrorTracker()
+        # Estado do aluno em um único banco SQLite (JSONs antigos são importados na primeira vez)
+        self.store = startup_profiler.timed(get_learner_store)()
+        self.progress = startup_profiler.timed(ProgressManager)(store=self.store)
+        self.logger = startup_profiler.timed(CourseLogger)()
+        self.error_tracker = startup_profiler.timed(ErrorTracker)()
         self.error_handler = ErrorHandler(self.logger, self.error_tracker)
-        self.secure_input = SecureInput()
+        self.secure_input = startup_profiler.timed(SecureInput)()
     
     def _initialize_advanced_systems(self) -> None:
         """Inicializa sistemas avançados com lazy loading"""
         # Inicializa loader para componentes do sistema
         self.system_loader = LazyModuleLoader()
         
+        # Pré-inicia os workers do sandbox em segundo plano
+        startup_profiler.timed(get_execution_service)().warm(background=True)
+        
+        # Calcula outputs de referência que ainda não estão em cache (primeira execução)
+        startup_profiler.timed(get_reference_cache)().warm_in_background()
+        
         # Sistemas essenciais (carregados imediatamente)
         VisualFeedback = self.system_loader.get_module("VisualFeedback")
         self.visual = VisualFeedback()
         self.shortcuts = KeyboardShortcuts(self.config.get_section('keyboard_shortcuts'))
         
+        # Módulos do curso ficam residentes até o orçamento de memória da sessão
+        module_loader.set_memory_budget(self.config.get("modules.memory_budget_mb", DEFAULT_MEMORY_BUDGET_MB))
+        
+        # Carrega em segundo plano os próximos módulos previstos pelo progresso
+        self.module_prefetcher = ModulePrefetcher(module_loader, self.progress)
+        
         # Propriedades lazy (carregados sob demanda)
         self._lazy_modules_initialized = False
         self._lazy_analytics = None
@@ -179,8 +216,14 @@ class PythonCourse:
                 if hasattr(module_instance, 'set_dependencies'):
                     module_instance.set_dependencies(self.ui, self.progress)
                 
+                # Enquanto o aluno lê, prepara os próximos módulos
+                self.module_prefetcher.on_module_opened(module_id)
+                
                 # Executa o módulo
                 module_instance.execute()
+                
+                # A conclusão pode ter mudado a previsão
+                self.module_prefetcher.on_module_opened(module_id)
             else:
                 self.ui.error(f"❌ Módulo {module_id} não encontrado")
                 self.ui.pause()
@@ -265,19 +308,21 @@ class PythonCourse:
     @property
     def resource_cache(self):
         if self._lazy_resource_cache is None:
-            self._lazy_resource_cache = ResourceCache()
+            # O mesmo ResourceCache é o L2 do cache compartilhado
+            self._lazy_resource_cache = get_tiered_cache().l2
         return self._lazy_resource_cache
     
     @property
     def offline_manager(self):
         if self._lazy_offline_manager is None:
-            self._lazy_offline_manager = OfflineResourceManager(self.resource_cache)
+            self._lazy_offline_manager = OfflineResourceManager(self.resource_cache, get_tiered_cache())
         return self._lazy_offline_manager
     
     @property
     def offline_sync(self):
         if self._lazy_offline_sync is None:
-            self._lazy_offline_sync = OfflineOnlineSync(self.connectivity_manager, self.resource_cache)
+            self._lazy_offline_sync = OfflineOnlineSync(self.connectivity_manager, self.resource_cache,
+                                                         tiered=get_tiered_cache())
             self._lazy_offline_sync.start_auto_sync()
         return self._lazy_offline_sync
     
@@ -290,7 +335,7 @@ class PythonCourse:
     @property
     def code_review_dashboard(self):
         if self._lazy_code_review_dashboard is None:
-            self._lazy_code_review_dashboard = CodeReviewDashboard(self.code_analysis_engine, self.ui)
+            self._lazy_code_review_dashboard = CodeReviewDashboard(self.code_analysis_engine, self.ui, store=self.store)
         return self._lazy_code_review_dashboard
     
     @property
@@ -311,42 +356,25 @@ class PythonCourse:
         self.menu_manager = MenuManager(self.ui, self.progress, self.shortcuts)
         self.menu_manager.ascii_mode = self.config.get("display.ascii_mode", False)
         
-        # Prepara componentes para controladores
+        # Prepara componentes para controladores (os não essenciais entram como
+        # LazyProxy: montar este dicionário não cria nenhum subsistema)
         components = {
             'progress': self.progress,
             'visual': self.visual,
             'logger': self.logger,
-            'gamification': self.gamification,
             'ui': self.ui,
             'error_tracker': self.error_tracker,
             'error_handler': self.error_handler,
-            'review': self.review,
-            'glossary': self.glossary,
-            'certificate': self.certificate,
-            'interactive_demos': self.interactive_demos,
-            'adaptive_session': self.adaptive_session,
-            'debug_session': self.debug_session,
-            'analytics': self.analytics,
-            'tutor': self.tutor,
-            'progressive_projects': self.progressive_projects,
-            'methodical_debugging': self.methodical_debugging,
-            'sync_manager': self.sync_manager,
             'secure_input': self.secure_input,
             'menu_options': self.menu_options,
-            'navigation': self.menu_manager.navigation,
-            'advanced_analytics': self.advanced_analytics,
-            'analytics_dashboard': self.analytics_dashboard,
-            'connectivity_manager': self.connectivity_manager,
-            'offline_manager': self.offline_manager,
-            'offline_sync': self.offline_sync,
-            'code_analysis_engine': self.code_analysis_engine,
-            'code_review_dashboard': self.code_review_dashboard,
-            'exercise_code_reviewer': self.exercise_code_reviewer
+            'navigation': self.menu_manager.navigation
         }
+        for name in DEFERRED_COMPONENTS:
+            components[name] = LazyProxy(lambda name=name: getattr(self, name))
         
         # Inicializa outros controladores
-        self.course_controller = CourseController(components)
-        self.session_manager = SessionManager(components)
+        self.course_controller = startup_profiler.timed(CourseController)(components)
+        self.session_manager = startup_profiler.timed(SessionManager)(components)
         
         # Atualiza referência no progressive_projects se já foi criado
         if self._lazy_progressive_projects is not None:
@@ -413,6 +441,9 @@ class PythonCourse:
             if not self.session_manager.initialize_session():
                 return
             
+            # Prepara o módulo onde o aluno parou (e o seguinte)
+            self.module_prefetcher.on_module_opened()
+            
             # Loop principal
             while self.session_manager.is_session_active():
                 try:
@@ -428,6 +459,7 @@ class PythonCourse:
         
         finally:
             # Limpeza da sessão
+            self.module_prefetcher.shutdown()
             self.session_manager.cleanup_session()
             self.session_manager.show_exit_message()
     
@@ -835,8 +867,19 @@ class PythonCourse:
             self.ui.pause()
 
 
+def startup_report() -> None:
+    """Monta o curso sem abrir o menu e imprime a árvore de tempos"""
+    PythonCourse()
+    startup_profiler.stop()
+    print(startup_profiler.report())
+
+
 def main():
     """Função principal"""
+    if "--startup-report" in sys.argv:
+        startup_report()
+        return
+    
     try:
         curso = PythonCourse()
         curso.run()
@@ -12,6 +12,11 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any
 from enum import Enum
 
+try:
+    from .storage import StateDocument
+except ImportError:
+    from storage import StateDocument
+
 
 class DifficultyLevel(Enum):
     """Níveis de dificuldade"""
@@ -35,10 +40,15 @@ class ExerciseType(Enum):
 class AdaptiveExerciseGenerator:
     """Gerador de exercícios adaptativos"""
     
-    def __init__(self, progress_manager, analytics_manager):
+    def __init__(self, progress_manager, analytics_manager, store=None):
         self.progress = progress_manager
         self.analytics = analytics_manager
         self.exercise_templates = self._load_exercise_templates()
+        
+        # Com o banco do aluno o histórico de exercícios é append-only (últimos 100 em memória)
+        self.store = store if store is not None else getattr(progress_manager, 'store', None)
+        self._document = (StateDocument(self.store, "adaptive", history_fields=("exercise_history",))
+                          if self.store else None)
         self.user_performance = self._load_user_performance()
         
     def _load_exercise_templates(self) -> Dict[str, List[Dict[str, Any]]]:
@@ -162,21 +172,38 @@ class AdaptiveExerciseGenerator:
     
     def _load_user_performance(self) -> Dict[str, Any]:
         """Carrega histórico de performance do usuário"""
+        if self._document is not None:
+            return self._document.load(self._create_default_performance,
+                                       legacy_loader=self._load_performance_file,
+                                       legacy_source="adaptive_performance.json")
+        return self._load_performance_file() or self._create_default_performance()
+    
+    def _load_performance_file(self) -> Optional[Dict[str, Any]]:
+        """Lê o adaptive_performance.json (None se ausente ou corrompido)"""
         try:
             with open("adaptive_performance.json", 'r', encoding='utf-8') as f:
                 return json.load(f)
         except:
-            return {
-                "topic_scores": {},  # Pontuação por tópico
-                "difficulty_preferences": {},  # Preferência de dificuldade
-                "exercise_history": [],  # Histórico de exercícios
-                "weak_areas": [],  # Áreas fracas identificadas
-                "mastered_topics": [],  # Tópicos dominados
-                "repetition_schedule": {}  # Agendamento de repetição espaçada
-            }
+            return None
+    
+    def _create_default_performance(self) -> Dict[str, Any]:
+        """Cria estrutura padrão de performance"""
+        return {
+            "topic_scores": {},  # Pontuação por tópico
+            "difficulty_preferences": {},  # Preferência de dificuldade
+            "exercise_history": [],  # Histórico de exercícios
+            "weak_areas": [],  # Áreas fracas identificadas
+            "mastered_topics": [],  # Tópicos dominados
+            "repetition_schedule": {}  # Agendamento de repetição espaçada
+        }
     
     def _save_user_performance(self) -> None:
         """Salva performance do usuário"""
+        if self._document is not None:
+            # No banco só os campos alterados são regravados
+            self._document.save(self.user_performance)
+            return
+        
         with open("adaptive_performance.json", 'w', encoding='utf-8') as f:
             json.dump(self.user_performance, f, indent=2, ensure_ascii=False)
     
@@ -321,7 +348,10 @@ class AdaptiveExerciseGenerator:
             "timestamp": datetime.now().isoformat()
         }
         
-        self.user_performance["exercise_history"].append(result)
+        if self._document is not None:
+            self._document.append(self.user_performance, "exercise_history", result)
+        else:
+            self.user_performance["exercise_history"].append(result)
         
         # Atualiza score do tópico
         topic = exercise["topic"]
@@ -8,12 +8,15 @@ Advanced Analytics System - Sistema avançado de análise de aprendizado
 import json
 import time
 import statistics
-from datetime import datetime, timedelta
+from datetime import datetime, date, timedelta
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
 from collections import defaultdict, Counter
 import os
 
+from .session_store import SessionColumns, SessionStore
+from .rollups import merge_buckets, new_bucket
+
 
 @dataclass
 class StudySession:
@@ -62,15 +65,15 @@ class AdvancedAnalytics:
     
     def __init__(self, data_dir: str = ".analytics"):
         self.data_dir = data_dir
-        self.sessions_file = os.path.join(data_dir, "study_sessions.json")
         self.errors_file = os.path.join(data_dir, "error_patterns.json")
         self.metrics_file = os.path.join(data_dir, "learning_metrics.json")
         
         # Cria diretório se não existir
         os.makedirs(data_dir, exist_ok=True)
         
-        # Carrega dados existentes
-        self.study_sessions: List[StudySession] = self._load_sessions()
+        # Carrega dados existentes (sessões em colunas, ordenadas por início)
+        self.session_store = SessionStore(data_dir)
+        self.sessions: SessionColumns = self.session_store.load()
         self.error_patterns: List[ErrorPattern] = self._load_error_patterns()
         self.current_session_start: Optional[datetime] = None
         
@@ -104,8 +107,7 @@ class AdvancedAnalytics:
             session_type=self.current_session_type
         )
         
-        self.study_sessions.append(session)
-        self._save_sessions()
+        self.add_session(session)
         
         # Reset
         self.current_session_start = None
@@ -118,8 +120,11 @@ class AdvancedAnalytics:
         module_id = module_id or getattr(self, 'current_module', 'unknown')
         topic = topic or getattr(self, 'current_topic', 'unknown')
         
-        # Atualiza padrões de erro
+        # Atualiza padrões de erro e os rollups do dia/semana
         self._update_error_pattern(error_type, module_id, topic, description)
+        now = datetime.now()
+        self.sessions.rollups.add_error(now, error_type)
+        self.session_store.append_error(self.sessions, now, error_type)
         
     def log_exercise_completion(self, success: bool = True):
         """Registra conclusão de exercício"""
@@ -128,27 +133,75 @@ class AdvancedAnalytics:
             if not success:
                 self.current_errors += 1
                 
+    def add_session(self, session: StudySession):
+        """Armazena uma sessão (uma linha na cauda do arquivo de sessões)"""
+        row = asdict(session)
+        self.sessions.append(**row)
+        self.session_store.append(self.sessions, row)
+        
+    @property
+    def study_sessions(self) -> List[StudySession]:
+        """Todas as sessões como objetos (compatibilidade; prefira as consultas por período)"""
+        return [StudySession(**row) for row in self.sessions.rows()]
+        
+    def get_sessions(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[StudySession]:
+        """Sessões com start <= início < end"""
+        lo, hi = self.sessions.window(start, end)
+        return [StudySession(**row) for row in self.sessions.rows(lo, hi)]
+        
+    def clear_history(self):
+        """Apaga sessões e padrões de erro (também do disco)"""
+        self.sessions.clear()
+        self.session_store.compact(self.sessions)
+        self.error_patterns.clear()
+        self._save_error_patterns()
+        
+    def _period_days(self, days: int, offset: int = 0) -> List[Tuple[str, Dict[str, Any]]]:
+        """Rollups dos `days` dias corridos que terminam `offset` dias antes de hoje"""
+        last = date.today() - timedelta(days=offset)
+        return self.sessions.rollups.days(last - timedelta(days=days - 1), last)
+        
+    def _period_totals(self, days: int, offset: int = 0) -> Dict[str, Any]:
+        """Soma dos rollups diários do período"""
+        return merge_buckets(bucket for _, bucket in self._period_days(days, offset))
+        
+    @staticmethod
+    def _average_score(bucket: Dict[str, Any]) -> float:
+        """Score médio das sessões com score > 0"""
+        return bucket["score_sum"] / bucket["score_count"] if bucket["score_count"] else 0
+        
+    def get_weekly_summaries(self, weeks: int = 8) -> List[Dict[str, Any]]:
+        """Tempo, exercícios, score médio e erros das últimas semanas ISO (da mais antiga à atual)"""
+        summaries = []
+        today = date.today()
+        for week in range(weeks - 1, -1, -1):
+            day = today - timedelta(weeks=week)
+            bucket = self.sessions.rollups.week(day) or new_bucket()
+            year, number, _ = day.isocalendar()
+            summaries.append({
+                "week": f"{year}-W{number:02d}",
+                "sessions": bucket["sessions"],
+                "time": bucket["time"],
+                "exercises": bucket["exercises"],
+                "score": self._average_score(bucket),
+                "errors": bucket["logged_errors"]
+            })
+        return summaries
+        
     def get_time_by_module(self, days: int = 30) -> Dict[str, float]:
         """Retorna tempo gasto por módulo nos últimos X dias"""
-        cutoff_date = datetime.now() - timedelta(days=days)
-        
-        module_times = defaultdict(float)
-        for session in self.study_sessions:
-            if session.start_time >= cutoff_date:
-                module_times[session.module_id] += session.duration_minutes
-                
-        return dict(module_times)
+        return self._period_totals(days)["modules"]
         
     def get_time_by_topic(self, module_id: str = None, days: int = 30) -> Dict[str, float]:
         """Retorna tempo gasto por tópico"""
-        cutoff_date = datetime.now() - timedelta(days=days)
-        
+        by_module = self._period_totals(days)["topics"]
+        if module_id is not None:
+            return by_module.get(module_id, {})
+            
         topic_times = defaultdict(float)
-        for session in self.study_sessions:
-            if session.start_time >= cutoff_date:
-                if module_id is None or session.module_id == module_id:
-                    topic_times[session.topic] += session.duration_minutes
-                    
+        for topics in by_module.values():
+            for topic, minutes in topics.items():
+                topic_times[topic] += minutes
         return dict(topic_times)
         
     def get_common_error_patterns(self, limit: int = 10) -> List[ErrorPattern]:
@@ -158,31 +211,31 @@ class AdvancedAnalytics:
                      
     def get_learning_metrics(self, days: int = 30) -> LearningMetrics:
         """Calcula métricas de aprendizado"""
-        cutoff_date = datetime.now() - timedelta(days=days)
-        recent_sessions = [s for s in self.study_sessions if s.start_time >= cutoff_date]
+        period = self._period_days(days)
+        totals = merge_buckets(bucket for _, bucket in period)
+        count = totals["sessions"]
         
-        if not recent_sessions:
+        if not count:
             return LearningMetrics(0, 0, 0, 0, 0, 0, 0, 1, 0)
             
         # Métricas básicas
-        total_time = sum(s.duration_minutes for s in recent_sessions)
-        avg_duration = statistics.mean([s.duration_minutes for s in recent_sessions])
-        modules = len(set(s.module_id for s in recent_sessions))
-        exercises = sum(s.exercises_completed for s in recent_sessions)
+        total_time = totals["time"]
+        avg_duration = total_time / count
+        modules = len(totals["modules"])
+        exercises = totals["exercises"]
         
         # Score médio
-        scores = [s.score for s in recent_sessions if s.score > 0]
-        avg_score = statistics.mean(scores) if scores else 0
+        avg_score = self._average_score(totals)
         
         # Taxa de melhoria (comparação com período anterior)
         improvement_rate = self._calculate_improvement_rate(days)
         
         # Score de consistência (baseado na regularidade das sessões)
-        consistency = self._calculate_consistency_score(recent_sessions)
+        consistency = self._consistency_from_counts(
+            [bucket["sessions"] for _, bucket in period if bucket["sessions"]])
         
         # Preferência de dificuldade
-        difficulties = [s.difficulty_level for s in recent_sessions]
-        difficulty_pref = int(statistics.mean(difficulties)) if difficulties else 1
+        difficulty_pref = int(totals["difficulty_sum"] / count)
         
         # Velocidade de aprendizado (módulos por semana)
         weeks = days / 7
@@ -242,9 +295,8 @@ class AdvancedAnalytics:
         metrics_week = self.get_learning_metrics(7)
         metrics_month = self.get_learning_metrics(30)
         
-        # Dados da semana
-        week_sessions = [s for s in self.study_sessions 
-                        if s.start_time >= datetime.now() - timedelta(days=7)]
+        # Dados da semana (hoje e os 6 dias anteriores)
+        week = self._period_totals(7)
         
         # Análise de tendências
         daily_times = self._get_daily_study_times(7)
@@ -255,15 +307,16 @@ class AdvancedAnalytics:
         
         return {
             "period": {
-                "start": (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d"),
+                "start": (date.today() - timedelta(days=6)).strftime("%Y-%m-%d"),
                 "end": datetime.now().strftime("%Y-%m-%d")
             },
             "summary": {
                 "total_time": metrics_week.total_study_time,
-                "sessions": len(week_sessions),
+                "sessions": week["sessions"],
                 "modules": metrics_week.modules_completed,
                 "exercises": metrics_week.exercises_completed,
-                "average_score": metrics_week.average_score
+                "average_score": metrics_week.average_score,
+                "errors": week["logged_errors"]
             },
             "comparison": {
                 "time_change": metrics_week.total_study_time - prev_week_metrics.get("time", 0),
@@ -275,7 +328,7 @@ class AdvancedAnalytics:
                 "daily_times": daily_times,
                 "peak_day": max(daily_times.items(), key=lambda x: x[1])[0] if daily_times else None
             },
-            "achievements": self._get_weekly_achievements(week_sessions),
+            "achievements": self._get_weekly_achievements(week),
             "suggestions": self.get_personalized_suggestions(),
             "common_errors": [asdict(e) for e in self.get_common_error_patterns(3)],
             "monthly_context": {
@@ -287,48 +340,8 @@ class AdvancedAnalytics:
         
     def get_study_heatmap(self, days: int = 30) -> Dict[str, float]:
         """Retorna dados para heatmap de estudos"""
-        cutoff_date = datetime.now() - timedelta(days=days)
-        daily_times = defaultdict(float)
+        return self._get_daily_study_times(days)
         
-        for session in self.study_sessions:
-            if session.start_time >= cutoff_date:
-                date_key = session.start_time.strftime("%Y-%m-%d")
-                daily_times[date_key] += session.duration_minutes
-                
-        return dict(daily_times)
-        
-    def _load_sessions(self) -> List[StudySession]:
-        """Carrega sessões de estudo do arquivo"""
-        if not os.path.exists(self.sessions_file):
-            return []
-            
-        try:
-            with open(self.sessions_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                sessions = []
-                for item in data:
-                    item['start_time'] = datetime.fromisoformat(item['start_time'])
-                    item['end_time'] = datetime.fromisoformat(item['end_time'])
-                    sessions.append(StudySession(**item))
-                return sessions
-        except Exception:
-            return []
-            
-    def _save_sessions(self):
-        """Salva sessões de estudo no arquivo"""
-        try:
-            data = []
-            for session in self.study_sessions:
-                session_dict = asdict(session)
-                session_dict['start_time'] = session.start_time.isoformat()
-                session_dict['end_time'] = session.end_time.isoformat()
-                data.append(session_dict)
-                
-            with open(self.sessions_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            print(f"Erro ao salvar sessões: {e}")
-            
     def _load_error_patterns(self) -> List[ErrorPattern]:
         """Carrega padrões de erro do arquivo"""
         if not os.path.exists(self.errors_file):
@@ -408,18 +421,14 @@ class AdvancedAnalytics:
         
     def _calculate_improvement_rate(self, days: int) -> float:
         """Calcula taxa de melhoria comparando com período anterior"""
-        cutoff = datetime.now() - timedelta(days=days)
-        prev_cutoff = cutoff - timedelta(days=days)
+        current = self._period_totals(days)
+        previous = self._period_totals(days, offset=days)
         
-        current_sessions = [s for s in self.study_sessions if s.start_time >= cutoff]
-        previous_sessions = [s for s in self.study_sessions 
-                           if prev_cutoff <= s.start_time < cutoff]
-        
-        if not current_sessions or not previous_sessions:
+        if not current["sessions"] or not previous["sessions"]:
             return 0.0
             
-        current_avg = statistics.mean([s.score for s in current_sessions if s.score > 0] or [0])
-        previous_avg = statistics.mean([s.score for s in previous_sessions if s.score > 0] or [0])
+        current_avg = self._average_score(current)
+        previous_avg = self._average_score(previous)
         
         if previous_avg == 0:
             return 0.0
@@ -428,20 +437,18 @@ class AdvancedAnalytics:
         
     def _calculate_consistency_score(self, sessions: List[StudySession]) -> float:
         """Calcula score de consistência baseado na regularidade das sessões"""
-        if not sessions:
-            return 0.0
-            
         # Agrupa sessões por dia
         daily_counts = defaultdict(int)
         for session in sessions:
-            date_key = session.start_time.strftime("%Y-%m-%d")
-            daily_counts[date_key] += 1
-            
-        if not daily_counts:
+            daily_counts[session.start_time.date()] += 1
+        return self._consistency_from_counts(list(daily_counts.values()))
+        
+    def _consistency_from_counts(self, counts: List[int]) -> float:
+        """Score de consistência a partir da quantidade de sessões por dia"""
+        if not counts:
             return 0.0
             
         # Calcula variância dos dias de estudo
-        counts = list(daily_counts.values())
         if len(counts) == 1:
             return 1.0
             
@@ -454,15 +461,7 @@ class AdvancedAnalytics:
         
     def _get_daily_study_times(self, days: int) -> Dict[str, float]:
         """Retorna tempo de estudo por dia"""
-        cutoff_date = datetime.now() - timedelta(days=days)
-        daily_times = defaultdict(float)
-        
-        for session in self.study_sessions:
-            if session.start_time >= cutoff_date:
-                date_key = session.start_time.strftime("%Y-%m-%d")
-                daily_times[date_key] += session.duration_minutes
-                
-        return dict(daily_times)
+        return {day: bucket["time"] for day, bucket in self._period_days(days) if bucket["sessions"]}
         
     def _calculate_trend(self, daily_times: Dict[str, float]) -> str:
         """Calcula tendência baseada nos tempos diários"""
@@ -484,36 +483,28 @@ class AdvancedAnalytics:
             
     def _get_previous_week_metrics(self) -> Dict[str, float]:
         """Obtém métricas da semana anterior para comparação"""
-        start_date = datetime.now() - timedelta(days=14)
-        end_date = datetime.now() - timedelta(days=7)
-        
-        week_sessions = [s for s in self.study_sessions 
-                        if start_date <= s.start_time < end_date]
-        
-        if not week_sessions:
+        period = self._period_days(7, offset=7)
+        totals = merge_buckets(bucket for _, bucket in period)
+        if not totals["sessions"]:
             return {"time": 0, "score": 0, "consistency": 0}
             
-        total_time = sum(s.duration_minutes for s in week_sessions)
-        scores = [s.score for s in week_sessions if s.score > 0]
-        avg_score = statistics.mean(scores) if scores else 0
-        consistency = self._calculate_consistency_score(week_sessions)
-        
         return {
-            "time": total_time,
-            "score": avg_score,
-            "consistency": consistency
+            "time": totals["time"],
+            "score": self._average_score(totals),
+            "consistency": self._consistency_from_counts(
+                [bucket["sessions"] for _, bucket in period if bucket["sessions"]])
         }
         
-    def _get_weekly_achievements(self, sessions: List[StudySession]) -> List[str]:
-        """Identifica conquistas da semana"""
+    def _get_weekly_achievements(self, week: Dict[str, Any]) -> List[str]:
+        """Identifica conquistas da semana a partir do rollup do período"""
         achievements = []
         
-        if not sessions:
+        if not week["sessions"]:
             return achievements
             
-        total_time = sum(s.duration_minutes for s in sessions)
-        total_exercises = sum(s.exercises_completed for s in sessions)
-        unique_modules = len(set(s.module_id for s in sessions))
+        total_time = week["time"]
+        total_exercises = week["exercises"]
+        unique_modules = len(week["modules"])
         
         # Conquistas baseadas em tempo
         if total_time >= 300:  # 5 horas
@@ -528,7 +519,7 @@ class AdvancedAnalytics:
             achievements.append("🎯 Mais de 20 exercícios completados!")
             
         # Conquistas baseadas em consistência
-        if len(sessions) >= 5:
+        if week["sessions"] >= 5:
             achievements.append("🔥 Estudou 5+ dias esta semana!")
             
         # Conquistas baseadas em variedade
@@ -98,6 +98,7 @@ class AnalyticsDashboard:
         print(f"  🎯 Módulos: {summary['modules']}")
         print(f"  💪 Exercícios: {summary['exercises']}")
         print(f"  📈 Score médio: {summary['average_score']:.1f}%")
+        print(f"  🐛 Erros registrados: {summary['errors']}")
         
         # Comparação com semana anterior
         comparison = report['comparison']
@@ -447,31 +448,8 @@ class AnalyticsDashboard:
         self.ui.clear_screen()
         self.ui.header("📈 GRÁFICO DE PROGRESSO", "Evolução do Desempenho")
         
-        # Simula dados de progresso por semana (últimas 8 semanas)
-        weekly_data = []
-        for week in range(8, 0, -1):
-            start_date = datetime.now() - timedelta(weeks=week)
-            end_date = start_date + timedelta(days=7)
-            
-            # Coleta sessões da semana
-            week_sessions = [s for s in self.analytics.study_sessions 
-                           if start_date <= s.start_time <= end_date]
-            
-            if week_sessions:
-                avg_score = statistics.mean([s.score for s in week_sessions if s.score > 0] or [0])
-                total_time = sum(s.duration_minutes for s in week_sessions)
-                total_exercises = sum(s.exercises_completed for s in week_sessions)
-            else:
-                avg_score = 0
-                total_time = 0
-                total_exercises = 0
-                
-            weekly_data.append({
-                "week": f"S{9-week}",
-                "score": avg_score,
-                "time": total_time,
-                "exercises": total_exercises
-            })
+        # Rollups das últimas 8 semanas ISO (já agregados a cada sessão)
+        weekly_data = self.analytics.get_weekly_summaries(8)
             
         if not any(w["score"] > 0 for w in weekly_data):
             print("\n📊 Dados insuficientes para gerar gráfico de progresso.")
@@ -547,7 +525,7 @@ class AnalyticsDashboard:
             "export_date": datetime.now().isoformat(),
             "metrics": metrics.__dict__,
             "weekly_report": report,
-            "total_sessions": len(self.analytics.study_sessions)
+            "total_sessions": len(self.analytics.sessions)
         }
         
         print("✅ Dados exportados com sucesso!")
@@ -560,8 +538,7 @@ class AnalyticsDashboard:
         confirm = input("\n⚠️ Limpar TODOS os dados? Esta ação não pode ser desfeita! (digite 'CONFIRMAR'): ")
         
         if confirm == "CONFIRMAR":
-            self.analytics.study_sessions.clear()
-            self.analytics.error_patterns.clear()
+            self.analytics.clear_history()
             print("✅ Histórico limpo com sucesso!")
         else:
             print("❌ Operação cancelada.")
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Rollups - Agregados das sessões por dia e por semana ISO
+Atualizados a cada sessão/erro registrado, para que os relatórios leiam
+só os dias do período em vez de percorrer todo o histórico
+"""
+
+from datetime import datetime, date, timedelta
+from typing import Dict, List, Any, Iterable, Optional
+
+
+def week_key(day: date) -> str:
+    """Chave da semana ISO (ex.: 2024-W07)"""
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def new_bucket() -> Dict[str, Any]:
+    """Agregado vazio"""
+    return {
+        "sessions": 0,
+        "time": 0.0,
+        "exercises": 0,
+        "errors": 0,            # erros contados nas sessões
+        "score_sum": 0.0,       # apenas sessões com score > 0
+        "score_count": 0,
+        "difficulty_sum": 0,
+        "logged_errors": 0,     # erros registrados por log_error
+        "modules": {},          # módulo -> minutos
+        "topics": {},           # módulo -> {tópico -> minutos}
+        "error_types": {},      # tipo -> ocorrências
+    }
+
+
+def merge_buckets(buckets: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Soma vários agregados em um só"""
+    total = new_bucket()
+    for bucket in buckets:
+        for key in ("sessions", "time", "exercises", "errors", "score_sum",
+                    "score_count", "difficulty_sum", "logged_errors"):
+            total[key] += bucket[key]
+        for module, minutes in bucket["modules"].items():
+            total["modules"][module] = total["modules"].get(module, 0.0) + minutes
+        for module, topics in bucket["topics"].items():
+            merged = total["topics"].setdefault(module, {})
+            for topic, minutes in topics.items():
+                merged[topic] = merged.get(topic, 0.0) + minutes
+        for error_type, count in bucket["error_types"].items():
+            total["error_types"][error_type] = total["error_types"].get(error_type, 0) + count
+    return total
+
+
+class SessionRollups:
+    """Agregados diários (YYYY-MM-DD) e semanais (ISO) das sessões e erros"""
+
+    def __init__(self):
+        self.daily: Dict[str, Dict[str, Any]] = {}
+        self.weekly: Dict[str, Dict[str, Any]] = {}
+
+    def _buckets(self, when: datetime) -> List[Dict[str, Any]]:
+        day = when.date()
+        return [self.daily.setdefault(day.isoformat(), new_bucket()),
+                self.weekly.setdefault(week_key(day), new_bucket())]
+
+    def add_session(self, start_time: datetime, module_id: str, topic: str,
+                    duration_minutes: float, exercises_completed: int, errors_made: int,
+                    score: float, difficulty_level: int) -> None:
+        """Contabiliza uma sessão no dia e na semana em que começou"""
+        for bucket in self._buckets(start_time):
+            bucket["sessions"] += 1
+            bucket["time"] += duration_minutes
+            bucket["exercises"] += exercises_completed
+            bucket["errors"] += errors_made
+            if score > 0:
+                bucket["score_sum"] += score
+                bucket["score_count"] += 1
+            bucket["difficulty_sum"] += difficulty_level
+            bucket["modules"][module_id] = bucket["modules"].get(module_id, 0.0) + duration_minutes
+            topics = bucket["topics"].setdefault(module_id, {})
+            topics[topic] = topics.get(topic, 0.0) + duration_minutes
+
+    def add_error(self, when: datetime, error_type: str) -> None:
+        """Contabiliza um erro registrado"""
+        for bucket in self._buckets(when):
+            bucket["logged_errors"] += 1
+            bucket["error_types"][error_type] = bucket["error_types"].get(error_type, 0) + 1
+
+    def days(self, first: date, last: date) -> List[tuple]:
+        """(dia, agregado) dos dias com atividade entre first e last, inclusive"""
+        result = []
+        day = first
+        while day <= last:
+            bucket = self.daily.get(day.isoformat())
+            if bucket is not None:
+                result.append((day.isoformat(), bucket))
+            day += timedelta(days=1)
+        return result
+
+    def week(self, day: date) -> Optional[Dict[str, Any]]:
+        """Agregado da semana ISO que contém o dia"""
+        return self.weekly.get(week_key(day))
+
+    def clear(self) -> None:
+        """Remove todos os agregados"""
+        self.daily.clear()
+        self.weekly.clear()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"daily": self.daily, "weekly": self.weekly}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SessionRollups":
+        rollups = cls()
+        rollups.daily = data.get("daily", {})
+        rollups.weekly = data.get("weekly", {})
+        return rollups
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Session Store - Armazenamento colunar das sessões de estudo
+Cada campo da sessão é uma coluna (array) ordenada pelo início em epoch-segundos,
+então consultas por período viram uma busca binária + varredura da faixa
+"""
+
+import os
+import sys
+import json
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import datetime, date
+from typing import Dict, List, Any, Optional, Tuple, Iterator
+
+from .rollups import SessionRollups
+
+
+# Colunas numéricas: nome -> typecode (persistidas nesta ordem)
+NUMERIC_COLUMNS = (
+    ("start", "d"),        # início (epoch-segundos)
+    ("end", "d"),          # fim (epoch-segundos)
+    ("duration", "d"),     # minutos
+    ("score", "d"),
+    ("exercises", "i"),
+    ("errors", "i"),
+    ("difficulty", "i"),
+    ("day", "i"),          # date.toordinal() do início (índice por data)
+    ("module", "i"),       # códigos dos rótulos abaixo
+    ("topic", "i"),
+    ("kind", "i"),
+)
+
+# Colunas categóricas guardadas como código -> rótulo
+LABEL_COLUMNS = ("module", "topic", "kind")
+
+FILE_MAGIC = b"PYSS"
+FILE_VERSION = 2
+_HEADER = struct.Struct("<4sHIII")  # magic, versão, geração, linhas, tamanho do JSON de metadados
+
+
+class SessionColumns:
+    """Sessões de estudo em colunas paralelas ordenadas por início (com seus rollups)"""
+
+    def __init__(self):
+        self.columns: Dict[str, array] = {name: array(code) for name, code in NUMERIC_COLUMNS}
+        self.labels: Dict[str, List[str]] = {name: [] for name in LABEL_COLUMNS}
+        self._codes: Dict[str, Dict[str, int]] = {name: {} for name in LABEL_COLUMNS}
+        self.rollups = SessionRollups()
+
+    def __len__(self) -> int:
+        return len(self.columns["start"])
+
+    def _code(self, column: str, label: str) -> int:
+        """Código do rótulo (cria se for novo)"""
+        codes = self._codes[column]
+        code = codes.get(label)
+        if code is None:
+            code = len(self.labels[column])
+            self.labels[column].append(label)
+            codes[label] = code
+        return code
+
+    def append(self, start_time: datetime, end_time: datetime, module_id: str, topic: str,
+               duration_minutes: float, exercises_completed: int, errors_made: int,
+               score: float, difficulty_level: int, session_type: str) -> int:
+        """
+        Insere uma sessão mantendo a ordem por início
+
+        Returns:
+            Posição em que a sessão foi inserida
+        """
+        self.rollups.add_session(start_time, module_id, topic, duration_minutes,
+                                 exercises_completed, errors_made, score, difficulty_level)
+
+        start = start_time.timestamp()
+        values = {
+            "start": start,
+            "end": end_time.timestamp(),
+            "duration": duration_minutes,
+            "score": score,
+            "exercises": exercises_completed,
+            "errors": errors_made,
+            "difficulty": difficulty_level,
+            "day": start_time.toordinal(),
+            "module": self._code("module", module_id),
+            "topic": self._code("topic", topic),
+            "kind": self._code("kind", session_type),
+        }
+
+        starts = self.columns["start"]
+        if not starts or start >= starts[-1]:
+            for name, column in self.columns.items():
+                column.append(values[name])
+            return len(starts) - 1
+
+        # Sessão retroativa: insere na posição certa para manter a busca binária
+        position = bisect_right(starts, start)
+        for name, column in self.columns.items():
+            column.insert(position, values[name])
+        return position
+
+    def clear(self) -> None:
+        """Remove todas as sessões"""
+        self.__init__()
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def window(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> Tuple[int, int]:
+        """Faixa [lo, hi) de sessões com start <= início < end"""
+        starts = self.columns["start"]
+        lo = bisect_left(starts, start.timestamp()) if start else 0
+        hi = bisect_left(starts, end.timestamp()) if end else len(starts)
+        return lo, max(lo, hi)
+
+    def slice(self, name: str, lo: int, hi: int) -> array:
+        """Cópia da faixa de uma coluna"""
+        return self.columns[name][lo:hi]
+
+    def total(self, name: str, lo: int, hi: int) -> float:
+        """Soma de uma coluna na faixa"""
+        return sum(self.columns[name][lo:hi])
+
+    def group_sum(self, key: str, value: str, lo: int, hi: int) -> Dict[str, float]:
+        """Soma de `value` agrupada pelo rótulo da coluna `key`"""
+        sums = defaultdict(float)
+        for code, amount in zip(self.columns[key][lo:hi], self.columns[value][lo:hi]):
+            sums[code] += amount
+        labels = self.labels[key]
+        return {labels[code]: amount for code, amount in sums.items()}
+
+    def daily_sum(self, value: str, lo: int, hi: int) -> Dict[str, float]:
+        """Soma de `value` por dia (YYYY-MM-DD), na ordem cronológica"""
+        sums = defaultdict(float)
+        for day, amount in zip(self.columns["day"][lo:hi], self.columns[value][lo:hi]):
+            sums[day] += amount
+        return {date.fromordinal(day).isoformat(): amount for day, amount in sums.items()}
+
+    def daily_count(self, lo: int, hi: int) -> Dict[int, int]:
+        """Quantidade de sessões por dia (ordinal)"""
+        counts = defaultdict(int)
+        for day in self.columns["day"][lo:hi]:
+            counts[day] += 1
+        return dict(counts)
+
+    def distinct(self, name: str, lo: int, hi: int) -> int:
+        """Quantidade de rótulos distintos na faixa"""
+        return len(set(self.columns[name][lo:hi]))
+
+    def row(self, index: int) -> Dict[str, Any]:
+        """Sessão na forma de dicionário com os campos de StudySession"""
+        c = self.columns
+        return {
+            "start_time": datetime.fromtimestamp(c["start"][index]),
+            "end_time": datetime.fromtimestamp(c["end"][index]),
+            "module_id": self.labels["module"][c["module"][index]],
+            "topic": self.labels["topic"][c["topic"][index]],
+            "duration_minutes": c["duration"][index],
+            "exercises_completed": c["exercises"][index],
+            "errors_made": c["errors"][index],
+            "score": c["score"][index],
+            "difficulty_level": c["difficulty"][index],
+            "session_type": self.labels["kind"][c["kind"][index]],
+        }
+
+    def rows(self, lo: int = 0, hi: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Itera as sessões da faixa"""
+        for index in range(lo, len(self) if hi is None else hi):
+            yield self.row(index)
+
+    # ------------------------------------------------------------------
+    # Serialização binária
+    # ------------------------------------------------------------------
+
+    def to_bytes(self, generation: int = 0) -> bytes:
+        """Cabeçalho + metadados (rótulos e rollups em JSON) + bytes de cada coluna (little-endian)"""
+        meta = json.dumps({"labels": self.labels, "rollups": self.rollups.to_dict()},
+                          ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        parts = [_HEADER.pack(FILE_MAGIC, FILE_VERSION, generation, len(self), len(meta)), meta]
+        for name, _ in NUMERIC_COLUMNS:
+            column = self.columns[name]
+            if sys.byteorder == "big":
+                column = array(column.typecode, column)
+                column.byteswap()
+            parts.append(column.tobytes())
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Tuple["SessionColumns", int]:
+        """Reconstrói as colunas a partir de to_bytes; retorna (colunas, geração)"""
+        if len(data) < _HEADER.size:
+            raise ValueError("Arquivo de sessões truncado")
+        magic, version, generation, rows, meta_size = _HEADER.unpack_from(data)
+        if magic != FILE_MAGIC or version not in (1, FILE_VERSION):
+            raise ValueError("Formato de arquivo de sessões desconhecido")
+
+        store = cls()
+        offset = _HEADER.size
+        meta = json.loads(data[offset:offset + meta_size].decode('utf-8'))
+        if version == 1:
+            meta = {"labels": meta}  # A versão 1 guardava só os rótulos
+        store.labels = meta["labels"]
+        store._codes = {name: {label: code for code, label in enumerate(labels)}
+                        for name, labels in store.labels.items()}
+        offset += meta_size
+
+        for name, typecode in NUMERIC_COLUMNS:
+            column = array(typecode)
+            size = rows * column.itemsize
+            if offset + size > len(data):
+                raise ValueError("Arquivo de sessões truncado")
+            column.frombytes(data[offset:offset + size])
+            if sys.byteorder == "big":
+                column.byteswap()
+            store.columns[name] = column
+            offset += size
+
+        if "rollups" in meta:
+            store.rollups = SessionRollups.from_dict(meta["rollups"])
+        else:
+            for row in store.rows():
+                store.rollups.add_session(row["start_time"], row["module_id"], row["topic"],
+                                          row["duration_minutes"], row["exercises_completed"],
+                                          row["errors_made"], row["score"], row["difficulty_level"])
+        return store, generation
+
+
+class SessionStore:
+    """
+    Persistência das colunas: snapshot binário + cauda append-only
+
+    end_session e log_error gravam só uma linha na cauda (JSON Lines); a cauda é
+    incorporada ao snapshot binário (que também guarda os rollups) quando passa
+    de `tail_limit` linhas ou ao carregar.
+    Cada linha leva a geração do snapshot vigente, então uma queda entre gravar
+    o snapshot e apagar a cauda não duplica sessões.
+    """
+
+    def __init__(self, data_dir: str, tail_limit: int = 64):
+        self.snapshot_file = os.path.join(data_dir, "study_sessions.bin")
+        self.tail_file = os.path.join(data_dir, "study_sessions.tail")
+        self.legacy_file = os.path.join(data_dir, "study_sessions.json")
+        self.tail_limit = tail_limit
+        self.generation = 0
+        self._tail_rows = 0
+
+    def load(self) -> SessionColumns:
+        """Carrega snapshot + cauda (importa o JSON antigo na primeira vez)"""
+        columns = None
+        if os.path.exists(self.snapshot_file):
+            try:
+                with open(self.snapshot_file, 'rb') as f:
+                    columns, self.generation = SessionColumns.from_bytes(f.read())
+            except (IOError, ValueError) as e:
+                print(f"Erro ao carregar sessões: {e}")
+        if columns is None:
+            columns = self._load_legacy()
+
+        self._tail_rows = 0
+        if os.path.exists(self.tail_file):
+            try:
+                with open(self.tail_file, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            item = json.loads(line)
+                        except json.JSONDecodeError:
+                            break  # Linha incompleta de uma gravação interrompida
+                        if item.pop('gen', 0) < self.generation:
+                            continue  # Já incorporada ao snapshot
+                        if item.pop('event', 'session') == 'error':
+                            columns.rollups.add_error(datetime.fromisoformat(item['time']),
+                                                      item['error_type'])
+                        else:
+                            columns.append(**self._decode(item))
+                        self._tail_rows += 1
+            except IOError as e:
+                print(f"Erro ao carregar sessões: {e}")
+
+        if self._tail_rows or (columns and not os.path.exists(self.snapshot_file)):
+            self.compact(columns)
+        return columns
+
+    def _load_legacy(self) -> SessionColumns:
+        """Importa o study_sessions.json do formato antigo"""
+        columns = SessionColumns()
+        if not os.path.exists(self.legacy_file):
+            return columns
+        try:
+            with open(self.legacy_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for item in sorted(data, key=lambda entry: entry['start_time']):
+                columns.append(**self._decode(item))
+        except Exception as e:
+            print(f"Erro ao importar sessões antigas: {e}")
+        return columns
+
+    @staticmethod
+    def _decode(item: Dict[str, Any]) -> Dict[str, Any]:
+        """Converte um registro JSON para os argumentos de SessionColumns.append"""
+        item = dict(item)
+        item['start_time'] = datetime.fromisoformat(item['start_time'])
+        item['end_time'] = datetime.fromisoformat(item['end_time'])
+        return item
+
+    def append(self, columns: SessionColumns, session: Dict[str, Any]) -> None:
+        """Acrescenta uma sessão à cauda (e compacta quando ela cresce)"""
+        record = dict(session)
+        record['start_time'] = session['start_time'].isoformat()
+        record['end_time'] = session['end_time'].isoformat()
+        self._write_tail(columns, record)
+
+    def append_error(self, columns: SessionColumns, when: datetime, error_type: str) -> None:
+        """Acrescenta um erro registrado à cauda (os rollups já devem tê-lo contado)"""
+        self._write_tail(columns, {'event': 'error', 'time': when.isoformat(), 'error_type': error_type})
+
+    def _write_tail(self, columns: SessionColumns, record: Dict[str, Any]) -> None:
+        """Grava uma linha na cauda com a geração atual"""
+        record['gen'] = self.generation
+        try:
+            with open(self.tail_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._tail_rows += 1
+        except IOError as e:
+            print(f"Erro ao salvar sessões: {e}")
+            return
+
+        if self._tail_rows >= self.tail_limit:
+            self.compact(columns)
+
+    def compact(self, columns: SessionColumns) -> None:
+        """Grava o snapshot binário de forma atômica e esvazia a cauda"""
+        try:
+            temp_file = f"{self.snapshot_file}.tmp"
+            with open(temp_file, 'wb') as f:
+                f.write(columns.to_bytes(self.generation + 1))
+            os.replace(temp_file, self.snapshot_file)
+            self.generation += 1
+            if os.path.exists(self.tail_file):
+                os.remove(self.tail_file)
+            self._tail_rows = 0
+        except IOError as e:
+            print(f"Erro ao salvar sessões: {e}")
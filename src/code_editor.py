@@ -13,6 +13,8 @@ from typing import List, Optional, Tuple, Dict, Any
 from datetime import datetime
 import re
 
+from .execution import get_execution_service, console_input_handler
+
 
 class SyntaxHighlighter:
     """Highlighter simples para Python"""
@@ -79,10 +81,18 @@ class SyntaxHighlighter:
         return indent_str + line_content
 
 
+# Execuções mantidas no histórico
+HISTORY_LIMIT = 50
+
+
 class CodeEditor:
     """Editor de código integrado no terminal"""
     
-    def __init__(self):
+    def __init__(self, store=None):
+        """
+        Args:
+            store: LearnerStore para o histórico de execuções (None usa o arquivo JSON)
+        """
         self.lines: List[str] = []
         self.cursor_row: int = 0
         self.cursor_col: int = 0
@@ -97,31 +107,61 @@ class CodeEditor:
         self.auto_indent: bool = True
         
         # Armazena códigos executados
+        self.history_file = "code_history.json"
+        self.store = store
         self.execution_history: List[Dict[str, Any]] = []
+        if self.store is not None:
+            self._migrate_execution_history()
         self.load_execution_history()
     
     def load_execution_history(self) -> None:
         """Carrega histórico de execuções"""
-        history_file = "code_history.json"
-        if os.path.exists(history_file):
-            try:
-                import json
-                with open(history_file, 'r', encoding='utf-8') as f:
-                    self.execution_history = json.load(f)
-            except:
-                self.execution_history = []
+        if self.store is not None:
+            self.execution_history = self.store.history("code_history", "executions", limit=HISTORY_LIMIT)
+            return
+        self.execution_history = self._load_history_file()
     
     def save_execution_history(self) -> None:
         """Salva histórico de execuções"""
-        import json
-        history_file = "code_history.json"
-        
         # Mantém apenas últimas 50 execuções
-        self.execution_history = self.execution_history[-50:]
+        self.execution_history = self.execution_history[-HISTORY_LIMIT:]
+        if self.store is not None:
+            # Cada execução já foi gravada como uma linha em add_execution
+            return
         
-        with open(history_file, 'w', encoding='utf-8') as f:
+        import json
+        with open(self.history_file, 'w', encoding='utf-8') as f:
             json.dump(self.execution_history, f, indent=2, ensure_ascii=False)
     
+    def add_execution(self, entry: Dict[str, Any]) -> None:
+        """Registra uma execução no histórico"""
+        self.execution_history.append(entry)
+        if self.store is not None:
+            # Uma linha nova no banco, sem reler/regravar o histórico
+            self.store.append("code_history", "executions", entry)
+        self.save_execution_history()
+    
+    def _migrate_execution_history(self) -> None:
+        """Importa o histórico JSON antigo para o banco (apenas uma vez)"""
+        self.store.ensure_domain("code_history")
+        with self.store.transaction():
+            if self.store.is_migrated("code_history"):
+                return
+            legacy = self._load_history_file()
+            self.store.append_many("code_history", "executions", legacy)
+            self.store.mark_migrated("code_history", self.history_file if legacy else None)
+    
+    def _load_history_file(self) -> List[Dict[str, Any]]:
+        """Lê o histórico do arquivo JSON"""
+        if os.path.exists(self.history_file):
+            try:
+                import json
+                with open(self.history_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except:
+                pass
+        return []
+    
     def clear_screen(self) -> None:
         """Limpa a tela"""
         os.system('cls' if os.name == 'nt' else 'clear')
@@ -314,34 +354,32 @@ class CodeEditor:
         code = '\n'.join(self.lines)
         
         # Salva no histórico
-        self.execution_history.append({
+        self.add_execution({
             "code": code,
             "timestamp": datetime.now().isoformat(),
             "filename": self.filename
         })
-        self.save_execution_history()
         
         print("\n" + "="*80)
         print("▶️  EXECUTANDO CÓDIGO...")
         print("="*80)
         
-        # Namespace para execução
-        namespace = {}
+        # Executa em um worker isolado (loops infinitos não travam o editor)
+        result = get_execution_service().run(code, input_handler=console_input_handler)
+        print(result.remaining_stdout, end='')
+        if result.stderr:
+            print(result.stderr, end='')
         
-        try:
-            exec(code, namespace)
+        if result.success:
             print("\n✅ Código executado com sucesso!")
-        except Exception as e:
-            print(f"\n❌ Erro: {type(e).__name__}: {e}")
+        else:
+            print(f"\n❌ Erro: {result.error_summary}")
             
             # Destaca linha do erro se possível
-            import traceback
-            tb = traceback.extract_tb(e.__traceback__)
-            for frame in tb:
-                if frame.filename == "<string>":
-                    print(f"   → Erro na linha {frame.lineno}")
-                    if 0 < frame.lineno <= len(self.lines):
-                        print(f"   → {self.lines[frame.lineno-1].strip()}")
+            if result.error_line:
+                print(f"   → Erro na linha {result.error_line}")
+                if 0 < result.error_line <= len(self.lines):
+                    print(f"   → {self.lines[result.error_line-1].strip()}")
         
         print("="*80)
         input("\nPressione ENTER para continuar...")
@@ -504,8 +542,8 @@ DICAS:
 class CodePlayground:
     """Ambiente de experimentação de código"""
     
-    def __init__(self):
-        self.editor = CodeEditor()
+    def __init__(self, store=None):
+        self.editor = CodeEditor(store=store)
         self.snippets = self._load_snippets()
     
     def _load_snippets(self) -> Dict[str, str]:
@@ -13,12 +13,14 @@ de LLMs externos, incluindo:
 - Análise de performance
 - Avaliação de manutenibilidade
 - Verificação de documentação
+- Review de diretórios inteiros com cache por conteúdo
 - Dashboard interativo
 - Integração com exercícios
 """
 
 from .analysis_engine import (
     CodeAnalysisEngine,
+    AnalysisContext,
     CodeIssue,
     CodeMetrics,
     QualityScore,
@@ -26,6 +28,8 @@ from .analysis_engine import (
     Severity
 )
 
+from .incremental_analysis import IncrementalAnalyzer
+from .tree_review import TreeReviewer
 from .code_review_dashboard import CodeReviewDashboard
 from .exercise_integration import ExerciseCodeReviewer
 
@@ -34,6 +38,9 @@ __author__ = "Python Course System"
 
 __all__ = [
     'CodeAnalysisEngine',
+    'AnalysisContext',
+    'IncrementalAnalyzer',
+    'TreeReviewer',
     'CodeReviewDashboard', 
     'ExerciseCodeReviewer',
     'CodeIssue',
@@ -9,8 +9,8 @@ Análise estática sem dependência de LLM externa
 import ast
 import re
 import keyword
-from typing import Dict, List, Any, Tuple, Optional
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Any, Tuple, Optional, Callable
+from dataclasses import dataclass, asdict, replace
 from enum import Enum
 from datetime import datetime
 import json
@@ -76,12 +76,78 @@ class QualityScore:
     documentation_score: float
 
 
+def _is_docstring(statement: ast.stmt) -> bool:
+    """Verifica se o statement é uma docstring (string literal não vazia)"""
+    return (isinstance(statement, ast.Expr) and isinstance(statement.value, ast.Constant)
+            and isinstance(statement.value.value, str) and bool(statement.value.value.strip()))
+
+
+# Ordem em que as categorias aparecem no resultado
+RULE_CATEGORIES = ("logic", "security", "performance", "maintainability", "naming", "documentation")
+
+# Nós que aumentam o nível de aninhamento
+NESTING_NODES = (ast.If, ast.For, ast.While, ast.With, ast.FunctionDef, ast.ClassDef)
+
+
+class AnalysisContext:
+    """Estado compartilhado pelas regras durante a travessia da AST"""
+    
+    def __init__(self, code: str):
+        self.code = code
+        self.issues: Dict[str, List[CodeIssue]] = {}
+        self.category = ""
+        
+        # Posição atual na árvore
+        self.nesting = 0
+        self.loop_depth = 0
+        self.max_nesting = 0
+        
+        # Contadores para métricas
+        self.functions = 0
+        self.classes = 0
+        self.imports = 0
+        self.decision_points = 0
+        self.documentable_items = 0
+        self.documented_items = 0
+        self.string_constants: List[Tuple[str, int]] = []
+        self.has_module_docstring = False
+    
+    def merge(self, other: "AnalysisContext", line_offset: int = 0) -> None:
+        """Incorpora o contexto de outro trecho, deslocando as linhas dos issues"""
+        for category, issues in other.issues.items():
+            if line_offset:
+                issues = [replace(issue, line=issue.line + line_offset) for issue in issues]
+            self.issues.setdefault(category, []).extend(issues)
+        
+        self.max_nesting = max(self.max_nesting, other.max_nesting)
+        self.functions += other.functions
+        self.classes += other.classes
+        self.imports += other.imports
+        self.decision_points += other.decision_points
+        self.documentable_items += other.documentable_items
+        self.documented_items += other.documented_items
+        self.string_constants.extend(
+            (value, line + line_offset) for value, line in other.string_constants
+        )
+    
+    @property
+    def cyclomatic_complexity(self) -> int:
+        """Complexidade ciclomática (base 1 + pontos de decisão)"""
+        return 1 + self.decision_points
+    
+    def add_issue(self, issue: CodeIssue) -> None:
+        """Adiciona um issue na categoria da regra em execução"""
+        self.issues.setdefault(self.category, []).append(issue)
+
+
 class CodeAnalysisEngine:
     """Engine principal de análise de código"""
     
     def __init__(self):
         self.rules = self._load_analysis_rules()
         self.analysis_history = []
+        self._dispatch: Dict[type, List[Tuple[str, Callable]]] = {}
+        self._register_default_rules()
         
     def analyze_code(self, code: str, filename: str = "user_code.py", 
                     context: str = "exercise") -> Dict[str, Any]:
@@ -105,23 +171,21 @@ class CodeAnalysisEngine:
         # Parse do AST
         try:
             tree = ast.parse(code)
-            syntax_valid = True
-            syntax_error = None
         except SyntaxError as e:
             return self._syntax_error_result(str(e), e.lineno or 1)
         
-        # Executa todas as análises
-        issues = []
-        issues.extend(self._analyze_style(code))
-        issues.extend(self._analyze_logic(tree, code))
-        issues.extend(self._analyze_security(tree, code))
-        issues.extend(self._analyze_performance(tree, code))
-        issues.extend(self._analyze_maintainability(tree, code))
-        issues.extend(self._analyze_naming(tree, code))
-        issues.extend(self._analyze_documentation(tree, code))
+        # Executa todas as regras em uma única travessia da AST
+        ctx = self._run_rules(tree, code)
+        return self.build_result(ctx, code, filename, context, analysis_start)
+    
+    def build_result(self, ctx: "AnalysisContext", code: str, filename: str,
+                     context: str, analysis_start: datetime) -> Dict[str, Any]:
+        """Monta o resultado final a partir do contexto produzido pelas regras"""
+        issues = self._analyze_style(code)
+        issues.extend(self._collect_issues(ctx, code))
         
         # Calcula métricas
-        metrics = self._calculate_metrics(tree, code)
+        metrics = self._calculate_metrics(ctx, code)
         
         # Calcula scores
         quality_score = self._calculate_quality_score(issues, metrics, code)
@@ -134,8 +198,8 @@ class CodeAnalysisEngine:
             "timestamp": analysis_start.isoformat(),
             "filename": filename,
             "context": context,
-            "syntax_valid": syntax_valid,
-            "syntax_error": syntax_error,
+            "syntax_valid": True,
+            "syntax_error": None,
             "issues": [asdict(issue) for issue in issues],
             "metrics": asdict(metrics),
             "quality_score": asdict(quality_score),
@@ -218,229 +282,103 @@ class CodeAnalysisEngine:
         
         return issues
     
-    def _analyze_logic(self, tree: ast.AST, code: str) -> List[CodeIssue]:
-        """Análise de lógica e boas práticas"""
-        issues = []
-        
-        for node in ast.walk(tree):
-            # Funções muito longas
-            if isinstance(node, ast.FunctionDef):
-                func_lines = (node.end_lineno or node.lineno) - node.lineno + 1
-                if func_lines > 50:
-                    issues.append(CodeIssue(
-                        line=node.lineno, column=node.col_offset,
-                        issue_type=IssueType.MAINTAINABILITY,
-                        severity=Severity.MEDIUM,
-                        message=f"Function '{node.name}' is too long ({func_lines} lines)",
-                        suggestion="Break into smaller, focused functions",
-                        rule_id="C901"
-                    ))
-                
-                # Muitos parâmetros
-                if len(node.args.args) > 7:
-                    issues.append(CodeIssue(
-                        line=node.lineno, column=node.col_offset,
-                        issue_type=IssueType.MAINTAINABILITY,
-                        severity=Severity.MEDIUM,
-                        message=f"Function '{node.name}' has too many parameters ({len(node.args.args)})",
-                        suggestion="Consider using a config object or reducing parameters",
-                        rule_id="C902"
-                    ))
-            
-            # Comparação com None usando ==
-            if isinstance(node, ast.Compare):
-                for i, comparator in enumerate(node.comparators):
-                    if isinstance(comparator, ast.Constant) and comparator.value is None:
-                        op = node.ops[i]
-                        if isinstance(op, (ast.Eq, ast.NotEq)):
-                            op_str = "==" if isinstance(op, ast.Eq) else "!="
-                            replacement = "is" if isinstance(op, ast.Eq) else "is not"
-                            issues.append(CodeIssue(
-                                line=node.lineno, column=node.col_offset,
-                                issue_type=IssueType.LOGIC,
-                                severity=Severity.MEDIUM,
-                                message=f"Use '{replacement}' instead of '{op_str}' for None comparison",
-                                suggestion=f"Replace '{op_str} None' with '{replacement} None'",
-                                rule_id="E711"
-                            ))
-                
-                # Comparação com True/False
-                for i, comparator in enumerate(node.comparators):
-                    if isinstance(comparator, ast.Constant) and isinstance(comparator.value, bool):
-                        issues.append(CodeIssue(
-                            line=node.lineno, column=node.col_offset,
-                            issue_type=IssueType.LOGIC,
-                            severity=Severity.LOW,
-                            message=f"Avoid explicit comparison with {comparator.value}",
-                            suggestion="Use the boolean value directly",
-                            rule_id="E712"
-                        ))
-            
-            # Argumentos padrão mutáveis
-            if isinstance(node, ast.FunctionDef):
-                for default in node.args.defaults:
-                    if isinstance(default, (ast.List, ast.Dict, ast.Set)):
-                        issues.append(CodeIssue(
-                            line=node.lineno, column=node.col_offset,
-                            issue_type=IssueType.LOGIC,
-                            severity=Severity.HIGH,
-                            message="Mutable default argument",
-                            suggestion="Use None as default and create object inside function",
-                            rule_id="B006"
-                        ))
-            
-            # Exception catching muito amplo
-            if isinstance(node, ast.ExceptHandler):
-                if node.type is None:
-                    issues.append(CodeIssue(
-                        line=node.lineno, column=node.col_offset,
-                        issue_type=IssueType.LOGIC,
-                        severity=Severity.MEDIUM,
-                        message="Bare except clause",
-                        suggestion="Catch specific exceptions instead of using bare except",
-                        rule_id="E722"
-                    ))
-                elif isinstance(node.type, ast.Name) and node.type.id == "Exception":
-                    issues.append(CodeIssue(
-                        line=node.lineno, column=node.col_offset,
-                        issue_type=IssueType.LOGIC,
-                        severity=Severity.LOW,
-                        message="Too broad exception clause",
-                        suggestion="Catch more specific exceptions when possible",
-                        rule_id="B902"
-                    ))
-        
-        return issues
-    
-    def _analyze_security(self, tree: ast.AST, code: str) -> List[CodeIssue]:
-        """Análise de segurança"""
-        issues = []
-        
-        for node in ast.walk(tree):
-            # Uso de eval()
-            if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
-                if node.func.id == 'eval':
-                    issues.append(CodeIssue(
-                        line=node.lineno, column=node.col_offset,
-                        issue_type=IssueType.SECURITY,
-                        severity=Severity.CRITICAL,
-                        message="Use of eval() is dangerous",
-                        suggestion="Use ast.literal_eval() for safe evaluation of literals",
-                        rule_id="S307"
-                    ))
-                
-                # Uso de exec()
-                elif node.func.id == 'exec':
-                    issues.append(CodeIssue(
-                        line=node.lineno, column=node.col_offset,
-                        issue_type=IssueType.SECURITY,
-                        severity=Severity.CRITICAL,
-                        message="Use of exec() is dangerous",
-                        suggestion="Avoid dynamic code execution",
-                        rule_id="S102"
-                    ))
-                
-                # Subprocess sem shell=False
-                elif node.func.id in ['subprocess', 'os.system', 'os.popen']:
-                    issues.append(CodeIssue(
-                        line=node.lineno, column=node.col_offset,
-                        issue_type=IssueType.SECURITY,
-                        severity=Severity.HIGH,
-                        message="Potentially unsafe subprocess call",
-                        suggestion="Use subprocess with shell=False and validate inputs",
-                        rule_id="S602"
-                    ))
-            
-            # Hardcoded secrets
-            if isinstance(node, ast.Assign):
-                for target in node.targets:
-                    if isinstance(target, ast.Name):
-                        var_name = target.id.lower()
-                        sensitive_words = ['password', 'secret', 'key', 'token', 'api_key', 'auth']
-                        if any(word in var_name for word in sensitive_words):
-                            if isinstance(node.value, ast.Constant) and isinstance(node.value.value, str):
-                                if len(node.value.value) > 3:  # Ignore placeholder values
-                                    issues.append(CodeIssue(
-                                        line=node.lineno, column=node.col_offset,
-                                        issue_type=IssueType.SECURITY,
-                                        severity=Severity.HIGH,
-                                        message=f"Hardcoded {var_name.replace('_', ' ')} detected",
-                                        suggestion="Use environment variables or secure config files",
-                                        rule_id="S105"
-                                    ))
-            
-            # SQL string concatenation
-            if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
-                if isinstance(node.left, ast.Constant) and isinstance(node.left.value, str):
-                    if any(keyword in node.left.value.upper() for keyword in ['SELECT', 'INSERT', 'UPDATE', 'DELETE']):
-                        issues.append(CodeIssue(
-                            line=node.lineno, column=node.col_offset,
-                            issue_type=IssueType.SECURITY,
-                            severity=Severity.HIGH,
-                            message="Potential SQL injection vulnerability",
-                            suggestion="Use parameterized queries instead of string concatenation",
-                            rule_id="S608"
-                        ))
-        
-        return issues
-    
-    def _analyze_performance(self, tree: ast.AST, code: str) -> List[CodeIssue]:
-        """Análise de performance"""
-        issues = []
-        
-        for node in ast.walk(tree):
-            # String concatenation em loops
-            if isinstance(node, (ast.For, ast.While)):
-                for child in ast.walk(node):
-                    if isinstance(child, ast.AugAssign) and isinstance(child.op, ast.Add):
-                        if isinstance(child.target, ast.Name):
-                            issues.append(CodeIssue(
-                                line=child.lineno, column=child.col_offset,
-                                issue_type=IssueType.PERFORMANCE,
-                                severity=Severity.MEDIUM,
-                                message="String concatenation in loop is inefficient",
-                                suggestion="Use join() method or list comprehension",
-                                rule_id="P101"
-                            ))
-            
-            # List comprehension desnecessária para contagem
-            if isinstance(node, ast.Call):
-                if isinstance(node.func, ast.Name) and node.func.id == 'len':
-                    if len(node.args) == 1 and isinstance(node.args[0], ast.ListComp):
-                        issues.append(CodeIssue(
-                            line=node.lineno, column=node.col_offset,
-                            issue_type=IssueType.PERFORMANCE,
-                            severity=Severity.LOW,
-                            message="Inefficient list comprehension for counting",
-                            suggestion="Use sum() with generator expression instead",
-                            rule_id="P102"
-                        ))
-            
-            # Uso de keys() desnecessário
-            if isinstance(node, ast.Call):
-                if isinstance(node.func, ast.Attribute) and node.func.attr == 'keys':
-                    # Verifica se está sendo usado em 'in' ou loop
-                    parent = getattr(node, 'parent', None)
-                    if isinstance(parent, (ast.Compare, ast.For)):
-                        issues.append(CodeIssue(
-                            line=node.lineno, column=node.col_offset,
-                            issue_type=IssueType.PERFORMANCE,
-                            severity=Severity.LOW,
-                            message="Unnecessary use of .keys()",
-                            suggestion="Iterate over dictionary directly",
-                            rule_id="P103"
-                        ))
-        
-        return issues
-    
-    def _analyze_maintainability(self, tree: ast.AST, code: str) -> List[CodeIssue]:
-        """Análise de manutenibilidade"""
-        issues = []
-        
+    # ------------------------------------------------------------------
+    # Registro de regras e travessia única da AST
+    # ------------------------------------------------------------------
+
+    def register_rule(self, category: str, node_types: Tuple[type, ...],
+                      handler: Callable[[ast.AST, "AnalysisContext"], None]) -> None:
+        """
+        Registra uma regra que será chamada para cada nó dos tipos informados
+
+        Args:
+            category: Categoria dos issues gerados (ver RULE_CATEGORIES) ou "metrics"
+            node_types: Tipos de nó AST que a regra observa
+            handler: Função (node, ctx) que adiciona issues com ctx.add_issue()
+        """
+        for node_type in node_types:
+            self._dispatch.setdefault(node_type, []).append((category, handler))
+
+    def _register_default_rules(self) -> None:
+        """Registra as regras padrão do engine"""
+        # Lógica
+        self.register_rule("logic", (ast.FunctionDef,), self._rule_function_shape)
+        self.register_rule("logic", (ast.Compare,), self._rule_literal_comparison)
+        self.register_rule("logic", (ast.FunctionDef,), self._rule_mutable_default)
+        self.register_rule("logic", (ast.ExceptHandler,), self._rule_broad_except)
+
+        # Segurança
+        self.register_rule("security", (ast.Call,), self._rule_dangerous_call)
+        self.register_rule("security", (ast.Assign,), self._rule_hardcoded_secret)
+        self.register_rule("security", (ast.BinOp,), self._rule_sql_concatenation)
+
+        # Performance
+        self.register_rule("performance", (ast.AugAssign,), self._rule_concatenation_in_loop)
+        self.register_rule("performance", (ast.Call,), self._rule_len_of_listcomp)
+        self.register_rule("performance", (ast.Call,), self._rule_unnecessary_keys)
+
+        # Manutenibilidade
+        self.register_rule("maintainability", (ast.Constant,), self._rule_collect_string)
+
+        # Nomenclatura
+        self.register_rule("naming", (ast.FunctionDef,), self._rule_function_name)
+        self.register_rule("naming", (ast.ClassDef,), self._rule_class_name)
+        self.register_rule("naming", (ast.Name,), self._rule_variable_name)
+
+        # Documentação
+        self.register_rule("documentation", (ast.FunctionDef, ast.ClassDef), self._rule_missing_docstring)
+
+        # Métricas (não geram issues)
+        self.register_rule("metrics", (ast.FunctionDef, ast.ClassDef, ast.Import, ast.ImportFrom),
+                           self._rule_count_definitions)
+        self.register_rule("metrics", (ast.If, ast.For, ast.While, ast.ExceptHandler, ast.With,
+                                       ast.BoolOp, ast.Break, ast.Continue),
+                           self._rule_count_complexity)
+
+    def _run_rules(self, tree: ast.Module, code: str) -> "AnalysisContext":
+        """Percorre a AST uma única vez despachando cada nó para as regras inscritas"""
+        return self.analyze_statements(tree.body, tree, code)
+
+    def analyze_statements(self, statements: List[ast.stmt], parent: ast.AST,
+                           code: str = "") -> "AnalysisContext":
+        """Aplica as regras a um grupo de statements de nível superior"""
+        ctx = AnalysisContext(code)
+        ctx.has_module_docstring = _is_docstring(statements[0]) if statements else False
+        for statement in statements:
+            self._traverse(statement, parent, ctx)
+        return ctx
+
+    def _traverse(self, root: ast.AST, parent: ast.AST, ctx: "AnalysisContext") -> None:
+        """Travessia em pré-ordem (iterativa) que define node.parent e o contexto de aninhamento"""
+        dispatch = self._dispatch
+        stack = [(root, parent, 0, 0)]
+
+        while stack:
+            node, node_parent, nesting, loop_depth = stack.pop()
+            node.parent = node_parent
+            ctx.nesting = nesting
+            ctx.loop_depth = loop_depth
+            if nesting > ctx.max_nesting:
+                ctx.max_nesting = nesting
+
+            for category, handler in dispatch.get(type(node), ()):
+                ctx.category = category
+                handler(node, ctx)
+
+            child_nesting = nesting + 1 if isinstance(node, NESTING_NODES) else nesting
+            child_loops = loop_depth + 1 if isinstance(node, (ast.For, ast.While)) else loop_depth
+            children = list(ast.iter_child_nodes(node))
+            for child in reversed(children):
+                stack.append((child, node, child_nesting, child_loops))
+
+    def _collect_issues(self, ctx: "AnalysisContext", code: str) -> List[CodeIssue]:
+        """Gera os issues que dependem do arquivo inteiro e junta todos na ordem das categorias"""
+        summary_issues = []
+
         # Complexidade ciclomática
-        complexity = self._calculate_cyclomatic_complexity(tree)
+        complexity = ctx.cyclomatic_complexity
         if complexity > 10:
-            issues.append(CodeIssue(
+            summary_issues.append(CodeIssue(
                 line=1, column=1,
                 issue_type=IssueType.MAINTAINABILITY,
                 severity=Severity.HIGH,
@@ -448,31 +386,23 @@ class CodeAnalysisEngine:
                 suggestion="Break down complex logic into smaller functions",
                 rule_id="C901"
             ))
-        
+
         # Nesting muito profundo
-        max_nesting = self._calculate_max_nesting(tree)
-        if max_nesting > 4:
-            issues.append(CodeIssue(
+        if ctx.max_nesting > 4:
+            summary_issues.append(CodeIssue(
                 line=1, column=1,
                 issue_type=IssueType.MAINTAINABILITY,
                 severity=Severity.MEDIUM,
-                message=f"Deep nesting detected ({max_nesting} levels)",
+                message=f"Deep nesting detected ({ctx.max_nesting} levels)",
                 suggestion="Reduce nesting using early returns or helper functions",
                 rule_id="C902"
             ))
-        
+
         # Duplicação de código (strings literais repetidas)
-        string_constants = []
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Constant) and isinstance(node.value, str):
-                if len(node.value) > 10:  # Apenas strings longas
-                    string_constants.append((node.value, node.lineno))
-        
-        # Verifica duplicações
-        seen = {}
-        for value, line in string_constants:
+        seen = set()
+        for value, line in ctx.string_constants:
             if value in seen:
-                issues.append(CodeIssue(
+                summary_issues.append(CodeIssue(
                     line=line, column=1,
                     issue_type=IssueType.MAINTAINABILITY,
                     severity=Severity.LOW,
@@ -480,140 +410,361 @@ class CodeAnalysisEngine:
                     suggestion="Consider using a constant or configuration",
                     rule_id="C903"
                 ))
-            seen[value] = line
-        
-        return issues
-    
-    def _analyze_naming(self, tree: ast.AST, code: str) -> List[CodeIssue]:
-        """Análise de convenções de nomenclatura"""
+            seen.add(value)
+
+        # Módulo sem docstring
+        module_issues = []
+        if not ctx.has_module_docstring and len(code.split('\n')) > 10:
+            module_issues.append(CodeIssue(
+                line=1, column=1,
+                issue_type=IssueType.DOCUMENTATION,
+                severity=Severity.LOW,
+                message="Module missing docstring",
+                suggestion="Add module-level docstring",
+                rule_id="D100"
+            ))
+
         issues = []
-        
-        for node in ast.walk(tree):
-            # Nomes de funções
-            if isinstance(node, ast.FunctionDef):
-                if not re.match(r'^[a-z_][a-z0-9_]*$', node.name):
-                    issues.append(CodeIssue(
-                        line=node.lineno, column=node.col_offset,
-                        issue_type=IssueType.NAMING,
-                        severity=Severity.LOW,
-                        message=f"Function name '{node.name}' should be snake_case",
-                        suggestion="Use lowercase with underscores (snake_case)",
-                        rule_id="N802"
-                    ))
-            
-            # Nomes de classes
-            if isinstance(node, ast.ClassDef):
-                if not re.match(r'^[A-Z][a-zA-Z0-9]*$', node.name):
-                    issues.append(CodeIssue(
-                        line=node.lineno, column=node.col_offset,
-                        issue_type=IssueType.NAMING,
-                        severity=Severity.LOW,
-                        message=f"Class name '{node.name}' should be PascalCase",
-                        suggestion="Use PascalCase (first letter uppercase)",
-                        rule_id="N801"
-                    ))
-            
-            # Variáveis com nomes muito curtos
-            if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
-                if len(node.id) == 1 and node.id not in ['i', 'j', 'k', 'x', 'y', 'z', '_']:
-                    issues.append(CodeIssue(
-                        line=node.lineno, column=node.col_offset,
-                        issue_type=IssueType.NAMING,
-                        severity=Severity.LOW,
-                        message=f"Variable name '{node.id}' is too short",
-                        suggestion="Use descriptive variable names",
-                        rule_id="N803"
-                    ))
-                
-                # Palavras reservadas como nomes
-                if keyword.iskeyword(node.id):
-                    issues.append(CodeIssue(
-                        line=node.lineno, column=node.col_offset,
-                        issue_type=IssueType.NAMING,
-                        severity=Severity.HIGH,
-                        message=f"'{node.id}' is a Python keyword",
-                        suggestion="Choose a different variable name",
-                        rule_id="N804"
-                    ))
-        
+        for category in RULE_CATEGORIES:
+            if category == "maintainability":
+                issues.extend(summary_issues)
+            issues.extend(ctx.issues.get(category, []))
+            if category == "documentation":
+                issues.extend(module_issues)
         return issues
-    
-    def _analyze_documentation(self, tree: ast.AST, code: str) -> List[CodeIssue]:
-        """Análise de documentação"""
-        issues = []
-        
-        for node in ast.walk(tree):
-            # Funções sem docstring
-            if isinstance(node, ast.FunctionDef):
-                if not ast.get_docstring(node):
-                    # Ignora funções muito simples (menos de 3 linhas)
-                    func_lines = (node.end_lineno or node.lineno) - node.lineno + 1
-                    if func_lines > 3 and not node.name.startswith('_'):
-                        issues.append(CodeIssue(
-                            line=node.lineno, column=node.col_offset,
-                            issue_type=IssueType.DOCUMENTATION,
-                            severity=Severity.LOW,
-                            message=f"Function '{node.name}' missing docstring",
-                            suggestion="Add docstring explaining function purpose",
-                            rule_id="D100"
-                        ))
-            
-            # Classes sem docstring
-            if isinstance(node, ast.ClassDef):
-                if not ast.get_docstring(node):
-                    issues.append(CodeIssue(
+
+    # ------------------------------------------------------------------
+    # Regras de lógica
+    # ------------------------------------------------------------------
+
+    def _rule_function_shape(self, node: ast.FunctionDef, ctx: "AnalysisContext") -> None:
+        """Funções muito longas ou com muitos parâmetros"""
+        func_lines = (node.end_lineno or node.lineno) - node.lineno + 1
+        if func_lines > 50:
+            ctx.add_issue(CodeIssue(
+                line=node.lineno, column=node.col_offset,
+                issue_type=IssueType.MAINTAINABILITY,
+                severity=Severity.MEDIUM,
+                message=f"Function '{node.name}' is too long ({func_lines} lines)",
+                suggestion="Break into smaller, focused functions",
+                rule_id="C901"
+            ))
+
+        if len(node.args.args) > 7:
+            ctx.add_issue(CodeIssue(
+                line=node.lineno, column=node.col_offset,
+                issue_type=IssueType.MAINTAINABILITY,
+                severity=Severity.MEDIUM,
+                message=f"Function '{node.name}' has too many parameters ({len(node.args.args)})",
+                suggestion="Consider using a config object or reducing parameters",
+                rule_id="C902"
+            ))
+
+    def _rule_literal_comparison(self, node: ast.Compare, ctx: "AnalysisContext") -> None:
+        """Comparação com None usando == e comparação com True/False"""
+        for i, comparator in enumerate(node.comparators):
+            if isinstance(comparator, ast.Constant) and comparator.value is None:
+                op = node.ops[i]
+                if isinstance(op, (ast.Eq, ast.NotEq)):
+                    op_str = "==" if isinstance(op, ast.Eq) else "!="
+                    replacement = "is" if isinstance(op, ast.Eq) else "is not"
+                    ctx.add_issue(CodeIssue(
                         line=node.lineno, column=node.col_offset,
-                        issue_type=IssueType.DOCUMENTATION,
+                        issue_type=IssueType.LOGIC,
                         severity=Severity.MEDIUM,
-                        message=f"Class '{node.name}' missing docstring",
-                        suggestion="Add docstring explaining class purpose",
-                        rule_id="D101"
+                        message=f"Use '{replacement}' instead of '{op_str}' for None comparison",
+                        suggestion=f"Replace '{op_str} None' with '{replacement} None'",
+                        rule_id="E711"
                     ))
-        
-        # Módulo sem docstring
-        module_docstring = ast.get_docstring(tree)
-        if not module_docstring:
-            lines = code.split('\n')
-            if len(lines) > 10:  # Apenas para códigos mais longos
-                issues.append(CodeIssue(
-                    line=1, column=1,
+
+        for comparator in node.comparators:
+            if isinstance(comparator, ast.Constant) and isinstance(comparator.value, bool):
+                ctx.add_issue(CodeIssue(
+                    line=node.lineno, column=node.col_offset,
+                    issue_type=IssueType.LOGIC,
+                    severity=Severity.LOW,
+                    message=f"Avoid explicit comparison with {comparator.value}",
+                    suggestion="Use the boolean value directly",
+                    rule_id="E712"
+                ))
+
+    def _rule_mutable_default(self, node: ast.FunctionDef, ctx: "AnalysisContext") -> None:
+        """Argumentos padrão mutáveis"""
+        for default in node.args.defaults:
+            if isinstance(default, (ast.List, ast.Dict, ast.Set)):
+                ctx.add_issue(CodeIssue(
+                    line=node.lineno, column=node.col_offset,
+                    issue_type=IssueType.LOGIC,
+                    severity=Severity.HIGH,
+                    message="Mutable default argument",
+                    suggestion="Use None as default and create object inside function",
+                    rule_id="B006"
+                ))
+
+    def _rule_broad_except(self, node: ast.ExceptHandler, ctx: "AnalysisContext") -> None:
+        """Exception catching muito amplo"""
+        if node.type is None:
+            ctx.add_issue(CodeIssue(
+                line=node.lineno, column=node.col_offset,
+                issue_type=IssueType.LOGIC,
+                severity=Severity.MEDIUM,
+                message="Bare except clause",
+                suggestion="Catch specific exceptions instead of using bare except",
+                rule_id="E722"
+            ))
+        elif isinstance(node.type, ast.Name) and node.type.id == "Exception":
+            ctx.add_issue(CodeIssue(
+                line=node.lineno, column=node.col_offset,
+                issue_type=IssueType.LOGIC,
+                severity=Severity.LOW,
+                message="Too broad exception clause",
+                suggestion="Catch more specific exceptions when possible",
+                rule_id="B902"
+            ))
+
+    # ------------------------------------------------------------------
+    # Regras de segurança
+    # ------------------------------------------------------------------
+
+    def _rule_dangerous_call(self, node: ast.Call, ctx: "AnalysisContext") -> None:
+        """Uso de eval(), exec() e chamadas de sistema"""
+        if not isinstance(node.func, ast.Name):
+            return
+
+        if node.func.id == 'eval':
+            ctx.add_issue(CodeIssue(
+                line=node.lineno, column=node.col_offset,
+                issue_type=IssueType.SECURITY,
+                severity=Severity.CRITICAL,
+                message="Use of eval() is dangerous",
+                suggestion="Use ast.literal_eval() for safe evaluation of literals",
+                rule_id="S307"
+            ))
+        elif node.func.id == 'exec':
+            ctx.add_issue(CodeIssue(
+                line=node.lineno, column=node.col_offset,
+                issue_type=IssueType.SECURITY,
+                severity=Severity.CRITICAL,
+                message="Use of exec() is dangerous",
+                suggestion="Avoid dynamic code execution",
+                rule_id="S102"
+            ))
+        elif node.func.id in ['subprocess', 'os.system', 'os.popen']:
+            ctx.add_issue(CodeIssue(
+                line=node.lineno, column=node.col_offset,
+                issue_type=IssueType.SECURITY,
+                severity=Severity.HIGH,
+                message="Potentially unsafe subprocess call",
+                suggestion="Use subprocess with shell=False and validate inputs",
+                rule_id="S602"
+            ))
+
+    def _rule_hardcoded_secret(self, node: ast.Assign, ctx: "AnalysisContext") -> None:
+        """Segredos escritos diretamente no código"""
+        sensitive_words = ['password', 'secret', 'key', 'token', 'api_key', 'auth']
+        for target in node.targets:
+            if isinstance(target, ast.Name):
+                var_name = target.id.lower()
+                if any(word in var_name for word in sensitive_words):
+                    if isinstance(node.value, ast.Constant) and isinstance(node.value.value, str):
+                        if len(node.value.value) > 3:  # Ignore placeholder values
+                            ctx.add_issue(CodeIssue(
+                                line=node.lineno, column=node.col_offset,
+                                issue_type=IssueType.SECURITY,
+                                severity=Severity.HIGH,
+                                message=f"Hardcoded {var_name.replace('_', ' ')} detected",
+                                suggestion="Use environment variables or secure config files",
+                                rule_id="S105"
+                            ))
+
+    def _rule_sql_concatenation(self, node: ast.BinOp, ctx: "AnalysisContext") -> None:
+        """SQL montado com concatenação de strings"""
+        if isinstance(node.op, ast.Add) and isinstance(node.left, ast.Constant) and isinstance(node.left.value, str):
+            if any(keyword in node.left.value.upper() for keyword in ['SELECT', 'INSERT', 'UPDATE', 'DELETE']):
+                ctx.add_issue(CodeIssue(
+                    line=node.lineno, column=node.col_offset,
+                    issue_type=IssueType.SECURITY,
+                    severity=Severity.HIGH,
+                    message="Potential SQL injection vulnerability",
+                    suggestion="Use parameterized queries instead of string concatenation",
+                    rule_id="S608"
+                ))
+
+    # ------------------------------------------------------------------
+    # Regras de performance
+    # ------------------------------------------------------------------
+
+    def _rule_concatenation_in_loop(self, node: ast.AugAssign, ctx: "AnalysisContext") -> None:
+        """Concatenação com += dentro de loops (reportada uma vez, mesmo em loops aninhados)"""
+        if ctx.loop_depth and isinstance(node.op, ast.Add) and isinstance(node.target, ast.Name):
+            ctx.add_issue(CodeIssue(
+                line=node.lineno, column=node.col_offset,
+                issue_type=IssueType.PERFORMANCE,
+                severity=Severity.MEDIUM,
+                message="String concatenation in loop is inefficient",
+                suggestion="Use join() method or list comprehension",
+                rule_id="P101"
+            ))
+
+    def _rule_len_of_listcomp(self, node: ast.Call, ctx: "AnalysisContext") -> None:
+        """List comprehension desnecessária para contagem"""
+        if isinstance(node.func, ast.Name) and node.func.id == 'len':
+            if len(node.args) == 1 and isinstance(node.args[0], ast.ListComp):
+                ctx.add_issue(CodeIssue(
+                    line=node.lineno, column=node.col_offset,
+                    issue_type=IssueType.PERFORMANCE,
+                    severity=Severity.LOW,
+                    message="Inefficient list comprehension for counting",
+                    suggestion="Use sum() with generator expression instead",
+                    rule_id="P102"
+                ))
+
+    def _rule_unnecessary_keys(self, node: ast.Call, ctx: "AnalysisContext") -> None:
+        """Uso de keys() desnecessário em 'in' ou loop"""
+        if isinstance(node.func, ast.Attribute) and node.func.attr == 'keys':
+            if isinstance(node.parent, (ast.Compare, ast.For)):
+                ctx.add_issue(CodeIssue(
+                    line=node.lineno, column=node.col_offset,
+                    issue_type=IssueType.PERFORMANCE,
+                    severity=Severity.LOW,
+                    message="Unnecessary use of .keys()",
+                    suggestion="Iterate over dictionary directly",
+                    rule_id="P103"
+                ))
+
+    # ------------------------------------------------------------------
+    # Regras de manutenibilidade, nomenclatura e documentação
+    # ------------------------------------------------------------------
+
+    def _rule_collect_string(self, node: ast.Constant, ctx: "AnalysisContext") -> None:
+        """Coleta strings longas para detectar duplicação ao final"""
+        if isinstance(node.value, str) and len(node.value) > 10:
+            ctx.string_constants.append((node.value, node.lineno))
+
+    def _rule_function_name(self, node: ast.FunctionDef, ctx: "AnalysisContext") -> None:
+        """Nomes de funções em snake_case"""
+        if not re.match(r'^[a-z_][a-z0-9_]*$', node.name):
+            ctx.add_issue(CodeIssue(
+                line=node.lineno, column=node.col_offset,
+                issue_type=IssueType.NAMING,
+                severity=Severity.LOW,
+                message=f"Function name '{node.name}' should be snake_case",
+                suggestion="Use lowercase with underscores (snake_case)",
+                rule_id="N802"
+            ))
+
+    def _rule_class_name(self, node: ast.ClassDef, ctx: "AnalysisContext") -> None:
+        """Nomes de classes em PascalCase"""
+        if not re.match(r'^[A-Z][a-zA-Z0-9]*$', node.name):
+            ctx.add_issue(CodeIssue(
+                line=node.lineno, column=node.col_offset,
+                issue_type=IssueType.NAMING,
+                severity=Severity.LOW,
+                message=f"Class name '{node.name}' should be PascalCase",
+                suggestion="Use PascalCase (first letter uppercase)",
+                rule_id="N801"
+            ))
+
+    def _rule_variable_name(self, node: ast.Name, ctx: "AnalysisContext") -> None:
+        """Variáveis com nomes muito curtos ou palavras reservadas"""
+        if not isinstance(node.ctx, ast.Store):
+            return
+
+        if len(node.id) == 1 and node.id not in ['i', 'j', 'k', 'x', 'y', 'z', '_']:
+            ctx.add_issue(CodeIssue(
+                line=node.lineno, column=node.col_offset,
+                issue_type=IssueType.NAMING,
+                severity=Severity.LOW,
+                message=f"Variable name '{node.id}' is too short",
+                suggestion="Use descriptive variable names",
+                rule_id="N803"
+            ))
+
+        if keyword.iskeyword(node.id):
+            ctx.add_issue(CodeIssue(
+                line=node.lineno, column=node.col_offset,
+                issue_type=IssueType.NAMING,
+                severity=Severity.HIGH,
+                message=f"'{node.id}' is a Python keyword",
+                suggestion="Choose a different variable name",
+                rule_id="N804"
+            ))
+
+    def _rule_missing_docstring(self, node: ast.AST, ctx: "AnalysisContext") -> None:
+        """Funções e classes sem docstring (também alimenta a cobertura de documentação)"""
+        has_docstring = bool(ast.get_docstring(node))
+        ctx.documentable_items += 1
+        if has_docstring:
+            ctx.documented_items += 1
+            return
+
+        if isinstance(node, ast.FunctionDef):
+            # Ignora funções muito simples (menos de 3 linhas)
+            func_lines = (node.end_lineno or node.lineno) - node.lineno + 1
+            if func_lines > 3 and not node.name.startswith('_'):
+                ctx.add_issue(CodeIssue(
+                    line=node.lineno, column=node.col_offset,
                     issue_type=IssueType.DOCUMENTATION,
                     severity=Severity.LOW,
-                    message="Module missing docstring",
-                    suggestion="Add module-level docstring",
+                    message=f"Function '{node.name}' missing docstring",
+                    suggestion="Add docstring explaining function purpose",
                     rule_id="D100"
                 ))
-        
-        return issues
-    
-    def _calculate_metrics(self, tree: ast.AST, code: str) -> CodeMetrics:
-        """Calcula métricas do código"""
+        else:
+            ctx.add_issue(CodeIssue(
+                line=node.lineno, column=node.col_offset,
+                issue_type=IssueType.DOCUMENTATION,
+                severity=Severity.MEDIUM,
+                message=f"Class '{node.name}' missing docstring",
+                suggestion="Add docstring explaining class purpose",
+                rule_id="D101"
+            ))
+
+    # ------------------------------------------------------------------
+    # Métricas
+    # ------------------------------------------------------------------
+
+    def _rule_count_definitions(self, node: ast.AST, ctx: "AnalysisContext") -> None:
+        """Conta funções, classes e imports"""
+        if isinstance(node, ast.FunctionDef):
+            ctx.functions += 1
+        elif isinstance(node, ast.ClassDef):
+            ctx.classes += 1
+        else:
+            ctx.imports += 1
+
+    def _rule_count_complexity(self, node: ast.AST, ctx: "AnalysisContext") -> None:
+        """Acumula pontos de decisão da complexidade ciclomática"""
+        if isinstance(node, ast.BoolOp):
+            ctx.decision_points += len(node.values) - 1
+        else:
+            ctx.decision_points += 1
+
+    def _calculate_metrics(self, ctx: "AnalysisContext", code: str) -> CodeMetrics:
+        """Calcula métricas do código a partir dos contadores da travessia"""
         lines = code.split('\n')
-        
+
         lines_of_code = len([l for l in lines if l.strip() and not l.strip().startswith('#')])
         blank_lines = len([l for l in lines if not l.strip()])
         comment_lines = len([l for l in lines if l.strip().startswith('#')])
-        
-        functions = len([n for n in ast.walk(tree) if isinstance(n, ast.FunctionDef)])
-        classes = len([n for n in ast.walk(tree) if isinstance(n, ast.ClassDef)])
-        imports = len([n for n in ast.walk(tree) if isinstance(n, (ast.Import, ast.ImportFrom))])
-        
-        cyclomatic_complexity = self._calculate_cyclomatic_complexity(tree)
-        maintainability_index = self._calculate_maintainability_index(tree, lines_of_code, cyclomatic_complexity)
-        documentation_coverage = self._calculate_documentation_coverage(tree)
-        
+
+        cyclomatic_complexity = ctx.cyclomatic_complexity
+        maintainability_index = self._calculate_maintainability_index(lines_of_code, cyclomatic_complexity)
+        documentation_coverage = (ctx.documented_items / ctx.documentable_items
+                                  if ctx.documentable_items > 0 else 1.0)
+
         return CodeMetrics(
             lines_of_code=lines_of_code,
             blank_lines=blank_lines,
             comment_lines=comment_lines,
-            functions=functions,
-            classes=classes,
-            imports=imports,
+            functions=ctx.functions,
+            classes=ctx.classes,
+            imports=ctx.imports,
             cyclomatic_complexity=cyclomatic_complexity,
             maintainability_index=maintainability_index,
             documentation_coverage=documentation_coverage
         )
-    
+
     def _calculate_quality_score(self, issues: List[CodeIssue], 
                                 metrics: CodeMetrics, code: str) -> QualityScore:
         """Calcula scores de qualidade"""
@@ -669,39 +820,7 @@ class CodeAnalysisEngine:
             documentation_score=round(documentation_score, 1)
         )
     
-    def _calculate_cyclomatic_complexity(self, tree: ast.AST) -> int:
-        """Calcula complexidade ciclomática"""
-        complexity = 1  # Base complexity
-        
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.If, ast.For, ast.While, ast.ExceptHandler, ast.With)):
-                complexity += 1
-            elif isinstance(node, ast.BoolOp):
-                complexity += len(node.values) - 1
-            elif isinstance(node, (ast.Break, ast.Continue)):
-                complexity += 1
-        
-        return complexity
-    
-    def _calculate_max_nesting(self, tree: ast.AST) -> int:
-        """Calcula nível máximo de aninhamento"""
-        max_depth = 0
-        
-        def get_depth(node, current_depth=0):
-            nonlocal max_depth
-            max_depth = max(max_depth, current_depth)
-            
-            if isinstance(node, (ast.If, ast.For, ast.While, ast.With, ast.FunctionDef, ast.ClassDef)):
-                for child in ast.iter_child_nodes(node):
-                    get_depth(child, current_depth + 1)
-            else:
-                for child in ast.iter_child_nodes(node):
-                    get_depth(child, current_depth)
-        
-        get_depth(tree)
-        return max_depth
-    
-    def _calculate_maintainability_index(self, tree: ast.AST, loc: int, complexity: int) -> float:
+    def _calculate_maintainability_index(self, loc: int, complexity: int) -> float:
         """Calcula índice de manutenibilidade simplificado"""
         if loc == 0:
             return 100.0
@@ -711,19 +830,6 @@ class CodeAnalysisEngine:
         mi = 171 - 5.2 * (halstead_volume ** 0.23) - 0.23 * complexity - 16.2 * (loc ** 0.5)
         return max(0, min(100, mi))
     
-    def _calculate_documentation_coverage(self, tree: ast.AST) -> float:
-        """Calcula cobertura de documentação"""
-        total_items = 0
-        documented_items = 0
-        
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
-                total_items += 1
-                if ast.get_docstring(node):
-                    documented_items += 1
-        
-        return documented_items / total_items if total_items > 0 else 1.0
-    
     def _score_to_grade(self, score: float) -> str:
         """Converte score numérico em grade"""
         if score >= 95: return "A+"
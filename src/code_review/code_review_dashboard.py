@@ -10,15 +10,29 @@ import json
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 from .analysis_engine import CodeAnalysisEngine, IssueType, Severity
+from .incremental_analysis import IncrementalAnalyzer
+from .tree_review import TreeReviewer, normalize_result
+
+# Limite de análises mantidas no histórico
+HISTORY_LIMIT = 100
 
 
 class CodeReviewDashboard:
     """Dashboard interativo para code review"""
     
-    def __init__(self, analysis_engine: CodeAnalysisEngine, ui_components):
+    def __init__(self, analysis_engine: CodeAnalysisEngine, ui_components, store=None):
+        """
+        Args:
+            analysis_engine: Engine de análise
+            ui_components: Componentes de interface
+            store: LearnerStore para o histórico (None usa o arquivo JSON)
+        """
         self.engine = analysis_engine
         self.ui = ui_components
         self.history_file = ".code_review_history.json"
+        self.store = store
+        if self.store is not None:
+            self._migrate_history()
         self.load_history()
         
     def show_main_dashboard(self):
@@ -35,6 +49,7 @@ class CodeReviewDashboard:
             print("2. 📁 Analisar Arquivo Python")
             print("3. 🧪 Exercício com Code Review")
             print("4. 🔄 Comparar Versões")
+            print("11. 🗂️ Revisar Projeto Inteiro")
             
             print("\n📊 RELATÓRIOS:")
             print("5. 📈 Histórico de Qualidade")
@@ -72,6 +87,8 @@ class CodeReviewDashboard:
                 self._configure_analysis()
             elif choice == "10":
                 self._clear_history()
+            elif choice == "11":
+                self._review_project_tree()
             else:
                 self.ui.error("Opção inválida!")
                 self.ui.pause()
@@ -170,6 +187,57 @@ class CodeReviewDashboard:
         # Mostra resultado
         self._display_analysis_result(result)
     
+    def _review_project_tree(self):
+        """Code review de todos os arquivos de um diretório"""
+        self.ui.clear_screen()
+        self.ui.header("🗂️ REVIEW DE PROJETO", "Analisa todos os arquivos Python de um diretório")
+        
+        path = input("\n📂 Diretório do projeto: ").strip()
+        
+        if not path or not os.path.exists(path):
+            self.ui.error(f"Diretório '{path}' não encontrado!")
+            self.ui.pause()
+            return
+        
+        print(f"\n🔍 Analisando '{path}'...")
+        report = TreeReviewer(self.engine).review_tree(path)
+        
+        if not report['total_files']:
+            self.ui.warning("Nenhum arquivo Python encontrado!")
+            self.ui.pause()
+            return
+        
+        print(f"\n📊 RESULTADO DO PROJETO:")
+        print(f"  📁 Arquivos: {report['total_files']} "
+              f"({report['analyzed_files']} analisados, {report['cached_files']} sem alterações)")
+        print(f"  📏 Linhas de código: {report['lines_of_code']}")
+        print(f"  📈 Score geral: {report['overall_score']:.1f}")
+        print(f"  🐛 Total de issues: {report['total_issues']}")
+        print(f"  ⏱️ Tempo: {report['review_time_ms']} ms")
+        
+        if report['by_severity']:
+            print("\n🚨 ISSUES POR SEVERIDADE:")
+            for severity in ['critical', 'high', 'medium', 'low']:
+                if severity in report['by_severity']:
+                    print(f"  • {severity.upper()}: {report['by_severity'][severity]}")
+        
+        if report['top_rules']:
+            print("\n📋 REGRAS MAIS VIOLADAS:")
+            for rule_id, count in report['top_rules'][:5]:
+                print(f"  • {rule_id}: {count}")
+        
+        if report['worst_files']:
+            print("\n⚠️ ARQUIVOS QUE MAIS PRECISAM DE ATENÇÃO:")
+            for filename, score in report['worst_files']:
+                print(f"  • {filename}: {score:.1f}")
+        
+        if report['syntax_errors']:
+            print("\n🚨 ARQUIVOS COM ERRO DE SINTAXE:")
+            for filename in report['syntax_errors']:
+                print(f"  • {filename}")
+        
+        self.ui.pause()
+    
     def _exercise_with_review(self):
         """Exercício com code review integrado"""
         self.ui.clear_screen()
@@ -267,13 +335,57 @@ print(resultado)''',
         
         # Análise com contexto do exercício
         print("\n🔍 Analisando sua solução...")
-        result = self.engine.analyze_code(user_code, f"exercise_{exercise['title']}.py", "exercise")
+        filename = f"exercise_{exercise['title']}.py"
+        analyzer = IncrementalAnalyzer(self.engine)
         
-        # Salva no histórico
-        self.save_analysis(result)
+        while True:
+            result = analyzer.analyze(user_code, filename, "exercise")
+            
+            # Salva no histórico
+            self.save_analysis(result)
+            
+            # Mostra resultado com dicas específicas do exercício
+            self._display_exercise_result(result, exercise)
+            
+            # Ciclo de edição: só os statements alterados são reanalisados
+            edited_code = self._edit_single_line(user_code)
+            if edited_code is None:
+                break
+            user_code = edited_code
+            print("\n🔍 Reanalisando alterações...")
+    
+    def _edit_single_line(self, code: str) -> Optional[str]:
+        """Permite editar uma linha do código; retorna None para encerrar"""
+        lines = code.split('\n')
+        try:
+            choice = input(f"\n✏️ Linha para editar (1-{len(lines)}, '+' para adicionar, Enter para sair): ").strip()
+        except EOFError:
+            return None
+        
+        if not choice:
+            return None
+        if choice == '+':
+            try:
+                lines.append(input("Nova linha: "))
+            except EOFError:
+                return None
+            return '\n'.join(lines)
+        
+        try:
+            index = int(choice) - 1
+        except ValueError:
+            self.ui.error("Entrada inválida!")
+            return code
+        if not 0 <= index < len(lines):
+            self.ui.error("Linha inexistente!")
+            return code
         
-        # Mostra resultado com dicas específicas do exercício
-        self._display_exercise_result(result, exercise)
+        print(f"Atual: {lines[index]}")
+        try:
+            lines[index] = input("Nova:  ")
+        except EOFError:
+            return None
+        return '\n'.join(lines)
     
     def _compare_code_versions(self):
         """Compara duas versões do código"""
@@ -316,8 +428,10 @@ print(resultado)''',
         
         # Análise de ambas as versões
         print("\n🔍 Analisando versões...")
-        result1 = self.engine.analyze_code(code1, "version_1.py", "comparison")
-        result2 = self.engine.analyze_code(code2, "version_2.py", "comparison")
+        # A versão 2 reaproveita a análise dos statements que não mudaram
+        analyzer = IncrementalAnalyzer(self.engine)
+        result1 = analyzer.analyze(code1, "version_1.py", "comparison")
+        result2 = analyzer.analyze(code2, "version_2.py", "comparison")
         
         # Mostra comparação
         self._display_version_comparison(result1, result2)
@@ -516,6 +630,8 @@ print(resultado)''',
         
         if confirm == "CONFIRMAR":
             self.engine.clear_history()
+            if self.store is not None:
+                self.store.clear_domain("code_review")
             if os.path.exists(self.history_file):
                 os.remove(self.history_file)
             self.ui.success("✅ Histórico limpo com sucesso!")
@@ -699,12 +815,17 @@ print(resultado)''',
     def save_analysis(self, result: Dict[str, Any]):
         """Salva análise no histórico persistente"""
         try:
+            if self.store is not None:
+                # Uma linha nova no banco, sem reler/regravar o histórico
+                self.store.append("code_review", "analyses", normalize_result(result))
+                return
+            
             history = self.load_history()
-            history.append(result)
+            history.append(normalize_result(result))
             
             # Limita histórico a 100 entradas
-            if len(history) > 100:
-                history = history[-100:]
+            if len(history) > HISTORY_LIMIT:
+                history = history[-HISTORY_LIMIT:]
             
             with open(self.history_file, 'w', encoding='utf-8') as f:
                 json.dump(history, f, indent=2, ensure_ascii=False)
@@ -712,8 +833,24 @@ print(resultado)''',
         except Exception as e:
             print(f"Erro ao salvar histórico: {e}")
     
+    def _migrate_history(self) -> None:
+        """Importa o histórico JSON antigo para o banco (apenas uma vez)"""
+        self.store.ensure_domain("code_review")
+        with self.store.transaction():
+            if self.store.is_migrated("code_review"):
+                return
+            legacy = self._load_history_file()
+            self.store.append_many("code_review", "analyses", legacy)
+            self.store.mark_migrated("code_review", self.history_file if legacy else None)
+    
     def load_history(self) -> List[Dict[str, Any]]:
         """Carrega histórico persistente"""
+        if self.store is not None:
+            return self.store.history("code_review", "analyses", limit=HISTORY_LIMIT)
+        return self._load_history_file()
+    
+    def _load_history_file(self) -> List[Dict[str, Any]]:
+        """Lê o histórico do arquivo JSON"""
         try:
             if os.path.exists(self.history_file):
                 with open(self.history_file, 'r', encoding='utf-8') as f:
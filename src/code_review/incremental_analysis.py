@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Análise Incremental - Reanalisa apenas os statements alterados entre versões
+Statements de nível superior inalterados reaproveitam issues e métricas em cache
+"""
+
+import ast
+import hashlib
+import difflib
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+
+from .analysis_engine import CodeAnalysisEngine, AnalysisContext
+
+
+class _Unit:
+    """Grupo de statements de nível superior que ocupam as mesmas linhas"""
+
+    __slots__ = ("start", "end", "key")
+
+    def __init__(self, start: int, end: int, key: str):
+        self.start = start  # Linha inicial (1-based, inclui decorators)
+        self.end = end      # Linha final (inclusive)
+        self.key = key
+
+
+class IncrementalAnalyzer:
+    """Mantém o estado da última versão de um código para reanálises rápidas"""
+
+    def __init__(self, engine: CodeAnalysisEngine, max_cached_units: int = 5000):
+        """
+        Args:
+            engine: Engine usado para aplicar as regras
+            max_cached_units: Limite de statements mantidos em cache (LRU)
+        """
+        self.engine = engine
+        self.max_cached_units = max_cached_units
+        self._cache: "OrderedDict[str, Tuple[int, AnalysisContext]]" = OrderedDict()
+        self._previous_lines: List[str] = []
+        self._previous_units: List[_Unit] = []
+
+        # Estatísticas da última análise
+        self.reused_units = 0
+        self.analyzed_units = 0
+
+    def reset(self) -> None:
+        """Esquece a versão anterior e o cache"""
+        self._cache.clear()
+        self._previous_lines = []
+        self._previous_units = []
+
+    def analyze(self, code: str, filename: str = "user_code.py",
+                context: str = "exercise") -> Dict[str, Any]:
+        """
+        Analisa o código reaproveitando o que não mudou desde a última chamada
+
+        Returns:
+            Resultado no mesmo formato de CodeAnalysisEngine.analyze_code
+        """
+        analysis_start = datetime.now()
+        self.reused_units = 0
+        self.analyzed_units = 0
+
+        if not code.strip():
+            self.reset()
+            return self.engine.analyze_code(code, filename, context)
+
+        lines = code.split('\n')
+        units = self._diff_units(lines) if self._previous_units else None
+        if units is None:
+            try:
+                tree = ast.parse(code)
+            except SyntaxError:
+                # Mantém a última versão válida como base para a próxima edição
+                return self.engine.analyze_code(code, filename, context)
+            units = self._analyze_tree(tree, lines)
+
+        ctx = AnalysisContext(code)
+        for index, (unit, (base_line, unit_ctx)) in enumerate(units):
+            if index == 0:
+                ctx.has_module_docstring = unit_ctx.has_module_docstring
+            ctx.merge(unit_ctx, line_offset=unit.start - base_line)
+
+        self._previous_lines = lines
+        self._previous_units = [unit for unit, _ in units]
+        return self.engine.build_result(ctx, code, filename, context, analysis_start)
+
+    # ------------------------------------------------------------------
+
+    def _diff_units(self, lines: List[str]) -> Optional[List[Tuple[_Unit, Tuple[int, AnalysisContext]]]]:
+        """
+        Mapeia statements inalterados da versão anterior e reanalisa só os trechos novos
+
+        Returns:
+            Lista ordenada de (unidade, (linha_base, contexto)) ou None se for preciso
+            refazer o parse completo
+        """
+        matcher = difflib.SequenceMatcher(None, self._previous_lines, lines, autojunk=False)
+        old_to_new: Dict[int, int] = {}
+        for tag, i1, i2, j1, _ in matcher.get_opcodes():
+            if tag == 'equal':
+                for offset in range(i2 - i1):
+                    old_to_new[i1 + offset] = j1 + offset
+
+        # Statements cujas linhas foram todas preservadas, na mesma sequência
+        kept: List[_Unit] = []
+        for unit in self._previous_units:
+            first = old_to_new.get(unit.start - 1)
+            if first is None or unit.key not in self._cache:
+                continue
+            if all(old_to_new.get(line - 1) == first + (line - unit.start)
+                   for line in range(unit.start, unit.end + 1)):
+                kept.append(_Unit(first + 1, first + 1 + unit.end - unit.start, unit.key))
+
+        result = []
+        cursor = 1
+        for unit in kept + [None]:
+            gap_end = unit.start - 1 if unit else len(lines)
+            if gap_end >= cursor:
+                gap_units = self._analyze_gap(lines, cursor, gap_end)
+                if gap_units is None:
+                    return None
+                result.extend(gap_units)
+            if unit is None:
+                break
+            if unit.start < cursor:
+                return None
+            self._cache.move_to_end(unit.key)
+            result.append((unit, self._cache[unit.key]))
+            self.reused_units += 1
+            cursor = unit.end + 1
+
+        return result
+
+    def _analyze_gap(self, lines: List[str], start: int, end: int):
+        """Faz o parse apenas das linhas alteradas (start..end, 1-based)"""
+        text = '\n'.join(lines[start - 1:end])
+        if not text.strip():
+            return []
+        try:
+            tree = ast.parse(text)
+        except SyntaxError:
+            return None
+        ast.increment_lineno(tree, start - 1)
+        return self._analyze_tree(tree, lines)
+
+    def _analyze_tree(self, tree: ast.Module, lines: List[str]):
+        """Agrupa os statements em unidades e aplica as regras nas que não estão em cache"""
+        groups: List[List[ast.stmt]] = []
+        spans: List[List[int]] = []
+        for statement in tree.body:
+            start = min([statement.lineno] + [d.lineno for d in getattr(statement, 'decorator_list', [])])
+            end = statement.end_lineno or statement.lineno
+            if spans and start <= spans[-1][1]:
+                groups[-1].append(statement)
+                spans[-1][1] = max(spans[-1][1], end)
+            else:
+                groups.append([statement])
+                spans.append([start, end])
+
+        result = []
+        for statements, (start, end) in zip(groups, spans):
+            source = '\n'.join(lines[start - 1:end])
+            key = hashlib.sha1(source.encode('utf-8')).hexdigest()
+            unit = _Unit(start, end, key)
+            cached = self._cache.get(key)
+            if cached is None:
+                cached = (start, self.engine.analyze_statements(statements, tree))
+                self._remember(key, cached)
+                self.analyzed_units += 1
+            else:
+                self._cache.move_to_end(key)
+                self.reused_units += 1
+            result.append((unit, cached))
+        return result
+
+    def _remember(self, key: str, entry: Tuple[int, AnalysisContext]) -> None:
+        """Guarda o contexto de uma unidade respeitando o limite do cache"""
+        self._cache[key] = entry
+        while len(self._cache) > self.max_cached_units:
+            self._cache.popitem(last=False)
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Review de Diretório - Analisa todos os arquivos Python de um projeto
+Os arquivos são analisados em paralelo e o resultado fica em cache pelo SHA-256
+do conteúdo, então uma nova revisão só reanalisa o que mudou
+"""
+
+import os
+import json
+import hashlib
+import multiprocessing
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from enum import Enum
+from typing import Dict, List, Any, Optional, Iterable
+
+from .analysis_engine import CodeAnalysisEngine
+
+
+# Diretórios que nunca fazem parte do código do aluno
+IGNORED_DIRECTORIES = {"__pycache__", ".git", ".venv", "venv", "env", ".tox", "build", "dist", "node_modules"}
+
+# Máximo de resultados mantidos no arquivo de cache
+MAX_CACHE_ENTRIES = 5000
+
+# Cache ao lado dos demais dados do curso (data/), independente do diretório atual
+DEFAULT_CACHE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                                  "data", "code_review_cache.json")
+
+# Abaixo deste número de arquivos pendentes não compensa iniciar processos
+MIN_FILES_FOR_POOL = 4
+
+_worker_engine: Optional[CodeAnalysisEngine] = None
+
+
+def _json_default(value: Any) -> Any:
+    """Converte enums dos issues para o valor serializável"""
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Objeto não serializável: {type(value).__name__}")
+
+
+def normalize_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Deixa o resultado no mesmo formato com que é lido do cache"""
+    return json.loads(json.dumps(result, default=_json_default))
+
+
+def _init_worker(rules: Dict[str, Any]) -> None:
+    """Cria o engine do processo worker com as regras do processo principal"""
+    global _worker_engine
+    _worker_engine = CodeAnalysisEngine()
+    _worker_engine.rules = rules
+
+
+def _analyze_in_worker(code: str, filename: str) -> Dict[str, Any]:
+    """Analisa um arquivo no processo worker"""
+    result = _worker_engine.analyze_code(code, filename, "project")
+    _worker_engine.clear_history()
+    return normalize_result(result)
+
+
+def _default_start_method() -> str:
+    """forkserver em POSIX (não herda as threads do processo principal), spawn no restante"""
+    methods = multiprocessing.get_all_start_methods()
+    if os.name == 'posix' and 'forkserver' in methods:
+        return 'forkserver'
+    return 'spawn'
+
+
+class TreeReviewer:
+    """Code review de um diretório inteiro com cache por conteúdo"""
+
+    def __init__(self, engine: Optional[CodeAnalysisEngine] = None, workers: Optional[int] = None,
+                 cache_file: str = DEFAULT_CACHE_FILE):
+        """
+        Args:
+            engine: Engine cujas regras são usadas (um novo se None)
+            workers: Número de processos (padrão: núcleos disponíveis)
+            cache_file: Arquivo JSON com os resultados por hash de conteúdo
+        """
+        self.engine = engine or CodeAnalysisEngine()
+        self.workers = workers or os.cpu_count() or 2
+        self.cache_file = cache_file
+        self.lock = threading.Lock()
+        # Serializa gravações: um snapshot antigo não sobrescreve um mais novo
+        self._save_lock = threading.Lock()
+        self.cache: Dict[str, Dict[str, Any]] = self._load_cache()
+
+    def _rules_fingerprint(self) -> str:
+        """Hash das regras: mudar a configuração invalida o cache"""
+        rules = json.dumps(self.engine.rules, sort_keys=True, default=str)
+        return hashlib.sha256(rules.encode('utf-8')).hexdigest()[:16]
+
+    def make_key(self, content: bytes) -> str:
+        """Chave do cache: SHA-256 do conteúdo + regras em uso"""
+        digest = hashlib.sha256(content)
+        digest.update(self._rules_fingerprint().encode('ascii'))
+        return digest.hexdigest()
+
+    def _load_cache(self) -> Dict[str, Dict[str, Any]]:
+        """Carrega o cache de resultados"""
+        if not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return {}
+
+    def save_cache(self) -> None:
+        """Salva o cache de forma atômica (arquivo temporário único + os.replace)"""
+        with self._save_lock:
+            with self.lock:
+                while len(self.cache) > MAX_CACHE_ENTRIES:
+                    del self.cache[next(iter(self.cache))]
+                snapshot = dict(self.cache)
+            temp_file = None
+            try:
+                directory = os.path.dirname(self.cache_file)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                # dumps + write é bem mais rápido que json.dump para caches grandes
+                data = json.dumps(snapshot, ensure_ascii=False)
+                fd, temp_file = tempfile.mkstemp(dir=directory or ".", suffix=".tmp")
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(data)
+                os.replace(temp_file, self.cache_file)
+            except (IOError, OSError) as e:
+                if temp_file is not None and os.path.exists(temp_file):
+                    os.unlink(temp_file)
+                print(f"Erro ao salvar cache de code review: {e}")
+
+    @staticmethod
+    def find_python_files(path: str) -> List[str]:
+        """Lista os arquivos .py do diretório (ordenados, sem diretórios ignorados)"""
+        if os.path.isfile(path):
+            return [path] if path.endswith('.py') else []
+
+        files = []
+        for root, dirs, filenames in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if d not in IGNORED_DIRECTORIES and not d.startswith('.'))
+            files.extend(os.path.join(root, name) for name in sorted(filenames) if name.endswith('.py'))
+        return files
+
+    def review_tree(self, path: str) -> Dict[str, Any]:
+        """
+        Analisa todos os arquivos Python de um diretório
+
+        Args:
+            path: Diretório do projeto (ou um único arquivo)
+
+        Returns:
+            Relatório agregado com o resultado de cada arquivo em "files"
+        """
+        review_start = datetime.now()
+        results: Dict[str, Dict[str, Any]] = {}
+        pending: List[tuple] = []
+
+        for file_path in self.find_python_files(path):
+            relative = os.path.relpath(file_path, path) if os.path.isdir(path) else os.path.basename(file_path)
+            try:
+                with open(file_path, 'rb') as f:
+                    content = f.read()
+            except IOError as e:
+                print(f"Erro ao ler {file_path}: {e}")
+                continue
+
+            key = self.make_key(content)
+            with self.lock:
+                cached = self.cache.pop(key, None)
+                if cached is not None:
+                    # Reinsere no fim: o dict funciona como LRU ao salvar
+                    self.cache[key] = cached
+            if cached is not None:
+                results[relative] = dict(cached, filename=relative)
+            else:
+                pending.append((relative, key, content.decode('utf-8', errors='replace')))
+
+        for (relative, key, _), result in zip(pending, self._analyze_pending(pending)):
+            results[relative] = result
+            with self.lock:
+                self.cache[key] = result
+
+        if pending:
+            self.save_cache()
+
+        report = self.build_report(results)
+        report.update({
+            "path": os.path.abspath(path),
+            "analyzed_files": len(pending),
+            "cached_files": len(results) - len(pending),
+            "review_time_ms": int((datetime.now() - review_start).total_seconds() * 1000)
+        })
+        return report
+
+    def _analyze_pending(self, pending: List[tuple]) -> Iterable[Dict[str, Any]]:
+        """Analisa os arquivos que não estão em cache (em paralelo quando compensa)"""
+        if len(pending) < MIN_FILES_FOR_POOL or self.workers == 1:
+            for relative, _, code in pending:
+                result = self.engine.analyze_code(code, relative, "project")
+                yield normalize_result(result)
+            return
+
+        context = multiprocessing.get_context(_default_start_method())
+        workers = min(self.workers, len(pending))
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                 initializer=_init_worker, initargs=(self.engine.rules,)) as pool:
+            futures = [pool.submit(_analyze_in_worker, code, relative) for relative, _, code in pending]
+            for future in futures:
+                yield future.result()
+
+    @staticmethod
+    def build_report(results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Agrega os resultados por arquivo em um relatório do projeto"""
+        total_loc = 0
+        weighted_score = 0.0
+        by_severity: Dict[str, int] = {}
+        by_type: Dict[str, int] = {}
+        by_rule: Dict[str, int] = {}
+        syntax_errors = []
+
+        for filename, result in results.items():
+            if not result.get("syntax_valid", True):
+                syntax_errors.append(filename)
+                continue
+
+            loc = result["metrics"]["lines_of_code"]
+            total_loc += loc
+            weighted_score += result["quality_score"]["overall_score"] * max(loc, 1)
+
+            for issue in result["issues"]:
+                by_severity[issue["severity"]] = by_severity.get(issue["severity"], 0) + 1
+                by_type[issue["issue_type"]] = by_type.get(issue["issue_type"], 0) + 1
+                by_rule[issue["rule_id"]] = by_rule.get(issue["rule_id"], 0) + 1
+
+        valid = [r for name, r in results.items() if name not in syntax_errors]
+        weight = sum(max(r["metrics"]["lines_of_code"], 1) for r in valid)
+        ranking = sorted(
+            ((name, r["quality_score"]["overall_score"]) for name, r in results.items() if name not in syntax_errors),
+            key=lambda item: item[1]
+        )
+
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "total_files": len(results),
+            "lines_of_code": total_loc,
+            "overall_score": round(weighted_score / weight, 1) if weight else 0,
+            "total_issues": sum(by_severity.values()),
+            "by_severity": by_severity,
+            "by_type": by_type,
+            "top_rules": sorted(by_rule.items(), key=lambda item: item[1], reverse=True)[:10],
+            "worst_files": ranking[:5],
+            "syntax_errors": syntax_errors,
+            "files": results
+        }
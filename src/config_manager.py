@@ -6,26 +6,46 @@ Gerenciador de Configurações
 Carrega e gerencia configurações do arquivo settings.json
 """
 
+import copy
 import json
 import os
 from typing import Dict, Any, Optional
-from .performance import CacheManager, cached
+from .performance import TieredCache, get_tiered_cache
 
 
 class ConfigManager:
     """Gerencia as configurações do curso"""
     
-    def __init__(self, config_file: str = "data/settings.json"):
+    def __init__(self, config_file: str = "data/settings.json", cache: Optional[TieredCache] = None):
         self.config_file = config_file
-        self._cache = CacheManager(max_size=100, default_ttl=300)  # Cache por 5 minutos
+        # Arquivo já lido fica no L1 (pela assinatura mtime/tamanho) para reload e outras instâncias.
+        # Sem L2: o "derivado" é o próprio settings.json, e ler a cópia do disco
+        # custaria o mesmo que reler o arquivo
+        self._cache = cache or get_tiered_cache()
+        self._cache.register_namespace("config", ttl=300, persist=False)
         self.config = self._load_config()
     
+    def _cache_key(self) -> Optional[str]:
+        """Chave do arquivo no cache (muda sempre que o arquivo muda)"""
+        try:
+            stat = os.stat(self.config_file)
+        except OSError:
+            return None
+        return f"{os.path.abspath(self.config_file)}:{stat.st_mtime_ns}:{stat.st_size}"
+    
+    def _read_config_file(self) -> Dict[str, Any]:
+        with open(self.config_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
     def _load_config(self) -> Dict[str, Any]:
         """Carrega as configurações do arquivo JSON"""
         if os.path.exists(self.config_file):
             try:
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                cache_key = self._cache_key()
+                if cache_key is None:
+                    return self._read_config_file()
+                # Cópia: cada instância altera o próprio dicionário
+                return copy.deepcopy(self._cache.get("config", cache_key, self._read_config_file))
             except (json.JSONDecodeError, IOError) as e:
                 print(f"Erro ao carregar configurações: {e}")
                 return self._get_default_config()
@@ -93,15 +113,19 @@ class ConfigManager:
                 "time_limit_minutes": 30,
                 "min_score_to_pass": 70,
                 "allow_skip": False,
-                "show_solutions": True
+                "show_solutions": True,
+                "memory_budget_mb": 4
             }
         }
     
     def _save_config(self, config: Dict[str, Any]) -> None:
         """Salva as configurações no arquivo JSON"""
+        old_key = self._cache_key()
         try:
             with open(self.config_file, 'w', encoding='utf-8') as f:
                 json.dump(config, f, indent=4, ensure_ascii=False)
+            if old_key:
+                self._cache.invalidate("config", old_key)
         except IOError as e:
             print(f"Erro ao salvar configurações: {e}")
     
@@ -10,21 +10,6 @@ import time
 from typing import Dict, Any, Optional, Callable, Tuple
 from datetime import datetime
 
-from ..progress_manager import ProgressManager
-from ..visual_feedback import VisualFeedback
-from ..logger import CourseLogger
-from ..gamification_system import GamificationSystem
-from ..ui_components import UIComponents
-from ..error_tracker import ErrorTracker
-from ..review_mode import ReviewMode
-from ..glossary import Glossary
-from ..certificate_generator import CertificateGenerator
-from ..interactive_demos import InteractiveDemoSession
-from ..adaptive_exercises import AdaptiveExerciseSession
-from ..visual_debugger import DebugSession
-from ..learning_analytics import LearningAnalytics
-from ..exercises.interactive_exercises import InteractiveExerciseSession
-
 
 class CourseController:
     """Controla a execução e lógica do curso"""
@@ -681,7 +666,8 @@ class CourseController:
         escolha = input("\n👉 Escolha o tipo de exercício: ").strip()
         
         if escolha == "1":
-            # Exercícios ricos
+            # Exercícios ricos (importados só aqui: o banco de exercícios é grande)
+            from ..exercises.interactive_exercises import InteractiveExerciseSession
             rich_session = InteractiveExerciseSession(self.ui, self.progress, self.visual)
             rich_session.start_rich_exercise_session()
         elif escolha == "2":
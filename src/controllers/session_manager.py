@@ -8,6 +8,7 @@ Gerencia o ciclo de vida da sessão do curso
 
 import time
 import sys
+import signal
 from typing import Dict, Any, Optional
 from datetime import datetime
 
@@ -15,8 +16,8 @@ from ..ui_components import UIComponents
 from ..progress_manager import ProgressManager
 from ..logger import CourseLogger
 from ..error_tracker import ErrorTracker
-from ..sync_manager import SyncManager
 from ..security import SecureInput
+from ..module_loader import LazyProxy
 
 
 class SessionManager:
@@ -30,9 +31,11 @@ class SessionManager:
         self.error_tracker = components['error_tracker']
         self.sync_manager = components['sync_manager']
         self.secure_input = components['secure_input']
+        self.analytics = components.get('analytics')
         
         self.session_start = datetime.now()
         self.session_active = True
+        self._cleaned_up = False
     
     def initialize_session(self) -> bool:
         """
@@ -53,6 +56,9 @@ class SessionManager:
             # Log de início de sessão
             self.logger.log_session_start()
             
+            # SIGTERM passa a encerrar via SystemExit para que os hooks atexit gravem os dados
+            self._install_termination_handler()
+            
             # Sincronização inicial
             self._sync_data()
             
@@ -62,6 +68,26 @@ class SessionManager:
             self.ui.error(f"Erro ao inicializar sessão: {str(e)}")
             return False
     
+    def _install_termination_handler(self) -> None:
+        """Converte SIGTERM em saída normal (atexit grava analytics pendentes)"""
+        def _on_terminate(signum, frame):
+            # A limpeza fica com o finally de PythonCourse.run(), que o SystemExit atravessa
+            sys.exit(0)
+        
+        try:
+            signal.signal(signal.SIGTERM, _on_terminate)
+        except (ValueError, AttributeError):
+            # Fora da thread principal ou plataforma sem SIGTERM
+            pass
+    
+    def _flush_pending_data(self) -> None:
+        """Grava dados mantidos em memória pelos componentes com persistência em lote"""
+        # Componente adiado que a sessão nunca usou não tem nada a gravar: não o cria
+        if isinstance(self.analytics, LazyProxy) and not self.analytics.is_loaded:
+            return
+        if self.analytics is not None and hasattr(self.analytics, 'flush'):
+            self.analytics.flush()
+    
     def _show_welcome_message(self) -> None:
         """Exibe mensagem de boas-vindas"""
         welcome_message = """
@@ -121,6 +147,10 @@ class SessionManager:
     
     def _sync_data(self) -> None:
         """Sincroniza dados se configurado"""
+        # hasattr num LazyProxy cria o sincronizador (import e pastas): se a
+        # sessão ainda não o usou, não há o que sincronizar na inicialização
+        if isinstance(self.sync_manager, LazyProxy) and not self.sync_manager.is_loaded:
+            return
         try:
             if hasattr(self.sync_manager, 'sync_up'):
                 self.sync_manager.sync_up()
@@ -128,14 +158,18 @@ class SessionManager:
             self.logger.log_error(f"Erro na sincronização: {str(e)}")
     
     def cleanup_session(self) -> None:
-        """Limpa recursos da sessão (otimizado para saída rápida)"""
+        """Limpa recursos da sessão (otimizado para saída rápida; só a primeira chamada grava)"""
+        if self._cleaned_up:
+            return
+        self._cleaned_up = True
         try:
             # Calcula duração da sessão
             session_duration = (datetime.now() - self.session_start).total_seconds()
             
-            # Atualiza tempo total (operação crítica)
-            self.progress.progress_data["total_time_spent"] += int(session_duration)
-            self.progress.save_progress()
+            # Atualiza tempo total (operação crítica: um append no journal)
+            self.progress.add_time_spent(int(session_duration))
+            self.progress.close()
+            self._flush_pending_data()
             
             # Log de fim de sessão (rápido)
             self.logger.log_session_end(session_duration)
@@ -180,6 +214,7 @@ class SessionManager:
         
         # Salva progresso rapidamente
         self.progress.save_progress()
+        self._flush_pending_data()
         
         print("✅ Progresso salvo. Saindo...")
         return False
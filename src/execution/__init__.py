@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Módulo de Execução
+Execução isolada do código dos alunos em um pool de processos
+"""
+
+from .sandbox import (
+    SandboxExecutor, ExecutionLimits, ExecutionResult,
+    get_execution_service, console_input_handler
+)
+
+__all__ = [
+    'SandboxExecutor',
+    'ExecutionLimits',
+    'ExecutionResult',
+    'get_execution_service',
+    'console_input_handler'
+]
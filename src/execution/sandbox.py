@@ -0,0 +1,588 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Sandbox de Execução - Pool de processos para executar código do aluno
+Isola o código em workers pré-iniciados com limites de CPU, tempo e memória
+"""
+
+import os
+import sys
+import io
+import time
+import atexit
+import pickle
+import signal
+import builtins
+import traceback
+import threading
+import multiprocessing
+from queue import Queue, Empty
+from concurrent.futures import ThreadPoolExecutor, Future
+from dataclasses import dataclass, field
+from typing import Any, Optional, Dict, List, Callable
+
+try:
+    import resource
+except ImportError:  # Windows não possui limites POSIX
+    resource = None
+
+
+# Tipo do callback que responde a chamadas de input() feitas pelo código do aluno.
+# Recebe o texto impresso desde a última pergunta (incluindo o prompt) e retorna a linha digitada.
+InputHandler = Callable[[str], str]
+
+
+@dataclass
+class ExecutionLimits:
+    """Limites aplicados a cada execução"""
+    cpu_seconds: float = 5.0
+    wall_seconds: float = 10.0
+    memory_mb: int = 256
+    max_output_chars: int = 100_000
+
+
+@dataclass
+class ExecutionResult:
+    """Resultado estruturado de uma execução no sandbox"""
+    stdout: str = ""
+    stderr: str = ""
+    success: bool = True
+    error_type: Optional[str] = None
+    error_message: str = ""
+    error_line: Optional[int] = None
+    traceback: str = ""
+    timed_out: bool = False
+    cpu_exceeded: bool = False
+    memory_exceeded: bool = False
+    output_truncated: bool = False
+    duration: float = 0.0
+    namespace: Dict[str, Any] = field(default_factory=dict)
+    streamed_chars: int = 0  # Caracteres de stdout já entregues ao InputHandler
+
+    @property
+    def remaining_stdout(self) -> str:
+        """Saída ainda não exibida durante chamadas interativas de input()"""
+        return self.stdout[self.streamed_chars:]
+
+    @property
+    def error_summary(self) -> str:
+        """Descrição curta do erro no formato 'Tipo: mensagem'"""
+        if self.success:
+            return ""
+        return f"{self.error_type}: {self.error_message}"
+
+    def rebuild_exception(self) -> BaseException:
+        """Recria uma exceção equivalente à levantada no worker"""
+        exc_class = getattr(builtins, self.error_type or "", None)
+        if not (isinstance(exc_class, type) and issubclass(exc_class, BaseException)):
+            exc_class = RuntimeError
+        try:
+            return exc_class(self.error_message)
+        except Exception:
+            return RuntimeError(self.error_message)
+
+
+@dataclass
+class _Job:
+    """Mensagem enviada ao worker"""
+    code: str
+    limits: ExecutionLimits
+    stdin: Optional[List[str]] = None
+    interactive: bool = False
+    namespace: Optional[Dict[str, Any]] = None
+    capture_namespace: bool = False
+
+
+# ---------------------------------------------------------------------------
+# Lado do worker
+# ---------------------------------------------------------------------------
+
+class _CpuLimitExceeded(BaseException):
+    """Levantada no worker quando o limite de CPU (SIGXCPU) é atingido"""
+
+
+class _BoundedOutput(io.StringIO):
+    """StringIO que descarta tudo após um número máximo de caracteres"""
+
+    def __init__(self, limit: int):
+        super().__init__()
+        self.limit = limit
+        self.size = 0
+        self.truncated = False
+
+    def write(self, text: str) -> int:
+        if self.size >= self.limit:
+            self.truncated = True
+            return len(text)
+        allowed = text[:self.limit - self.size]
+        if len(allowed) < len(text):
+            self.truncated = True
+        self.size += len(allowed)
+        super().write(allowed)
+        return len(text)
+
+
+_job_active = False
+
+
+def _on_cpu_limit(signum, frame):
+    """Handler de SIGXCPU: interrompe apenas o código do aluno"""
+    if _job_active:
+        raise _CpuLimitExceeded()
+
+
+def _address_space_bytes() -> Optional[int]:
+    """Tamanho atual do espaço de endereçamento do processo (Linux)"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[0])
+        return pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError, IndexError):
+        return None
+
+
+def _apply_limits(limits: ExecutionLimits) -> None:
+    """Ajusta os limites soft de CPU e memória para o próximo job"""
+    if resource is None:
+        return
+
+    try:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        used = usage.ru_utime + usage.ru_stime
+        _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        soft = int(used + limits.cpu_seconds) + 1
+        if hard != resource.RLIM_INFINITY:
+            soft = min(soft, hard)
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+    except (ValueError, OSError):
+        pass
+
+    baseline = _address_space_bytes()
+    if baseline and limits.memory_mb:
+        try:
+            _, hard = resource.getrlimit(resource.RLIMIT_AS)
+            soft = baseline + limits.memory_mb * 1024 * 1024
+            if hard != resource.RLIM_INFINITY:
+                soft = min(soft, hard)
+            resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+        except (ValueError, OSError):
+            pass
+
+
+def _reset_limits() -> None:
+    """Restaura os limites soft para o valor hard após o job"""
+    if resource is None:
+        return
+    for limit in (resource.RLIMIT_CPU, resource.RLIMIT_AS):
+        try:
+            _, hard = resource.getrlimit(limit)
+            resource.setrlimit(limit, (hard, hard))
+        except (ValueError, OSError):
+            pass
+
+
+def _picklable_namespace(namespace: Dict[str, Any]) -> Dict[str, Any]:
+    """Filtra as variáveis do aluno que podem voltar ao processo principal"""
+    result = {}
+    for name, value in namespace.items():
+        if name.startswith('__') or type(value).__name__ == 'module':
+            continue
+        try:
+            pickle.dumps(value)
+        except Exception:
+            continue
+        result[name] = value
+    return result
+
+
+def _error_line(exc: BaseException) -> Optional[int]:
+    """Linha do código do aluno onde o erro ocorreu"""
+    if isinstance(exc, SyntaxError):
+        return exc.lineno
+    line = None
+    for frame in traceback.extract_tb(exc.__traceback__):
+        if frame.filename == "<string>":
+            line = frame.lineno
+    return line
+
+
+def _run_job(conn, job: _Job) -> ExecutionResult:
+    """Executa um job dentro do worker"""
+    global _job_active
+
+    stdout = _BoundedOutput(job.limits.max_output_chars)
+    stderr = _BoundedOutput(job.limits.max_output_chars)
+    pending_stdin = list(job.stdin or [])
+    streamed = 0
+
+    def sandbox_input(prompt: Any = "") -> str:
+        nonlocal streamed
+        stdout.write(str(prompt))
+        if job.interactive:
+            chunk = stdout.getvalue()[streamed:]
+            streamed += len(chunk)
+            conn.send(('input', chunk))
+            kind, line = conn.recv()
+            if kind == 'eof':
+                raise EOFError("EOF when reading a line")
+            return line
+        if pending_stdin:
+            return pending_stdin.pop(0)
+        raise EOFError("EOF when reading a line")
+
+    sandbox_builtins = dict(builtins.__dict__)
+    sandbox_builtins['input'] = sandbox_input
+    namespace = {'__name__': '__main__', '__builtins__': sandbox_builtins}
+    if job.namespace:
+        namespace.update(job.namespace)
+
+    result = ExecutionResult()
+    old_stdout, old_stderr = sys.stdout, sys.stderr
+    start = time.perf_counter()
+    try:
+        sys.stdout, sys.stderr = stdout, stderr
+        compiled = compile(job.code, "<string>", "exec")
+        _apply_limits(job.limits)
+        _job_active = True
+        exec(compiled, namespace)
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            result.success = False
+            result.error_type = "SystemExit"
+            result.error_message = str(e.code)
+    except _CpuLimitExceeded:
+        result.success = False
+        result.cpu_exceeded = True
+        result.error_type = "TimeoutError"
+        result.error_message = f"Limite de CPU excedido ({job.limits.cpu_seconds:g}s)"
+    except MemoryError:
+        result.success = False
+        result.memory_exceeded = True
+        result.error_type = "MemoryError"
+        result.error_message = f"Limite de memória excedido ({job.limits.memory_mb} MB)"
+    except BaseException as e:
+        result.success = False
+        result.error_type = type(e).__name__
+        result.error_message = str(e)
+        result.error_line = _error_line(e)
+        # Remove o frame do próprio sandbox para mostrar só o código do aluno
+        tb = e.__traceback__.tb_next if e.__traceback__ else None
+        result.traceback = ''.join(traceback.format_exception(type(e), e, tb))
+    finally:
+        _job_active = False
+        _reset_limits()
+        sys.stdout, sys.stderr = old_stdout, old_stderr
+
+    result.duration = time.perf_counter() - start
+    result.stdout = stdout.getvalue()
+    result.stderr = stderr.getvalue()
+    result.output_truncated = stdout.truncated or stderr.truncated
+    result.streamed_chars = streamed
+    if job.capture_namespace:
+        result.namespace = _picklable_namespace(namespace)
+    return result
+
+
+def _worker_main(conn) -> None:
+    """Loop principal de um worker do pool"""
+    # Ctrl+C é tratado pelo processo principal, que encerra o worker se necessário
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if hasattr(signal, 'SIGXCPU'):
+        signal.signal(signal.SIGXCPU, _on_cpu_limit)
+
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            break
+        if job is None:
+            break
+        try:
+            result = _run_job(conn, job)
+        except BaseException as e:
+            result = ExecutionResult(success=False, error_type=type(e).__name__, error_message=str(e))
+        try:
+            conn.send(('result', result))
+        except (pickle.PicklingError, TypeError, AttributeError):
+            result.namespace = {}
+            conn.send(('result', result))
+        except (OSError, BrokenPipeError):
+            break
+
+
+# ---------------------------------------------------------------------------
+# Lado do processo principal
+# ---------------------------------------------------------------------------
+
+class _Worker:
+    """Processo worker e sua conexão"""
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.jobs_done = 0
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    def kill(self) -> None:
+        """Encerra o worker imediatamente"""
+        try:
+            self.process.kill()
+            self.process.join(1)
+        except Exception:
+            pass
+        self.conn.close()
+
+    def stop(self) -> None:
+        """Pede ao worker para encerrar e força se necessário"""
+        try:
+            self.conn.send(None)
+            self.process.join(1)
+        except (OSError, BrokenPipeError):
+            pass
+        if self.process.is_alive():
+            self.kill()
+        else:
+            self.conn.close()
+
+
+def _default_start_method() -> str:
+    """forkserver em POSIX (workers leves e sem herdar threads), spawn no restante"""
+    methods = multiprocessing.get_all_start_methods()
+    if os.name == 'posix' and 'forkserver' in methods:
+        return 'forkserver'
+    return 'spawn'
+
+
+class SandboxExecutor:
+    """Serviço de execução isolada com pool de workers pré-iniciados"""
+
+    def __init__(self, workers: Optional[int] = None, limits: Optional[ExecutionLimits] = None,
+                 max_jobs_per_worker: int = 200, start_method: Optional[str] = None):
+        """
+        Inicializa o serviço (os workers só são criados no primeiro uso ou em warm())
+
+        Args:
+            workers: Número de processos no pool
+            limits: Limites padrão de cada execução
+            max_jobs_per_worker: Execuções antes de reciclar um worker
+            start_method: Método de criação de processos do multiprocessing
+        """
+        self.size = workers or min(4, os.cpu_count() or 1)
+        self.limits = limits or ExecutionLimits()
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self._context = multiprocessing.get_context(start_method or _default_start_method())
+        self._idle: "Queue[_Worker]" = Queue()
+        self._spawned = 0
+        self._lock = threading.Lock()
+        self._dispatcher: Optional[ThreadPoolExecutor] = None
+        self._closed = False
+
+        # Estatísticas
+        self.jobs = 0
+        self.timeouts = 0
+        self.restarts = 0
+        self.total_time = 0.0
+
+    # -- gerenciamento do pool --------------------------------------------
+
+    def warm(self, background: bool = False) -> None:
+        """Inicia todos os workers antecipadamente"""
+        def start_all():
+            while True:
+                with self._lock:
+                    if self._closed or self._spawned >= self.size:
+                        return
+                    self._spawned += 1
+                try:
+                    self._idle.put(_Worker(self._context))
+                except Exception:
+                    with self._lock:
+                        self._spawned -= 1
+                    return
+
+        if background:
+            threading.Thread(target=start_all, name="sandbox-warmup", daemon=True).start()
+        else:
+            start_all()
+
+    def _acquire(self) -> _Worker:
+        """Obtém um worker livre, criando um novo se o pool ainda não está cheio"""
+        if self._closed:
+            raise RuntimeError("SandboxExecutor já foi encerrado")
+        try:
+            return self._idle.get_nowait()
+        except Empty:
+            pass
+        with self._lock:
+            can_spawn = self._spawned < self.size
+            if can_spawn:
+                self._spawned += 1
+        if can_spawn:
+            try:
+                return _Worker(self._context)
+            except Exception:
+                with self._lock:
+                    self._spawned -= 1
+                raise
+        return self._idle.get()
+
+    def _release(self, worker: _Worker, healthy: bool) -> None:
+        """Devolve o worker ao pool ou o descarta"""
+        worker.jobs_done += 1
+        if healthy and not self._closed and worker.is_alive() and worker.jobs_done < self.max_jobs_per_worker:
+            self._idle.put(worker)
+            return
+        if healthy:
+            worker.stop()
+        else:
+            worker.kill()
+        with self._lock:
+            self._spawned -= 1
+            self.restarts += 1
+
+    def shutdown(self) -> None:
+        """Encerra todos os workers"""
+        self._closed = True
+        if self._dispatcher:
+            self._dispatcher.shutdown(wait=False)
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except Empty:
+                break
+            worker.stop()
+            with self._lock:
+                self._spawned -= 1
+
+    # -- execução -----------------------------------------------------------
+
+    def run(self, code: str, limits: Optional[ExecutionLimits] = None,
+            stdin: Optional[List[str]] = None, input_handler: Optional[InputHandler] = None,
+            namespace: Optional[Dict[str, Any]] = None, capture_namespace: bool = False) -> ExecutionResult:
+        """
+        Executa código em um worker isolado
+
+        Args:
+            code: Código Python a executar
+            limits: Limites desta execução (padrão do serviço se None)
+            stdin: Linhas retornadas por input(), em ordem
+            input_handler: Callback para input() interativo (tem prioridade sobre stdin)
+            namespace: Variáveis iniciais (apenas valores serializáveis)
+            capture_namespace: Retorna as variáveis serializáveis definidas pelo código
+
+        Returns:
+            ExecutionResult com saída, erros e flags de limite
+        """
+        limits = limits or self.limits
+        job = _Job(code=code, limits=limits, stdin=stdin,
+                   interactive=input_handler is not None,
+                   namespace=namespace, capture_namespace=capture_namespace)
+
+        start = time.perf_counter()
+        worker = self._acquire()
+        healthy = False
+        try:
+            result = self._dispatch(worker, job, input_handler)
+            healthy = not (result.timed_out or result.cpu_exceeded or result.memory_exceeded
+                           or result.error_type == "WorkerCrashed")
+        finally:
+            # Em KeyboardInterrupt o worker pode estar em loop infinito: descarta
+            self._release(worker, healthy)
+
+        with self._lock:
+            self.jobs += 1
+            self.total_time += time.perf_counter() - start
+            if result.timed_out:
+                self.timeouts += 1
+        return result
+
+    def _dispatch(self, worker: _Worker, job: _Job, input_handler: Optional[InputHandler]) -> ExecutionResult:
+        """Envia o job e aguarda o resultado respeitando o limite de tempo real"""
+        start = time.perf_counter()
+        deadline = start + job.limits.wall_seconds
+        try:
+            worker.conn.send(job)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            # Namespace inicial não serializável: nada foi executado
+            return ExecutionResult(success=False, error_type=type(e).__name__, error_message=str(e))
+        except (OSError, BrokenPipeError):
+            return self._crashed(start)
+
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0 or not worker.conn.poll(remaining):
+                return ExecutionResult(
+                    success=False, timed_out=True, error_type="TimeoutError",
+                    error_message=f"Tempo limite de execução excedido ({job.limits.wall_seconds:g}s)",
+                    duration=time.perf_counter() - start
+                )
+            try:
+                kind, payload = worker.conn.recv()
+            except (EOFError, OSError):
+                return self._crashed(start)
+
+            if kind == 'result':
+                return payload
+
+            # Pedido de input(): o tempo esperando o aluno não conta no limite
+            waiting_since = time.perf_counter()
+            try:
+                reply = ('line', input_handler(payload))
+            except EOFError:
+                reply = ('eof', '')
+            deadline += time.perf_counter() - waiting_since
+            worker.conn.send(reply)
+
+    @staticmethod
+    def _crashed(start: float) -> ExecutionResult:
+        """Resultado para um worker que morreu durante a execução"""
+        return ExecutionResult(
+            success=False, error_type="WorkerCrashed",
+            error_message="O processo de execução foi encerrado inesperadamente",
+            duration=time.perf_counter() - start
+        )
+
+    def submit(self, code: str, **kwargs) -> "Future[ExecutionResult]":
+        """Agenda uma execução e retorna um Future"""
+        with self._lock:
+            if self._dispatcher is None:
+                self._dispatcher = ThreadPoolExecutor(max_workers=self.size,
+                                                      thread_name_prefix="sandbox")
+        return self._dispatcher.submit(self.run, code, **kwargs)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Retorna estatísticas do pool"""
+        return {
+            "workers": self._spawned,
+            "idle_workers": self._idle.qsize(),
+            "jobs": self.jobs,
+            "timeouts": self.timeouts,
+            "restarts": self.restarts,
+            "avg_latency_ms": (self.total_time / self.jobs * 1000) if self.jobs else 0.0,
+            "start_method": self._context.get_start_method(),
+        }
+
+
+def console_input_handler(pending_output: str) -> str:
+    """InputHandler que usa o terminal: mostra a saída pendente e lê uma linha"""
+    print(pending_output, end='', flush=True)
+    return input()
+
+
+_service: Optional[SandboxExecutor] = None
+_service_lock = threading.Lock()
+
+
+def get_execution_service() -> SandboxExecutor:
+    """Retorna o serviço de execução compartilhado pelo curso"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = SandboxExecutor()
+            atexit.register(_service.shutdown)
+        return _service
@@ -6,9 +6,27 @@ Pacote de Exercícios Ricos
 Sistema avançado de exercícios para o curso de Python
 """
 
+import importlib
+
 from .rich_exercises import Exercise, ExerciseType, RichExerciseEngine, ExerciseGenerator
-from .interactive_exercises import InteractiveExerciseSession
-from .exercise_bank import ExerciseBank
+from .reference_cache import ReferenceOutputCache, get_reference_cache
+
+# Sessão interativa e banco de exercícios são pesados e só servem aos menus
+# de exercícios: importados no primeiro acesso (main.py usa reference_cache
+# na inicialização)
+_LAZY_ATTRIBUTES = {
+    'InteractiveExerciseSession': '.interactive_exercises',
+    'ExerciseBank': '.exercise_bank',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        module = importlib.import_module(_LAZY_ATTRIBUTES[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = [
     'Exercise',
@@ -16,5 +34,7 @@ __all__ = [
     'RichExerciseEngine',
     'ExerciseGenerator',
     'InteractiveExerciseSession',
-    'ExerciseBank'
+    'ExerciseBank',
+    'ReferenceOutputCache',
+    'get_reference_cache'
 ]
\ No newline at end of file
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cache de Outputs de Referência - Evita reexecutar o código canônico dos exercícios
+A chave é o hash do código + versão do Python, então editar um exercício invalida a entrada
+"""
+
+import os
+import sys
+import json
+import hashlib
+import platform
+import tempfile
+import threading
+from typing import Dict, Optional, Iterable, Any
+
+
+PYTHON_TAG = f"{platform.python_implementation()}-{'.'.join(map(str, sys.version_info[:3]))}"
+
+
+class ReferenceOutputCache:
+    """Cache persistente do output esperado de cada exercício"""
+
+    def __init__(self, cache_file: str = "data/reference_outputs.json"):
+        self.cache_file = cache_file
+        self.lock = threading.Lock()
+        # Serializa gravações (warm-up em segundo plano e UI); separado de
+        # `lock` para que get/put não esperem o disco
+        self._save_lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, str]] = self._load()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(code: str) -> str:
+        """Gera a chave a partir do conteúdo do código e da versão do Python"""
+        return hashlib.sha256(f"{PYTHON_TAG}\0{code}".encode('utf-8')).hexdigest()
+
+    def _load(self) -> Dict[str, Dict[str, str]]:
+        """Carrega o cache descartando entradas de outras versões do Python"""
+        if not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return {}
+        return {key: entry for key, entry in data.items()
+                if isinstance(entry, dict) and entry.get("python") == PYTHON_TAG}
+
+    def save(self) -> None:
+        """Salva o cache de forma atômica (arquivo temporário único + os.replace)"""
+        with self._save_lock:
+            with self.lock:
+                snapshot = dict(self.entries)
+            temp_file = None
+            try:
+                directory = os.path.dirname(self.cache_file)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                fd, temp_file = tempfile.mkstemp(dir=directory or ".", suffix=".tmp")
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(snapshot, f, ensure_ascii=False)
+                os.replace(temp_file, self.cache_file)
+            except (IOError, OSError) as e:
+                if temp_file is not None and os.path.exists(temp_file):
+                    os.unlink(temp_file)
+                print(f"Erro ao salvar cache de referência: {e}")
+
+    def get(self, code: str) -> Optional[str]:
+        """Retorna o output em cache ou None"""
+        entry = self.entries.get(self.make_key(code))
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry["output"]
+
+    def put(self, code: str, output: str, exercise_id: Optional[str] = None, persist: bool = True) -> None:
+        """Armazena o output de um código (substitui versões antigas do mesmo exercício)"""
+        key = self.make_key(code)
+        entry = {"output": output, "python": PYTHON_TAG}
+        with self.lock:
+            if exercise_id:
+                entry["exercise_id"] = exercise_id
+                stale = [k for k, e in self.entries.items()
+                         if e.get("exercise_id") == exercise_id and k != key]
+                for stale_key in stale:
+                    del self.entries[stale_key]
+            self.entries[key] = entry
+        if persist:
+            self.save()
+
+    def warm_from_bank(self, engine: Any = None, modules: Iterable[int] = range(1, 36)) -> int:
+        """
+        Pré-calcula os outputs de referência do ExerciseBank
+
+        Args:
+            engine: RichExerciseEngine usado para executar (um novo se None)
+            modules: Números dos módulos a percorrer
+
+        Returns:
+            Quantidade de outputs calculados
+        """
+        from .exercise_bank import ExerciseBank
+        from .rich_exercises import RichExerciseEngine, ExerciseType
+
+        engine = engine or RichExerciseEngine(reference_cache=self)
+        pending = []
+        for module_number in modules:
+            for exercise in ExerciseBank.get_exercises_by_module(module_number):
+                if exercise.type in (ExerciseType.OUTPUT_PREDICTION, ExerciseType.CODE_REFACTORING):
+                    if self.make_key(exercise.code) not in self.entries:
+                        pending.append(exercise)
+
+        futures = [engine.executor.submit(exercise.code) for exercise in pending]
+        computed = 0
+        for exercise, future in zip(pending, futures):
+            result = future.result()
+            if engine.is_cacheable(result):
+                self.put(exercise.code, engine.output_from_result(result),
+                         exercise_id=exercise.id, persist=False)
+                computed += 1
+
+        if computed:
+            self.save()
+        return computed
+
+    def warm_in_background(self) -> threading.Thread:
+        """Executa warm_from_bank em uma thread daemon"""
+        thread = threading.Thread(target=self.warm_from_bank, name="reference-cache-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas do cache"""
+        total_requests = self.hits + self.misses
+        return {
+            "total_entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total_requests if total_requests > 0 else 0,
+            "python": PYTHON_TAG
+        }
+
+
+_reference_cache: Optional[ReferenceOutputCache] = None
+_reference_cache_lock = threading.Lock()
+
+
+def get_reference_cache() -> ReferenceOutputCache:
+    """Retorna o cache de referência compartilhado"""
+    global _reference_cache
+    with _reference_cache_lock:
+        if _reference_cache is None:
+            _reference_cache = ReferenceOutputCache()
+        return _reference_cache
+
+
+if __name__ == "__main__":
+    # Pré-aquecimento na instalação: python -m src.exercises.reference_cache
+    total = get_reference_cache().warm_from_bank()
+    print(f"✅ {total} outputs de referência calculados")
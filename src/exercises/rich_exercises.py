@@ -5,17 +5,19 @@
 Sistema de Exercícios Ricos - Debugging, Code Completion, Output Prediction, Refactoring
 """
 
-from typing import Dict, List, Any, Optional, Tuple, Callable
+from typing import Dict, List, Any, Optional, Tuple, Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from enum import Enum
 import ast
-import sys
-import io
 import contextlib
 import traceback
 import difflib
 import re
 
+from ..execution import SandboxExecutor, ExecutionResult, get_execution_service
+from .reference_cache import ReferenceOutputCache, get_reference_cache
+
 
 class ExerciseType(Enum):
     """Tipos de exercícios disponíveis"""
@@ -51,9 +53,12 @@ class Exercise:
 class RichExerciseEngine:
     """Motor de avaliação para exercícios ricos"""
     
-    def __init__(self, ui_components=None):
+    def __init__(self, ui_components=None, executor: Optional[SandboxExecutor] = None,
+                 reference_cache: Optional[ReferenceOutputCache] = None):
         self.ui = ui_components
         self.current_exercise: Optional[Exercise] = None
+        self.executor = executor or get_execution_service()
+        self.reference_cache = reference_cache or get_reference_cache()
         
     def evaluate_exercise(self, exercise: Exercise, user_answer: Any) -> Tuple[bool, str, int]:
         """
@@ -72,29 +77,88 @@ class RichExerciseEngine:
             return self._evaluate_refactoring(exercise, user_answer)
         else:
             return self._evaluate_multiple_choice(exercise, user_answer)
+    
+    def evaluate_batch(self, exercise: Exercise,
+                       answers: Iterable[Any]) -> Iterator[Tuple[int, Tuple[bool, str, int]]]:
+        """
+        Avalia várias respostas para o mesmo exercício (ex: uma turma inteira)
+        
+        O output de referência é calculado uma única vez e as respostas que
+        precisam ser executadas são distribuídas entre os workers do sandbox.
+        
+        Yields:
+            (índice_da_resposta, (correto, feedback, pontos_ganhos)) na ordem em que terminam
+        """
+        answers = list(answers)
+        reference = None
+        if exercise.type in (ExerciseType.OUTPUT_PREDICTION, ExerciseType.CODE_REFACTORING):
+            reference = self._reference_output(exercise)
+        
+        # Tipos que não executam código são avaliados diretamente
+        if exercise.type not in (ExerciseType.DEBUGGING, ExerciseType.CODE_REFACTORING):
+            for index, answer in enumerate(answers):
+                yield index, self._evaluate_with_reference(exercise, answer, reference)
+            return
+        
+        with ThreadPoolExecutor(max_workers=self.executor.size) as pool:
+            futures = {
+                pool.submit(self._evaluate_with_reference, exercise, answer, reference): index
+                for index, answer in enumerate(answers)
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+    
+    def _evaluate_with_reference(self, exercise: Exercise, user_answer: Any,
+                                 reference: Optional[str]) -> Tuple[bool, str, int]:
+        """Avalia uma resposta reaproveitando o output de referência já calculado"""
+        if exercise.type == ExerciseType.OUTPUT_PREDICTION:
+            return self._evaluate_output(exercise, user_answer, reference)
+        if exercise.type == ExerciseType.CODE_REFACTORING:
+            return self._evaluate_refactoring(exercise, user_answer, reference)
+        return self.evaluate_exercise(exercise, user_answer)
+    
+    def _reference_output(self, exercise: Exercise) -> str:
+        """Output produzido pelo código original do exercício (via cache persistente)"""
+        output = self.reference_cache.get(exercise.code)
+        if output is None:
+            result = self.executor.run(exercise.code)
+            output = self.output_from_result(result)
+            if self.is_cacheable(result):
+                self.reference_cache.put(exercise.code, output, exercise_id=exercise.id)
+        return output
+    
+    @staticmethod
+    def output_from_result(result: ExecutionResult) -> str:
+        """Converte o resultado do sandbox no texto usado para comparação"""
+        if not result.success:
+            return f"Erro: {result.error_message}"
+        return result.stdout
+    
+    @staticmethod
+    def is_cacheable(result: ExecutionResult) -> bool:
+        """Falhas por limite ou queda do worker não são determinísticas e não vão para o cache"""
+        return not (result.timed_out or result.cpu_exceeded or result.memory_exceeded
+                    or result.error_type == "WorkerCrashed")
             
     def _evaluate_debugging(self, exercise: Exercise, user_answer: str) -> Tuple[bool, str, int]:
         """Avalia exercício de debugging"""
-        try:
-            # Verifica se o código fornecido pelo usuário executa sem erros
-            exec_globals = {}
-            exec(user_answer, exec_globals)
-            
-            # Verifica se a correção está na linha esperada (se especificada)
-            if exercise.bug_line:
-                user_lines = user_answer.strip().split('\n')
-                original_lines = exercise.code.strip().split('\n')
-                
-                if exercise.bug_line <= len(user_lines):
-                    if user_lines[exercise.bug_line - 1] != original_lines[exercise.bug_line - 1]:
-                        # Linha foi modificada, provavelmente corrigida
-                        return True, "✅ Excelente! Você encontrou e corrigiu o bug!", exercise.points
-                        
-            # Se não há linha específica, verifica se o código funciona
-            return True, "✅ Código corrigido com sucesso!", exercise.points
+        # Verifica se o código fornecido pelo usuário executa sem erros
+        result = self.executor.run(user_answer)
+        if not result.success:
+            return False, f"❌ O código ainda contém erros: {result.error_message}", 0
+        
+        # Verifica se a correção está na linha esperada (se especificada)
+        if exercise.bug_line:
+            user_lines = user_answer.strip().split('\n')
+            original_lines = exercise.code.strip().split('\n')
             
-        except Exception as e:
-            return False, f"❌ O código ainda contém erros: {str(e)}", 0
+            if exercise.bug_line <= len(user_lines):
+                if user_lines[exercise.bug_line - 1] != original_lines[exercise.bug_line - 1]:
+                    # Linha foi modificada, provavelmente corrigida
+                    return True, "✅ Excelente! Você encontrou e corrigiu o bug!", exercise.points
+                    
+        # Se não há linha específica, verifica se o código funciona
+        return True, "✅ Código corrigido com sucesso!", exercise.points
             
     def _evaluate_completion(self, exercise: Exercise, user_answer: Dict[str, str]) -> Tuple[bool, str, int]:
         """Avalia exercício de completar código"""
@@ -124,10 +188,12 @@ class RichExerciseEngine:
         else:
             return False, f"Parcialmente correto ({correct_count}/{total_count})\n" + "\n".join(feedback_parts), score
             
-    def _evaluate_output(self, exercise: Exercise, user_answer: str) -> Tuple[bool, str, int]:
+    def _evaluate_output(self, exercise: Exercise, user_answer: str,
+                         actual_output: Optional[str] = None) -> Tuple[bool, str, int]:
         """Avalia predição de output"""
         # Executa o código para obter output real
-        actual_output = self._capture_output(exercise.code)
+        if actual_output is None:
+            actual_output = self._reference_output(exercise)
         
         # Normaliza outputs para comparação
         user_output = user_answer.strip()
@@ -151,14 +217,16 @@ class RichExerciseEngine:
         feedback = "❌ Output incorreto.\n\nDiferenças:\n" + ''.join(diff)
         return False, feedback, 0
         
-    def _evaluate_refactoring(self, exercise: Exercise, user_answer: str) -> Tuple[bool, str, int]:
+    def _evaluate_refactoring(self, exercise: Exercise, user_answer: str,
+                              original_output: Optional[str] = None) -> Tuple[bool, str, int]:
         """Avalia exercício de refatoração"""
         criteria_met = []
         criteria_failed = []
         
         try:
             # Verifica se o código refatorado funciona
-            original_output = self._capture_output(exercise.code)
+            if original_output is None:
+                original_output = self._reference_output(exercise)
             refactored_output = self._capture_output(user_answer)
             
             if original_output != refactored_output:
@@ -200,19 +268,8 @@ class RichExerciseEngine:
             return False, f"❌ Incorreto. A resposta correta é: {exercise.solution}", 0
             
     def _capture_output(self, code: str) -> str:
-        """Captura output de um código"""
-        old_stdout = sys.stdout
-        sys.stdout = buffer = io.StringIO()
-        
-        try:
-            exec(code)
-            output = buffer.getvalue()
-        except Exception as e:
-            output = f"Erro: {str(e)}"
-        finally:
-            sys.stdout = old_stdout
-            
-        return output
+        """Captura output de um código (executado no sandbox)"""
+        return self.output_from_result(self.executor.run(code))
         
     def _check_refactoring_criterion(self, code: str, criterion: str) -> bool:
         """Verifica se um critério de refatoração foi atendido"""
@@ -12,6 +12,11 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any
 from enum import Enum
 
+try:
+    from .storage import StateDocument
+except ImportError:
+    from storage import StateDocument
+
 
 class PlayerLevel(Enum):
     """Níveis do jogador"""
@@ -56,20 +61,33 @@ class BadgeType(Enum):
 class GamificationSystem:
     """Sistema completo de gamificação"""
     
-    def __init__(self, progress_manager):
+    def __init__(self, progress_manager, store=None):
         self.progress = progress_manager
         self.game_file = "data/gamification.json"
+        
+        # Com o banco do aluno, cada campo é uma linha e o histórico de XP é append-only
+        self.store = store if store is not None else getattr(progress_manager, 'store', None)
+        self._document = (StateDocument(self.store, "gamification", history_fields=("historico_xp",))
+                          if self.store else None)
         self.game_data = self._load_game_data()
         
     def _load_game_data(self) -> Dict[str, Any]:
         """Carrega dados de gamificação"""
+        if self._document is not None:
+            return self._document.load(self._create_default_game_data,
+                                       legacy_loader=self._load_game_file,
+                                       legacy_source=self.game_file)
+        return self._load_game_file() or self._create_default_game_data()
+    
+    def _load_game_file(self) -> Optional[Dict[str, Any]]:
+        """Lê o arquivo JSON de gamificação (None se ausente ou corrompido)"""
         if os.path.exists(self.game_file):
             try:
                 with open(self.game_file, 'r', encoding='utf-8') as f:
                     return json.load(f)
             except:
-                return self._create_default_game_data()
-        return self._create_default_game_data()
+                return None
+        return None
     
     def _create_default_game_data(self) -> Dict[str, Any]:
         """Cria estrutura padrão de gamificação"""
@@ -96,6 +114,11 @@ class GamificationSystem:
     
     def save_game_data(self) -> None:
         """Salva dados de gamificação"""
+        if self._document is not None:
+            # No banco só os campos alterados são regravados
+            self._document.save(self.game_data)
+            return
+        
         with open(self.game_file, 'w', encoding='utf-8') as f:
             json.dump(self.game_data, f, indent=2, ensure_ascii=False)
     
@@ -104,11 +127,15 @@ class GamificationSystem:
         self.game_data["xp_total"] += quantidade
         
         # Registra no histórico
-        self.game_data["historico_xp"].append({
+        registro = {
             "quantidade": quantidade,
             "motivo": motivo,
             "timestamp": datetime.now().isoformat()
-        })
+        }
+        if self._document is not None:
+            self._document.append(self.game_data, "historico_xp", registro)
+        else:
+            self.game_data["historico_xp"].append(registro)
         
         # Verifica novo nível
         nivel_anterior = self.game_data["nivel_atual"]
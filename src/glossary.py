@@ -11,16 +11,38 @@ import os
 from typing import Dict, List, Optional, Any
 from .utils import PythonCourseUtils
 from .visual_feedback import VisualFeedback
+from .performance import TieredCache, get_tiered_cache
+from .glossary_index import INDEX_VERSION, GlossaryIndex
 
 
 class Glossary:
     """Gerencia o glossário de termos Python"""
     
-    def __init__(self, glossary_file: str = "glossary.json"):
+    def __init__(self, glossary_file: str = "glossary.json", cache: Optional[TieredCache] = None):
         self.glossary_file = glossary_file
         self.utils = PythonCourseUtils()
         self.visual = VisualFeedback()
+        # Índices derivados ficam no cache em disco: a próxima execução não recalcula
+        self._cache = cache or get_tiered_cache()
+        self._cache.register_namespace("glossary", ttl=3600, l2_ttl=30 * 24 * 3600)
         self.terms = self._load_glossary()
+        self._signature = self._file_signature()
+        self.index = self._load_index()
+    
+    def _file_signature(self) -> str:
+        """Identifica a versão do arquivo do glossário (caminho, mtime e tamanho)"""
+        try:
+            stat = os.stat(self.glossary_file)
+        except OSError:
+            return f"{os.path.abspath(self.glossary_file)}:missing:{len(self.terms)}"
+        return f"{os.path.abspath(self.glossary_file)}:{stat.st_mtime_ns}:{stat.st_size}"
+    
+    def _index_key(self) -> str:
+        return f"index:v{INDEX_VERSION}:{self._signature}"
+    
+    def _load_index(self) -> GlossaryIndex:
+        """Índice de busca, via cache (montado uma vez por versão do arquivo)"""
+        return self._cache.get("glossary", self._index_key(), lambda: GlossaryIndex(self.terms))
     
     def _load_glossary(self) -> Dict[str, Any]:
         """Carrega o glossário do arquivo JSON"""
@@ -78,8 +100,8 @@ class Glossary:
         if search in self.terms:
             self._display_term(search, self.terms[search])
         else:
-            # Busca parcial
-            matches = [term for term in self.terms if search in term]
+            # Busca por relevância: prefixo, definição e erros de digitação
+            matches = self.index.search(search)
             
             if matches:
                 print(f"\n📝 Termos encontrados com '{search}':")
@@ -154,19 +176,13 @@ class Glossary:
         self.utils.limpar_tela()
         self.utils.titulo("📚 TERMOS POR MÓDULO")
         
-        # Organiza termos por módulo
-        by_module = {}
-        for term, info in self.terms.items():
-            for module in info.get('modulos_relacionados', []):
-                if module not in by_module:
-                    by_module[module] = []
-                by_module[module].append(term)
+        by_module = self.index.modules()
         
         # Exibe por módulo
         for module in sorted(by_module.keys()):
             module_num = module.split('_')[1]
             print(f"\n📖 Módulo {module_num}:")
-            for term in sorted(by_module[module]):
+            for term in by_module[module]:
                 print(f"   • {term}")
         
         self.utils.pausar()
@@ -196,21 +212,21 @@ class Glossary:
     
     def get_terms_for_module(self, module_id: str) -> List[str]:
         """Retorna lista de termos relacionados a um módulo"""
-        related_terms = []
-        for term, info in self.terms.items():
-            if module_id in info.get('modulos_relacionados', []):
-                related_terms.append(term)
-        return sorted(related_terms)
+        return list(self.index.terms_for_module(module_id))
     
     def add_term(self, term: str, definition: str, example: str, 
                  related_modules: List[str]) -> None:
         """Adiciona um novo termo ao glossário"""
-        self.terms[term.lower()] = {
+        key = term.lower()
+        self.terms[key] = {
             "definicao": definition,
             "exemplo": example,
             "modulos_relacionados": related_modules
         }
+        self.index.add(key, self.terms[key])
         self._save_glossary()
+        self._signature = self._file_signature()
+        self._cache.set("glossary", self._index_key(), self.index)
     
     def _save_glossary(self) -> None:
         """Salva o glossário no arquivo JSON"""
@@ -221,12 +237,13 @@ class Glossary:
             print(f"Erro ao salvar glossário: {e}")
     
     def search_definition(self, text: str) -> List[str]:
-        """Busca termos que contenham o texto na definição"""
-        matches = []
-        text_lower = text.lower()
-        
-        for term, info in self.terms.items():
-            if text_lower in info['definicao'].lower():
-                matches.append(term)
-        
-        return matches
\ No newline at end of file
+        """Busca termos que contenham as palavras do texto na definição"""
+        return self.index.search_definition(text)
+    
+    def search(self, query: str, limit: int = 10) -> List[str]:
+        """Busca termos por relevância (nome, definição, exemplo; tolera erros)"""
+        return self.index.search(query, limit)
+    
+    def suggest(self, prefix: str, limit: int = 10) -> List[str]:
+        """Sugestões de termos para o autocompletar"""
+        return self.index.complete(prefix, limit)
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Índice de Busca do Glossário
+Montado uma vez ao carregar o glossário: tokens sem acento (termo, definição e
+exemplo), trie de prefixos dos nomes para o autocompletar, trigramas para
+tolerar erros de digitação e o mapa módulo → termos. Cada consulta toca só as
+listas de postings das palavras buscadas, não o glossário inteiro.
+"""
+
+import heapq
+import math
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter, deque
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# Muda quando a estrutura do índice muda: índices persistidos no cache em disco
+# com outra versão são ignorados
+INDEX_VERSION = 1
+
+# Peso de uma palavra conforme o campo onde aparece (vale o maior)
+FIELD_WEIGHTS = {"termo": 3.0, "definicao": 1.0, "exemplo": 0.5}
+# Nos postings, os campos de cada ocorrência ficam num bitmask
+FIELD_BITS = {field: 1 << position for position, field in enumerate(FIELD_WEIGHTS)}
+MASK_WEIGHTS = [max([weight for field, weight in FIELD_WEIGHTS.items() if mask & FIELD_BITS[field]],
+                    default=0.0)
+                for mask in range(1 << len(FIELD_WEIGHTS))]
+
+PREFIX_SIMILARITY = 0.6      # peso de "dic" completando "dicionario"
+FUZZY_THRESHOLD = 0.5        # similaridade mínima (Dice dos trigramas)
+FUZZY_MIN_LENGTH = 4         # palavras curtas demais geram falsos positivos
+FUZZY_CANDIDATES = 5         # correções consideradas por palavra
+COMMON_FRACTION = 0.2        # palavra em mais que isso dos termos é ignorada na busca
+EXACT_NAME_BONUS = 100.0
+NAME_PREFIX_BONUS = 5.0
+
+_END = ""                    # chave de fim de palavra nos nós da trie
+_WORD = re.compile(r"\w+")
+
+
+def fold(text: str) -> str:
+    """Minúsculas e sem acentos: "Função" -> "funcao" """
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+@lru_cache(maxsize=65536)
+def _fold_word(word: str) -> str:
+    return fold(word)
+
+
+def tokenize(text: str) -> List[str]:
+    """Palavras do texto já normalizadas por fold()"""
+    # Separa antes de normalizar: só as palavras com acento pagam o fold (e o cache)
+    words = _WORD.findall(unicodedata.normalize("NFC", text).casefold())
+    return [word if word.isascii() else _fold_word(word) for word in words]
+
+
+def trigrams(token: str) -> Set[str]:
+    """Trigramas com bordas marcadas: "for" -> {"$fo", "for", "or$"}"""
+    padded = f"${token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class GlossaryIndex:
+    """Índice invertido, trie e trigramas sobre os termos do glossário"""
+
+    def __init__(self, terms: Optional[Dict[str, Dict[str, Any]]] = None):
+        # palavra -> termo -> bitmask dos campos onde a palavra aparece
+        self._postings: Dict[str, Dict[str, int]] = {}
+        # termo -> campo -> palavras (para remover o termo)
+        self._term_tokens: Dict[str, Dict[str, Set[str]]] = {}
+        self._vocabulary: List[str] = []    # ordenado, para prefixos nas definições
+        self._trigrams: Dict[str, Set[str]] = {}
+        self._trie: Dict[str, Any] = {}
+        self._names: Dict[str, str] = {}
+        self._modules: Dict[str, List[str]] = {}
+        self._term_modules: Dict[str, List[str]] = {}
+
+        for term, info in (terms or {}).items():
+            self.add(term, info)
+
+    def __len__(self) -> int:
+        return len(self._term_tokens)
+
+    def __contains__(self, term: str) -> bool:
+        return term in self._term_tokens
+
+    # ------------------------------------------------------------------
+    # Manutenção
+    # ------------------------------------------------------------------
+
+    def add(self, term: str, info: Dict[str, Any]) -> None:
+        """Indexa um termo (substitui a versão anterior, se houver)"""
+        if term in self._term_tokens:
+            self.remove(term)
+
+        name = fold(term).strip()
+        fields = {
+            "termo": set(tokenize(term)),
+            "definicao": set(tokenize(info.get("definicao", ""))),
+            "exemplo": set(tokenize(info.get("exemplo", ""))),
+        }
+        self._term_tokens[term] = fields
+        self._names[term] = name
+
+        masks: Dict[str, int] = {}
+        for field, tokens in fields.items():
+            bit = FIELD_BITS[field]
+            for token in tokens:
+                masks[token] = masks.get(token, 0) | bit
+        for token, mask in masks.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                insort(self._vocabulary, token)
+                for gram in trigrams(token):
+                    self._trigrams.setdefault(gram, set()).add(token)
+            postings[term] = mask
+
+        for key in {name, *fields["termo"]}:
+            self._trie_node(key, create=True).setdefault(_END, set()).add(term)
+
+        modules = list(info.get("modulos_relacionados", []))
+        self._term_modules[term] = modules
+        for module in modules:
+            terms = self._modules.setdefault(module, [])
+            if term not in terms:
+                insort(terms, term)
+
+    def remove(self, term: str) -> bool:
+        """Tira um termo do índice"""
+        fields = self._term_tokens.pop(term, None)
+        if fields is None:
+            return False
+        name = self._names.pop(term)
+
+        for token in set().union(*fields.values()):
+            postings = self._postings[token]
+            del postings[term]
+            if not postings:
+                del self._postings[token]
+                del self._vocabulary[bisect_left(self._vocabulary, token)]
+                for gram in trigrams(token):
+                    self._trigrams[gram].discard(token)
+                    if not self._trigrams[gram]:
+                        del self._trigrams[gram]
+
+        for key in {name, *fields["termo"]}:
+            node = self._trie_node(key)
+            if node is not None:
+                node[_END].discard(term)
+                if not node[_END]:
+                    del node[_END]
+
+        for module in self._term_modules.pop(term, []):
+            terms = self._modules.get(module, [])
+            if term in terms:
+                terms.remove(term)
+            if not terms:
+                self._modules.pop(module, None)
+        return True
+
+    def _trie_node(self, key: str, create: bool = False) -> Optional[Dict[str, Any]]:
+        node = self._trie
+        for char in key:
+            child = node.get(char)
+            if child is None:
+                if not create:
+                    return None
+                child = node[char] = {}
+            node = child
+        return node
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def terms_for_module(self, module_id: str) -> List[str]:
+        """Termos (ordenados) de um módulo"""
+        return self._modules.get(module_id, [])
+
+    def modules(self) -> Dict[str, List[str]]:
+        """Mapa módulo -> termos ordenados"""
+        return self._modules
+
+    def complete(self, prefix: str, limit: int = 10) -> List[str]:
+        """
+        Autocompletar: termos cujo nome (ou uma palavra do nome) começa com o prefixo
+
+        Os que começam pelo nome inteiro vêm primeiro; dentro de cada grupo,
+        as completações mais curtas antes.
+        """
+        folded = fold(prefix).strip()
+        if not folded or limit <= 0:
+            return []
+
+        node = self._trie_node(folded)
+        if node is None:
+            return []
+
+        found: List[str] = []
+        seen: Set[str] = set()
+        # Busca em largura: completações curtas primeiro, sem percorrer a subárvore toda
+        queue = deque([node])
+        while queue and len(found) < limit * 2:
+            current = queue.popleft()
+            for term in sorted(current.get(_END, ())):
+                if term not in seen:
+                    seen.add(term)
+                    found.append(term)
+            queue.extend(current[char] for char in sorted(current) if char != _END)
+
+        found.sort(key=lambda term: not self._names[term].startswith(folded))
+        return found[:limit]
+
+    def search(self, query: str, limit: int = 10) -> List[str]:
+        """
+        Busca ordenada por relevância em nomes, definições e exemplos
+
+        Cada palavra da consulta casa por igualdade, por prefixo do nome do
+        termo ou, se não estiver no vocabulário, pelas palavras mais parecidas
+        (erros de digitação). Palavras raras pesam mais; as muito comuns
+        ("de", "um") só contam quando a consulta não tem outras.
+        """
+        return [term for term, _ in self.ranked(query, limit)]
+
+    def ranked(self, query: str, limit: int = 10) -> List[Tuple[str, float]]:
+        """Como search(), com a pontuação de cada termo"""
+        folded = fold(query).strip()
+        tokens = tokenize(query)
+        if not tokens or limit <= 0:
+            return []
+        tokens = [token for token in tokens if not self._is_common(token)] or tokens
+
+        scores: Dict[str, float] = {}
+        for token in tokens:
+            best: Dict[str, float] = {}
+            for word, similarity in self._match(token).items():
+                factor = similarity * self._idf(word)
+                for term, mask in self._postings[word].items():
+                    score = MASK_WEIGHTS[mask] * factor
+                    if best.get(term, 0.0) < score:
+                        best[term] = score
+            prefix_score = PREFIX_SIMILARITY * FIELD_WEIGHTS["termo"] * self._idf(token)
+            for term in self.complete(token, limit=limit * 2):
+                if best.get(term, 0.0) < prefix_score:
+                    best[term] = prefix_score
+            if not scores:
+                scores = best
+            else:
+                for term, score in best.items():
+                    scores[term] = scores.get(term, 0.0) + score
+
+        for term in self.complete(folded, limit=limit):
+            bonus = EXACT_NAME_BONUS if self._names[term] == folded else NAME_PREFIX_BONUS
+            scores[term] = scores.get(term, 0.0) + bonus
+
+        return heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], len(item[0]), item[0]))
+
+    def search_definition(self, text: str) -> List[str]:
+        """
+        Termos cuja definição contém as palavras do texto (sem diferenciar acentos)
+
+        A última palavra pode estar incompleta ("memór" acha "memória").
+        """
+        tokens = tokenize(text)
+        if not tokens:
+            return sorted(self._term_tokens)
+
+        # Todas as palavras na definição; a última pode ser só o começo de uma
+        definition = FIELD_BITS["definicao"]
+        *whole, partial = tokens
+        candidates: Optional[Set[str]] = None
+        for token in sorted(whole, key=lambda token: len(self._postings.get(token, ()))):
+            found = {term for term, mask in self._postings.get(token, {}).items()
+                     if mask & definition and (candidates is None or term in candidates)}
+            candidates = found
+            if not candidates:
+                return []
+
+        matches: Set[str] = set()
+        for word in self.words_with_prefix(partial):
+            for term, mask in self._postings[word].items():
+                if mask & definition and (candidates is None or term in candidates):
+                    matches.add(term)
+        return sorted(matches)
+
+    def words_with_prefix(self, prefix: str) -> List[str]:
+        """Palavras do vocabulário (todos os campos) que começam com o prefixo"""
+        start = bisect_left(self._vocabulary, prefix)
+        end = start
+        while end < len(self._vocabulary) and self._vocabulary[end].startswith(prefix):
+            end += 1
+        return self._vocabulary[start:end]
+
+    def _idf(self, word: str) -> float:
+        frequency = len(self._postings.get(word, ()))
+        return math.log(1 + (len(self._term_tokens) + 1) / (frequency + 1))
+
+    def _is_common(self, token: str) -> bool:
+        return len(self._postings.get(token, ())) > COMMON_FRACTION * len(self._term_tokens)
+
+    def _match(self, token: str) -> Dict[str, float]:
+        """Palavras do vocabulário que representam `token`, com a similaridade"""
+        if token in self._postings:
+            return {token: 1.0}
+        if len(token) < FUZZY_MIN_LENGTH:
+            return {}
+        return self.correct(token)
+
+    def correct(self, token: str) -> Dict[str, float]:
+        """Palavras do vocabulário parecidas com `token` (Dice sobre trigramas)"""
+        grams = sorted(trigrams(token), key=lambda gram: len(self._trigrams.get(gram, ())))
+        # Dice >= t exige ao menos t*|q|/(2-t) trigramas em comum, então todo
+        # candidato tem um dos |q|-mínimo+1 trigramas mais raros: os comuns
+        # (postings enormes) só são consultados para conferir candidatos
+        needed = math.ceil(FUZZY_THRESHOLD * len(grams) / (2 - FUZZY_THRESHOLD))
+        probe, rest = grams[:len(grams) - needed + 1], grams[len(grams) - needed + 1:]
+        shared: Counter = Counter()
+        for gram in probe:
+            shared.update(self._trigrams.get(gram, ()))
+
+        rest_postings = [self._trigrams.get(gram, set()) for gram in rest]
+        minimum = FUZZY_THRESHOLD * len(grams) / 2
+
+        similar = []
+        for word, count in shared.items():
+            # |trigramas(w)| == len(w) para palavras sem trigramas repetidos;
+            # descarta quem não alcança o limiar nem casando todo o resto
+            if count + len(rest) < minimum + FUZZY_THRESHOLD * len(word) / 2:
+                continue
+            count += sum(1 for postings in rest_postings if word in postings)
+            similarity = 2.0 * count / (len(grams) + len(word))
+            if similarity >= FUZZY_THRESHOLD:
+                similar.append((similarity, word))
+        similar.sort(key=lambda item: (-item[0], item[1]))
+        return {word: similarity for similarity, word in similar[:FUZZY_CANDIDATES]}
@@ -8,29 +8,81 @@ Analisa padrões, identifica dificuldades e gera relatórios personalizados
 
 import json
 import os
+import atexit
+import threading
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional, Any
 from collections import defaultdict, Counter
 import statistics
 
+try:
+    from .storage import StateDocument
+except ImportError:
+    from storage import StateDocument
+
 
 class LearningAnalytics:
     """Sistema de análise e insights de aprendizagem"""
     
-    def __init__(self, progress_manager):
+    # Campos que precisam voltar a ser defaultdict após carregar o JSON
+    _DEFAULTDICT_FIELDS = {
+        "error_patterns": int,
+        "module_attempts": list,
+        "time_per_module": list,
+        "concepts_difficulty": int,
+        "daily_activity": int,
+        "help_requests": int
+    }
+    
+    def __init__(self, progress_manager, flush_interval: float = 5.0, max_pending: int = 50,
+                 store=None):
+        """
+        Args:
+            progress_manager: Gerenciador de progresso do aluno
+            flush_interval: Segundos até gravar as alterações acumuladas
+            max_pending: Quantidade de alterações que força a gravação imediata
+            store: LearnerStore (padrão: o mesmo do progress_manager, se houver)
+        """
         self.progress = progress_manager
         self.analytics_file = "analytics.json"
+        self.store = store if store is not None else getattr(progress_manager, 'store', None)
+        self._document = (StateDocument(self.store, "analytics", history_fields=("erros_detalhados",))
+                          if self.store else None)
         self.analytics_data = self._load_analytics()
         
+        # Persistência em lote: os registros só marcam os dados como alterados
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending_changes = 0
+        self._flush_timer: Optional[threading.Timer] = None
+        self._lock = threading.RLock()
+        atexit.register(self.flush)
+        
     def _load_analytics(self) -> Dict[str, Any]:
         """Carrega dados de análise salvos"""
+        if self._document is not None:
+            data = self._document.load(self._create_default_analytics,
+                                       legacy_loader=self._load_analytics_file,
+                                       legacy_source=self.analytics_file)
+        else:
+            data = self._load_analytics_file()
+            if data is None:
+                return self._create_default_analytics()
+        
+        # O JSON devolve dicts comuns; os contadores precisam de defaultdict
+        for field, factory in self._DEFAULTDICT_FIELDS.items():
+            data[field] = defaultdict(factory, data.get(field, {}))
+        return data
+    
+    def _load_analytics_file(self) -> Optional[Dict[str, Any]]:
+        """Lê o analytics.json (None se não existir ou estiver corrompido)"""
         if os.path.exists(self.analytics_file):
             try:
                 with open(self.analytics_file, 'r', encoding='utf-8') as f:
                     return json.load(f)
             except:
-                return self._create_default_analytics()
-        return self._create_default_analytics()
+                return None
+        return None
     
     def _create_default_analytics(self) -> Dict[str, Any]:
         """Cria estrutura padrão de analytics"""
@@ -47,39 +99,88 @@ class LearningAnalytics:
         }
     
     def save_analytics(self) -> None:
-        """Salva dados de análise"""
-        # Converter defaultdict para dict normal para JSON
-        data_to_save = {
-            k: dict(v) if isinstance(v, defaultdict) else v
-            for k, v in self.analytics_data.items()
-        }
-        
-        with open(self.analytics_file, 'w', encoding='utf-8') as f:
-            json.dump(data_to_save, f, indent=2, ensure_ascii=False)
+        """Salva dados de análise imediatamente (escrita atômica)"""
+        with self._lock:
+            self._cancel_timer()
+            self._pending_changes = 0
+            
+            if self._document is not None:
+                # No banco só os campos alterados são regravados
+                self._document.save(self.analytics_data)
+                return
+            
+            # Converter defaultdict para dict normal para JSON
+            data_to_save = {
+                k: dict(v) if isinstance(v, defaultdict) else v
+                for k, v in self.analytics_data.items()
+            }
+            
+            temp_file = f"{self.analytics_file}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(data_to_save, f, indent=2, ensure_ascii=False)
+            os.replace(temp_file, self.analytics_file)
+    
+    def _mark_dirty(self) -> None:
+        """Registra uma alteração pendente e agenda a gravação em lote"""
+        with self._lock:
+            self._pending_changes += 1
+            if self._pending_changes >= self.max_pending:
+                flush_now = True
+            else:
+                flush_now = False
+                if self._flush_timer is None:
+                    self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+                    self._flush_timer.daemon = True
+                    self._flush_timer.start()
+        
+        if flush_now:
+            self.flush()
+    
+    def _cancel_timer(self) -> None:
+        """Cancela a gravação agendada (se houver)"""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+    
+    def flush(self) -> None:
+        """Grava as alterações pendentes (chamado pelo timer, no limite de lote e na saída)"""
+        with self._lock:
+            if not self._pending_changes:
+                self._cancel_timer()
+                return
+        try:
+            self.save_analytics()
+        except IOError as e:
+            print(f"Erro ao salvar analytics: {e}")
     
     def registrar_erro(self, tipo_erro: str, modulo: str, contexto: str = "") -> None:
         """Registra um erro para análise de padrões"""
-        self.analytics_data["error_patterns"][tipo_erro] += 1
-        self.analytics_data["concepts_difficulty"][modulo] += 1
-        
-        # Registra contexto do erro
-        erro_completo = {
-            "tipo": tipo_erro,
-            "modulo": modulo,
-            "contexto": contexto,
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        if "erros_detalhados" not in self.analytics_data:
-            self.analytics_data["erros_detalhados"] = []
-        
-        self.analytics_data["erros_detalhados"].append(erro_completo)
-        self.save_analytics()
+        with self._lock:
+            self.analytics_data["error_patterns"][tipo_erro] += 1
+            self.analytics_data["concepts_difficulty"][modulo] += 1
+            
+            # Registra contexto do erro
+            erro_completo = {
+                "tipo": tipo_erro,
+                "modulo": modulo,
+                "contexto": contexto,
+                "timestamp": datetime.now().isoformat()
+            }
+            
+            if self._document is not None:
+                # Histórico vai direto para a tabela append-only (uma linha)
+                self._document.append(self.analytics_data, "erros_detalhados", erro_completo)
+            else:
+                if "erros_detalhados" not in self.analytics_data:
+                    self.analytics_data["erros_detalhados"] = []
+                self.analytics_data["erros_detalhados"].append(erro_completo)
+        self._mark_dirty()
     
     def registrar_tempo_modulo(self, modulo: str, tempo_segundos: int) -> None:
         """Registra tempo gasto em um módulo"""
-        self.analytics_data["time_per_module"][modulo].append(tempo_segundos)
-        self.save_analytics()
+        with self._lock:
+            self.analytics_data["time_per_module"][modulo].append(tempo_segundos)
+        self._mark_dirty()
     
     def registrar_tentativa(self, modulo: str, sucesso: bool, pontos: int = 0) -> None:
         """Registra tentativa em um módulo"""
@@ -88,19 +189,22 @@ class LearningAnalytics:
             "pontos": pontos,
             "timestamp": datetime.now().isoformat()
         }
-        self.analytics_data["module_attempts"][modulo].append(tentativa)
-        self.save_analytics()
+        with self._lock:
+            self.analytics_data["module_attempts"][modulo].append(tentativa)
+        self._mark_dirty()
     
     def registrar_ajuda(self, topico: str) -> None:
         """Registra quando aluno pede ajuda"""
-        self.analytics_data["help_requests"][topico] += 1
-        self.save_analytics()
+        with self._lock:
+            self.analytics_data["help_requests"][topico] += 1
+        self._mark_dirty()
     
     def registrar_atividade_diaria(self) -> None:
         """Registra atividade do dia"""
         hoje = datetime.now().strftime("%Y-%m-%d")
-        self.analytics_data["daily_activity"][hoje] += 1
-        self.save_analytics()
+        with self._lock:
+            self.analytics_data["daily_activity"][hoje] += 1
+        self._mark_dirty()
     
     def calcular_taxa_sucesso_modulo(self, modulo: str) -> float:
         """Calcula taxa de sucesso em um módulo"""
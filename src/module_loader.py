@@ -7,10 +7,13 @@ Module Loader - Sistema de carregamento lazy para módulos
 
 import importlib
 import sys
+import threading
 from typing import Dict, Any, Optional, Callable
 from functools import wraps
 import time
 
+from .startup_profiler import startup_profiler
+
 
 class LazyModuleLoader:
     """Carrega módulos sob demanda para melhor performance"""
@@ -65,7 +68,8 @@ class LazyModuleLoader:
         
         # Importa o módulo
         module_path = self._module_paths[module_name]
-        module = importlib.import_module(module_path)
+        with startup_profiler.section(f"lazy {module_name} ({module_path})"):
+            module = importlib.import_module(module_path)
         
         # Obtém a classe/função do módulo
         if hasattr(module, module_name):
@@ -130,6 +134,92 @@ class LazyModuleLoader:
         return decorator
 
 
+class LazyImport:
+    """
+    Proxy em nível de módulo para uma classe/função de outro módulo
+
+    `AdvancedAnalytics = LazyImport("src.analytics.advanced_analytics", "AdvancedAnalytics")`
+    só importa o módulo na primeira chamada ou acesso a atributo.
+    """
+    
+    def __init__(self, module_path: str, attribute: str):
+        self._module_path = module_path
+        self._attribute = attribute
+        self._target = None
+        self._lock = threading.Lock()
+        
+    def resolve(self) -> Any:
+        """Importa (uma vez) e retorna o objeto real"""
+        if self._target is None:
+            with self._lock:
+                if self._target is None:
+                    with startup_profiler.section(f"lazy {self._attribute} ({self._module_path})"):
+                        module = importlib.import_module(self._module_path)
+                    self._target = getattr(module, self._attribute)
+        return self._target
+        
+    @property
+    def is_loaded(self) -> bool:
+        return self._target is not None
+        
+    def __call__(self, *args, **kwargs):
+        target = self.resolve()
+        with startup_profiler.section(f"{self._attribute}()"):
+            return target(*args, **kwargs)
+        
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.resolve(), name)
+        
+    def __repr__(self) -> str:
+        state = "carregado" if self.is_loaded else "não carregado"
+        return f"<LazyImport {self._module_path}.{self._attribute} ({state})>"
+
+
+class LazyProxy:
+    """
+    Substituto de um objeto criado só no primeiro uso
+
+    Controladores recebem o proxy no lugar do componente; o primeiro acesso a
+    atributo chama a fábrica e todos os seguintes vão direto ao objeto real.
+    """
+    
+    __slots__ = ("_factory", "_target", "_lock")
+    
+    def __init__(self, factory: Callable[[], Any]):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_target", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+        
+    def resolve(self) -> Any:
+        """Cria (uma vez) e retorna o objeto real"""
+        target = object.__getattribute__(self, "_target")
+        if target is None:
+            with object.__getattribute__(self, "_lock"):
+                target = object.__getattribute__(self, "_target")
+                if target is None:
+                    target = object.__getattribute__(self, "_factory")()
+                    object.__setattr__(self, "_target", target)
+        return target
+        
+    @property
+    def is_loaded(self) -> bool:
+        """True se o objeto real já foi criado (consultar não o cria)"""
+        return object.__getattribute__(self, "_target") is not None
+        
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.resolve(), name)
+        
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self.resolve(), name, value)
+        
+    def __bool__(self) -> bool:
+        return True
+        
+    def __repr__(self) -> str:
+        target = object.__getattribute__(self, "_target")
+        return f"<LazyProxy {target!r}>" if target is not None else "<LazyProxy (não criado)>"
+
+
 # Instância global do loader
 module_loader = LazyModuleLoader()
 
@@ -8,19 +8,106 @@ Carrega módulos sob demanda para melhor performance
 
 import importlib
 import os
-from typing import Dict, Any, Optional, Type
+import sys
+import threading
+import types
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Iterable, Optional, Type
 from pathlib import Path
 
 from .shared.base_module import BaseModule
+from .sections import SectionLoader, load_manifest, load_sectioned_class
+from ..performance import TieredCache, get_tiered_cache
+
+
+# Namespace do cache (só em memória) para o manifesto de seções, que pode ser
+# relido do disco a qualquer momento. Classes e instâncias ficam no próprio
+# loader: o L1 compartilhado pode descartá-las sob pressão de outros
+# namespaces, e a instância leva o estado do módulo na sessão
+MANIFEST_NAMESPACE = "module_manifest"
+# Seções recalculadas com ast (fonte diferente do manifesto), persistidas no L2
+# pelo SHA-1 do fonte: o próximo início não reanalisa o arquivo
+SECTIONS_NAMESPACE = "module_sections"
+
+# Memória máxima (estimada) dos módulos residentes por sessão
+DEFAULT_MEMORY_BUDGET_MB = 4
+
+# Atributos de objetos de código que guardam dados; alguns só existem em
+# versões mais novas do Python (co_linetable: 3.10, co_exceptiontable e
+# co_qualname: 3.11) e são lidos com getattr
+_CODE_ATTRIBUTES = ("co_consts", "co_names", "co_varnames", "co_linetable", "co_exceptiontable",
+                    "co_qualname")
+
+
+def _resident_size(roots: Iterable[Any], owner: str) -> int:
+    """
+    Tamanho profundo dos objetos que pertencem a um módulo do curso
+
+    Percorre funções (código, constantes, defaults), classes e instâncias
+    definidas em `owner` e os containers alcançáveis a partir delas. Outros
+    módulos, classes de fora e as instâncias delas (ui, progress...) são
+    compartilhados e contam só o próprio objeto raso.
+    """
+    seen = set()
+    total = 0
+    stack = list(roots)
+    while stack:
+        obj = stack.pop()
+        if obj is None or id(obj) in seen or isinstance(obj, (types.ModuleType, types.BuiltinFunctionType)):
+            continue
+        seen.add(id(obj))
+        if isinstance(obj, type) and obj.__module__ != owner:
+            continue
+        total += sys.getsizeof(obj)
+
+        if isinstance(obj, types.FunctionType):
+            stack.extend((obj.__code__, obj.__defaults__, obj.__kwdefaults__, obj.__dict__))
+        elif isinstance(obj, types.CodeType):
+            stack.extend(getattr(obj, name, None) for name in _CODE_ATTRIBUTES)
+        elif isinstance(obj, type):
+            stack.extend(vars(obj).values())
+        elif isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif type(obj).__module__ == owner and hasattr(obj, "__dict__"):
+            stack.append(vars(obj))
+    return total
 
 
 class ModuleLoader:
     """Carregador dinâmico de módulos do curso"""
     
-    def __init__(self):
+    def __init__(self, cache: Optional[TieredCache] = None, sectioned: bool = True,
+                 memory_budget_mb: Optional[float] = DEFAULT_MEMORY_BUDGET_MB):
+        """
+        Args:
+            cache: Cache compartilhado para dados recalculáveis (padrão: get_tiered_cache())
+            sectioned: Monta os módulos com seções compiladas sob demanda
+                (False importa a classe inteira)
+            memory_budget_mb: Memória dos módulos residentes; acima dela os
+                menos usados recentemente são descarregados (None = sem limite)
+        """
+        self._cache = cache or get_tiered_cache()
+        self._cache.register_namespace(MANIFEST_NAMESPACE, ttl=None, persist=False)
+        self._cache.register_namespace(SECTIONS_NAMESPACE, ttl=None)
+        self.base_path = Path(__file__).parent
+        self.sectioned = sectioned
         self._loaded_modules: Dict[str, Type[BaseModule]] = {}
         self._module_cache: Dict[str, BaseModule] = {}
-        self.base_path = Path(__file__).parent
+        self._section_loaders: Dict[str, SectionLoader] = {}
+        # Serializa cargas: UI e prefetch em segundo plano não montam o mesmo módulo duas vezes
+        self._load_lock = threading.RLock()
+        
+        # LRU dos módulos residentes (primeiro = menos recente) com o tamanho estimado;
+        # lock próprio: um acerto só reordena e não espera cargas em andamento
+        self._resident: "OrderedDict[str, int]" = OrderedDict()
+        self._lru_lock = threading.Lock()
+        self._imported: Dict[str, str] = {}
+        self.memory_budget_bytes: Optional[int] = None
+        self.evictions = 0
+        self.set_memory_budget(memory_budget_mb)
         
         # Mapeamento de módulos para seus arquivos
         self._module_mapping = {
@@ -68,61 +155,176 @@ class ModuleLoader:
             "modulo_35": ("enterprise.modulo_35_capstone", "Modulo35Capstone"),
         }
     
-    def get_module(self, module_id: str) -> Optional[BaseModule]:
+    def get_module(self, module_id: str, quiet: bool = False, prefetch: bool = False) -> Optional[BaseModule]:
         """
         Carrega e retorna instância do módulo
         
         Args:
             module_id: ID do módulo (ex: "modulo_1")
+            quiet: Não imprime erros (usado pelo prefetch em segundo plano)
+            prefetch: Carga especulativa: entra no fim da fila do LRU e é a
+                primeira a sair se o orçamento de memória estourar
             
         Returns:
             Instância do módulo ou None se não encontrado
         """
-        # Verifica cache primeiro
-        if module_id in self._module_cache:
-            return self._module_cache[module_id]
-        
-        # Carrega módulo se não estiver em cache
-        module_class = self._load_module_class(module_id)
-        if module_class:
-            instance = module_class()
-            self._module_cache[module_id] = instance
+        # Verifica cache primeiro (sem o lock de carga nem medição)
+        instance = self._module_cache.get(module_id)
+        if instance is not None:
+            if not prefetch:
+                self._touch(module_id)
             return instance
         
+        with self._load_lock:
+            # Outra thread pode ter terminado a carga enquanto esperávamos
+            instance = self._module_cache.get(module_id)
+            if instance is not None:
+                if not prefetch:
+                    self._touch(module_id)
+                return instance
+            
+            # Carrega módulo se não estiver em cache
+            module_class = self._load_module_class(module_id, quiet=quiet)
+            if module_class:
+                instance = module_class()
+                self._module_cache[module_id] = instance
+                self._record_size(module_id, self._measure(module_id, instance), least_recent=prefetch)
+                self._enforce_budget(keep=None if prefetch else module_id)
+                return instance
+        
         return None
     
-    def _load_module_class(self, module_id: str) -> Optional[Type[BaseModule]]:
+    def set_memory_budget(self, memory_budget_mb: Optional[float]) -> None:
+        """Define o orçamento de memória dos módulos (None = sem limite)"""
+        with self._load_lock:
+            self.memory_budget_bytes = int(memory_budget_mb * 1024 * 1024) if memory_budget_mb else None
+            self._enforce_budget()
+    
+    def _measure(self, module_id: str, instance: BaseModule) -> int:
+        """
+        Tamanho residente estimado de um módulo (classe, globais, instância, seções em uso)
+        
+        É só uma estimativa para o orçamento: se a medição falhar, o módulo
+        conta o tamanho raso da instância e a carga segue normalmente.
+        """
+        module_class = type(instance)
+        try:
+            execute = module_class.__dict__.get('execute')
+            roots = [module_class, instance, getattr(execute, '__globals__', None)]
+            section_loader = self._section_loaders.get(module_id)
+            if section_loader is not None:
+                roots.append(section_loader.resident_objects())
+            return _resident_size(roots, module_class.__module__)
+        except Exception:
+            return sys.getsizeof(instance)
+    
+    def _touch(self, module_id: str) -> None:
+        """Marca o módulo como o mais recente no LRU"""
+        with self._lru_lock:
+            if module_id in self._resident:
+                self._resident.move_to_end(module_id)
+    
+    def _record_size(self, module_id: str, size: int, least_recent: bool = False) -> None:
+        """Registra o tamanho de um módulo recém-carregado na ponta do LRU"""
+        with self._lru_lock:
+            self._resident[module_id] = size
+            self._resident.move_to_end(module_id, last=not least_recent)
+    
+    def _remeasure(self, module_id: str) -> None:
+        """
+        Remede um módulo depois que uma seção dele é compilada
+        
+        O orçamento é reaplicado na próxima carga: a seção em execução não
+        espera por descarregamentos.
+        """
+        instance = self._module_cache.get(module_id)
+        if instance is None:
+            return
+        size = self._measure(module_id, instance)
+        with self._lru_lock:
+            if module_id in self._resident:
+                self._resident[module_id] = size
+    
+    def _enforce_budget(self, keep: Optional[str] = None) -> None:
+        """Descarrega os módulos menos usados até caber no orçamento"""
+        if self.memory_budget_bytes is None:
+            return
+        with self._load_lock:
+            with self._lru_lock:
+                resident = list(self._resident.items())
+            total = sum(size for _, size in resident)
+            for module_id, size in resident:
+                if total <= self.memory_budget_bytes:
+                    break
+                if module_id != keep:
+                    self.unload_module(module_id)
+                    self.evictions += 1
+                    total -= size
+    
+    def has_module(self, module_id: str) -> bool:
+        """Verifica se um ID de módulo existe no mapeamento"""
+        return module_id in self._module_mapping
+    
+    def is_module_ready(self, module_id: str) -> bool:
+        """Verifica se a instância do módulo já está em cache (abre sem espera)"""
+        return module_id in self._module_cache
+    
+    def _load_module_class(self, module_id: str, quiet: bool = False) -> Optional[Type[BaseModule]]:
         """
         Carrega classe do módulo dinamicamente
         
         Args:
             module_id: ID do módulo
+            quiet: Não imprime erros
             
         Returns:
             Classe do módulo ou None se não encontrado
         """
         # Verifica se já foi carregado
-        if module_id in self._loaded_modules:
-            return self._loaded_modules[module_id]
+        module_class = self._loaded_modules.get(module_id)
+        if module_class is not None:
+            return module_class
         
+        with self._load_lock:
+            module_class = self._loaded_modules.get(module_id)
+            if module_class is None:
+                module_class = self._import_module_class(module_id, print if not quiet else (lambda message: None))
+            return module_class
+    
+    def _import_module_class(self, module_id: str, warn: Callable[[str], None]) -> Optional[Type[BaseModule]]:
+        """Importa (ou monta a casca de) uma classe de módulo e guarda no cache"""
         # Verifica se módulo existe no mapeamento
         if module_id not in self._module_mapping:
-            print(f"⚠️ Módulo {module_id} não encontrado no mapeamento")
+            warn(f"⚠️ Módulo {module_id} não encontrado no mapeamento")
             return None
         
         module_path, class_name = self._module_mapping[module_id]
         
         try:
-            # Importa o módulo dinamicamente
             full_module_path = f"src.modules.{module_path}"
-            module = importlib.import_module(full_module_path)
-            
-            # Obtém a classe
-            module_class = getattr(module, class_name)
+            if self.sectioned:
+                # Só a casca (menu) é compilada; cada seção no primeiro uso
+                manifest = self._cache.get(MANIFEST_NAMESPACE, "sections", load_manifest)
+                module_class, section_loader = load_sectioned_class(
+                    self.base_path / (module_path.replace('.', '/') + '.py'),
+                    full_module_path, class_name, (manifest or {}).get(module_id),
+                    resolve_entry=lambda digest, build, class_name=class_name: self._cache.get(
+                        SECTIONS_NAMESPACE, f"{class_name}:{digest}", build))
+                section_loader.on_compile = lambda name, module_id=module_id: self._remeasure(module_id)
+                self._section_loaders[module_id] = section_loader
+            else:
+                # Importa o módulo dinamicamente
+                newly_imported = full_module_path not in sys.modules
+                module = importlib.import_module(full_module_path)
+                if newly_imported:
+                    self._imported[module_id] = full_module_path
+                
+                # Obtém a classe
+                module_class = getattr(module, class_name)
             
             # Verifica se é subclasse de BaseModule
             if not issubclass(module_class, BaseModule):
-                print(f"⚠️ {class_name} não é subclasse de BaseModule")
+                warn(f"⚠️ {class_name} não é subclasse de BaseModule")
                 return None
             
             # Armazena no cache
@@ -130,14 +332,14 @@ class ModuleLoader:
             
             return module_class
             
-        except ImportError as e:
-            print(f"❌ Erro ao importar módulo {module_id}: {e}")
+        except (ImportError, SyntaxError) as e:
+            warn(f"❌ Erro ao importar módulo {module_id}: {e}")
             return None
         except AttributeError as e:
-            print(f"❌ Classe {class_name} não encontrada no módulo {module_path}: {e}")
+            warn(f"❌ Classe {class_name} não encontrada no módulo {module_path}: {e}")
             return None
         except Exception as e:
-            print(f"❌ Erro inesperado ao carregar módulo {module_id}: {e}")
+            warn(f"❌ Erro inesperado ao carregar módulo {module_id}: {e}")
             return None
     
     def preload_modules(self, module_ids: list[str]) -> None:
@@ -163,11 +365,32 @@ class ModuleLoader:
         Args:
             module_id: ID do módulo para descarregar
         """
-        if module_id in self._module_cache:
-            del self._module_cache[module_id]
+        with self._load_lock:
+            self._module_cache.pop(module_id, None)
+            self._loaded_modules.pop(module_id, None)
+            self._section_loaders.pop(module_id, None)
+            with self._lru_lock:
+                self._resident.pop(module_id, None)
+            
+            # Módulo importado por este loader: sai também de sys.modules e do pacote pai
+            module_name = self._imported.pop(module_id, None)
+            if module_name is not None and sys.modules.pop(module_name, None) is not None:
+                parent_name, _, child = module_name.rpartition('.')
+                parent = sys.modules.get(parent_name)
+                if parent is not None and hasattr(parent, child):
+                    delattr(parent, child)
+    
+    def get_section_loader(self, module_id: str) -> Optional[SectionLoader]:
+        """
+        Retorna o carregador de seções de um módulo já carregado
         
-        if module_id in self._loaded_modules:
-            del self._loaded_modules[module_id]
+        Args:
+            module_id: ID do módulo
+            
+        Returns:
+            SectionLoader ou None (módulo não carregado ou sem seções)
+        """
+        return self._section_loaders.get(module_id)
     
     def get_loaded_modules(self) -> list[str]:
         """
@@ -176,7 +399,7 @@ class ModuleLoader:
         Returns:
             Lista de IDs de módulos carregados
         """
-        return list(self._loaded_modules.keys())
+        return list(self._loaded_modules)
     
     def get_cached_instances(self) -> list[str]:
         """
@@ -185,12 +408,15 @@ class ModuleLoader:
         Returns:
             Lista de IDs de módulos com instâncias em cache
         """
-        return list(self._module_cache.keys())
+        return list(self._module_cache)
     
     def clear_cache(self) -> None:
         """Limpa todo o cache de módulos"""
+        for module_id in list(self._resident) + list(self._imported):
+            self.unload_module(module_id)
         self._module_cache.clear()
         self._loaded_modules.clear()
+        self._section_loaders.clear()
         print("🧹 Cache de módulos limpo")
     
     def get_module_info(self, module_id: str) -> Dict[str, Any]:
@@ -206,8 +432,8 @@ class ModuleLoader:
         info = {
             'id': module_id,
             'exists': module_id in self._module_mapping,
-            'loaded': module_id in self._loaded_modules,
-            'cached': module_id in self._module_cache,
+            'loaded': module_id in self.get_loaded_modules(),
+            'cached': module_id in self.get_cached_instances(),
         }
         
         if info['exists']:
@@ -217,6 +443,13 @@ class ModuleLoader:
                 'class_name': class_name,
                 'file_path': str(self.base_path / (module_path.replace('.', '/') + '.py'))
             })
+            resident_bytes = self._resident.get(module_id)
+            if resident_bytes is not None:
+                info['resident_bytes'] = resident_bytes
+            section_loader = self._section_loaders.get(module_id)
+            if section_loader is not None:
+                info['sections'] = len(section_loader.sections)
+                info['live_sections'] = section_loader.live_sections()
         
         return info
     
@@ -240,8 +473,10 @@ class ModuleLoader:
             Relatório de saúde
         """
         total_modules = len(self._module_mapping)
-        loaded_count = len(self._loaded_modules)
-        cached_count = len(self._module_cache)
+        with self._lru_lock:
+            resident = dict(self._resident)
+        loaded_count = len(self.get_loaded_modules())
+        cached_count = len(self.get_cached_instances())
         
         # Verifica se arquivos existem
         existing_files = 0
@@ -261,6 +496,10 @@ class ModuleLoader:
             'existing_files': existing_files,
             'missing_files': missing_files,
             'memory_efficiency': f"{cached_count}/{total_modules} ({cached_count/total_modules*100:.1f}%)",
+            'resident_modules': resident,
+            'resident_bytes': sum(resident.values()),
+            'memory_budget_bytes': self.memory_budget_bytes,
+            'evictions': self.evictions,
             'status': 'healthy' if len(missing_files) == 0 else 'warning'
         }
 
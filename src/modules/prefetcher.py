@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Prefetch Preditivo de Módulos
+Enquanto o aluno lê um módulo, prevê os próximos (pelo progresso salvo) e
+os importa/instancia em uma thread de baixa prioridade, para que abrir o
+próximo módulo seja instantâneo.
+"""
+
+import atexit
+import os
+import re
+import threading
+from typing import Any, List, Optional
+
+from .module_loader import ModuleLoader
+
+
+def _module_number(module_id: str) -> int:
+    match = re.search(r"(\d+)$", module_id)
+    return int(match.group(1)) if match else 0
+
+
+class ModulePrefetcher:
+    """Carrega em segundo plano os módulos que o aluno provavelmente abrirá"""
+
+    def __init__(self, loader: ModuleLoader, progress: Any = None, depth: int = 2,
+                 idle_delay: float = 0.5):
+        """
+        Args:
+            loader: ModuleLoader compartilhado com a UI
+            progress: ProgressManager (ou None: prevê só pela numeração)
+            depth: Quantos módulos à frente carregar
+            idle_delay: Espera antes de cada módulo: a tela atual é desenhada
+                primeiro e, entre um módulo e outro, o GIL fica com a UI
+        """
+        self.loader = loader
+        self.progress = progress
+        self.depth = depth
+        self.idle_delay = idle_delay
+
+        self._module_ids = sorted((module_id for module_id in loader.list_all_modules()),
+                                  key=_module_number)
+        self._condition = threading.Condition()
+        self._targets: List[str] = []
+        self._generation = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.prefetched: List[str] = []
+        self.failed: List[str] = []
+
+        atexit.register(self.shutdown)
+
+    def _completed(self) -> set:
+        if self.progress is None:
+            return set()
+        data = getattr(self.progress, "progress_data", {}) or {}
+        completed = set(data.get("modules_completed", []))
+        for module_id, status in data.get("modules_progress", {}).items():
+            if status.get("completed"):
+                completed.add(module_id)
+        return completed
+
+    def _last_accessed(self) -> Optional[str]:
+        """Módulo acessado por último (ponto de retomada ao abrir o curso)"""
+        if self.progress is None:
+            return None
+        modules = (getattr(self.progress, "progress_data", {}) or {}).get("modules_progress", {})
+        accessed = [(status["last_access"], module_id) for module_id, status in modules.items()
+                    if status.get("last_access")]
+        return max(accessed)[1] if accessed else None
+
+    def predict(self, current: Optional[str] = None) -> List[str]:
+        """
+        Prevê os próximos módulos
+
+        Args:
+            current: Módulo aberto agora (None = início da sessão)
+
+        Returns:
+            Até `depth` IDs, do mais provável para o menos provável
+        """
+        completed = self._completed()
+        predictions: List[str] = []
+
+        if current is None:
+            # Início da sessão: o aluno tende a retomar onde parou
+            current = self._last_accessed()
+            if current is not None and current not in completed:
+                predictions.append(current)
+
+        # Próximos não concluídos depois do atual; se acabaram, os pendentes anteriores
+        position = _module_number(current) if current else 0
+        ahead = [module_id for module_id in self._module_ids if _module_number(module_id) > position]
+        behind = [module_id for module_id in self._module_ids if _module_number(module_id) < position]
+        for module_id in ahead + behind:
+            if len(predictions) >= self.depth:
+                break
+            if module_id != current and module_id not in completed and module_id not in predictions:
+                predictions.append(module_id)
+        return predictions
+
+    def on_module_opened(self, module_id: Optional[str] = None) -> List[str]:
+        """
+        Agenda o prefetch a partir do módulo aberto (substitui previsões antigas)
+
+        Returns:
+            Módulos que serão carregados
+        """
+        if self._stop.is_set():
+            return []
+        targets = [target for target in self.predict(module_id) if not self.loader.is_module_ready(target)]
+        with self._condition:
+            self._targets = targets
+            self._generation += 1
+            self._condition.notify()
+        if targets:
+            self._ensure_thread()
+        return targets
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="module-prefetch", daemon=True)
+            self._thread.start()
+
+    @staticmethod
+    def _lower_priority() -> None:
+        """Baixa a prioridade da thread no sistema (Linux: cada thread tem seu nice)"""
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+        except (AttributeError, OSError):
+            pass
+
+    def _run(self) -> None:
+        self._lower_priority()
+        while not self._stop.is_set():
+            with self._condition:
+                while not self._targets and not self._stop.is_set():
+                    self._condition.wait()
+                generation = self._generation
+
+            # Espera a UI ficar ociosa; uma nova previsão reinicia a espera
+            if self._stop.wait(self.idle_delay):
+                return
+            with self._condition:
+                if generation != self._generation or not self._targets:
+                    continue
+                module_id = self._targets.pop(0)
+
+            if not self.loader.is_module_ready(module_id):
+                if self.loader.get_module(module_id, quiet=True, prefetch=True) is not None:
+                    self.prefetched.append(module_id)
+                else:
+                    self.failed.append(module_id)
+
+    def shutdown(self, timeout: float = 1.0) -> None:
+        """Cancela o prefetch pendente e espera a thread terminar"""
+        self._stop.set()
+        with self._condition:
+            self._targets = []
+            self._condition.notify_all()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Seções Carregadas Sob Demanda
+Cada módulo do curso é uma única classe com milhares de linhas; aqui ele é
+montado como uma "casca" (construtor, execute e menu de navegação) e cada
+seção da lição é compilada só quando o aluno a escolhe no menu.
+
+O manifesto (section_manifest.json, gerado por tools/build_section_manifest.py)
+registra, por módulo, o intervalo de linhas de cada seção. Ele é validado pelo
+SHA-1 do arquivo: se o fonte mudou, o intervalo é recalculado com ast.
+"""
+
+import ast
+import hashlib
+import json
+import marshal
+import os
+import sys
+import tempfile
+import threading
+import types
+import weakref
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+MANIFEST_FILE = Path(__file__).parent / "section_manifest.json"
+
+# Métodos que ficam sempre na casca
+SHELL_METHODS = ("__init__", "execute")
+SHELL_PREFIXES = ("_navegacao",)
+
+# Métodos menores que isso ficam na casca: compilar à parte não compensa
+MIN_SECTION_LINES = 25
+
+
+def _file_digest(source: bytes) -> str:
+    return hashlib.sha1(source).hexdigest()
+
+
+def _needs_class_cell(node: ast.FunctionDef) -> bool:
+    """super() sem argumentos e __class__ dependem da classe original"""
+    return any(isinstance(child, ast.Name) and child.id in ("super", "__class__")
+               for child in ast.walk(node))
+
+
+def build_entry(file_path: Path, class_name: str, source: Optional[bytes] = None) -> Dict[str, Any]:
+    """
+    Analisa um arquivo de módulo e retorna sua entrada no manifesto
+
+    Args:
+        file_path: Arquivo .py do módulo
+        class_name: Classe principal do módulo
+        source: Conteúdo já lido (opcional)
+
+    Returns:
+        {"sha1", "class", "sections": {método: [primeira_linha, última_linha]}}
+    """
+    if source is None:
+        source = Path(file_path).read_bytes()
+    tree = ast.parse(source, filename=str(file_path))
+
+    sections: Dict[str, List[int]] = {}
+    for node in tree.body:
+        if not (isinstance(node, ast.ClassDef) and node.name == class_name):
+            continue
+        for item in node.body:
+            if not isinstance(item, ast.FunctionDef) or item.decorator_list:
+                continue
+            if item.name in SHELL_METHODS or item.name.startswith(SHELL_PREFIXES):
+                continue
+            if item.end_lineno - item.lineno + 1 < MIN_SECTION_LINES or _needs_class_cell(item):
+                continue
+            sections[item.name] = [item.lineno, item.end_lineno]
+
+    return {"sha1": _file_digest(source), "class": class_name, "sections": sections}
+
+
+def _shell_cache_path(file_path: Path) -> Path:
+    """Onde guardar o bytecode da casca (ao lado dos .pyc do Python)"""
+    file_path = Path(file_path)
+    return file_path.parent / "__pycache__" / f"{file_path.stem}.shell.{sys.implementation.cache_tag}.pyc"
+
+
+def _read_shell_code(file_path: Path, digest: str) -> Optional[types.CodeType]:
+    """Bytecode da casca em cache, se foi gerado a partir deste mesmo fonte"""
+    try:
+        data = _shell_cache_path(file_path).read_bytes()
+        if data[:40].decode("ascii") == digest:
+            return marshal.loads(data[40:])
+    except (OSError, ValueError, EOFError, TypeError):
+        pass
+    return None
+
+
+def _write_shell_code(file_path: Path, digest: str, code: types.CodeType) -> None:
+    """Grava o bytecode da casca (falhas são ignoradas, como nos .pyc)"""
+    cache_path = _shell_cache_path(file_path)
+    try:
+        cache_path.parent.mkdir(exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(digest.encode("ascii") + marshal.dumps(code))
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+
+def load_manifest(path: Path = MANIFEST_FILE) -> Dict[str, Dict[str, Any]]:
+    """Lê o manifesto de seções ({} se ausente ou corrompido)"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(entries: Dict[str, Dict[str, Any]], path: Path = MANIFEST_FILE) -> None:
+    """Grava o manifesto de seções"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(entries, f, indent=1, sort_keys=True)
+        f.write("\n")
+
+
+class SectionLoader:
+    """Compila as seções de um módulo sob demanda"""
+
+    def __init__(self, file_path: Path, class_name: str, sections: Dict[str, List[int]],
+                 offsets: Dict[str, Tuple[int, int]], module_globals: Dict[str, Any]):
+        self.file_path = str(file_path)
+        self.class_name = class_name
+        self.sections = sections
+        # Só os offsets ficam em memória; o texto da seção é lido do arquivo
+        self._offsets = offsets
+        self._globals = module_globals
+        self._lock = threading.Lock()
+        # Seções em uso (menu aberto): liberadas assim que ninguém as referencia
+        self._live: "weakref.WeakValueDictionary[str, Callable]" = weakref.WeakValueDictionary()
+        self.compile_count = 0
+        # Chamado (fora do lock) após cada compilação; o ModuleLoader remede o módulo
+        self.on_compile: Optional[Callable[[str], None]] = None
+
+    def compile(self, name: str) -> Callable:
+        """Compila (ou reaproveita, se ainda visível) a função de uma seção"""
+        with self._lock:
+            func = self._live.get(name)
+            if func is not None:
+                return func
+
+            start = self.sections[name][0]
+            begin, finish = self._offsets[name]
+            with open(self.file_path, "rb") as f:
+                f.seek(begin)
+                body = f.read(finish - begin).decode("utf-8")
+            # Compilada dentro de uma classe homônima (name mangling de
+            # __atributos) e com as mesmas linhas do arquivo nos tracebacks
+            source = "\n" * (start - 2) + f"class {self.class_name}:\n" + body
+            module_code = compile(source, self.file_path, "exec")
+            # Executa só o corpo da classe: sem criar a classe não há ciclo de
+            # referências e a função some assim que a seção termina
+            class_body = next(const for const in module_code.co_consts
+                              if isinstance(const, types.CodeType))
+            namespace: Dict[str, Any] = {}
+            exec(class_body, self._globals, namespace)
+            func = namespace[name]
+
+            self._live[name] = func
+            self.compile_count += 1
+
+        if self.on_compile is not None:
+            self.on_compile(name)
+        return func
+
+    def call(self, instance: Any, name: str, args: Tuple, kwargs: Dict[str, Any]) -> Any:
+        """Executa a seção; o código compilado é descartado ao final"""
+        func = self.compile(name)
+        return func(instance, *args, **kwargs)
+
+    def resident_objects(self) -> List[Any]:
+        """Objetos mantidos em memória por este loader (para medir o módulo)"""
+        return [self.sections, self._offsets, list(self._live.values())]
+
+    def live_sections(self) -> List[str]:
+        """Seções cujo código ainda está em memória"""
+        return list(self._live.keys())
+
+
+def load_sectioned_class(file_path: Path, module_name: str, class_name: str,
+                         entry: Optional[Dict[str, Any]] = None,
+                         resolve_entry: Optional[Callable[[str, Callable[[], Dict[str, Any]]], Dict[str, Any]]] = None
+                         ) -> Tuple[type, SectionLoader]:
+    """
+    Monta a classe de um módulo com as seções substituídas por stubs
+
+    Args:
+        file_path: Arquivo .py do módulo
+        module_name: Nome completo (ex: "src.modules.advanced.modulo_18_oop_basico")
+        class_name: Classe principal do módulo
+        entry: Entrada do manifesto (recalculada se ausente ou desatualizada)
+        resolve_entry: Chamada como resolve_entry(sha1, build) quando a entrada
+            precisa ser recalculada (ex.: busca num cache em disco antes do ast)
+
+    Returns:
+        (classe casca, SectionLoader)
+    """
+    source = Path(file_path).read_bytes()
+    digest = _file_digest(source)
+    if entry is None or entry.get("sha1") != digest or entry.get("class") != class_name:
+        build = lambda: build_entry(file_path, class_name, source)
+        entry = resolve_entry(digest, build) if resolve_entry else build()
+    sections = entry["sections"]
+
+    # bytes.splitlines quebra linhas como o tokenizer (str.splitlines não)
+    lines = source.splitlines(keepends=True)
+    line_offsets = [0]
+    for line in lines:
+        line_offsets.append(line_offsets[-1] + len(line))
+
+    shell_code = _read_shell_code(file_path, digest)
+    shell = None if shell_code is not None else list(lines)
+    offsets: Dict[str, Tuple[int, int]] = {}
+    for name, (start, end) in sections.items():
+        offsets[name] = (line_offsets[start - 1], line_offsets[end])
+        if shell is None:
+            continue
+        definition = lines[start - 1]
+        indent = definition[:len(definition) - len(definition.lstrip())].decode("utf-8")
+        shell[start - 1] = (f"{indent}def {name}(self, *args, **kwargs): "
+                            f"return __sections__.call(self, {name!r}, args, kwargs)\n").encode("utf-8")
+        for index in range(start, end):
+            shell[index] = b"\n"
+
+    if shell_code is None:
+        shell_code = compile(b"".join(shell), str(file_path), "exec")
+        _write_shell_code(file_path, digest, shell_code)
+
+    module = types.ModuleType(module_name)
+    module.__file__ = str(file_path)
+    module.__package__ = module_name.rpartition(".")[0]
+    loader = SectionLoader(file_path, class_name, sections, offsets, module.__dict__)
+    module.__sections__ = loader
+
+    exec(shell_code, module.__dict__)
+    return getattr(module, class_name), loader
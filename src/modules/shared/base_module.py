@@ -15,12 +15,14 @@ try:
     from ...utils import PythonCourseUtils
     from ...ui_components import UIComponents
     from ...progress_manager import ProgressManager
+    from ...execution import get_execution_service, console_input_handler
 except ImportError:
     import sys
     sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
     from utils import PythonCourseUtils
     from ui_components import UIComponents
     from progress_manager import ProgressManager
+    from execution import get_execution_service, console_input_handler
 
 
 class BaseModule(ABC):
@@ -236,36 +238,26 @@ class BaseModule(ABC):
             
             print(f"\n{output_color}{'─' * 25} OUTPUT {'─' * 25}{reset}")
             
-            try:
-                # Captura o output
-                import io
-                import sys
-                old_stdout = sys.stdout
-                sys.stdout = buffer = io.StringIO()
-                
-                exec(codigo)
-                
-                output = buffer.getvalue()
-                sys.stdout = old_stdout
-                
-                if output:
-                    print(f"{output_color}{output}{reset}", end='')
-                    
+            # Executa em um worker isolado e exibe a saída capturada
+            result = get_execution_service().run(codigo, input_handler=console_input_handler)
+            output = result.remaining_stdout
+            if output:
+                print(f"{output_color}{output}{reset}", end='')
+            
+            if result.success:
                 print(f"{output_color}{'─' * 58}{reset}")
-                
-            except Exception as e:
-                sys.stdout = old_stdout
-                print(f"{error_color}❌ Erro: {e}{reset}")
+            else:
+                print(f"{error_color}❌ Erro: {result.error_message}{reset}")
                 print(f"{error_color}{'─' * 58}{reset}")
                 
         else:
             # Fallback sem cores
             print("\n▶️  EXECUTANDO:")
             print("-" * 40)
-            try:
-                exec(codigo)
-            except Exception as e:
-                print(f"❌ Erro: {e}")
+            result = get_execution_service().run(codigo, input_handler=console_input_handler)
+            print(result.remaining_stdout, end='')
+            if not result.success:
+                print(f"❌ Erro: {result.error_message}")
             print("-" * 40)
     
     def exercicio(self, descricao: str, resposta_esperada: Union[str, List[str]], dica: str = "") -> bool:
@@ -430,11 +422,12 @@ class BaseModule(ABC):
             code_to_run = '\n'.join(user_code)
             if code_to_run.strip():
                 print(f"\n{title_color}🚀 EXECUTANDO SEU CÓDIGO:{reset}")
-                try:
-                    exec(code_to_run)
+                result = get_execution_service().run(code_to_run, input_handler=console_input_handler)
+                print(result.remaining_stdout, end='')
+                if result.success:
                     self.print_success("\n✅ Código executado com sucesso!")
-                except Exception as e:
-                    self.print_warning(f"\n❌ Erro: {e}")
+                else:
+                    self.print_warning(f"\n❌ Erro: {result.error_message}")
             
             # Mostrar solução
             show_solution = input("\n🔍 Deseja ver a solução? (s/n): ").lower()
@@ -5,14 +5,16 @@
 Connectivity Manager - Sistema de detecção e gerenciamento de conectividade
 """
 
+import queue
 import socket
 import threading
 import time
-import requests
+import http.client
 from typing import Callable, Optional, List, Dict, Any
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 from enum import Enum
+from urllib.parse import urlsplit
 
 
 class ConnectionStatus(Enum):
@@ -33,30 +35,94 @@ class ConnectionEvent:
     error_message: Optional[str] = None
 
 
+class TcpProbe:
+    """Sonda leve: abre (e fecha) uma conexão TCP"""
+    
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.name = f"tcp://{host}:{port}"
+        
+    def __call__(self, timeout: float) -> float:
+        """Retorna a latência em ms; levanta OSError se não conectar"""
+        start = time.perf_counter()
+        with socket.create_connection((self.host, self.port), timeout=timeout):
+            return (time.perf_counter() - start) * 1000
+
+
+class HttpHeadProbe:
+    """Sonda HTTP(S) com HEAD: só cabeçalhos, sem baixar a página"""
+    
+    def __init__(self, url: str):
+        self.url = url
+        self.name = url
+        
+    def __call__(self, timeout: float) -> float:
+        """Retorna a latência em ms; levanta OSError/HTTPException em falha"""
+        parts = urlsplit(self.url)
+        connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        start = time.perf_counter()
+        connection = connection_class(parts.netloc, timeout=timeout)
+        try:
+            connection.request("HEAD", parts.path or "/",
+                               headers={'User-Agent': 'Python-Course-Connectivity-Check'})
+            status = connection.getresponse().status
+        finally:
+            connection.close()
+        # Qualquer resposta (inclusive redirecionamento) prova que a rede funciona
+        if status >= 500:
+            raise http.client.HTTPException(f"HTTP {status}")
+        return (time.perf_counter() - start) * 1000
+
+
+def default_probes() -> List[Callable[[float], float]]:
+    """Sondas padrão: DNS públicos por TCP e dois sites por HEAD"""
+    return [
+        TcpProbe("8.8.8.8", 53),
+        TcpProbe("1.1.1.1", 53),
+        HttpHeadProbe("https://www.google.com"),
+        HttpHeadProbe("https://www.python.org"),
+    ]
+
+
 class ConnectivityManager:
     """Gerenciador de conectividade com detecção automática"""
     
-    def __init__(self, check_interval: int = 30):
+    def __init__(self, check_interval: int = 30,
+                 probes: Optional[List[Callable[[float], float]]] = None,
+                 quorum: int = 1, verdict_ttl: float = 15.0):
+        """
+        Args:
+            check_interval: Segundos entre verificações do monitoramento
+            probes: Sondas (recebem o timeout e retornam a latência em ms ou
+                levantam exceção); padrão: default_probes()
+            quorum: Sucessos necessários para considerar online
+            verdict_ttl: Segundos em que o último resultado vale sem nova verificação
+        """
         self.check_interval = check_interval
         self.current_status = ConnectionStatus.UNKNOWN
         self.last_check = None
         self.connection_history: List[ConnectionEvent] = []
         self.observers: List[Callable[[ConnectionEvent], None]] = []
         
-        # URLs para teste de conectividade
-        self.test_urls = [
-            "https://www.google.com",
-            "https://www.github.com", 
-            "https://httpbin.org/get",
-            "https://www.python.org"
-        ]
+        # Sondas executadas em paralelo, cada uma numa thread daemon: uma sonda
+        # presa no DNS (getaddrinfo ignora o timeout do socket) não segura a
+        # saída do programa, como fariam os workers de um ThreadPoolExecutor
+        self.probes = probes if probes is not None else default_probes()
+        self.quorum = quorum
+        
+        # Resultado em cache, renovado em segundo plano
+        self.verdict_ttl = verdict_ttl
+        self._verdict_time: Optional[float] = None
+        self._refresh_lock = threading.Lock()
+        self._refreshing = False
         
         # Thread de monitoramento
         self.monitoring = False
         self.monitor_thread: Optional[threading.Thread] = None
         
         # Configurações
-        self.timeout_seconds = 5
+        self.timeout_seconds = 3  # tempo máximo de uma verificação inteira
         self.max_latency_ms = 3000  # Conexão considerada lenta acima disso
         
     def start_monitoring(self):
@@ -78,53 +144,88 @@ class ConnectivityManager:
             self.monitor_thread.join(timeout=1)
             
     def check_connectivity(self) -> ConnectionStatus:
-        """Verifica conectividade atual"""
-        # Teste básico de socket
-        if not self._can_connect_to_host("8.8.8.8", 53):
-            self._update_status(ConnectionStatus.OFFLINE)
-            return self.current_status
-            
-        # Testa URLs reais
-        latency_results = []
-        successful_requests = 0
+        """
+        Verifica conectividade atual rodando as sondas em paralelo
+
+        Retorna assim que `quorum` sondas tiverem sucesso ou o quorum ficar
+        impossível; demora no máximo timeout_seconds.
+        """
+        results: "queue.Queue[Optional[float]]" = queue.Queue()
+        timeout = self.timeout_seconds
         
-        for url in self.test_urls[:2]:  # Testa apenas 2 URLs para ser mais rápido
+        def run(probe: Callable[[float], float]) -> None:
             try:
-                start_time = time.time()
-                response = requests.get(
-                    url, 
-                    timeout=self.timeout_seconds,
-                    headers={'User-Agent': 'Python-Course-Connectivity-Check'}
-                )
-                
-                if response.status_code == 200:
-                    latency = (time.time() - start_time) * 1000
-                    latency_results.append(latency)
-                    successful_requests += 1
-                    
+                results.put(probe(timeout))
             except Exception:
-                continue
+                results.put(None)
                 
+        for probe in self.probes:
+            threading.Thread(target=run, args=(probe,), name="connectivity-probe", daemon=True).start()
+            
+        deadline = time.monotonic() + timeout
+        latencies: List[float] = []
+        failures = 0
+        pending = len(self.probes)
+        
+        # Para no quorum; com o quorum impossível, só espera o primeiro sucesso
+        # (limitada x offline). As sondas que ainda não responderam terminam
+        # sozinhas (também têm timeout)
+        while pending and len(latencies) < self.quorum:
+            if failures > len(self.probes) - self.quorum and latencies:
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                latency = results.get(timeout=remaining)
+            except queue.Empty:
+                break
+            pending -= 1
+            if latency is None:
+                failures += 1
+            else:
+                latencies.append(latency)
+            
         # Determina status baseado nos resultados
-        if successful_requests == 0:
+        avg_latency = sum(latencies) / len(latencies) if latencies else None
+        if not latencies:
             new_status = ConnectionStatus.OFFLINE
-        elif successful_requests < len(self.test_urls) // 2:
+        elif len(latencies) < self.quorum or avg_latency > self.max_latency_ms:
             new_status = ConnectionStatus.LIMITED
         else:
-            avg_latency = sum(latency_results) / len(latency_results)
-            if avg_latency > self.max_latency_ms:
-                new_status = ConnectionStatus.LIMITED
-            else:
-                new_status = ConnectionStatus.ONLINE
+            new_status = ConnectionStatus.ONLINE
                 
         # Atualiza status
-        avg_latency = sum(latency_results) / len(latency_results) if latency_results else None
+        self._verdict_time = time.monotonic()
+        self.last_check = datetime.now()
         self._update_status(new_status, avg_latency)
         
         return self.current_status
         
+    def refresh_async(self) -> None:
+        """Dispara uma verificação em segundo plano (no máximo uma por vez)"""
+        with self._refresh_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+            
+        def refresh():
+            try:
+                self.check_connectivity()
+            except Exception:
+                pass
+            finally:
+                self._refreshing = False
+                
+        threading.Thread(target=refresh, daemon=True).start()
+        
+    def _verdict_is_stale(self) -> bool:
+        return self._verdict_time is None or time.monotonic() - self._verdict_time > self.verdict_ttl
+        
     def is_online(self) -> bool:
-        """Verifica se está online"""
+        """Verifica se está online (nunca bloqueia: usa o último resultado e renova se expirou)"""
+        if self._verdict_is_stale():
+            self.refresh_async()
         return self.current_status == ConnectionStatus.ONLINE
         
     def is_offline(self) -> bool:
@@ -210,18 +311,9 @@ class ConnectivityManager:
     def force_offline_mode(self):
         """Força modo offline"""
         self._update_status(ConnectionStatus.OFFLINE, error_message="Forced offline mode")
+        # Mantém o modo forçado até a próxima verificação do monitoramento
+        self._verdict_time = time.monotonic() + self.check_interval
         
-    def _can_connect_to_host(self, host: str, port: int) -> bool:
-        """Testa conexão básica com host"""
-        try:
-            socket.setdefaulttimeout(3)
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            result = sock.connect_ex((host, port))
-            sock.close()
-            return result == 0
-        except Exception:
-            return False
-            
     def _update_status(self, new_status: ConnectionStatus, latency: Optional[float] = None, error_message: Optional[str] = None):
         """Atualiza status de conectividade"""
         old_status = self.current_status
@@ -237,7 +329,6 @@ class ConnectivityManager:
             
             self.connection_history.append(event)
             self.current_status = new_status
-            self.last_check = datetime.now()
             
             # Notifica observadores
             for observer in self.observers:
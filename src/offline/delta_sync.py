@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Delta Sync - Envio de diferenças (estilo JSON Patch) em vez de snapshots completos
+
+O DeltaEncoder guarda, por recurso, a última versão confirmada pelo servidor e
+envia só as operações 'add'/'remove'/'replace' entre ela e o estado atual. Se o
+servidor não conhece essa base (primeiro envio, servidor reiniciado, base local
+perdida) o envio cai para o snapshot completo.
+
+LocalSyncServer é um servidor substituto, em memória, usado enquanto não há
+backend real (e nos testes).
+"""
+
+import copy
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# ----------------------------------------------------------------------
+# Diferenças e aplicação de patches
+# ----------------------------------------------------------------------
+
+def _escape(token: str) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def diff(base: Any, target: Any, path: str = "") -> List[Dict[str, Any]]:
+    """Operações que transformam `base` em `target` (listas são comparadas por posição)"""
+    if type(base) is not type(target):
+        return [{"op": "replace", "path": path, "value": target}]
+
+    if isinstance(base, dict):
+        ops = [{"op": "remove", "path": f"{path}/{_escape(key)}"} for key in base if key not in target]
+        for key, value in target.items():
+            child = f"{path}/{_escape(key)}"
+            if key in base:
+                ops.extend(diff(base[key], value, child))
+            else:
+                ops.append({"op": "add", "path": child, "value": value})
+        return ops
+
+    if isinstance(base, list):
+        common = min(len(base), len(target))
+        ops = []
+        for index in range(common):
+            ops.extend(diff(base[index], target[index], f"{path}/{index}"))
+        # Remove do fim para o começo: os índices anteriores continuam válidos
+        for index in range(len(base) - 1, common - 1, -1):
+            ops.append({"op": "remove", "path": f"{path}/{index}"})
+        for value in target[common:]:
+            ops.append({"op": "add", "path": f"{path}/-", "value": value})
+        return ops
+
+    return [] if base == target else [{"op": "replace", "path": path, "value": target}]
+
+
+def apply_patch(document: Any, patch: List[Dict[str, Any]]) -> Any:
+    """Aplica as operações a uma cópia do documento"""
+    document = copy.deepcopy(document)
+    for operation in patch:
+        path = operation["path"]
+        if path == "":
+            document = copy.deepcopy(operation["value"])
+            continue
+
+        tokens = [_unescape(token) for token in path.split("/")[1:]]
+        parent = document
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        last = tokens[-1]
+
+        if isinstance(parent, list):
+            if operation["op"] == "remove":
+                del parent[int(last)]
+            elif last == "-":
+                parent.append(copy.deepcopy(operation["value"]))
+            elif operation["op"] == "add":
+                parent.insert(int(last), copy.deepcopy(operation["value"]))
+            else:
+                parent[int(last)] = copy.deepcopy(operation["value"])
+        elif operation["op"] == "remove":
+            del parent[last]
+        else:
+            parent[last] = copy.deepcopy(operation["value"])
+    return document
+
+
+# ----------------------------------------------------------------------
+# Servidor substituto
+# ----------------------------------------------------------------------
+
+class LocalSyncServer:
+    """Servidor de sincronização em memória: aplica patches e versiona cada recurso"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.documents: Dict[str, Tuple[int, Any]] = {}
+        self.bytes_received = 0
+
+    def receive(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Recebe um snapshot ou um patch
+
+        Returns:
+            {"status": "ok", "version": n} ou {"status": "base_mismatch", "version": n}
+        """
+        with self.lock:
+            self.bytes_received += len(json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+            resource = payload["resource"]
+            version, document = self.documents.get(resource, (0, None))
+
+            if "snapshot" in payload:
+                document = copy.deepcopy(payload["snapshot"])
+            elif payload.get("base_version") != version or document is None:
+                return {"status": "base_mismatch", "version": version}
+            else:
+                document = apply_patch(document, payload["patch"])
+
+            self.documents[resource] = (version + 1, document)
+            return {"status": "ok", "version": version + 1}
+
+    def get_document(self, resource: str) -> Optional[Any]:
+        with self.lock:
+            entry = self.documents.get(resource)
+            return copy.deepcopy(entry[1]) if entry else None
+
+
+# ----------------------------------------------------------------------
+# Codificador
+# ----------------------------------------------------------------------
+
+class DeltaEncoder:
+    """Envia cada recurso como diferença da última versão confirmada pelo servidor"""
+
+    def __init__(self, base_dir: Path):
+        """
+        Args:
+            base_dir: Diretório das bases confirmadas (um JSON por recurso)
+        """
+        self.base_dir = Path(base_dir)
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self._resource_locks: Dict[str, threading.Lock] = {}
+        self._bases: Dict[str, Tuple[int, Any]] = {}
+        self.stats = {"deltas": 0, "snapshots": 0, "bytes_sent": 0, "bytes_full": 0}
+
+    def _base_file(self, resource: str) -> Path:
+        safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in resource)
+        return self.base_dir / f"{safe_name}.json"
+
+    def _load_base(self, resource: str) -> Optional[Tuple[int, Any]]:
+        if resource not in self._bases:
+            try:
+                with open(self._base_file(resource), 'r', encoding='utf-8') as f:
+                    stored = json.load(f)
+                self._bases[resource] = (stored["version"], stored["data"])
+            except (IOError, ValueError, KeyError):
+                return None
+        return self._bases[resource]
+
+    def _save_base(self, resource: str, version: int, data: Any) -> None:
+        self._bases[resource] = (version, data)
+        temp_file = self._base_file(resource).with_suffix(".tmp")
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump({"version": version, "data": data}, f, ensure_ascii=False)
+            os.replace(temp_file, self._base_file(resource))
+        except IOError as e:
+            print(f"Erro ao salvar base de sincronização: {e}")
+
+    def encode(self, resource: str, data: Any) -> Dict[str, Any]:
+        """Monta o payload: patch sobre a base confirmada ou snapshot se não houver base"""
+        base = self._load_base(resource)
+        if base is None:
+            return {"resource": resource, "snapshot": data}
+        return {"resource": resource, "base_version": base[0], "patch": diff(base[1], data)}
+
+    def push(self, resource: str, data: Any, server: LocalSyncServer) -> Dict[str, Any]:
+        """
+        Envia o estado atual do recurso e guarda a versão confirmada
+
+        Returns:
+            Resposta do servidor acrescida de "mode" ('delta', 'snapshot' ou
+            'unchanged') e "bytes" (tamanho enviado)
+        """
+        with self.lock:
+            resource_lock = self._resource_locks.setdefault(resource, threading.Lock())
+
+        # Um envio por recurso de cada vez: envios paralelos partiriam da mesma base
+        with resource_lock:
+            # Cópia normalizada: alterações posteriores do chamador não mudam a base
+            serialized = json.dumps(data, ensure_ascii=False)
+            data = json.loads(serialized)
+            payload = self.encode(resource, data)
+            if "patch" in payload and not payload["patch"]:
+                return {"status": "ok", "version": payload["base_version"], "mode": "unchanged", "bytes": 0}
+
+            sent = len(json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+            response = server.receive(payload)
+            if response["status"] == "base_mismatch":
+                # O servidor não tem a base: reenvia o snapshot completo
+                payload = {"resource": resource, "snapshot": data}
+                sent += len(json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+                response = server.receive(payload)
+
+            mode = "snapshot" if "snapshot" in payload else "delta"
+            if response["status"] == "ok":
+                self._save_base(resource, response["version"], data)
+
+            with self.lock:
+                self.stats["deltas" if mode == "delta" else "snapshots"] += 1
+                self.stats["bytes_sent"] += sent
+                self.stats["bytes_full"] += len(serialized.encode('utf-8'))
+            return dict(response, mode=mode, bytes=sent)
+
+    def reset(self, resource: str) -> None:
+        """Esquece a base de um recurso (o próximo envio será um snapshot)"""
+        with self.lock:
+            self._bases.pop(resource, None)
+            self._base_file(resource).unlink(missing_ok=True)
@@ -6,35 +6,134 @@ Resource Cache - Sistema completo de cache para modo offline
 """
 
 import os
+import bz2
 import json
+import lzma
+import mmap
+import zlib
+import atexit
 import hashlib
 import shutil
 import sqlite3
+import tempfile
+import threading
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional, Union, Tuple
+from typing import Dict, Any, Callable, List, Optional, Union, Tuple
 from dataclasses import dataclass, asdict
 from pathlib import Path
 import pickle
 import gzip
 
+from ..performance.tiered_cache import TieredCache
+
 
 @dataclass
 class CacheEntry:
     """Entrada do cache"""
     key: str
-    data_type: str  # 'json', 'binary', 'text', 'file'
+    data_type: str  # 'json', 'binary', 'blob', 'text', 'file'
     size_bytes: int
     created_at: datetime
     last_accessed: datetime
     access_count: int
     expiry_date: Optional[datetime] = None
     metadata: Optional[Dict[str, Any]] = None
+    codec: Optional[str] = None
+
+
+# Tipos gravados sem transformação: podem ser lidos por open_view
+MAPPABLE_TYPES = ("blob", "text", "json", "file")
+
+# Codecs de compressão (nome gravado na coluna `codec` do índice)
+CODECS: Dict[str, Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    "zlib": (zlib.compress, zlib.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+    "bz2": (bz2.compress, bz2.decompress),
+}
+
+# Codec padrão por tipo; blobs ficam crus para continuar mapeáveis por open_view
+DEFAULT_CODECS: Dict[str, Optional[str]] = {
+    "json": "zlib",
+    "text": "zlib",
+    "binary": "zlib",
+    "blob": None,
+}
+
+
+class _Mapping:
+    """mmap de um arquivo do cache compartilhado por todas as visões abertas"""
+
+    def __init__(self, file_path: Path):
+        self.file_path = file_path
+        self.refs = 0
+        with open(file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            # mmap não aceita arquivos vazios
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+    def view(self) -> memoryview:
+        return memoryview(self.mmap) if self.mmap is not None else memoryview(b"")
+
+    def close(self) -> bool:
+        """Desfaz o mapeamento; False se ainda há fatias da visão em uso"""
+        if self.mmap is None:
+            return True
+        try:
+            self.mmap.close()
+            return True
+        except BufferError:
+            return False
+
+
+class CacheView:
+    """
+    Visão somente leitura (memoryview) de uma entrada do cache, sem cópia
+
+    Use com `with` ou chame release(); o mapeamento é desfeito quando a
+    última visão do arquivo é liberada.
+    """
+
+    def __init__(self, cache: "ResourceCache", key: str, mapping: _Mapping):
+        self._cache = cache
+        self._mapping = mapping
+        self.key = key
+        self.view = mapping.view()
+
+    def __len__(self) -> int:
+        return len(self.view)
+
+    def __getitem__(self, item):
+        return self.view[item]
+
+    def release(self) -> None:
+        if self._mapping is None:
+            return
+        self.view.release()
+        self._cache._release_mapping(self._mapping)
+        self._mapping = None
+
+    def __enter__(self) -> memoryview:
+        return self.view
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+        return False
 
 
 class ResourceCache:
     """Cache inteligente para recursos offline"""
     
-    def __init__(self, cache_dir: str = ".cache", max_size_mb: int = 500):
+    def __init__(self, cache_dir: str = ".cache", max_size_mb: int = 500,
+                 access_flush_interval: float = 5.0, max_pending_access: int = 200,
+                 codecs: Optional[Dict[str, Optional[str]]] = None,
+                 min_compress_bytes: int = 1024, close_at_exit: bool = True):
+        """
+        Args:
+            codecs: Codec por tipo de dado (sobrepõe DEFAULT_CODECS; None = sem compressão)
+            min_compress_bytes: Conteúdos menores que isso são gravados sem compressão
+            close_at_exit: Fecha o cache na saída do programa (False quando
+                outro objeto, como o TieredCache, cuida de fechá-lo)
+        """
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
         
@@ -49,16 +148,55 @@ class ResourceCache:
         self.max_size_bytes = max_size_mb * 1024 * 1024
         self.db_path = self.cache_dir / "cache_index.db"
         
+        # Conexão única (também usada pela thread de sync), protegida pelo lock
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                                    isolation_level=None, cached_statements=64)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        
         # Inicializa banco de dados
         self._init_database()
         
+        self.codecs = dict(DEFAULT_CODECS, **(codecs or {}))
+        unknown = {codec for codec in self.codecs.values() if codec and codec not in CODECS}
+        if unknown:
+            raise ValueError(f"Codecs desconhecidos: {', '.join(sorted(unknown))}")
+        self.min_compress_bytes = min_compress_bytes
+        
+        # Totais mantidos em memória (evita SUM(size_bytes) a cada store)
+        count, raw_total = self.conn.execute("""
+            SELECT COUNT(*), COALESCE(SUM(COALESCE(raw_bytes, size_bytes)), 0)
+            FROM cache_entries
+        """).fetchone()
+        self.entry_count = count
+        # Bytes em disco: cada blob conta uma vez, não importa quantas chaves o usam
+        self.total_bytes, self.blob_raw_bytes = self.conn.execute(
+            "SELECT COALESCE(SUM(size_bytes), 0), COALESCE(SUM(raw_bytes), 0) FROM cache_blobs"
+        ).fetchone()
+        self.raw_total_bytes = raw_total  # tamanho lógico antes da compressão, por chave
+        # blob_raw_bytes: o mesmo, mas cada blob uma vez (compressão x deduplicação)
+        
+        # Acessos (last_accessed/access_count) acumulados e gravados em lote
+        self.access_flush_interval = access_flush_interval
+        self.max_pending_access = max_pending_access
+        self._pending_access: Dict[str, List] = {}
+        self._access_timer: Optional[threading.Timer] = None
+        if close_at_exit:
+            atexit.register(self.close)
+        
+        # Mapeamentos abertos por open_view (um por arquivo, com contagem de referências)
+        self._mappings: Dict[str, _Mapping] = {}
+        self._closing_mappings: List[_Mapping] = []
+        
         # Estatísticas
         self.hits = 0
         self.misses = 0
         
     def _init_database(self):
         """Inicializa banco de dados SQLite para índice do cache"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.lock:
+            conn = self.conn
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS cache_entries (
                     key TEXT PRIMARY KEY,
@@ -69,10 +207,18 @@ class ResourceCache:
                     last_accessed TEXT NOT NULL,
                     access_count INTEGER DEFAULT 0,
                     expiry_date TEXT,
-                    metadata TEXT
+                    metadata TEXT,
+                    codec TEXT,
+                    raw_bytes INTEGER
                 )
             """)
             
+            # Índices criados antes dos codecs: codec NULL = formato original
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(cache_entries)")}
+            for column, sql_type in (("codec", "TEXT"), ("raw_bytes", "INTEGER")):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE cache_entries ADD COLUMN {column} {sql_type}")
+            
             conn.execute("""
                 CREATE INDEX IF NOT EXISTS idx_last_accessed 
                 ON cache_entries(last_accessed)
@@ -83,6 +229,35 @@ class ResourceCache:
                 ON cache_entries(expiry_date)
             """)
             
+            # Arquivos endereçados pelo conteúdo, com o número de chaves que os usam
+            has_blobs = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'cache_blobs'"
+            ).fetchone()
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_blobs (
+                    file_path TEXT PRIMARY KEY,
+                    refcount INTEGER NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    raw_bytes INTEGER
+                )
+            """)
+            if not has_blobs:
+                # Índices antigos: cada arquivo (nomeado pela chave) é um blob próprio
+                conn.execute("""
+                    INSERT INTO cache_blobs (file_path, refcount, size_bytes, raw_bytes)
+                    SELECT file_path, COUNT(*), MAX(size_bytes), MAX(COALESCE(raw_bytes, size_bytes))
+                    FROM cache_entries GROUP BY file_path
+                """)
+            elif "raw_bytes" not in {row[1] for row in conn.execute("PRAGMA table_info(cache_blobs)")}:
+                # Blobs gravados antes de raw_bytes: o tamanho original vem das chaves
+                conn.execute("ALTER TABLE cache_blobs ADD COLUMN raw_bytes INTEGER")
+                conn.execute("""
+                    UPDATE cache_blobs SET raw_bytes = COALESCE((
+                        SELECT MAX(COALESCE(e.raw_bytes, e.size_bytes)) FROM cache_entries e
+                        WHERE e.file_path = cache_blobs.file_path
+                    ), size_bytes)
+                """)
+            
     def store(self, key: str, data: Any, data_type: str = 'auto', 
               ttl_hours: Optional[int] = None, metadata: Optional[Dict] = None) -> bool:
         """Armazena dados no cache"""
@@ -91,44 +266,81 @@ class ResourceCache:
             if data_type == 'auto':
                 data_type = self._detect_data_type(data)
                 
-            # Gera hash do key para nome do arquivo
-            file_hash = hashlib.md5(key.encode()).hexdigest()
-            
             # Determina extensão baseada no tipo
             extensions = {
                 'json': '.json',
                 'binary': '.bin',
+                'blob': '.blob',
                 'text': '.txt',
                 'file': '.cache'
             }
             extension = extensions.get(data_type, '.cache')
             
-            file_path = self.data_dir / f"{file_hash}{extension}"
-            
-            # Serializa e salva dados
-            size_bytes = self._serialize_data(data, file_path, data_type)
+            # Serializa num arquivo temporário; o nome final é o hash do conteúdo
+            fd, tmp_name = tempfile.mkstemp(dir=self.temp_dir)
+            os.close(fd)
+            tmp_path = Path(tmp_name)
+            size_bytes, raw_bytes, codec, digest = self._serialize_data(data, tmp_path, data_type)
             
             if size_bytes == 0:
+                tmp_path.unlink(missing_ok=True)
                 return False
+            file_path = self.data_dir / f"{digest}{extension}"
                 
             # Calcula data de expiração
             expiry_date = None
             if ttl_hours:
                 expiry_date = datetime.now() + timedelta(hours=ttl_hours)
                 
-            # Registra no banco
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute("""
-                    INSERT OR REPLACE INTO cache_entries 
-                    (key, data_type, file_path, size_bytes, created_at, 
-                     last_accessed, access_count, expiry_date, metadata)
-                    VALUES (?, ?, ?, ?, ?, ?, 0, ?, ?)
-                """, (
-                    key, data_type, str(file_path), size_bytes,
-                    datetime.now().isoformat(), datetime.now().isoformat(),
-                    expiry_date.isoformat() if expiry_date else None,
-                    json.dumps(metadata) if metadata else None
-                ))
+            # Registra no banco: índice e contagem de referências numa transação,
+            # com o arquivo movido antes do COMMIT (se algo falhar, o valor
+            # anterior e o blob dele continuam intactos)
+            now = datetime.now().isoformat()
+            with self.lock:
+                try:
+                    self.conn.execute("BEGIN")
+                    previous = self.conn.execute("""
+                        SELECT file_path, size_bytes, COALESCE(raw_bytes, size_bytes)
+                        FROM cache_entries WHERE key = ?
+                    """, (key,)).fetchone()
+                    self.conn.execute("""
+                        INSERT OR REPLACE INTO cache_entries 
+                        (key, data_type, file_path, size_bytes, created_at, 
+                         last_accessed, access_count, expiry_date, metadata, codec, raw_bytes)
+                        VALUES (?, ?, ?, ?, ?, ?, 0, ?, ?, ?, ?)
+                    """, (
+                        key, data_type, str(file_path), size_bytes, now, now,
+                        expiry_date.isoformat() if expiry_date else None,
+                        json.dumps(metadata) if metadata else None,
+                        codec, raw_bytes
+                    ))
+                    
+                    added, freed = False, None
+                    if not (previous and previous[0] == str(file_path)):
+                        # Conteúdo novo (mesmo conteúdo: o blob já está no lugar)
+                        added = self._acquire_blob(file_path, tmp_path, size_bytes, raw_bytes)
+                        if previous:
+                            freed = self._release_blob(previous[0])
+                    self.conn.execute("COMMIT")
+                except BaseException:
+                    if self.conn.in_transaction:
+                        self.conn.execute("ROLLBACK")
+                    raise
+                finally:
+                    tmp_path.unlink(missing_ok=True)
+                    
+                # Só depois do COMMIT: contadores em memória e o arquivo sem referências
+                self._pending_access.pop(key, None)
+                if added:
+                    self.total_bytes += size_bytes
+                    self.blob_raw_bytes += raw_bytes
+                if freed is not None:
+                    self._drop_blob(previous[0], *freed)
+                if previous:
+                    self.raw_total_bytes -= previous[2]
+                else:
+                    self.entry_count += 1
+                self.raw_total_bytes += raw_bytes
                 
             # Verifica se precisa fazer limpeza
             self._cleanup_if_needed()
@@ -142,19 +354,17 @@ class ResourceCache:
     def retrieve(self, key: str) -> Optional[Any]:
         """Recupera dados do cache"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute("""
-                    SELECT data_type, file_path, expiry_date, metadata
+            with self.lock:
+                row = self.conn.execute("""
+                    SELECT data_type, file_path, expiry_date, metadata, codec
                     FROM cache_entries WHERE key = ?
-                """, (key,))
-                
-                row = cursor.fetchone()
+                """, (key,)).fetchone()
                 
             if not row:
                 self.misses += 1
                 return None
                 
-            data_type, file_path_str, expiry_str, metadata_str = row
+            data_type, file_path_str, expiry_str, metadata_str, codec = row
             file_path = Path(file_path_str)
             
             # Verifica se arquivo existe
@@ -172,17 +382,11 @@ class ResourceCache:
                     return None
                     
             # Deserializa dados
-            data = self._deserialize_data(file_path, data_type)
+            data = self._deserialize_data(file_path, data_type, codec)
             
             if data is not None:
-                # Atualiza estatísticas de acesso
-                with sqlite3.connect(self.db_path) as conn:
-                    conn.execute("""
-                        UPDATE cache_entries 
-                        SET last_accessed = ?, access_count = access_count + 1
-                        WHERE key = ?
-                    """, (datetime.now().isoformat(), key))
-                    
+                # Estatísticas de acesso vão para o banco no próximo flush
+                self._record_access(key)
                 self.hits += 1
                 return data
             else:
@@ -194,16 +398,68 @@ class ResourceCache:
             self.misses += 1
             return None
             
+    def open_view(self, key: str) -> Optional[CacheView]:
+        """
+        Abre uma visão somente leitura, sem cópia, do conteúdo gravado de uma entrada
+
+        Serve para bytes (blob), texto, JSON e arquivos gravados sem compressão;
+        entradas em pickle ou comprimidas retornam None. Leitores da mesma
+        entrada compartilham um único mmap.
+        """
+        with self.lock:
+            row = self.conn.execute("""
+                SELECT data_type, file_path, expiry_date, codec FROM cache_entries WHERE key = ?
+            """, (key,)).fetchone()
+            
+        if not row or row[0] not in MAPPABLE_TYPES or row[3] not in (None, "none"):
+            self.misses += 1
+            return None
+            
+        data_type, file_path_str, expiry_str, _ = row
+        if expiry_str and datetime.now() > datetime.fromisoformat(expiry_str):
+            self._remove_entry(key)
+            self.misses += 1
+            return None
+            
+        with self.lock:
+            self._close_pending_mappings()
+            mapping = self._mappings.get(file_path_str)
+            if mapping is None:
+                try:
+                    mapping = _Mapping(Path(file_path_str))
+                except OSError:
+                    self.misses += 1
+                    return None
+                self._mappings[file_path_str] = mapping
+            mapping.refs += 1
+            
+        self._record_access(key)
+        self.hits += 1
+        return CacheView(self, key, mapping)
+        
+    def _release_mapping(self, mapping: _Mapping) -> None:
+        """Libera uma referência; desfaz o mapeamento na última"""
+        with self.lock:
+            mapping.refs -= 1
+            if mapping.refs > 0:
+                return
+            if self._mappings.get(str(mapping.file_path)) is mapping:
+                del self._mappings[str(mapping.file_path)]
+            if not mapping.close():
+                # Ainda há fatias da visão vivas: tenta de novo depois
+                self._closing_mappings.append(mapping)
+                
+    def _close_pending_mappings(self) -> None:
+        self._closing_mappings = [m for m in self._closing_mappings if not m.close()]
+        
     def exists(self, key: str) -> bool:
         """Verifica se chave existe no cache"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute("""
+            with self.lock:
+                return self.conn.execute("""
                     SELECT 1 FROM cache_entries 
                     WHERE key = ? AND (expiry_date IS NULL OR expiry_date > ?)
-                """, (key, datetime.now().isoformat()))
-                
-                return cursor.fetchone() is not None
+                """, (key, datetime.now().isoformat())).fetchone() is not None
                 
         except Exception:
             return False
@@ -222,8 +478,14 @@ class ResourceCache:
             self.files_dir.mkdir(exist_ok=True)
             
             # Limpa banco
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute("DELETE FROM cache_entries")
+            with self.lock:
+                self.conn.execute("DELETE FROM cache_entries")
+                self.conn.execute("DELETE FROM cache_blobs")
+                self._pending_access.clear()
+                self.entry_count = 0
+                self.total_bytes = 0
+                self.raw_total_bytes = 0
+                self.blob_raw_bytes = 0
                 
             # Reset estatísticas
             self.hits = 0
@@ -237,34 +499,31 @@ class ResourceCache:
             
     def get_size_info(self) -> Dict[str, Any]:
         """Retorna informações sobre tamanho do cache"""
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute("""
-                    SELECT COUNT(*), SUM(size_bytes), AVG(size_bytes)
-                    FROM cache_entries
-                """)
-                
-                count, total_size, avg_size = cursor.fetchone()
-                
-            return {
-                "entries": count or 0,
-                "total_size_mb": (total_size or 0) / (1024 * 1024),
-                "average_size_kb": (avg_size or 0) / 1024,
-                "max_size_mb": self.max_size_bytes / (1024 * 1024),
-                "usage_percent": ((total_size or 0) / self.max_size_bytes) * 100
-            }
-            
-        except Exception:
-            return {"entries": 0, "total_size_mb": 0, "average_size_kb": 0}
+        count, total_size = self.entry_count, self.total_bytes
+        return {
+            "entries": count,
+            "total_size_mb": total_size / (1024 * 1024),
+            "average_size_kb": (total_size / count / 1024) if count else 0,
+            "max_size_mb": self.max_size_bytes / (1024 * 1024),
+            "usage_percent": (total_size / self.max_size_bytes) * 100
+        }
             
     def get_statistics(self) -> Dict[str, Any]:
         """Retorna estatísticas do cache"""
         size_info = self.get_size_info()
+        with self.lock:
+            blobs = self.conn.execute("SELECT COUNT(*) FROM cache_blobs").fetchone()[0]
         total_requests = self.hits + self.misses
         hit_rate = (self.hits / total_requests * 100) if total_requests > 0 else 0
         
         return {
             **size_info,
+            "raw_size_mb": self.raw_total_bytes / (1024 * 1024),
+            "blobs": blobs,
+            # Compressão: cada blob contra o próprio tamanho original
+            "compression_ratio": self.blob_raw_bytes / self.total_bytes if self.total_bytes else 1.0,
+            # Deduplicação: bytes originais que as chaves repetidas não gravaram de novo
+            "dedup_saved_mb": (self.raw_total_bytes - self.blob_raw_bytes) / (1024 * 1024),
             "hits": self.hits,
             "misses": self.misses,
             "hit_rate": hit_rate,
@@ -277,13 +536,11 @@ class ResourceCache:
             current_time = datetime.now().isoformat()
             
             # Busca entradas expiradas
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute("""
+            with self.lock:
+                expired_entries = self.conn.execute("""
                     SELECT key, file_path FROM cache_entries 
                     WHERE expiry_date IS NOT NULL AND expiry_date <= ?
-                """, (current_time,))
-                
-                expired_entries = cursor.fetchall()
+                """, (current_time,)).fetchall()
                 
             # Remove arquivos e entradas
             removed_count = 0
@@ -350,58 +607,88 @@ class ResourceCache:
             return "json"
         elif isinstance(data, str):
             return "text"
-        elif isinstance(data, bytes):
-            return "binary"
+        elif isinstance(data, (bytes, bytearray, memoryview)):
+            return "blob"  # Gravado como está: pode ser mapeado por open_view
         else:
             return "binary"  # Usa pickle para outros tipos
             
-    def _serialize_data(self, data: Any, file_path: Path, data_type: str) -> int:
-        """Serializa dados para arquivo"""
+    def _serialize_data(self, data: Any, file_path: Path, data_type: str) -> Tuple[int, int, str, str]:
+        """
+        Serializa dados para arquivo, comprimindo conforme o codec do tipo
+
+        Returns:
+            (bytes gravados, bytes antes da compressão, codec usado, SHA-256 do
+            que foi gravado); tamanho 0 em erro
+        """
         try:
+            if data_type == "file":
+                # Copia arquivo existente (sem compressão: pode ser mapeado)
+                digest = hashlib.sha256()
+                source = data if hasattr(data, 'read') else open(str(data), 'rb')
+                try:
+                    with open(file_path, 'wb') as f:
+                        for chunk in iter(lambda: source.read(1024 * 1024), b""):
+                            digest.update(chunk)
+                            f.write(chunk)
+                finally:
+                    if source is not data:
+                        source.close()
+                size = file_path.stat().st_size
+                return size, size, "none", digest.hexdigest()
+                
             if data_type == "json":
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=2, ensure_ascii=False)
-                    
+                payload = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
             elif data_type == "text":
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(str(data))
-                    
+                payload = str(data).encode('utf-8')
             elif data_type == "binary":
-                # Usa pickle com compressão
-                with gzip.open(file_path, 'wb') as f:
-                    pickle.dump(data, f)
-                    
-            elif data_type == "file":
-                # Copia arquivo existente
-                if hasattr(data, 'read'):
-                    with open(file_path, 'wb') as f:
-                        shutil.copyfileobj(data, f)
+                payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+            elif data_type == "blob":
+                payload = data
+            else:
+                return 0, 0, "none", ""
+                
+            codec = self.codecs.get(data_type)
+            if codec and len(payload) >= self.min_compress_bytes:
+                compressed = CODECS[codec][0](payload)
+                # Só vale a pena se economizar espaço
+                if len(compressed) < len(payload):
+                    stored = compressed
                 else:
-                    shutil.copy2(str(data), file_path)
-                    
-            return file_path.stat().st_size
+                    stored, codec = payload, "none"
+            else:
+                stored, codec = payload, "none"
+                
+            with open(file_path, 'wb') as f:
+                f.write(stored)
+            return len(stored), len(payload), codec, hashlib.sha256(stored).hexdigest()
             
         except Exception as e:
             print(f"Erro na serialização: {e}")
-            return 0
+            return 0, 0, "none", ""
             
-    def _deserialize_data(self, file_path: Path, data_type: str) -> Any:
-        """Deserializa dados do arquivo"""
+    def _deserialize_data(self, file_path: Path, data_type: str, codec: Optional[str] = "none") -> Any:
+        """Deserializa dados do arquivo (codec None = entrada gravada antes dos codecs)"""
         try:
+            if data_type == "file":
+                return file_path
+                
+            with open(file_path, 'rb') as f:
+                payload = f.read()
+                
+            if codec in CODECS:
+                payload = CODECS[codec][1](payload)
+            elif codec is None and data_type == "binary":
+                # Formato original do tipo binary: pickle em gzip
+                payload = gzip.decompress(payload)
+                
             if data_type == "json":
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-                    
+                return json.loads(payload.decode('utf-8'))
             elif data_type == "text":
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    return f.read()
-                    
+                return payload.decode('utf-8')
             elif data_type == "binary":
-                with gzip.open(file_path, 'rb') as f:
-                    return pickle.load(f)
-                    
-            elif data_type == "file":
-                return file_path
+                return pickle.loads(payload)
+            elif data_type == "blob":
+                return payload
                 
         except Exception as e:
             print(f"Erro na deserialização: {e}")
@@ -411,22 +698,28 @@ class ResourceCache:
         """Remove entrada específica do cache"""
         try:
             # Busca caminho do arquivo
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute("""
-                    SELECT file_path FROM cache_entries WHERE key = ?
-                """, (key,))
-                
-                row = cursor.fetchone()
+            with self.lock:
+                row = self.conn.execute("""
+                    SELECT file_path, size_bytes, COALESCE(raw_bytes, size_bytes)
+                    FROM cache_entries WHERE key = ?
+                """, (key,)).fetchone()
                 
                 if row:
-                    file_path = Path(row[0])
-                    
-                    # Remove arquivo
-                    if file_path.exists():
-                        file_path.unlink()
-                        
-                    # Remove entrada do banco
-                    conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+                    # Remove entrada do banco; o arquivo só sai quando nenhuma chave o usa
+                    try:
+                        self.conn.execute("BEGIN")
+                        self.conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+                        freed = self._release_blob(row[0])
+                        self.conn.execute("COMMIT")
+                    except BaseException:
+                        if self.conn.in_transaction:
+                            self.conn.execute("ROLLBACK")
+                        raise
+                    self._pending_access.pop(key, None)
+                    if freed is not None:
+                        self._drop_blob(row[0], *freed)
+                    self.entry_count -= 1
+                    self.raw_total_bytes -= row[2]
                     return True
                     
             return False
@@ -435,11 +728,58 @@ class ResourceCache:
             print(f"Erro ao remover entrada: {e}")
             return False
             
+    def _acquire_blob(self, file_path: Path, tmp_path: Path, size_bytes: int, raw_bytes: int) -> bool:
+        """
+        Adiciona uma referência ao blob, movendo o temporário se ele ainda não existe
+
+        Roda dentro da transação de store(). Returns: True se o blob é novo (os
+        totais em memória são somados só após o COMMIT)
+        """
+        updated = self.conn.execute(
+            "UPDATE cache_blobs SET refcount = refcount + 1 WHERE file_path = ?", (str(file_path),)
+        ).rowcount
+        if updated and file_path.exists():
+            return False
+        os.replace(tmp_path, file_path)
+        if updated:
+            return False
+        self.conn.execute(
+            "INSERT INTO cache_blobs (file_path, refcount, size_bytes, raw_bytes) VALUES (?, 1, ?, ?)",
+            (str(file_path), size_bytes, raw_bytes)
+        )
+        return True
+            
+    def _release_blob(self, file_path_str: str) -> Optional[Tuple[int, int]]:
+        """
+        Remove uma referência ao blob (dentro da transação de quem chama)
+
+        Returns:
+            (bytes em disco, bytes originais) do blob se nenhuma chave o usa mais
+            (o arquivo é apagado por _drop_blob depois do COMMIT), None caso contrário
+        """
+        self.conn.execute(
+            "UPDATE cache_blobs SET refcount = refcount - 1 WHERE file_path = ?", (file_path_str,)
+        )
+        row = self.conn.execute(
+            "SELECT refcount, size_bytes, COALESCE(raw_bytes, size_bytes) FROM cache_blobs WHERE file_path = ?",
+            (file_path_str,)
+        ).fetchone()
+        if row is None or row[0] > 0:
+            return None
+        self.conn.execute("DELETE FROM cache_blobs WHERE file_path = ?", (file_path_str,))
+        return row[1], row[2]
+        
+    def _drop_blob(self, file_path_str: str, size_bytes: int, raw_bytes: int) -> None:
+        """Apaga o arquivo de um blob sem referências (após o COMMIT)"""
+        self.total_bytes -= size_bytes
+        self.blob_raw_bytes -= raw_bytes
+        Path(file_path_str).unlink(missing_ok=True)
+        # Visões já abertas continuam válidas; a próxima mapeia o arquivo novo
+        self._mappings.pop(file_path_str, None)
+        
     def _cleanup_if_needed(self):
         """Faz limpeza se necessário"""
-        size_info = self.get_size_info()
-        
-        if size_info["usage_percent"] > 90:  # Acima de 90% do limite
+        if self.total_bytes > self.max_size_bytes * 0.9:  # Acima de 90% do limite
             self._cleanup_lru(target_percent=70)  # Limpa até 70%
             
     def _cleanup_lru(self, target_percent: float = 70):
@@ -447,34 +787,101 @@ class ResourceCache:
         try:
             target_size = self.max_size_bytes * (target_percent / 100)
             
-            # Busca entradas ordenadas por último acesso
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute("""
+            # Busca entradas ordenadas por último acesso (com os acessos pendentes gravados)
+            self.flush_access()
+            with self.lock:
+                entries = self.conn.execute("""
                     SELECT key, size_bytes FROM cache_entries 
                     ORDER BY last_accessed ASC
-                """)
-                
-                entries = cursor.fetchall()
+                """).fetchall()
                 
-            current_size = sum(size for _, size in entries)
-            
-            # Remove entradas até atingir tamanho alvo
+            # Remove entradas até atingir tamanho alvo (blobs compartilhados
+            # só liberam espaço quando a última chave sai)
             for key, size in entries:
-                if current_size <= target_size:
+                if self.total_bytes <= target_size:
                     break
-                    
-                if self._remove_entry(key):
-                    current_size -= size
+                self._remove_entry(key)
                     
         except Exception as e:
             print(f"Erro na limpeza LRU: {e}")
+            
+    def _record_access(self, key: str) -> None:
+        """Acumula um acesso; grava em lote após o intervalo ou ao atingir o limite"""
+        with self.lock:
+            pending = self._pending_access.get(key)
+            if pending is None:
+                self._pending_access[key] = [datetime.now().isoformat(), 1]
+            else:
+                pending[0] = datetime.now().isoformat()
+                pending[1] += 1
+                
+            if len(self._pending_access) >= self.max_pending_access:
+                self.flush_access()
+            elif self._access_timer is None:
+                self._access_timer = threading.Timer(self.access_flush_interval, self.flush_access)
+                self._access_timer.daemon = True
+                self._access_timer.start()
+                
+    def flush_access(self) -> int:
+        """Grava last_accessed/access_count acumulados em uma transação"""
+        with self.lock:
+            if self._access_timer is not None:
+                self._access_timer.cancel()
+                self._access_timer = None
+            if not self._pending_access:
+                return 0
+            updates = [(accessed, count, key) for key, (accessed, count) in self._pending_access.items()]
+            self._pending_access.clear()
+            try:
+                self.conn.execute("BEGIN")
+                self.conn.executemany("""
+                    UPDATE cache_entries 
+                    SET last_accessed = ?, access_count = access_count + ?
+                    WHERE key = ?
+                """, updates)
+                self.conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                if self.conn.in_transaction:
+                    self.conn.execute("ROLLBACK")
+                print(f"Erro ao gravar acessos do cache: {e}")
+                return 0
+            return len(updates)
+            
+    def close(self) -> None:
+        """Grava os acessos pendentes, desfaz os mapeamentos e fecha a conexão"""
+        with self.lock:
+            for mapping in list(self._mappings.values()) + self._closing_mappings:
+                mapping.close()
+            self._mappings.clear()
+            self._closing_mappings.clear()
+            if self.conn is None:
+                return
+            try:
+                self.flush_access()
+            except sqlite3.ProgrammingError:
+                pass
+            self.conn.close()
+            self.conn = None
+
+
+# Namespace dos recursos offline no TieredCache (chaves iguais às do ResourceCache)
+OFFLINE_NAMESPACE = "offline"
+
+
+def offline_tiered_cache(cache: ResourceCache, tiered: Optional[TieredCache] = None) -> TieredCache:
+    """TieredCache com o ResourceCache como L2 e o namespace offline registrado"""
+    tiered = tiered or TieredCache(l2=cache)
+    tiered.register_namespace(OFFLINE_NAMESPACE, ttl=3600, l2_prefix="", write_behind=False)
+    return tiered
 
 
 class OfflineResourceManager:
     """Gerenciador de recursos para modo offline"""
     
-    def __init__(self, cache: ResourceCache):
+    def __init__(self, cache: ResourceCache, tiered: Optional[TieredCache] = None):
         self.cache = cache
+        # Leituras repetidas dos recursos vêm do L1; o ResourceCache é o L2
+        self.tiered = offline_tiered_cache(cache, tiered)
         self.essential_resources = [
             "course_modules",
             "exercise_templates", 
@@ -483,6 +890,10 @@ class OfflineResourceManager:
             "help_content"
         ]
         
+    def _store(self, key: str, data: Any, ttl_hours: int) -> bool:
+        """Grava um recurso no L1 e no disco"""
+        return self.tiered.set(OFFLINE_NAMESPACE, key, data, l2_ttl=ttl_hours * 3600)
+        
     def prepare_offline_mode(self, course_data: Dict) -> bool:
         """Prepara sistema para modo offline"""
         try:
@@ -491,22 +902,22 @@ class OfflineResourceManager:
             
             # Módulos do curso
             if "modules" in course_data:
-                if self.cache.store("course_modules", course_data["modules"], ttl_hours=168):
+                if self._store("course_modules", course_data["modules"], 168):
                     success_count += 1
                     
             # Templates de exercícios
             if "exercise_templates" in course_data:
-                if self.cache.store("exercise_templates", course_data["exercise_templates"], ttl_hours=168):
+                if self._store("exercise_templates", course_data["exercise_templates"], 168):
                     success_count += 1
                     
             # Dados de temas
             if "themes" in course_data:
-                if self.cache.store("theme_data", course_data["themes"], ttl_hours=720):  # 30 dias
+                if self._store("theme_data", course_data["themes"], 720):  # 30 dias
                     success_count += 1
                     
             # Conteúdo de ajuda
             if "help_content" in course_data:
-                if self.cache.store("help_content", course_data["help_content"], ttl_hours=168):
+                if self._store("help_content", course_data["help_content"], 168):
                     success_count += 1
                     
             return success_count >= 2  # Pelo menos 2 recursos essenciais
@@ -520,7 +931,7 @@ class OfflineResourceManager:
         essential_count = 0
         
         for resource in self.essential_resources[:4]:  # Verifica 4 principais
-            if self.cache.exists(resource):
+            if self.tiered.exists(OFFLINE_NAMESPACE, resource):
                 essential_count += 1
                 
         return essential_count >= 3  # Pelo menos 3 dos 4 essenciais
@@ -531,7 +942,7 @@ class OfflineResourceManager:
         missing_resources = []
         
         for resource in self.essential_resources:
-            if self.cache.exists(resource):
+            if self.tiered.exists(OFFLINE_NAMESPACE, resource):
                 available_resources.append(resource)
             else:
                 missing_resources.append(resource)
@@ -549,5 +960,5 @@ class OfflineResourceManager:
         
     def _get_last_sync_time(self) -> Optional[str]:
         """Retorna timestamp da última sincronização"""
-        sync_data = self.cache.retrieve("last_sync_time")
+        sync_data = self.tiered.get(OFFLINE_NAMESPACE, "last_sync_time")
         return sync_data.get("timestamp") if sync_data else None
\ No newline at end of file
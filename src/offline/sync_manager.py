@@ -8,15 +8,21 @@ Sync Manager - Sistema de sincronização offline/online
 import json
 import os
 import time
+import uuid
+import random
 import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional, Callable
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
 
 from .connectivity_manager import ConnectivityManager, ConnectionEvent
-from .resource_cache import ResourceCache
+from .resource_cache import ResourceCache, OFFLINE_NAMESPACE, offline_tiered_cache
+from .sync_queue import SyncOperation, SyncQueue
+from .delta_sync import DeltaEncoder, LocalSyncServer
+from ..performance.tiered_cache import TieredCache
 
 
 class SyncStatus(Enum):
@@ -28,19 +34,6 @@ class SyncStatus(Enum):
     CONFLICT = "conflict"
 
 
-@dataclass
-class SyncOperation:
-    """Operação de sincronização"""
-    id: str
-    operation_type: str  # 'upload', 'download', 'merge'
-    resource_type: str   # 'progress', 'settings', 'analytics', etc
-    data: Any
-    timestamp: datetime
-    priority: int = 1    # 1=alta, 2=média, 3=baixa
-    retry_count: int = 0
-    max_retries: int = 3
-
-
 @dataclass
 class SyncResult:
     """Resultado de sincronização"""
@@ -56,15 +49,34 @@ class OfflineOnlineSync:
     """Sistema de sincronização entre dados offline e online"""
     
     def __init__(self, connectivity_manager: ConnectivityManager, 
-                 cache: ResourceCache, data_dir: str = ".sync"):
+                 cache: ResourceCache, data_dir: str = ".sync",
+                 tiered: Optional[TieredCache] = None, max_in_flight: int = 8,
+                 backoff_base: float = 2.0, backoff_max: float = 300.0,
+                 server: Optional[LocalSyncServer] = None):
+        """
+        Args:
+            server: Destino dos uploads (padrão: servidor local substituto)
+            max_in_flight: Operações executadas ao mesmo tempo
+            backoff_base: Espera (s) antes da primeira nova tentativa; dobra a cada falha
+            backoff_max: Espera máxima (s) entre tentativas
+        """
         self.connectivity = connectivity_manager
         self.cache = cache
+        self.tiered = offline_tiered_cache(cache, tiered)
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
         
         # Filas de sincronização
-        self.pending_operations: List[SyncOperation] = []
         self.completed_operations: List[SyncResult] = []
+        self.max_in_flight = max_in_flight
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._drain_lock = threading.Lock()
+        self.upload_latency = 0.1  # latência simulada de cada upload (s)
+        
+        # Uploads enviam só a diferença para a última versão confirmada
+        self.server = server or LocalSyncServer()
+        self.delta = DeltaEncoder(self.data_dir / "bases")
         
         # Estado da sincronização
         self.current_status = SyncStatus.IDLE
@@ -80,11 +92,12 @@ class OfflineOnlineSync:
         self.sync_callbacks: List[Callable[[SyncResult], None]] = []
         
         # Arquivos de estado
-        self.pending_file = self.data_dir / "pending_operations.json"
+        self.pending_file = self.data_dir / "pending_operations.json"  # formato antigo
+        self.queue_file = self.data_dir / "pending_operations.journal"
         self.state_file = self.data_dir / "sync_state.json"
         
         # Carrega estado persistente
-        self._load_pending_operations()
+        self.queue = SyncQueue(self.queue_file, legacy_file=self.pending_file)
         self._load_sync_state()
         
         # Registra observer de conectividade
@@ -107,11 +120,16 @@ class OfflineOnlineSync:
         
         if self.sync_thread:
             self.sync_thread.join(timeout=5)
+        self.queue.flush()
             
     def queue_sync_operation(self, operation_type: str, resource_type: str, 
                            data: Any, priority: int = 1) -> str:
-        """Adiciona operação à fila de sincronização"""
-        operation_id = f"{operation_type}_{resource_type}_{int(time.time())}"
+        """
+        Adiciona operação à fila de sincronização
+
+        Um upload substitui os uploads do mesmo recurso que ainda não foram enviados.
+        """
+        operation_id = f"{operation_type}_{resource_type}_{int(time.time())}_{uuid.uuid4().hex[:8]}"
         
         operation = SyncOperation(
             id=operation_id,
@@ -122,15 +140,16 @@ class OfflineOnlineSync:
             priority=priority
         )
         
-        # Insere na fila ordenada por prioridade
-        self.pending_operations.append(operation)
-        self.pending_operations.sort(key=lambda x: x.priority)
-        
-        # Salva estado
-        self._save_pending_operations()
+        # Heap por prioridade; o journal grava só esta operação
+        self.queue.put(operation)
         
         return operation_id
         
+    @property
+    def pending_operations(self) -> List[SyncOperation]:
+        """Operações na fila, na ordem em que serão processadas"""
+        return self.queue.snapshot()
+        
     def sync_now(self, force: bool = False) -> List[SyncResult]:
         """Executa sincronização imediata"""
         if not self.connectivity.is_online() and not force:
@@ -184,11 +203,13 @@ class OfflineOnlineSync:
         return {
             "current_status": self.current_status.value,
             "last_sync": self.last_sync_time.isoformat() if self.last_sync_time else None,
-            "pending_operations": len(self.pending_operations),
+            "pending_operations": len(self.queue),
             "auto_sync_enabled": self.auto_sync_enabled,
             "connectivity_status": self.connectivity.current_status.value,
             "sync_interval_minutes": self.sync_interval_minutes,
-            "total_synced": len(self.completed_operations)
+            "total_synced": len(self.completed_operations),
+            "bytes_sent": self.delta.stats["bytes_sent"],
+            "bytes_full": self.delta.stats["bytes_full"]
         }
         
     def get_pending_operations(self) -> List[Dict[str, Any]]:
@@ -232,10 +253,11 @@ class OfflineOnlineSync:
                 result.status == SyncStatus.CONFLICT):
                 
                 # Re-adiciona à fila com resolução
-                for op in self.pending_operations:
-                    if op.id == operation_id:
-                        op.data["conflict_resolution"] = resolution
-                        return True
+                op = self.queue.get(operation_id)
+                if op is not None:
+                    op.data["conflict_resolution"] = resolution
+                    self.queue.update(op)
+                    return True
                         
         return False
         
@@ -252,7 +274,7 @@ class OfflineOnlineSync:
         """Loop principal de sincronização automática"""
         while self.auto_sync_enabled and not self.stop_sync.is_set():
             try:
-                if self.connectivity.is_online() and self.pending_operations:
+                if self.connectivity.is_online() and len(self.queue):
                     self._execute_sync_operations()
                     
                 # Aguarda próximo ciclo
@@ -263,42 +285,52 @@ class OfflineOnlineSync:
                 self.stop_sync.wait(60)  # Aguarda 1 minuto em caso de erro
                 
     def _execute_sync_operations(self) -> List[SyncResult]:
-        """Executa operações de sincronização pendentes"""
-        if self.current_status == SyncStatus.SYNCING:
+        """Executa as operações prontas da fila, até max_in_flight ao mesmo tempo"""
+        if not self._drain_lock.acquire(blocking=False):
             return []
             
         self.current_status = SyncStatus.SYNCING
         results = []
         
         try:
-            # Processa operações por prioridade
-            operations_to_process = self.pending_operations.copy()
-            
-            for operation in operations_to_process:
-                result = self._process_single_operation(operation)
-                results.append(result)
-                
-                # Remove da fila se bem-sucedido ou excedeu tentativas
-                if (result.status in [SyncStatus.SUCCESS, SyncStatus.CONFLICT] or
-                    operation.retry_count >= operation.max_retries):
-                    self.pending_operations.remove(operation)
-                else:
-                    # Incrementa contador de tentativas
-                    operation.retry_count += 1
-                    
-                # Chama callbacks
-                for callback in self.sync_callbacks:
-                    try:
-                        callback(result)
-                    except Exception:
-                        pass
+            with ThreadPoolExecutor(max_workers=self.max_in_flight,
+                                    thread_name_prefix="sync") as pool:
+                in_flight = {}
+                while True:
+                    # Completa as vagas com as próximas operações por prioridade
+                    for operation in self.queue.pop_ready(self.max_in_flight - len(in_flight)):
+                        in_flight[pool.submit(self._process_single_operation, operation)] = operation
+                    if not in_flight:
+                        break
                         
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    finished = []
+                    for future in done:
+                        operation = in_flight.pop(future)
+                        result = future.result()
+                        results.append(result)
+                        
+                        # Remove da fila se bem-sucedido ou excedeu tentativas
+                        if (result.status in [SyncStatus.SUCCESS, SyncStatus.CONFLICT] or
+                            operation.retry_count >= operation.max_retries):
+                            finished.append(operation.id)
+                        else:
+                            operation.retry_count += 1
+                            self.queue.retry(operation, self._backoff_delay(operation.retry_count))
+                            
+                        # Chama callbacks
+                        for callback in self.sync_callbacks:
+                            try:
+                                callback(result)
+                            except Exception:
+                                pass
+                    self.queue.complete(finished)
+                    
             # Atualiza estado
             self.last_sync_time = datetime.now()
             self.current_status = SyncStatus.SUCCESS if results else SyncStatus.IDLE
             
             # Salva estado persistente
-            self._save_pending_operations()
             self._save_sync_state()
             
         except Exception as e:
@@ -310,6 +342,8 @@ class OfflineOnlineSync:
                 timestamp=datetime.now()
             )
             results.append(error_result)
+        finally:
+            self._drain_lock.release()
             
         # Adiciona ao histórico
         self.completed_operations.extend(results)
@@ -320,6 +354,11 @@ class OfflineOnlineSync:
             
         return results
         
+    def _backoff_delay(self, retry_count: int) -> float:
+        """Espera exponencial com jitter (metade fixa, metade aleatória)"""
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (retry_count - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
+        
     def _process_single_operation(self, operation: SyncOperation) -> SyncResult:
         """Processa uma operação individual"""
         try:
@@ -346,22 +385,30 @@ class OfflineOnlineSync:
             )
             
     def _handle_upload(self, operation: SyncOperation) -> SyncResult:
-        """Processa upload de dados"""
-        # Simula upload (em implementação real, faria request HTTP)
-        
-        # Cacheia dados localmente como backup
+        """Processa upload de dados (patch sobre a última versão confirmada)"""
+        # Cacheia dados localmente como backup (o cache guarda por conteúdo:
+        # backups iguais de uploads seguidos compartilham o mesmo arquivo)
         cache_key = f"uploaded_{operation.resource_type}_{operation.timestamp.isoformat()}"
         self.cache.store(cache_key, operation.data, ttl_hours=168)  # 1 semana
         
-        # Simula latência de rede
-        time.sleep(0.1)
+        # Simula latência de rede (em implementação real, o servidor seria um backend HTTP)
+        time.sleep(self.upload_latency)
+        response = self.delta.push(operation.resource_type, operation.data, self.server)
+        if response["status"] != "ok":
+            return SyncResult(
+                operation_id=operation.id,
+                status=SyncStatus.ERROR,
+                message=f"Upload de {operation.resource_type} recusado pelo servidor",
+                timestamp=datetime.now()
+            )
         
         return SyncResult(
             operation_id=operation.id,
             status=SyncStatus.SUCCESS,
             message=f"Upload de {operation.resource_type} concluído",
             timestamp=datetime.now(),
-            data_synced={"resource_type": operation.resource_type, "size": len(str(operation.data))}
+            data_synced={"resource_type": operation.resource_type, "size": response["bytes"],
+                         "mode": response["mode"], "version": response["version"]}
         )
         
     def _handle_download(self, operation: SyncOperation) -> SyncResult:
@@ -378,7 +425,7 @@ class OfflineOnlineSync:
         
         # Cacheia dados baixados
         cache_key = f"downloaded_{operation.resource_type}"
-        self.cache.store(cache_key, downloaded_data, ttl_hours=24)
+        self.tiered.set(OFFLINE_NAMESPACE, cache_key, downloaded_data, l2_ttl=24 * 3600)
         
         return SyncResult(
             operation_id=operation.id,
@@ -438,7 +485,7 @@ class OfflineOnlineSync:
         
     def _on_connectivity_change(self, event: ConnectionEvent):
         """Responde a mudanças de conectividade"""
-        if event.new_status.value == "online" and self.pending_operations:
+        if event.new_status.value == "online" and len(self.queue):
             # Conectou - inicia sincronização se houver operações pendentes
             if not self.sync_thread or not self.sync_thread.is_alive():
                 threading.Thread(
@@ -446,38 +493,6 @@ class OfflineOnlineSync:
                     daemon=True
                 ).start()
                 
-    def _load_pending_operations(self):
-        """Carrega operações pendentes do arquivo"""
-        if not self.pending_file.exists():
-            return
-            
-        try:
-            with open(self.pending_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                
-            self.pending_operations = []
-            for item in data:
-                item['timestamp'] = datetime.fromisoformat(item['timestamp'])
-                self.pending_operations.append(SyncOperation(**item))
-                
-        except Exception as e:
-            print(f"Erro ao carregar operações pendentes: {e}")
-            
-    def _save_pending_operations(self):
-        """Salva operações pendentes no arquivo"""
-        try:
-            data = []
-            for op in self.pending_operations:
-                op_dict = asdict(op)
-                op_dict['timestamp'] = op.timestamp.isoformat()
-                data.append(op_dict)
-                
-            with open(self.pending_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-                
-        except Exception as e:
-            print(f"Erro ao salvar operações pendentes: {e}")
-            
     def _load_sync_state(self):
         """Carrega estado da sincronização"""
         if not self.state_file.exists():
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Sync Queue - Fila de prioridade durável para operações de sincronização
+
+As operações ficam em um heap em memória (prioridade, ordem de chegada) e cada
+alteração é acrescentada a um journal append-only ('<crc32> <json>' por linha).
+Ao abrir, o journal é reaplicado; uma cauda corrompida (escrita interrompida)
+é descartada. Quando o journal cresce demais em relação às operações vivas ele
+é reescrito de forma atômica.
+"""
+
+import os
+import json
+import time
+import heapq
+import zlib
+import threading
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+@dataclass
+class SyncOperation:
+    """Operação de sincronização"""
+    id: str
+    operation_type: str  # 'upload', 'download', 'merge'
+    resource_type: str   # 'progress', 'settings', 'analytics', etc
+    data: Any
+    timestamp: datetime
+    priority: int = 1    # 1=alta, 2=média, 3=baixa
+    retry_count: int = 0
+    max_retries: int = 3
+    next_attempt: float = 0.0  # epoch antes do qual não deve ser tentada (backoff)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data['timestamp'] = self.timestamp.isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SyncOperation":
+        data = dict(data)
+        data['timestamp'] = datetime.fromisoformat(data['timestamp'])
+        return cls(**data)
+
+
+class SyncQueue:
+    """Fila de prioridade com journal append-only e coalescência de uploads"""
+
+    def __init__(self, journal_file: Path, legacy_file: Optional[Path] = None,
+                 sync_interval: float = 1.0, compact_min: int = 1000):
+        """
+        Args:
+            journal_file: Arquivo do journal
+            legacy_file: JSON antigo (lista de operações) importado uma única vez
+            sync_interval: Intervalo mínimo (s) entre fsyncs do journal
+            compact_min: Número de registros a partir do qual o journal pode ser compactado
+        """
+        self.journal_file = Path(journal_file)
+        self.sync_interval = sync_interval
+        self.compact_min = compact_min
+
+        self.lock = threading.RLock()
+        self._ops: Dict[str, SyncOperation] = {}        # todas as operações vivas
+        self._heap: List[Tuple[int, int, str]] = []     # (prioridade, seq, id)
+        self._seq_of: Dict[str, int] = {}               # seq atual das que estão no heap
+        self._in_flight: set = set()
+        self._coalesce: Dict[Tuple[str, str], str] = {} # (tipo, recurso) -> id na fila
+        self._seq = 0
+        self._records = 0
+        self.coalesced = 0
+
+        self._journal = None
+        self._last_sync = 0.0
+
+        self._replay()
+        if legacy_file is not None and Path(legacy_file).exists():
+            self._import_legacy(Path(legacy_file))
+
+    # ------------------------------------------------------------------
+    # Journal
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _encode(record: Dict[str, Any]) -> bytes:
+        payload = json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        return b"%08x %s\n" % (zlib.crc32(payload), payload)
+
+    @staticmethod
+    def _decode(raw_line: bytes) -> Optional[Dict[str, Any]]:
+        """Valida e decodifica uma linha (None se estiver incompleta ou corrompida)"""
+        if not raw_line.endswith(b"\n") or len(raw_line) < 10:
+            return None
+        checksum, payload = raw_line[:8], raw_line[9:-1]
+        try:
+            if int(checksum, 16) != zlib.crc32(payload):
+                return None
+            return json.loads(payload.decode('utf-8'))
+        except (ValueError, UnicodeDecodeError):
+            return None
+
+    def _replay(self) -> None:
+        if not self.journal_file.exists():
+            return
+
+        valid_bytes = 0
+        try:
+            with open(self.journal_file, 'rb') as f:
+                for raw_line in f:
+                    record = self._decode(raw_line)
+                    if record is None:
+                        break
+                    valid_bytes += len(raw_line)
+                    self._records += 1
+                    self._apply(record)
+
+            # Remove a escrita parcial para que novos registros não fiquem atrás dela
+            if valid_bytes < self.journal_file.stat().st_size:
+                with open(self.journal_file, 'r+b') as f:
+                    f.truncate(valid_bytes)
+        except (IOError, OSError) as e:
+            print(f"Erro ao ler fila de sincronização: {e}")
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        """Aplica um registro ao estado em memória (usado também no replay)"""
+        kind = record["op"]
+        if kind == "put":
+            self._enqueue(SyncOperation.from_dict(record["item"]))
+        elif kind == "done":
+            for op_id in record["ids"]:
+                self._drop(op_id)
+        elif kind == "retry":
+            op = self._ops.get(record["id"])
+            if op is not None:
+                op.retry_count = record["retry_count"]
+                op.next_attempt = record["next_attempt"]
+
+    def _write(self, records: Iterable[Dict[str, Any]]) -> None:
+        """Acrescenta registros ao journal em uma única escrita"""
+        data = b"".join(self._encode(record) for record in records)
+        if not data:
+            return
+        try:
+            if self._journal is None:
+                self.journal_file.parent.mkdir(parents=True, exist_ok=True)
+                self._journal = open(self.journal_file, 'ab', buffering=0)
+            self._journal.write(data)
+            self._records += data.count(b"\n")
+
+            # fsync em lote: no máximo um por sync_interval
+            now = time.monotonic()
+            if now - self._last_sync >= self.sync_interval:
+                os.fsync(self._journal.fileno())
+                self._last_sync = now
+        except (IOError, OSError) as e:
+            print(f"Erro ao salvar fila de sincronização: {e}")
+
+        if self._records >= self.compact_min and self._records > 2 * len(self._ops):
+            self.compact()
+
+    def compact(self) -> None:
+        """Reescreve o journal só com as operações vivas"""
+        with self.lock:
+            temp_file = self.journal_file.with_name(self.journal_file.name + ".tmp")
+            ops = sorted(self._ops.values(), key=lambda op: self._seq_of.get(op.id, 0))
+            try:
+                with open(temp_file, 'wb') as f:
+                    for op in ops:
+                        f.write(self._encode({"op": "put", "item": op.to_dict()}))
+                    f.flush()
+                    os.fsync(f.fileno())
+                if self._journal is not None:
+                    self._journal.close()
+                    self._journal = None
+                os.replace(temp_file, self.journal_file)
+                self._records = len(ops)
+            except (IOError, OSError) as e:
+                print(f"Erro ao compactar fila de sincronização: {e}")
+
+    def _import_legacy(self, legacy_file: Path) -> None:
+        """Importa o pending_operations.json do formato antigo e o remove"""
+        try:
+            with open(legacy_file, 'r', encoding='utf-8') as f:
+                items = json.load(f)
+            for item in items:
+                self.put(SyncOperation.from_dict(item))
+            legacy_file.unlink()
+        except Exception as e:
+            print(f"Erro ao importar operações pendentes: {e}")
+
+    def flush(self) -> None:
+        """Força o fsync do journal"""
+        with self.lock:
+            if self._journal is not None:
+                try:
+                    os.fsync(self._journal.fileno())
+                except OSError:
+                    pass
+
+    def close(self) -> None:
+        with self.lock:
+            if self._journal is not None:
+                self.flush()
+                self._journal.close()
+                self._journal = None
+
+    # ------------------------------------------------------------------
+    # Estado em memória
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _coalesce_key(op: SyncOperation) -> Optional[Tuple[str, str]]:
+        # Uploads enviam o estado completo do recurso: o mais novo substitui os anteriores
+        return (op.operation_type, op.resource_type) if op.operation_type == "upload" else None
+
+    def _enqueue(self, op: SyncOperation) -> List[str]:
+        """Coloca a operação no heap; retorna os ids que ela substituiu"""
+        superseded = []
+        key = self._coalesce_key(op)
+        if key is not None:
+            previous = self._coalesce.get(key)
+            if previous is not None and previous != op.id and previous not in self._in_flight:
+                self._drop(previous)
+                superseded.append(previous)
+            self._coalesce[key] = op.id
+
+        self._seq += 1
+        self._ops[op.id] = op
+        self._seq_of[op.id] = self._seq
+        heapq.heappush(self._heap, (op.priority, self._seq, op.id))
+        return superseded
+
+    def _drop(self, op_id: str) -> None:
+        op = self._ops.pop(op_id, None)
+        self._seq_of.pop(op_id, None)
+        self._in_flight.discard(op_id)
+        if op is not None:
+            key = self._coalesce_key(op)
+            if key is not None and self._coalesce.get(key) == op_id:
+                del self._coalesce[key]
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+
+    def put(self, op: SyncOperation) -> List[str]:
+        """
+        Enfileira uma operação (ou substitui a de mesmo id)
+
+        Returns:
+            Ids de uploads anteriores do mesmo recurso que foram descartados
+        """
+        with self.lock:
+            superseded = self._enqueue(op)
+            records = [{"op": "put", "item": op.to_dict()}]
+            if superseded:
+                self.coalesced += len(superseded)
+                records.append({"op": "done", "ids": superseded})
+            self._write(records)
+            return superseded
+
+    def update(self, op: SyncOperation) -> None:
+        """Grava no journal uma alteração feita nos dados de uma operação na fila"""
+        with self.lock:
+            if op.id in self._ops:
+                self._write([{"op": "put", "item": op.to_dict()}])
+
+    def pop_ready(self, limit: int, now: Optional[float] = None) -> List[SyncOperation]:
+        """Retira até `limit` operações prontas, por prioridade, marcando-as em andamento"""
+        now = time.time() if now is None else now
+        ready: List[SyncOperation] = []
+        deferred = []
+        with self.lock:
+            while self._heap and len(ready) < limit:
+                entry = heapq.heappop(self._heap)
+                priority, seq, op_id = entry
+                if self._seq_of.get(op_id) != seq or op_id in self._in_flight:
+                    continue  # substituída ou já retirada
+                op = self._ops[op_id]
+                if op.next_attempt > now:
+                    deferred.append(entry)
+                    continue
+                self._in_flight.add(op_id)
+                if self._coalesce.get(self._coalesce_key(op)) == op_id:
+                    del self._coalesce[self._coalesce_key(op)]
+                ready.append(op)
+            for entry in deferred:
+                heapq.heappush(self._heap, entry)
+        return ready
+
+    def complete(self, op_ids: List[str]) -> None:
+        """Remove definitivamente operações concluídas (um registro para o lote)"""
+        if not op_ids:
+            return
+        with self.lock:
+            for op_id in op_ids:
+                self._drop(op_id)
+            self._write([{"op": "done", "ids": list(op_ids)}])
+
+    def retry(self, op: SyncOperation, delay: float) -> None:
+        """Devolve uma operação em andamento para a fila, só tentando após `delay` segundos"""
+        with self.lock:
+            if op.id not in self._ops:
+                return
+            key = self._coalesce_key(op)
+            if key is not None and self._coalesce.get(key, op.id) != op.id:
+                # Um upload mais novo do mesmo recurso chegou enquanto esta estava em andamento
+                self._drop(op.id)
+                self.coalesced += 1
+                self._write([{"op": "done", "ids": [op.id]}])
+                return
+
+            self._in_flight.discard(op.id)
+            op.next_attempt = time.time() + delay
+            self._seq += 1
+            self._seq_of[op.id] = self._seq
+            heapq.heappush(self._heap, (op.priority, self._seq, op.id))
+            if key is not None:
+                self._coalesce[key] = op.id
+            self._write([{"op": "retry", "id": op.id, "retry_count": op.retry_count,
+                          "next_attempt": op.next_attempt}])
+
+    def get(self, op_id: str) -> Optional[SyncOperation]:
+        with self.lock:
+            return self._ops.get(op_id)
+
+    def snapshot(self) -> List[SyncOperation]:
+        """Operações vivas na ordem em que seriam processadas"""
+        with self.lock:
+            return sorted(self._ops.values(), key=lambda op: (op.priority, self._seq_of.get(op.id, 0)))
+
+    def __len__(self) -> int:
+        return len(self._ops)
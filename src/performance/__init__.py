@@ -7,5 +7,10 @@ Otimizações de cache e lazy loading
 """
 
 from .cache_manager import CacheManager, LazyLoader, FileCache, cached
+from .intelligent_cache import IntelligentCacheManager
+from .tiered_cache import TieredCache, NamespacePolicy, get_tiered_cache
 
-__all__ = ['CacheManager', 'LazyLoader', 'FileCache', 'cached']
\ No newline at end of file
+__all__ = [
+    'CacheManager', 'LazyLoader', 'FileCache', 'cached',
+    'IntelligentCacheManager', 'TieredCache', 'NamespacePolicy', 'get_tiered_cache'
+]
\ No newline at end of file
@@ -3,177 +3,456 @@
 
 """
 Intelligent Cache Manager - Cache com expiration queue e batch operations
+O cache é dividido em fatias com lock próprio; em cada fatia o LRU é uma
+lista duplamente ligada, então get/set/eviction são O(1)
 """
 
+import sys
 import time
 import heapq
-import json
-import pickle
-from typing import Any, Optional, Dict, List, Tuple, Callable, Union
-from functools import wraps
-from collections import OrderedDict
 import hashlib
+from typing import Any, Optional, Dict, List, Tuple, Callable, Iterable
+from functools import wraps
 from threading import Lock
-from dataclasses import dataclass, field
 
 
-@dataclass(order=True)
+# Quantos itens de um container são medidos antes de extrapolar o tamanho
+_SIZE_SAMPLE = 32
+
+
+def estimate_size(value: Any, depth: int = 2) -> int:
+    """
+    Estimativa barata do tamanho em bytes de um valor
+
+    Strings e bytes custam O(1); containers são medidos por amostragem
+    (os primeiros itens, extrapolados para o total) até `depth` níveis.
+    """
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value) + 33
+    if isinstance(value, str):
+        return sys.getsizeof(value)
+
+    size = sys.getsizeof(value, 64)
+    if depth <= 0:
+        return size
+
+    if isinstance(value, dict):
+        count = len(value)
+        if not count:
+            return size
+        sample = 0
+        for index, (key, item) in enumerate(value.items()):
+            if index == _SIZE_SAMPLE:
+                break
+            sample += estimate_size(key, depth - 1) + estimate_size(item, depth - 1)
+        return size + sample * count // min(count, _SIZE_SAMPLE)
+
+    if isinstance(value, (list, tuple, set, frozenset)):
+        count = len(value)
+        if not count:
+            return size
+        sample = 0
+        for index, item in enumerate(value):
+            if index == _SIZE_SAMPLE:
+                break
+            sample += estimate_size(item, depth - 1)
+        return size + sample * count // min(count, _SIZE_SAMPLE)
+
+    attributes = getattr(value, '__dict__', None)
+    if attributes is not None:
+        size += estimate_size(attributes, depth - 1)
+    return size
+
+
 class CacheEntry:
-    """Entrada de cache com prioridade para heap"""
-    expiration_time: float
-    key: str = field(compare=False)
-    value: Any = field(compare=False)
-    size: int = field(compare=False)
-    access_count: int = field(default=0, compare=False)
-    last_access: float = field(default_factory=time.time, compare=False)
+    """Nó da lista duplamente ligada do LRU (o próprio nó é o valor do dicionário)"""
+
+    __slots__ = ("key", "value", "size", "expiration_time", "access_count", "last_access",
+                 "prev", "next")
+
+    def __init__(self, key: Optional[str] = None, value: Any = None, size: int = 0,
+                 expiration_time: float = 0.0):
+        self.key = key
+        self.value = value
+        self.size = size
+        self.expiration_time = expiration_time
+        self.access_count = 0
+        self.last_access = time.time()
+        self.prev: "CacheEntry" = self
+        self.next: "CacheEntry" = self
+
+
+class _Reserve:
+    """Bytes que cada fatia cede às entradas grandes (lido sem lock pelas fatias)"""
+
+    def __init__(self):
+        self.per_shard = 0.0
+
+
+class _CacheShard:
+    """
+    Uma fatia do cache com lock, LRU e fila de expiração próprios
+
+    O LRU é uma lista circular com sentinela: mover, inserir e remover são O(1).
+    A fila de expiração usa remoção preguiçosa: entradas sobrescritas ou
+    removidas ficam no heap e são descartadas ao sair dele (ou quando o heap
+    fica com mais lixo do que entradas válidas e é reconstruído).
+    """
+
+    def __init__(self, max_size_bytes: float, reserve: Optional[_Reserve] = None):
+        self.lock = Lock()
+        self.entries: Dict[str, CacheEntry] = {}
+        self.head = CacheEntry()  # sentinela: head.next é o mais recente, head.prev o menos
+        self.expiration_queue: List[Tuple[float, int, CacheEntry]] = []
+        self.sequence = 0
+        self.max_size_bytes = max_size_bytes
+        self.reserve = reserve
+        self.current_size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejections = 0
+
+    # Lista ligada -----------------------------------------------------
+
+    def _link_front(self, entry: CacheEntry) -> None:
+        head = self.head
+        entry.prev = head
+        entry.next = head.next
+        head.next.prev = entry
+        head.next = entry
+
+    @staticmethod
+    def _unlink(entry: CacheEntry) -> None:
+        entry.prev.next = entry.next
+        entry.next.prev = entry.prev
+        entry.prev = entry.next = entry
+
+    # Operações (chamadas com o lock da fatia) -------------------------
+
+    def capacity(self) -> float:
+        """Orçamento atual: a parte da fatia menos o que ela cede às entradas grandes"""
+        return self.max_size_bytes - (self.reserve.per_shard if self.reserve else 0)
+
+    def get(self, key: str, now: float) -> Optional[Any]:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry.expiration_time < now:
+            self.remove(entry)
+            self.misses += 1
+            return None
+
+        entry.access_count += 1
+        entry.last_access = now
+        if self.head.next is not entry:
+            self._unlink(entry)
+            self._link_front(entry)
+        self.hits += 1
+        return entry.value
+
+    def set(self, key: str, value: Any, size: int, expiration: float, now: float) -> bool:
+        old = self.entries.get(key)
+        if old is not None:
+            self.remove(old)
+
+        # Maior que o cache inteiro: esvaziá-lo não bastaria, então nem entra
+        if size > self.max_size_bytes:
+            self.rejections += 1
+            return False
+
+        self._ensure_space(size, now)
+
+        entry = CacheEntry(key, value, size, expiration)
+        entry.last_access = now
+        self.entries[key] = entry
+        self._link_front(entry)
+        self.current_size_bytes += size
+
+        self.sequence += 1
+        heapq.heappush(self.expiration_queue, (expiration, self.sequence, entry))
+        if len(self.expiration_queue) > 2 * len(self.entries) + 64:
+            self._rebuild_queue()
+        return True
+
+    def remove(self, entry: CacheEntry) -> None:
+        """Remove a entrada do dicionário e do LRU (o heap é limpo depois)"""
+        del self.entries[entry.key]
+        self._unlink(entry)
+        self.current_size_bytes -= entry.size
+
+    def _ensure_space(self, required_size: int, now: float) -> None:
+        self._cleanup_expired(now)
+
+        head = self.head
+        capacity = self.capacity()
+        while self.current_size_bytes + required_size > capacity and self.entries:
+            self.remove(head.prev)
+            self.evictions += 1
+
+    def _cleanup_expired(self, now: float) -> int:
+        queue = self.expiration_queue
+        entries = self.entries
+        removed = 0
+        while queue and queue[0][0] < now:
+            _, _, entry = heapq.heappop(queue)
+            # Só remove se o nó ainda é o atual da chave (senão é lixo do heap)
+            if entries.get(entry.key) is entry:
+                self.remove(entry)
+                removed += 1
+        return removed
+
+    def _rebuild_queue(self) -> None:
+        """Descarta do heap as entradas que não estão mais no cache"""
+        entries = self.entries
+        self.expiration_queue = [item for item in self.expiration_queue
+                                 if entries.get(item[2].key) is item[2]]
+        heapq.heapify(self.expiration_queue)
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.head.prev = self.head.next = self.head
+        self.expiration_queue.clear()
+        self.current_size_bytes = 0
 
 
 class IntelligentCacheManager:
-    """Cache inteligente com expiration queue e otimizações"""
+    """Cache inteligente com LRU O(1), expiration queue e locks por fatia"""
     
-    def __init__(self, max_size_mb: float = 100, default_ttl: int = 3600):
+    def __init__(self, max_size_mb: float = 100, default_ttl: int = 3600, shards: int = 16):
         """
         Inicializa o cache inteligente
         
+        Valores maiores que a parte de uma fatia vão para uma área de entradas
+        grandes; cada fatia cede a ela 1/N do espaço que ela ocupa, então o
+        total continua dentro de max_size_mb. Só valores maiores que o cache
+        inteiro são recusados.
+        
         Args:
-            max_size_mb: Tamanho máximo em MB
+            max_size_mb: Tamanho máximo em MB (dividido igualmente entre as fatias)
             default_ttl: TTL padrão em segundos
+            shards: Número de fatias, cada uma com seu próprio lock
         """
-        self.cache: Dict[str, CacheEntry] = {}
-        self.expiration_queue: List[CacheEntry] = []
         self.max_size_bytes = max_size_mb * 1024 * 1024
-        self.current_size_bytes = 0
         self.default_ttl = default_ttl
-        self.lock = Lock()
+        self._reserve = _Reserve()
+        self.shards = [_CacheShard(self.max_size_bytes / shards, self._reserve) for _ in range(shards)]
+        # Entradas grandes: LRU próprio com o cache inteiro de orçamento
+        self.large = _CacheShard(self.max_size_bytes)
         
-        # Estatísticas
-        self.hits = 0
-        self.misses = 0
-        self.evictions = 0
+    @property
+    def max_entry_bytes(self) -> float:
+        """Maior valor que o cache aceita"""
+        return self.max_size_bytes
+        
+    def _shard(self, key: str) -> _CacheShard:
+        return self.shards[hash(key) % len(self.shards)]
+        
+    def _group_by_shard(self, keys: Iterable[str]) -> Dict[int, List[str]]:
+        groups: Dict[int, List[str]] = {}
+        count = len(self.shards)
+        for key in keys:
+            groups.setdefault(hash(key) % count, []).append(key)
+        return groups
         
     def _estimate_size(self, value: Any) -> int:
         """Estima o tamanho em bytes de um valor"""
-        try:
-            return len(pickle.dumps(value))
-        except:
-            # Fallback para estimativa básica
-            return len(str(value))
+        return estimate_size(value)
             
     def get(self, key: str) -> Optional[Any]:
         """Obtém valor do cache com atualização de acesso"""
-        with self.lock:
-            if key not in self.cache:
-                self.misses += 1
-                return None
-                
-            entry = self.cache[key]
-            
-            # Verifica se expirou
-            if entry.expiration_time < time.time():
-                self._remove_entry(key)
-                self.misses += 1
+        shard = self._shard(key)
+        now = time.time()
+        with shard.lock:
+            value = shard.get(key, now)
+        if value is None and self.large.entries:
+            value = self._get_large(key, now)
+        return value
+        
+    def _get_large(self, key: str, now: float) -> Optional[Any]:
+        large = self.large
+        with large.lock:
+            if key not in large.entries:
                 return None
-                
-            # Atualiza estatísticas
-            entry.access_count += 1
-            entry.last_access = time.time()
-            self.hits += 1
-            
-            return entry.value
+            value = large.get(key, now)
+            if value is None:
+                # Expirada: o miss já foi contado na fatia da chave
+                large.misses -= 1
+            self._update_reserve()
+        if value is not None:
+            # Era um acerto, não o miss que a fatia contou
+            shard = self._shard(key)
+            with shard.lock:
+                shard.misses -= 1
+        return value
+        
+    def _update_reserve(self) -> None:
+        """Recalcula o que cada fatia cede às entradas grandes (com o lock de self.large)"""
+        self._reserve.per_shard = self.large.current_size_bytes / len(self.shards)
+        
+    def _store(self, key: str, value: Any, size: int, expiration: float, now: float) -> bool:
+        """Grava na fatia da chave ou, se não couber nela, entre as entradas grandes"""
+        shard = self._shard(key)
+        large = self.large
+        if size <= shard.capacity():
+            if large.entries:
+                self._remove_large(key)
+            with shard.lock:
+                return shard.set(key, value, size, expiration, now)
+        
+        with shard.lock:
+            old = shard.entries.get(key)
+            if old is not None:
+                shard.remove(old)
+        with large.lock:
+            stored = large.set(key, value, size, expiration, now)
+            self._update_reserve()
+        if stored:
+            # As fatias encolhem para a nova reserva (uma de cada vez, sem segurar dois locks)
+            for other in self.shards:
+                with other.lock:
+                    other._ensure_space(0, now)
+        return stored
+        
+    def _remove_large(self, key: str) -> bool:
+        large = self.large
+        with large.lock:
+            entry = large.entries.get(key)
+            if entry is None:
+                return False
+            large.remove(entry)
+            self._update_reserve()
+            return True
             
-    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
-        """Adiciona ou atualiza valor no cache"""
-        ttl = ttl or self.default_ttl
-        size = self._estimate_size(value)
-        expiration = time.time() + ttl
-        
-        with self.lock:
-            # Remove entrada antiga se existir
-            if key in self.cache:
-                self._remove_entry(key)
-                
-            # Verifica espaço e faz eviction se necessário
-            self._ensure_space(size)
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, size: Optional[int] = None) -> bool:
+        """
+        Adiciona ou atualiza valor no cache
+        
+        Args:
+            key: Chave
+            value: Valor
+            ttl: TTL em segundos (padrão: default_ttl)
+            size: Tamanho em bytes, se o chamador já souber (evita a estimativa)
             
-            # Cria nova entrada
-            entry = CacheEntry(
-                expiration_time=expiration,
-                key=key,
-                value=value,
-                size=size
-            )
+        Returns:
+            False se o valor é maior que o cache inteiro (max_entry_bytes; não
+            é armazenado, e uma versão anterior da chave é descartada)
+        """
+        if size is None:
+            size = self._estimate_size(value)
+        now = time.time()
+        expiration = now + (ttl or self.default_ttl)
+        return self._store(key, value, size, expiration, now)
             
-            # Adiciona ao cache e heap
-            self.cache[key] = entry
-            heapq.heappush(self.expiration_queue, entry)
-            self.current_size_bytes += size
+    def delete(self, key: str) -> bool:
+        """Remove uma chave do cache"""
+        shard = self._shard(key)
+        with shard.lock:
+            entry = shard.entries.get(key)
+            if entry is not None:
+                shard.remove(entry)
+                return True
+        return bool(self.large.entries) and self._remove_large(key)
             
     def batch_get(self, keys: List[str]) -> Dict[str, Optional[Any]]:
-        """Obtém múltiplos valores de uma vez"""
+        """Obtém múltiplos valores de uma vez (um lock por fatia envolvida)"""
         results = {}
-        with self.lock:
+        now = time.time()
+        for index, shard_keys in self._group_by_shard(keys).items():
+            shard = self.shards[index]
+            with shard.lock:
+                for key in shard_keys:
+                    results[key] = shard.get(key, now)
+        if self.large.entries:
             for key in keys:
-                results[key] = self.get(key)
-        return results
+                if results[key] is None:
+                    results[key] = self._get_large(key, now)
+        return {key: results[key] for key in keys}
         
     def batch_set(self, items: Dict[str, Any], ttl: Optional[int] = None) -> None:
-        """Define múltiplos valores de uma vez"""
-        with self.lock:
-            for key, value in items.items():
-                self.set(key, value, ttl)
-                
-    def _remove_entry(self, key: str) -> None:
-        """Remove entrada do cache"""
-        if key in self.cache:
-            entry = self.cache[key]
-            self.current_size_bytes -= entry.size
-            del self.cache[key]
-            
-    def _ensure_space(self, required_size: int) -> None:
-        """Garante espaço suficiente fazendo eviction se necessário"""
-        # Remove entradas expiradas primeiro
-        self._cleanup_expired()
-        
-        # Se ainda precisar de espaço, remove LRU
-        while (self.current_size_bytes + required_size > self.max_size_bytes 
-               and self.cache):
-            # Encontra entrada menos recentemente usada
-            lru_key = min(self.cache.keys(), 
-                         key=lambda k: self.cache[k].last_access)
-            self._remove_entry(lru_key)
-            self.evictions += 1
-            
-    def _cleanup_expired(self) -> None:
-        """Remove entradas expiradas do cache"""
-        current_time = time.time()
-        
-        # Remove do heap
-        while self.expiration_queue and self.expiration_queue[0].expiration_time < current_time:
-            entry = heapq.heappop(self.expiration_queue)
-            if entry.key in self.cache:
-                self._remove_entry(entry.key)
+        """Define múltiplos valores de uma vez (um lock por fatia envolvida)"""
+        sizes = {key: self._estimate_size(value) for key, value in items.items()}
+        now = time.time()
+        expiration = now + (ttl or self.default_ttl)
+        large: List[str] = []
+        for index, shard_keys in self._group_by_shard(items).items():
+            shard = self.shards[index]
+            with shard.lock:
+                capacity = shard.capacity()
+                for key in shard_keys:
+                    if sizes[key] <= capacity:
+                        shard.set(key, items[key], sizes[key], expiration, now)
+                    else:
+                        large.append(key)
+        if self.large.entries:
+            # Chave que era grande e agora coube na fatia: sai das entradas grandes
+            for key in items.keys() - set(large):
+                self._remove_large(key)
+        for key in large:
+            self._store(key, items[key], sizes[key], expiration, now)
+                    
+    def cleanup_expired(self) -> int:
+        """Remove entradas expiradas de todas as fatias"""
+        now = time.time()
+        removed = 0
+        for shard in self.shards:
+            with shard.lock:
+                removed += shard._cleanup_expired(now)
+        with self.large.lock:
+            removed += self.large._cleanup_expired(now)
+            self._update_reserve()
+        return removed
                 
     def clear(self) -> None:
         """Limpa todo o cache"""
-        with self.lock:
-            self.cache.clear()
-            self.expiration_queue.clear()
-            self.current_size_bytes = 0
+        for shard in self.shards:
+            with shard.lock:
+                shard.clear()
+        with self.large.lock:
+            self.large.clear()
+            self._update_reserve()
+                
+    def keys(self) -> List[str]:
+        """Chaves presentes no cache (sem verificar expiração)"""
+        keys = []
+        for shard in self.shards + [self.large]:
+            with shard.lock:
+                keys.extend(shard.entries)
+        return keys
+                
+    def __len__(self) -> int:
+        return sum(len(shard.entries) for shard in self.shards) + len(self.large.entries)
+        
+    @property
+    def current_size_bytes(self) -> int:
+        return sum(shard.current_size_bytes for shard in self.shards) + self.large.current_size_bytes
             
     def get_stats(self) -> Dict[str, Any]:
         """Retorna estatísticas do cache"""
-        total_requests = self.hits + self.misses
-        hit_rate = self.hits / total_requests if total_requests > 0 else 0
+        areas = self.shards + [self.large]
+        hits = sum(shard.hits for shard in areas)
+        misses = sum(shard.misses for shard in areas)
+        evictions = sum(shard.evictions for shard in areas)
+        rejections = sum(shard.rejections for shard in areas)
+        entries = len(self)
+        size_bytes = self.current_size_bytes
+        total_requests = hits + misses
+        hit_rate = hits / total_requests if total_requests > 0 else 0
         
         return {
-            "total_entries": len(self.cache),
-            "size_mb": self.current_size_bytes / (1024 * 1024),
-            "hits": self.hits,
-            "misses": self.misses,
+            "total_entries": entries,
+            "size_mb": size_bytes / (1024 * 1024),
+            "hits": hits,
+            "misses": misses,
             "hit_rate": hit_rate,
-            "evictions": self.evictions,
-            "avg_entry_size_kb": (self.current_size_bytes / len(self.cache) / 1024) 
-                                if self.cache else 0
+            "evictions": evictions,
+            "rejections": rejections,
+            "large_entries": len(self.large.entries),
+            "max_entry_mb": self.max_entry_bytes / (1024 * 1024),
+            "avg_entry_size_kb": (size_bytes / entries / 1024) if entries else 0,
+            "shards": len(self.shards)
         }
         
     def cache_decorator(self, ttl: Optional[int] = None):
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tiered Cache - Fachada única de cache com dois níveis
+L1 em memória (IntelligentCacheManager) e L2 em disco (ResourceCache), com
+loaders read-through, escrita em segundo plano no L2, promoção para o L1
+e TTL por namespace
+"""
+
+import math
+import atexit
+import threading
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .intelligent_cache import IntelligentCacheManager
+
+
+@dataclass
+class NamespacePolicy:
+    """Regras de cache de um namespace"""
+    ttl: Optional[float] = 3600          # segundos no L1 (None = sem expiração)
+    l2_ttl: Optional[float] = None       # segundos no L2 (None = mesmo do L1)
+    persist: bool = True                 # grava no L2
+    write_behind: bool = True            # grava no L2 em lote (False = na hora)
+    l2_prefix: Optional[str] = None      # prefixo das chaves no L2 (padrão: "<namespace>:")
+
+
+def _default_l2():
+    """L2 padrão: o cache offline em disco (importado só quando usado)"""
+    from ..offline.resource_cache import ResourceCache
+    # Quem fecha é o TieredCache, depois de gravar as escritas pendentes
+    return ResourceCache(close_at_exit=False)
+
+
+class TieredCache:
+    """Cache L1 (memória) + L2 (disco) com uma única API e estatísticas"""
+
+    def __init__(self, l1: Optional[IntelligentCacheManager] = None, l2: Any = None,
+                 l2_factory: Optional[Callable[[], Any]] = _default_l2,
+                 flush_interval: float = 2.0, max_pending: int = 100):
+        """
+        Args:
+            l1: Cache em memória (um novo IntelligentCacheManager se None)
+            l2: Cache em disco com store/retrieve/remove (ex.: ResourceCache)
+            l2_factory: Cria o L2 no primeiro uso quando `l2` não é informado
+                (esse L2 é do TieredCache: close() e a saída do programa o fecham)
+            flush_interval: Segundos até gravar as escritas pendentes no L2
+            max_pending: Quantidade de escritas pendentes que força a gravação
+        """
+        self.l1 = l1 or IntelligentCacheManager()
+        self._l2 = l2
+        self._l2_factory = l2_factory if l2 is None else None
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self.lock = threading.RLock()
+        self.namespaces: Dict[str, NamespacePolicy] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+        # Lock próprio dos contadores: contar um acerto não espera pelo L2
+        self._stats_lock = threading.Lock()
+        self._pending: Dict[str, Tuple[Any, Optional[float]]] = {}
+        self._timer: Optional[threading.Timer] = None
+
+        # Um só gancho de saída: grava o que está pendente e só então fecha o
+        # L2 (ganchos separados rodam em ordem inversa e fechariam o L2 antes)
+        atexit.register(self.close)
+
+    # ------------------------------------------------------------------
+    # Configuração
+    # ------------------------------------------------------------------
+
+    def register_namespace(self, name: str, **policy) -> NamespacePolicy:
+        """Registra (ou atualiza) as regras de um namespace"""
+        with self.lock:
+            self.namespaces[name] = NamespacePolicy(**policy)
+            with self._stats_lock:
+                self._stats.setdefault(name, {"l1_hits": 0, "l2_hits": 0, "misses": 0,
+                                              "loads": 0, "writes": 0})
+            return self.namespaces[name]
+
+    def _count(self, namespace: str, counter: str) -> None:
+        with self._stats_lock:
+            self._stats[namespace][counter] += 1
+
+    def _policy(self, namespace: str) -> NamespacePolicy:
+        policy = self.namespaces.get(namespace)
+        if policy is None:
+            policy = self.register_namespace(namespace)
+        return policy
+
+    @property
+    def l2(self) -> Any:
+        """Cache em disco (criado no primeiro acesso)"""
+        if self._l2 is None and self._l2_factory is not None:
+            with self.lock:
+                if self._l2 is None:
+                    self._l2 = self._l2_factory()
+        return self._l2
+
+    @staticmethod
+    def _l1_key(namespace: str, key: str) -> str:
+        return f"{namespace}\x00{key}"
+
+    def _l2_key(self, namespace: str, key: str, policy: NamespacePolicy) -> str:
+        prefix = f"{namespace}:" if policy.l2_prefix is None else policy.l2_prefix
+        return prefix + key
+
+    # ------------------------------------------------------------------
+    # Leitura e escrita
+    # ------------------------------------------------------------------
+
+    def get(self, namespace: str, key: str, loader: Optional[Callable[[], Any]] = None) -> Optional[Any]:
+        """
+        Busca no L1, depois no L2 (promovendo para o L1) e por fim no loader
+
+        Valores None não são cacheados: um loader que retorna None é chamado de novo.
+        """
+        policy = self._policy(namespace)
+        l1_key = self._l1_key(namespace, key)
+
+        value = self.l1.get(l1_key)
+        if value is not None:
+            self._count(namespace, "l1_hits")
+            return value
+
+        if policy.persist:
+            l2_key = self._l2_key(namespace, key, policy)
+            with self.lock:
+                pending = self._pending.get(l2_key)
+            value = pending[0] if pending else self._l2_retrieve(l2_key)
+            if value is not None:
+                self._count(namespace, "l2_hits")
+                self.l1.set(l1_key, value, ttl=self._l1_ttl(policy))
+                return value
+
+        self._count(namespace, "misses")
+        if loader is None:
+            return None
+
+        value = loader()
+        self._count(namespace, "loads")
+        if value is not None:
+            self.set(namespace, key, value)
+        return value
+
+    def set(self, namespace: str, key: str, value: Any, l2_ttl: Optional[float] = None) -> bool:
+        """
+        Grava no L1 e (conforme o namespace) no L2
+
+        Args:
+            l2_ttl: TTL em segundos no L2 só para esta chave (padrão: o do namespace)
+
+        Returns:
+            False se a gravação imediata no L2 falhou
+        """
+        policy = self._policy(namespace)
+        self._count(namespace, "writes")
+        self.l1.set(self._l1_key(namespace, key), value, ttl=self._l1_ttl(policy))
+        if not policy.persist:
+            return True
+
+        l2_key = self._l2_key(namespace, key, policy)
+        if l2_ttl is None:
+            l2_ttl = policy.l2_ttl if policy.l2_ttl is not None else policy.ttl
+        if not policy.write_behind:
+            return self._l2_store(l2_key, value, l2_ttl)
+
+        with self.lock:
+            self._pending[l2_key] = (value, l2_ttl)
+            if len(self._pending) >= self.max_pending:
+                # Só troca o lote aqui; a gravação em disco é fora do lock
+                full = self._take_pending()
+            else:
+                full = None
+                if self._timer is None:
+                    self._timer = threading.Timer(self.flush_interval, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+        if full:
+            self._write_pending(full)
+        return True
+
+    def invalidate(self, namespace: str, key: str) -> bool:
+        """Remove a chave dos dois níveis"""
+        policy = self._policy(namespace)
+        removed = self.l1.delete(self._l1_key(namespace, key))
+        if policy.persist:
+            l2_key = self._l2_key(namespace, key, policy)
+            with self.lock:
+                removed = self._pending.pop(l2_key, None) is not None or removed
+            if self.l2 is not None:
+                removed = self.l2.remove(l2_key) or removed
+        return removed
+
+    def exists(self, namespace: str, key: str) -> bool:
+        """Verifica se a chave está em algum dos níveis (sem carregar do L2)"""
+        if self.l1.get(self._l1_key(namespace, key)) is not None:
+            return True
+        policy = self._policy(namespace)
+        if not policy.persist:
+            return False
+        l2_key = self._l2_key(namespace, key, policy)
+        with self.lock:
+            if l2_key in self._pending:
+                return True
+        return self.l2 is not None and self.l2.exists(l2_key)
+
+    def keys(self, namespace: str) -> List[str]:
+        """Chaves do namespace presentes no L1"""
+        prefix = self._l1_key(namespace, "")
+        return [key[len(prefix):] for key in self.l1.keys() if key.startswith(prefix)]
+
+    def clear_namespace(self, namespace: str) -> int:
+        """Remove do L1 todas as chaves do namespace"""
+        keys = self.keys(namespace)
+        for key in keys:
+            self.l1.delete(self._l1_key(namespace, key))
+        return len(keys)
+
+    def cached(self, namespace: str, key_func: Optional[Callable[..., str]] = None):
+        """Decorador read-through: o resultado da função fica no namespace"""
+        def decorator(func: Callable) -> Callable:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                key = key_func(*args, **kwargs) if key_func else f"{func.__name__}:{args!r}:{kwargs!r}"
+                return self.get(namespace, key, lambda: func(*args, **kwargs))
+            return wrapper
+        return decorator
+
+    # ------------------------------------------------------------------
+    # L2
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _l1_ttl(policy: NamespacePolicy) -> float:
+        return math.inf if policy.ttl is None else policy.ttl
+
+    def _l2_retrieve(self, l2_key: str) -> Optional[Any]:
+        l2 = self.l2
+        return l2.retrieve(l2_key) if l2 is not None else None
+
+    def _l2_store(self, l2_key: str, value: Any, ttl: Optional[float]) -> bool:
+        l2 = self.l2
+        if l2 is None:
+            return False
+        return l2.store(l2_key, value, ttl_hours=ttl / 3600 if ttl else None)
+
+    def flush(self) -> int:
+        """Grava no L2 as escritas pendentes"""
+        with self.lock:
+            pending = self._take_pending()
+        self._write_pending(pending)
+        return len(pending)
+
+    def _take_pending(self) -> Dict[str, Tuple[Any, Optional[float]]]:
+        """Tira o lote de escritas pendentes (chamado com self.lock)"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, {}
+        return pending
+
+    def _write_pending(self, pending: Dict[str, Tuple[Any, Optional[float]]]) -> None:
+        """Grava um lote no L2 (sem self.lock: leituras seguem enquanto o disco trabalha)"""
+        for l2_key, (value, ttl) in pending.items():
+            self._l2_store(l2_key, value, ttl)
+
+    def close(self) -> None:
+        """Grava as escritas pendentes e fecha o L2 criado pela l2_factory"""
+        self.flush()
+        with self.lock:
+            l2 = self._l2 if self._l2_factory is not None else None
+        if l2 is not None and hasattr(l2, "close"):
+            l2.close()
+
+    # ------------------------------------------------------------------
+    # Estatísticas
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estatísticas por namespace, do L1 e (se aberto) do L2"""
+        with self._stats_lock:
+            namespaces = {}
+            for name, counters in self._stats.items():
+                requests = counters["l1_hits"] + counters["l2_hits"] + counters["misses"]
+                hits = counters["l1_hits"] + counters["l2_hits"]
+                namespaces[name] = dict(counters, hit_rate=hits / requests if requests else 0)
+        with self.lock:
+            pending = len(self._pending)
+
+        return {
+            "namespaces": namespaces,
+            "pending_writes": pending,
+            "l1": self.l1.get_stats(),
+            "l2": self._l2.get_statistics() if self._l2 is not None else None
+        }
+
+
+_tiered_cache: Optional[TieredCache] = None
+_tiered_cache_lock = threading.Lock()
+
+
+def get_tiered_cache() -> TieredCache:
+    """Retorna o cache compartilhado da aplicação"""
+    global _tiered_cache
+    with _tiered_cache_lock:
+        if _tiered_cache is None:
+            _tiered_cache = TieredCache()
+        return _tiered_cache
@@ -4,30 +4,88 @@
 """
 Sistema de Gerenciamento de Progresso do Aluno
 Salva e carrega o progresso do curso em arquivo JSON
+
+Cada alteração é gravada como um evento compacto em um journal append-only
+(progress.json.journal). O arquivo JSON é um snapshot periódico: ao carregar,
+os eventos posteriores ao snapshot são reaplicados, e uma linha cortada por
+queda de energia é descartada sem afetar o restante do progresso.
+
+Com um LearnerStore, o progresso fica no banco SQLite compartilhado e cada
+alteração regrava apenas os campos modificados.
 """
 
 import json
 import os
+import time
+import zlib
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 
+try:
+    from .storage import LearnerStore, StateDocument
+except ImportError:
+    from storage import LearnerStore, StateDocument
+
+
+JOURNAL_SUFFIX = ".journal"
+
 
 class ProgressManager:
     """Gerencia o progresso do aluno no curso"""
     
-    def __init__(self, progress_file: str = "data/progress.json"):
+    def __init__(self, progress_file: str = "data/progress.json",
+                 sync_interval: float = 1.0, compact_every: int = 500,
+                 store: Optional[LearnerStore] = None):
+        """
+        Args:
+            progress_file: Snapshot JSON do progresso
+            sync_interval: Intervalo mínimo (s) entre fsyncs do journal
+            compact_every: Quantidade de eventos que dispara um novo snapshot
+            store: Banco do aluno; se informado substitui snapshot e journal
+                   (os arquivos antigos são importados na primeira execução)
+        """
         self.progress_file = progress_file
+        self.store = store
+        self._document = StateDocument(store, "progress") if store else None
+        self.journal_file = progress_file + JOURNAL_SUFFIX
+        self.sync_interval = sync_interval
+        self.compact_every = compact_every
+        self._journal = None
+        self._journal_seq = 0
+        self._pending_events = 0
+        self._last_sync = time.monotonic()
         self.progress_data = self._load_progress()
     
     def _load_progress(self) -> Dict[str, Any]:
-        """Carrega o progresso do arquivo JSON"""
+        """Carrega o progresso do banco ou dos arquivos"""
+        if self._document is not None:
+            return self._document.load(self._create_default_progress,
+                                       legacy_loader=self._load_legacy_progress,
+                                       legacy_source=self.progress_file)
+        return self._load_progress_files()
+    
+    def _load_legacy_progress(self) -> Optional[Dict[str, Any]]:
+        """Lê snapshot + journal antigos para a migração (None se não existirem)"""
+        if not os.path.exists(self.progress_file) and not os.path.exists(self.journal_file):
+            return None
+        return self._load_progress_files()
+    
+    def _load_progress_files(self) -> Dict[str, Any]:
+        """Carrega o snapshot e reaplica os eventos do journal"""
+        progress = None
         if os.path.exists(self.progress_file):
             try:
                 with open(self.progress_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                    progress = json.load(f)
             except (json.JSONDecodeError, IOError):
-                return self._create_default_progress()
-        return self._create_default_progress()
+                progress = None
+        if progress is None:
+            progress = self._create_default_progress()
+        
+        self._journal_seq = progress.pop("journal_seq", 0)
+        self.progress_data = progress
+        self._replay_journal()
+        return self.progress_data
     
     def _create_default_progress(self) -> Dict[str, Any]:
         """Cria estrutura padrão de progresso"""
@@ -53,47 +111,208 @@ class ProgressManager:
             "total_time_spent": 0
         }
     
-    def save_progress(self) -> None:
-        """Salva o progresso no arquivo JSON"""
-        self.progress_data["last_access"] = datetime.now().isoformat()
+    # ------------------------------------------------------------------
+    # Journal de eventos
+    # ------------------------------------------------------------------
+    
+    def _replay_journal(self) -> None:
+        """Reaplica os eventos posteriores ao snapshot, descartando uma cauda corrompida"""
+        if not os.path.exists(self.journal_file):
+            return
+        
+        valid_bytes = 0
         try:
-            with open(self.progress_file, 'w', encoding='utf-8') as f:
-                json.dump(self.progress_data, f, indent=4, ensure_ascii=False)
+            with open(self.journal_file, 'rb') as f:
+                for raw_line in f:
+                    event = self._decode_event(raw_line)
+                    if event is None:
+                        break
+                    valid_bytes += len(raw_line)
+                    if event["seq"] <= self._journal_seq:
+                        continue
+                    self._apply_event(event["op"], event["args"])
+                    self._journal_seq = event["seq"]
+                    self._pending_events += 1
+            
+            # Remove a escrita parcial para que novos eventos não fiquem atrás dela
+            if valid_bytes < os.path.getsize(self.journal_file):
+                with open(self.journal_file, 'r+b') as f:
+                    f.truncate(valid_bytes)
         except IOError as e:
+            print(f"Erro ao ler journal de progresso: {e}")
+    
+    @staticmethod
+    def _encode_event(seq: int, op: str, args: Dict[str, Any]) -> bytes:
+        """Serializa um evento como '<crc32> <json>\\n'"""
+        payload = json.dumps({"seq": seq, "op": op, "args": args},
+                             ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        return b"%08x %s\n" % (zlib.crc32(payload), payload)
+    
+    @staticmethod
+    def _decode_event(raw_line: bytes) -> Optional[Dict[str, Any]]:
+        """Valida e decodifica uma linha do journal (None se estiver incompleta ou corrompida)"""
+        if not raw_line.endswith(b"\n") or len(raw_line) < 10:
+            return None
+        checksum, payload = raw_line[:8], raw_line[9:-1]
+        try:
+            if int(checksum, 16) != zlib.crc32(payload):
+                return None
+            return json.loads(payload.decode('utf-8'))
+        except (ValueError, UnicodeDecodeError):
+            return None
+    
+    def _record(self, op: str, **args: Any) -> None:
+        """Aplica uma alteração e a acrescenta ao journal"""
+        args.setdefault("ts", datetime.now().isoformat())
+        self._apply_event(op, args)
+        if self._document is not None:
+            self._document.save(self.progress_data)
+            return
+        
+        self._journal_seq += 1
+        self._pending_events += 1
+        
+        try:
+            if self._journal is None:
+                directory = os.path.dirname(self.journal_file)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._journal = open(self.journal_file, 'ab', buffering=0)
+            self._journal.write(self._encode_event(self._journal_seq, op, args))
+            
+            # fsync em lote: no máximo um por sync_interval
+            now = time.monotonic()
+            if now - self._last_sync >= self.sync_interval:
+                os.fsync(self._journal.fileno())
+                self._last_sync = now
+        except (IOError, OSError) as e:
             print(f"Erro ao salvar progresso: {e}")
+        
+        if self._pending_events >= self.compact_every:
+            self.save_progress()
     
-    def set_user_name(self, name: str) -> None:
-        """Define o nome do usuário"""
+    def _apply_event(self, op: str, args: Dict[str, Any]) -> None:
+        """Aplica um evento ao estado em memória (usado também no replay)"""
+        handler = getattr(self, f"_apply_{op}", None)
+        if handler is None:
+            return
+        handler(**args)
+        self.progress_data["last_access"] = args["ts"]
+    
+    def _apply_set_user_name(self, name: str, ts: str) -> None:
         self.progress_data["user_name"] = name
-        self.save_progress()
     
-    def mark_module_completed(self, module_id: str, score: int = 0) -> None:
-        """Marca um módulo como completo"""
+    def _apply_mark_module_completed(self, module_id: str, score: int, ts: str) -> None:
         if module_id not in self.progress_data["modules_completed"]:
             self.progress_data["modules_completed"].append(module_id)
         
         if module_id in self.progress_data["modules_progress"]:
             self.progress_data["modules_progress"][module_id]["completed"] = True
             self.progress_data["modules_progress"][module_id]["score"] = score
-            self.progress_data["modules_progress"][module_id]["last_access"] = datetime.now().isoformat()
+            self.progress_data["modules_progress"][module_id]["last_access"] = ts
         
         self.progress_data["total_score"] += score
-        self.save_progress()
     
-    def complete_module(self, module_id: str, score: int = 100) -> None:
-        """Alias para mark_module_completed - compatibilidade"""
-        self.mark_module_completed(module_id, score)
-    
-    def update_module_progress(self, module_id: str, time_spent: int = 0, attempts: int = 0) -> None:
-        """Atualiza o progresso de um módulo"""
+    def _apply_update_module_progress(self, module_id: str, time_spent: int, attempts: int, ts: str) -> None:
         if module_id in self.progress_data["modules_progress"]:
             module = self.progress_data["modules_progress"][module_id]
             module["time_spent"] += time_spent
             module["attempts"] += attempts
-            module["last_access"] = datetime.now().isoformat()
+            module["last_access"] = ts
         
         self.progress_data["total_time_spent"] += time_spent
-        self.save_progress()
+    
+    def _apply_add_achievement(self, name: str, ts: str) -> None:
+        self.progress_data["achievements"].append({"name": name, "date": ts})
+    
+    def _apply_mark_mini_project_completed(self, module_id: str, score: int, ts: str) -> None:
+        if module_id in self.progress_data["modules_progress"]:
+            self.progress_data["modules_progress"][module_id]["mini_projeto_completo"] = True
+            self.progress_data["modules_progress"][module_id]["mini_projeto_score"] = score
+            self.progress_data["modules_progress"][module_id]["last_access"] = ts
+        
+        # Adiciona à lista global de mini projetos completos
+        mini_projeto_key = f"{module_id}_mini_projeto"
+        if mini_projeto_key not in self.progress_data["mini_projetos_completos"]:
+            self.progress_data["mini_projetos_completos"].append(mini_projeto_key)
+        
+        self.progress_data["total_score"] += score
+    
+    def _apply_add_score(self, points: int, ts: str) -> None:
+        self.progress_data["total_score"] += points
+    
+    def _apply_add_time_spent(self, seconds: int, ts: str) -> None:
+        self.progress_data["total_time_spent"] += seconds
+    
+    def flush(self) -> None:
+        """Força o fsync dos eventos pendentes no journal"""
+        if self._journal is not None:
+            try:
+                os.fsync(self._journal.fileno())
+            except OSError as e:
+                print(f"Erro ao salvar progresso: {e}")
+            self._last_sync = time.monotonic()
+    
+    def close(self) -> None:
+        """Sincroniza e fecha o journal"""
+        self.flush()
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+    
+    def save_progress(self) -> None:
+        """Grava um snapshot completo (compactação) e esvazia o journal"""
+        self.progress_data["last_access"] = datetime.now().isoformat()
+        if self._document is not None:
+            # No banco só os campos alterados são regravados
+            self._document.save(self.progress_data)
+            return
+        
+        snapshot = dict(self.progress_data, journal_seq=self._journal_seq)
+        try:
+            directory = os.path.dirname(self.progress_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temp_file = f"{self.progress_file}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, indent=4, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, self.progress_file)
+            
+            # O snapshot já contém journal_seq: se cair aqui, o replay ignora os eventos antigos
+            if self._journal is not None:
+                self._journal.close()
+            self._journal = open(self.journal_file, 'wb', buffering=0)
+            self._pending_events = 0
+            self._last_sync = time.monotonic()
+        except (IOError, OSError) as e:
+            print(f"Erro ao salvar progresso: {e}")
+    
+    def set_user_name(self, name: str) -> None:
+        """Define o nome do usuário"""
+        self._record("set_user_name", name=name)
+    
+    def mark_module_completed(self, module_id: str, score: int = 0) -> None:
+        """Marca um módulo como completo"""
+        self._record("mark_module_completed", module_id=module_id, score=score)
+    
+    def complete_module(self, module_id: str, score: int = 100) -> None:
+        """Alias para mark_module_completed - compatibilidade"""
+        self.mark_module_completed(module_id, score)
+    
+    def update_module_progress(self, module_id: str, time_spent: int = 0, attempts: int = 0) -> None:
+        """Atualiza o progresso de um módulo"""
+        self._record("update_module_progress", module_id=module_id,
+                     time_spent=time_spent, attempts=attempts)
+    
+    def add_score(self, points: int) -> None:
+        """Soma pontos ao score total"""
+        self._record("add_score", points=points)
+    
+    def add_time_spent(self, seconds: int) -> None:
+        """Soma tempo de estudo (em segundos) ao total"""
+        self._record("add_time_spent", seconds=seconds)
     
     def get_completion_percentage(self) -> float:
         """Calcula a porcentagem de conclusão do curso"""
@@ -108,11 +327,7 @@ class ProgressManager:
     def add_achievement(self, achievement: str) -> None:
         """Adiciona uma conquista ao perfil do aluno"""
         if achievement not in self.progress_data["achievements"]:
-            self.progress_data["achievements"].append({
-                "name": achievement,
-                "date": datetime.now().isoformat()
-            })
-            self.save_progress()
+            self._record("add_achievement", name=achievement)
     
     def get_progress_summary(self) -> Dict[str, Any]:
         """Retorna um resumo do progresso"""
@@ -133,18 +348,7 @@ class ProgressManager:
     
     def mark_mini_project_completed(self, module_id: str, score: int = 50) -> None:
         """Marca mini projeto como completo"""
-        if module_id in self.progress_data["modules_progress"]:
-            self.progress_data["modules_progress"][module_id]["mini_projeto_completo"] = True
-            self.progress_data["modules_progress"][module_id]["mini_projeto_score"] = score
-            self.progress_data["modules_progress"][module_id]["last_access"] = datetime.now().isoformat()
-        
-        # Adiciona à lista global de mini projetos completos
-        mini_projeto_key = f"{module_id}_mini_projeto"
-        if mini_projeto_key not in self.progress_data["mini_projetos_completos"]:
-            self.progress_data["mini_projetos_completos"].append(mini_projeto_key)
-        
-        self.progress_data["total_score"] += score
-        self.save_progress()
+        self._record("mark_mini_project_completed", module_id=module_id, score=score)
     
     def get_mini_projects_completion_percentage(self) -> float:
         """Calcula porcentagem de mini projetos completos"""
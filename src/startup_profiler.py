@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Startup Profiler - Árvore de tempos da inicialização do curso
+
+Quando ativado (main.py --startup-report), registra cada import que carrega
+módulos novos e cada seção marcada (construtores, proxies lazy resolvidos),
+aninhados conforme acontecem na thread principal. Desativado, section() e
+timed() custam só uma verificação de flag.
+
+Só usa a biblioteca padrão: é importado antes de todo o resto.
+"""
+
+import builtins
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional
+
+
+class _Node:
+    """Nó da árvore de tempos"""
+
+    __slots__ = ("name", "start", "elapsed", "children")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = time.perf_counter()
+        self.elapsed = 0.0
+        self.children: List["_Node"] = []
+
+
+class StartupProfiler:
+    """Coleta tempos de imports e construtores em uma árvore"""
+
+    def __init__(self):
+        self.enabled = False
+        self.root = _Node("inicialização")
+        self._stack: List[_Node] = [self.root]
+        self._original_import: Optional[Callable] = None
+        self._main_thread = threading.main_thread().ident
+
+    def start(self) -> None:
+        """Ativa a coleta e intercepta os imports"""
+        if self.enabled:
+            return
+        self.enabled = True
+        self.root = _Node("inicialização")
+        self._stack = [self.root]
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._import
+
+    def stop(self) -> float:
+        """Desativa a coleta; retorna o tempo total em ms"""
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+        if self.enabled:
+            self.root.elapsed = time.perf_counter() - self.root.start
+            self.enabled = False
+        return self.root.elapsed * 1000
+
+    def _push(self, name: str) -> _Node:
+        node = _Node(name)
+        self._stack[-1].children.append(node)
+        self._stack.append(node)
+        return node
+
+    def _pop(self, node: _Node) -> None:
+        node.elapsed = time.perf_counter() - node.start
+        self._stack.pop()
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original = self._original_import
+        if threading.get_ident() != self._main_thread or original is None:
+            return original(name, globals, locals, fromlist, level)
+
+        if level and globals:
+            package = (globals.get("__package__") or "").rsplit(".", level - 1)[0]
+            name_label = f"{package}.{name}" if name else package
+        else:
+            name_label = name
+        label = f"import {name_label}"
+        if self._stack[-1].name == label:
+            # Reentrada do próprio mecanismo de import (fromlist)
+            return original(name, globals, locals, fromlist, level)
+        loaded_before = len(sys.modules)
+        node = self._push(label)
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            self._pop(node)
+            # Imports já em cache não interessam ao relatório
+            if len(sys.modules) == loaded_before:
+                self._stack[-1].children.remove(node)
+                self._stack[-1].children.extend(node.children)
+
+    @contextmanager
+    def section(self, name: str) -> Iterator[None]:
+        """Marca um trecho (construtor, carga lazy) na árvore"""
+        if not self.enabled or threading.get_ident() != self._main_thread:
+            yield
+            return
+        node = self._push(name)
+        try:
+            yield
+        finally:
+            self._pop(node)
+
+    def timed(self, factory: Callable, name: Optional[str] = None) -> Callable:
+        """Envolve um construtor/fábrica para que sua chamada apareça no relatório"""
+        label = name or f"{getattr(factory, '__name__', repr(factory))}()"
+
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with self.section(label):
+                return factory(*args, **kwargs)
+        return wrapper
+
+    def report(self, min_ms: float = 1.0) -> str:
+        """Árvore formatada (nós abaixo de min_ms são agrupados)"""
+        if self.enabled:
+            self.root.elapsed = time.perf_counter() - self.root.start
+        lines = ["⏱️  RELATÓRIO DE INICIALIZAÇÃO", "=" * 60]
+        self._format(self.root, 0, min_ms, lines)
+        return "\n".join(lines)
+
+    def _format(self, node: _Node, depth: int, min_ms: float, lines: List[str]) -> None:
+        lines.append(f"{node.elapsed * 1000:9.1f} ms  {'  ' * depth}{node.name}")
+        hidden = 0.0
+        hidden_count = 0
+        for child in node.children:
+            if child.elapsed * 1000 >= min_ms:
+                self._format(child, depth + 1, min_ms, lines)
+            else:
+                hidden += child.elapsed
+                hidden_count += 1
+        if hidden_count:
+            lines.append(f"{hidden * 1000:9.1f} ms  {'  ' * (depth + 1)}"
+                         f"(outros {hidden_count} itens < {min_ms:g} ms)")
+
+
+# Instância global (ativada por main.py --startup-report)
+startup_profiler = StartupProfiler()
@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Módulo de Armazenamento
+Banco SQLite único com o estado do aluno
+"""
+
+from .learner_store import LearnerStore, StateDocument, get_learner_store
+
+__all__ = [
+    'LearnerStore',
+    'StateDocument',
+    'get_learner_store'
+]
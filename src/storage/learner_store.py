@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Armazenamento do Aluno - Banco SQLite (WAL) único para todo o estado do curso
+Cada domínio (progresso, analytics, gamificação...) tem uma tabela de estado com
+uma linha por campo e uma tabela de histórico append-only para listas que só crescem
+"""
+
+import os
+import re
+import json
+import sqlite3
+import threading
+import atexit
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Callable, Iterable
+
+
+DEFAULT_DB_PATH = "data/learner_state.db"
+
+_DOMAIN_PATTERN = re.compile(r"^[a-z][a-z0-9_]*$")
+
+
+def _dumps(value: Any) -> str:
+    """Serialização estável (ordena chaves para detectar alterações pelo texto)"""
+    return json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+
+
+class LearnerStore:
+    """Banco SQLite compartilhado com tabelas por domínio"""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # Em WAL, NORMAL só sincroniza nos checkpoints: commits continuam atômicos
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS migrations (
+                domain TEXT PRIMARY KEY,
+                source TEXT,
+                migrated_at TEXT NOT NULL
+            )
+        """)
+        self._domains = set()
+
+    def ensure_domain(self, domain: str) -> None:
+        """Cria as tabelas de estado e histórico de um domínio"""
+        if domain in self._domains:
+            return
+        if not _DOMAIN_PATTERN.match(domain):
+            raise ValueError(f"Nome de domínio inválido: {domain!r}")
+
+        with self.lock:
+            self.conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {domain}_state (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+            self.conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {domain}_history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    stream TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+            """)
+            self.conn.execute(f"""
+                CREATE INDEX IF NOT EXISTS idx_{domain}_history_stream
+                ON {domain}_history(stream, id)
+            """)
+            self._domains.add(domain)
+
+    # ------------------------------------------------------------------
+    # Estado (uma linha por campo)
+    # ------------------------------------------------------------------
+
+    def load_state(self, domain: str) -> Dict[str, Any]:
+        """Carrega todos os campos de um domínio"""
+        self.ensure_domain(domain)
+        with self.lock:
+            rows = self.conn.execute(f"SELECT key, value FROM {domain}_state").fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def put(self, domain: str, key: str, value: Any) -> None:
+        """Grava um único campo"""
+        self.put_many(domain, {key: value})
+
+    def put_many(self, domain: str, values: Dict[str, Any], serialized: bool = False) -> None:
+        """Grava vários campos em uma única transação"""
+        if not values:
+            return
+        self.ensure_domain(domain)
+        now = datetime.now().isoformat()
+        rows = [(key, value if serialized else _dumps(value), now) for key, value in values.items()]
+        with self.lock:
+            with self.transaction():
+                self.conn.executemany(
+                    f"INSERT OR REPLACE INTO {domain}_state (key, value, updated_at) VALUES (?, ?, ?)",
+                    rows
+                )
+
+    def delete_keys(self, domain: str, keys: Iterable[str]) -> None:
+        """Remove campos de um domínio"""
+        self.ensure_domain(domain)
+        with self.lock:
+            with self.transaction():
+                self.conn.executemany(f"DELETE FROM {domain}_state WHERE key = ?", [(k,) for k in keys])
+
+    # ------------------------------------------------------------------
+    # Histórico (append-only)
+    # ------------------------------------------------------------------
+
+    def append(self, domain: str, stream: str, payload: Any) -> None:
+        """Acrescenta um item ao histórico"""
+        self.append_many(domain, stream, [payload])
+
+    def append_many(self, domain: str, stream: str, payloads: List[Any]) -> None:
+        """Acrescenta vários itens ao histórico em uma transação"""
+        if not payloads:
+            return
+        self.ensure_domain(domain)
+        now = datetime.now().isoformat()
+        with self.lock:
+            with self.transaction():
+                self.conn.executemany(
+                    f"INSERT INTO {domain}_history (stream, payload, created_at) VALUES (?, ?, ?)",
+                    [(stream, _dumps(payload), now) for payload in payloads]
+                )
+
+    def history(self, domain: str, stream: str, limit: Optional[int] = None) -> List[Any]:
+        """Retorna o histórico em ordem cronológica (os últimos `limit` itens)"""
+        self.ensure_domain(domain)
+        query = f"SELECT payload FROM {domain}_history WHERE stream = ? ORDER BY id DESC"
+        params: tuple = (stream,)
+        if limit is not None:
+            query += " LIMIT ?"
+            params = (stream, limit)
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+        return [json.loads(payload) for (payload,) in reversed(rows)]
+
+    def history_count(self, domain: str, stream: str) -> int:
+        """Quantidade de itens de um histórico"""
+        self.ensure_domain(domain)
+        with self.lock:
+            return self.conn.execute(
+                f"SELECT COUNT(*) FROM {domain}_history WHERE stream = ?", (stream,)
+            ).fetchone()[0]
+
+    def clear_domain(self, domain: str) -> None:
+        """Apaga estado e histórico de um domínio"""
+        self.ensure_domain(domain)
+        with self.lock:
+            with self.transaction():
+                self.conn.execute(f"DELETE FROM {domain}_state")
+                self.conn.execute(f"DELETE FROM {domain}_history")
+
+    # ------------------------------------------------------------------
+    # Migração dos arquivos JSON
+    # ------------------------------------------------------------------
+
+    def is_migrated(self, domain: str) -> bool:
+        """Verifica se o domínio já foi importado (ou criado) no banco"""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT 1 FROM migrations WHERE domain = ?", (domain,)
+            ).fetchone() is not None
+
+    def mark_migrated(self, domain: str, source: Optional[str]) -> None:
+        """
+        Registra que o domínio não deve mais ser lido dos arquivos antigos
+
+        Chame dentro da mesma transaction() da importação: se o processo
+        cair no meio, nem os dados nem o registro ficam gravados e a
+        importação é refeita do zero na próxima vez.
+        """
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO migrations (domain, source, migrated_at) VALUES (?, ?, ?)",
+                (domain, source, datetime.now().isoformat())
+            )
+
+    def transaction(self) -> "_Transaction":
+        """
+        Transação explícita (a conexão está em autocommit)
+
+        Segura o lock do banco até o fim. Transações aninhadas fazem parte
+        da externa: só ela grava (ou desfaz) tudo de uma vez.
+        """
+        return _Transaction(self)
+
+    def close(self) -> None:
+        """Fecha a conexão"""
+        with self.lock:
+            self.conn.close()
+
+
+class _Transaction:
+    """BEGIN/COMMIT com ROLLBACK em caso de erro (aninhada = parte da externa)"""
+
+    def __init__(self, store: LearnerStore):
+        self.store = store
+        self.conn = store.conn
+        self.outermost = False
+
+    def __enter__(self):
+        self.store.lock.acquire()
+        try:
+            self.outermost = not self.conn.in_transaction
+            if self.outermost:
+                self.conn.execute("BEGIN")
+        except BaseException:
+            self.store.lock.release()
+            raise
+        return self.conn
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            if self.outermost:
+                self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.store.lock.release()
+        return False
+
+
+class StateDocument:
+    """
+    Dicionário de estado persistido em um domínio do LearnerStore
+
+    Campos comuns viram uma linha cada e só são regravados quando mudam.
+    Campos de histórico são listas append-only: apenas os últimos
+    `history_window` itens ficam em memória.
+    """
+
+    def __init__(self, store: LearnerStore, domain: str,
+                 history_fields: Iterable[str] = (), history_window: int = 100):
+        self.store = store
+        self.domain = domain
+        self.history_fields = tuple(history_fields)
+        self.history_window = history_window
+        self._persisted: Dict[str, str] = {}
+
+    def load(self, default_factory: Callable[[], Dict[str, Any]],
+             legacy_loader: Optional[Callable[[], Optional[Dict[str, Any]]]] = None,
+             legacy_source: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Carrega o estado do banco, importando os dados antigos na primeira vez
+
+        Args:
+            default_factory: Estrutura padrão (campos ausentes no banco vêm daqui)
+            legacy_loader: Função que lê o formato antigo (None se não houver)
+            legacy_source: Descrição da origem antiga para o registro de migração
+        """
+        store = self.store
+        store.ensure_domain(self.domain)
+
+        # Importação e registro na mesma transação: uma queda no meio não
+        # deixa dados importados sem registro (que duplicaria o histórico)
+        with store.transaction():
+            if not store.is_migrated(self.domain):
+                legacy = legacy_loader() if legacy_loader else None
+                if legacy:
+                    self._import(legacy)
+                store.mark_migrated(self.domain, legacy_source if legacy else None)
+
+        data = default_factory()
+        stored = store.load_state(self.domain)
+        data.update(stored)
+        for field in self.history_fields:
+            data[field] = store.history(self.domain, field, limit=self.history_window)
+
+        self._persisted = {key: _dumps(value) for key, value in stored.items()}
+        return data
+
+    def _import(self, legacy: Dict[str, Any]) -> None:
+        """Copia um estado no formato antigo para o banco"""
+        for field in self.history_fields:
+            items = legacy.get(field) or []
+            if isinstance(items, list):
+                self.store.append_many(self.domain, field, items)
+        self.store.put_many(self.domain, {
+            key: value for key, value in legacy.items() if key not in self.history_fields
+        })
+
+    def save(self, data: Dict[str, Any]) -> int:
+        """
+        Grava apenas os campos alterados desde o último save
+
+        Returns:
+            Quantidade de linhas gravadas
+        """
+        changed = {}
+        for key, value in data.items():
+            if key in self.history_fields:
+                continue
+            serialized = _dumps(value)
+            if self._persisted.get(key) != serialized:
+                changed[key] = serialized
+
+        if changed:
+            self.store.put_many(self.domain, changed, serialized=True)
+            self._persisted.update(changed)
+        return len(changed)
+
+    def append(self, data: Dict[str, Any], field: str, item: Any) -> None:
+        """Acrescenta um item ao histórico (banco + janela em memória)"""
+        self.store.append(self.domain, field, item)
+        items = data.setdefault(field, [])
+        items.append(item)
+        if len(items) > self.history_window:
+            del items[:len(items) - self.history_window]
+
+    def reset(self) -> None:
+        """Apaga o domínio inteiro"""
+        self.store.clear_domain(self.domain)
+        self._persisted = {}
+
+
+_learner_store: Optional[LearnerStore] = None
+_learner_store_lock = threading.Lock()
+
+
+def get_learner_store() -> LearnerStore:
+    """Retorna o banco compartilhado do aluno"""
+    global _learner_store
+    with _learner_store_lock:
+        if _learner_store is None:
+            _learner_store = LearnerStore()
+            atexit.register(_learner_store.close)
+        return _learner_store
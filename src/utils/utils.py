@@ -9,6 +9,11 @@ Funções auxiliares para interface e interação com o usuário
 import os
 from typing import Optional, Dict, Any, Union, List
 
+try:
+    from ..execution import get_execution_service, console_input_handler
+except ImportError:
+    from execution import get_execution_service, console_input_handler
+
 
 class PythonCourseUtils:
     """Classe com utilitários para o curso de Python"""
@@ -51,19 +56,26 @@ class PythonCourseUtils:
         """Executa um código e mostra o resultado com ajuda para erros"""
         print("\n▶️  EXECUTANDO:")
         print("-" * 40)
-        try:
-            if namespace is None:
-                namespace = {}
-            exec(codigo, namespace)
-        except Exception as e:
-            print(f"❌ Erro: {e}")
+        # Executa em um worker isolado; variáveis serializáveis voltam para o namespace
+        result = get_execution_service().run(
+            codigo,
+            input_handler=console_input_handler,
+            namespace=namespace,
+            capture_namespace=namespace is not None
+        )
+        print(result.remaining_stdout, end='')
+        if namespace is not None:
+            namespace.update(result.namespace)
+        
+        if not result.success:
+            print(f"❌ Erro: {result.error_message}")
             
             # Oferece ajuda automática para erros
             if ajuda_erros:
                 try:
                     from ..tutor_assistant import ErrorHelper
                     helper = ErrorHelper()
-                    helper.ajudar_com_erro(codigo, e)
+                    helper.ajudar_com_erro(codigo, result.rebuild_exception())
                 except:
                     # Se não conseguir carregar o helper, ignora
                     pass
@@ -187,7 +199,6 @@ class PythonCourseUtils:
         if resultado and self.gamification_system:
             self.gamification_system.award_xp(pontos, "Exercício correto")
             if self.progress_manager:
-                self.progress_manager.progress_data["total_score"] += pontos
-                self.progress_manager.save_progress()
+                self.progress_manager.add_score(pontos)
         
         return resultado
\ No newline at end of file
@@ -14,6 +14,8 @@ from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 import traceback
 
+from .execution import get_execution_service
+
 
 class VariableTracker:
     """Rastreador de variáveis durante execução"""
@@ -589,21 +591,14 @@ class DebugSession:
         code = '\n'.join(code_lines)
         expected = input("\nSaída esperada: ")
         
-        # Executa código e captura saída
-        import io
-        import contextlib
-        
-        output_buffer = io.StringIO()
+        # Executa código no sandbox e captura saída
+        result = get_execution_service().run(code)
         
-        try:
-            with contextlib.redirect_stdout(output_buffer):
-                exec(code)
-            actual = output_buffer.getvalue().strip()
-            
+        if result.success:
+            actual = result.stdout.strip()
             self.comparer.compare_outputs(expected, actual, code)
-        
-        except Exception as e:
-            print(f"\n❌ Erro na execução: {e}")
+        else:
+            print(f"\n❌ Erro na execução: {result.error_message}")
     
     def _visual_code_test(self) -> None:
         """Teste de código com visualização"""
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes para o armazenamento colunar das sessões do AdvancedAnalytics
+"""
+
+import unittest
+import os
+import json
+import tempfile
+import sys
+from datetime import datetime, timedelta
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.analytics.advanced_analytics import AdvancedAnalytics, StudySession
+
+
+def make_session(days_ago: float, module: str, duration: float, score: float) -> StudySession:
+    """Sessão encerrada `days_ago` dias atrás"""
+    start = datetime.now() - timedelta(days=days_ago)
+    return StudySession(
+        start_time=start,
+        end_time=start + timedelta(minutes=duration),
+        module_id=module,
+        topic=f"{module}_topic",
+        duration_minutes=duration,
+        exercises_completed=2,
+        errors_made=1,
+        score=score,
+        difficulty_level=3,
+        session_type="study"
+    )
+
+
+class TestSessionColumns(unittest.TestCase):
+    """Testes para consultas e persistência das sessões"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.analytics = AdvancedAnalytics(data_dir=self.temp_dir.name)
+        self.sessions = [
+            make_session(40, "modulo_1", 30, 70),
+            make_session(10, "modulo_2", 20, 80),
+            make_session(2, "modulo_1", 15, 0),
+            make_session(5, "modulo_3", 45, 90),
+            make_session(1, "modulo_2", 10, 60),
+        ]
+        for session in self.sessions:
+            self.analytics.add_session(session)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_window_aggregates_match_full_scan(self):
+        """Agregações por período devem bater com a varredura da lista"""
+        cutoff = datetime.now() - timedelta(days=30)
+        expected = {}
+        for session in self.sessions:
+            if session.start_time >= cutoff:
+                expected[session.module_id] = expected.get(session.module_id, 0) + session.duration_minutes
+
+        self.assertEqual(self.analytics.get_time_by_module(30), expected)
+        self.assertEqual(self.analytics.get_time_by_topic("modulo_2", 30), {"modulo_2_topic": 30})
+
+        metrics = self.analytics.get_learning_metrics(30)
+        self.assertEqual(metrics.total_study_time, 90)
+        self.assertEqual(metrics.modules_completed, 3)
+        self.assertAlmostEqual(metrics.average_score, (80 + 90 + 60) / 3)
+
+    def test_rollups_match_sessions(self):
+        """Rollups diários e semanais somam o mesmo que as sessões"""
+        rollups = self.analytics.sessions.rollups
+        self.assertEqual(sum(b["sessions"] for b in rollups.daily.values()), len(self.sessions))
+        self.assertAlmostEqual(sum(b["time"] for b in rollups.weekly.values()),
+                               sum(s.duration_minutes for s in self.sessions))
+
+        weeks = self.analytics.get_weekly_summaries(8)
+        self.assertEqual(len(weeks), 8)
+        today = datetime.now().date()
+        first_monday = today - timedelta(weeks=7, days=today.weekday())
+        self.assertEqual(sum(w["sessions"] for w in weeks),
+                         sum(1 for s in self.sessions if s.start_time.date() >= first_monday))
+
+    def test_logged_errors_are_rolled_up_and_persisted(self):
+        """log_error atualiza os rollups e sobrevive ao recarregar"""
+        self.analytics.log_error("syntax", "faltou dois pontos", "modulo_1", "if")
+        self.analytics.log_error("syntax", "parêntese aberto", "modulo_1", "if")
+        self.assertEqual(self.analytics.generate_weekly_report()["summary"]["errors"], 2)
+
+        reloaded = AdvancedAnalytics(data_dir=self.temp_dir.name)
+        today = reloaded.sessions.rollups.daily[datetime.now().date().isoformat()]
+        self.assertEqual(today["error_types"], {"syntax": 2})
+        self.assertEqual(reloaded.sessions.rollups.to_dict(), self.analytics.sessions.rollups.to_dict())
+
+    def test_sessions_are_kept_sorted(self):
+        """Sessões retroativas são inseridas na ordem de início"""
+        starts = [session.start_time for session in self.analytics.study_sessions]
+        self.assertEqual(starts, sorted(starts))
+        self.assertEqual(len(self.analytics.get_sessions(datetime.now() - timedelta(days=7))), 3)
+
+    def test_reload_from_snapshot_and_tail(self):
+        """Snapshot binário + cauda devem reconstruir as mesmas sessões"""
+        self.analytics.session_store.compact(self.analytics.sessions)
+        self.analytics.add_session(make_session(0.5, "modulo_4", 25, 75))
+        self.assertTrue(os.path.exists(self.analytics.session_store.tail_file))
+
+        reloaded = AdvancedAnalytics(data_dir=self.temp_dir.name)
+        self.assertEqual(reloaded.study_sessions, self.analytics.study_sessions)
+        self.assertFalse(os.path.exists(reloaded.session_store.tail_file))
+
+    def test_clear_history_persists(self):
+        """Limpar o histórico também apaga as sessões do disco"""
+        self.analytics.clear_history()
+        reloaded = AdvancedAnalytics(data_dir=self.temp_dir.name)
+        self.assertEqual(len(reloaded.sessions), 0)
+
+    def test_imports_legacy_json(self):
+        """O study_sessions.json antigo é importado na primeira carga"""
+        legacy_dir = os.path.join(self.temp_dir.name, "legacy")
+        os.makedirs(legacy_dir)
+        session = make_session(3, "modulo_1", 12, 50)
+        data = dict(session.__dict__)
+        data["start_time"] = session.start_time.isoformat()
+        data["end_time"] = session.end_time.isoformat()
+        with open(os.path.join(legacy_dir, "study_sessions.json"), 'w', encoding='utf-8') as f:
+            json.dump([data], f)
+
+        analytics = AdvancedAnalytics(data_dir=legacy_dir)
+        self.assertEqual(analytics.study_sessions, [session])
+        self.assertTrue(os.path.exists(analytics.session_store.snapshot_file))
+
+
+if __name__ == '__main__':
+    unittest.main()
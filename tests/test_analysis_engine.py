@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes para o Engine de Análise de Código
+"""
+
+import unittest
+import ast
+import os
+import io
+import json
+import sys
+import tempfile
+import threading
+import time
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.code_review.analysis_engine import CodeAnalysisEngine, CodeIssue, IssueType, Severity
+from src.code_review.incremental_analysis import IncrementalAnalyzer
+from src.code_review.tree_review import TreeReviewer
+
+
+class TestCodeAnalysisEngine(unittest.TestCase):
+    """Testes para a classe CodeAnalysisEngine"""
+    
+    def setUp(self):
+        self.engine = CodeAnalysisEngine()
+    
+    def _rule_ids(self, code: str):
+        return [issue['rule_id'] for issue in self.engine.analyze_code(code)['issues']]
+    
+    def test_unnecessary_keys_uses_parent(self):
+        """Testa que P103 detecta .keys() em loops e comparações"""
+        code = "dados = {}\nfor chave in dados.keys():\n    print(chave)\nprint('a' in dados.keys())\n"
+        self.assertEqual(self._rule_ids(code).count("P103"), 2)
+    
+    def test_concatenation_in_nested_loops_reported_once(self):
+        """Testa que += em loops aninhados gera um único issue"""
+        code = "texto = ''\nfor i in range(3):\n    for j in range(3):\n        texto += 'a'\n"
+        self.assertEqual(self._rule_ids(code).count("P101"), 1)
+    
+    def test_metrics_from_single_pass(self):
+        """Testa métricas calculadas durante a travessia"""
+        code = (
+            "import os\n\n"
+            "class Conta:\n"
+            "    \"\"\"Conta bancária\"\"\"\n\n"
+            "    def sacar(self, valor):\n"
+            "        if valor > 0 and valor < 100:\n"
+            "            return valor\n"
+            "        return 0\n"
+        )
+        metrics = self.engine.analyze_code(code)['metrics']
+        self.assertEqual(metrics['functions'], 1)
+        self.assertEqual(metrics['classes'], 1)
+        self.assertEqual(metrics['imports'], 1)
+        self.assertEqual(metrics['cyclomatic_complexity'], 3)
+        self.assertEqual(metrics['documentation_coverage'], 0.5)
+    
+    def test_register_custom_rule(self):
+        """Testa registro de uma regra extra"""
+        def no_print(node, ctx):
+            if isinstance(node.func, ast.Name) and node.func.id == 'print':
+                ctx.add_issue(CodeIssue(
+                    line=node.lineno, column=node.col_offset,
+                    issue_type=IssueType.STYLE, severity=Severity.LOW,
+                    message="print() encontrado", suggestion="Use logging",
+                    rule_id="X001"
+                ))
+        
+        self.engine.register_rule("logic", (ast.Call,), no_print)
+        self.assertIn("X001", self._rule_ids("print('oi')\n"))
+
+
+
+class TestIncrementalAnalyzer(unittest.TestCase):
+    """Testes para a reanálise incremental"""
+    
+    CODE = (
+        '"""Módulo de exemplo"""\n\n'
+        "def soma(a, b):\n"
+        "    return a + b\n\n\n"
+        "def divide(a, b):\n"
+        "    try:\n"
+        "        return a / b\n"
+        "    except:\n"
+        "        return None\n\n\n"
+        "class Conta:\n"
+        "    def saldo(self):\n"
+        "        return eval('0')\n"
+    )
+    
+    @staticmethod
+    def _summary(result):
+        issues = sorted((i['rule_id'], i['line'], i['message']) for i in result['issues'])
+        metrics = {k: v for k, v in result['metrics'].items() if k != 'analysis_time'}
+        return issues, metrics, result['quality_score']['overall_score']
+    
+    def test_matches_full_analysis_after_edit(self):
+        """Testa que o resultado incremental é igual ao da análise completa"""
+        analyzer = IncrementalAnalyzer(CodeAnalysisEngine())
+        analyzer.analyze(self.CODE)
+        
+        edited = self.CODE.replace("def soma(a, b):\n", "import os\n\n\ndef soma(a, b):\n    x = 1\n")
+        incremental = analyzer.analyze(edited)
+        full = CodeAnalysisEngine().analyze_code(edited)
+        
+        self.assertEqual(self._summary(incremental), self._summary(full))
+        self.assertEqual(analyzer.reused_units, 3)
+    
+    def test_syntax_error_falls_back(self):
+        """Testa que código inválido usa a análise completa"""
+        analyzer = IncrementalAnalyzer(CodeAnalysisEngine())
+        analyzer.analyze(self.CODE)
+        result = analyzer.analyze(self.CODE.replace("return a + b", "return a +"))
+        self.assertFalse(result['syntax_valid'])
+
+
+
+class TestTreeReviewer(unittest.TestCase):
+    """Testes para o review de diretório"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.project = os.path.join(self.temp_dir.name, "projeto")
+        os.makedirs(os.path.join(self.project, "pacote"))
+        self._write("main.py", "from pacote import util\nprint(util.dobro(2))\n")
+        self._write("pacote/util.py", "def dobro(x):\n    return x * 2\n")
+        self._write("pacote/quebrado.py", "def f(:\n")
+        self.cache_file = os.path.join(self.temp_dir.name, "cache.json")
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def _write(self, relative, content):
+        with open(os.path.join(self.project, relative), 'w', encoding='utf-8') as f:
+            f.write(content)
+    
+    def test_only_changed_files_are_reanalyzed(self):
+        """Testa que arquivos inalterados vêm do cache entre execuções"""
+        report = TreeReviewer(workers=1, cache_file=self.cache_file).review_tree(self.project)
+        self.assertEqual(report['total_files'], 3)
+        self.assertEqual(report['analyzed_files'], 3)
+        self.assertEqual(report['syntax_errors'], [os.path.join("pacote", "quebrado.py")])
+        
+        self._write("pacote/util.py", "def dobro(x):\n    return eval('x * 2')\n")
+        report = TreeReviewer(workers=1, cache_file=self.cache_file).review_tree(self.project)
+        self.assertEqual(report['analyzed_files'], 1)
+        self.assertEqual(report['cached_files'], 2)
+        self.assertIn("S307", [issue['rule_id'] for issue in report['files'][os.path.join("pacote", "util.py")]['issues']])
+    
+    def test_default_cache_is_under_data_directory(self):
+        """O cache padrão fica em data/ do curso, não no diretório de onde foi lançado"""
+        data_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data'))
+        previous = os.getcwd()
+        os.chdir(self.project)
+        try:
+            reviewer = TreeReviewer(workers=1)
+        finally:
+            os.chdir(previous)
+        self.assertEqual(os.path.dirname(reviewer.cache_file), data_dir)
+        self.assertNotIn(".code_review_cache.json", os.listdir(self.project))
+    
+    def test_concurrent_saves_use_separate_temp_files(self):
+        """Dois reviewers gravando o mesmo cache ao mesmo tempo não se atrapalham"""
+        directory = os.path.join(self.temp_dir.name, "concorrente")
+        cache_file = os.path.join(directory, "cache.json")
+        reviewers = [TreeReviewer(workers=1, cache_file=cache_file) for _ in range(2)]
+        for number, reviewer in enumerate(reviewers):
+            reviewer.cache[f"chave_{number}"] = {"issues": []}
+        
+        real_replace = os.replace
+        
+        def slow_replace(source, target):
+            # Pausa antes de trocar: a outra thread grava o temporário nesse meio tempo
+            time.sleep(0.05)
+            real_replace(source, target)
+        
+        output = io.StringIO()
+        threads = [threading.Thread(target=reviewer.save_cache) for reviewer in reviewers]
+        with patch("src.code_review.tree_review.os.replace", slow_replace), redirect_stdout(output):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        
+        self.assertEqual(output.getvalue(), "")
+        self.assertEqual(os.listdir(directory), ["cache.json"])
+        with open(cache_file, encoding='utf-8') as f:
+            self.assertEqual(len(json.load(f)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
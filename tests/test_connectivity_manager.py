@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes para as sondas paralelas do ConnectivityManager
+"""
+
+import unittest
+import os
+import socket
+import time
+import threading
+import subprocess
+import sys
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.offline.connectivity_manager import ConnectivityManager, ConnectionStatus, TcpProbe
+
+
+def slow_probe(timeout):
+    time.sleep(timeout)
+    raise OSError("sem resposta")
+
+
+def failing_probe(timeout):
+    raise OSError("rede inacessível")
+
+
+class TestConnectivityManager(unittest.TestCase):
+    """Testes com um servidor TCP local como alvo das sondas"""
+
+    def setUp(self):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen()
+        self.port = self.server.getsockname()[1]
+
+        closed = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        closed.bind(("127.0.0.1", 0))
+        self.closed_port = closed.getsockname()[1]
+        closed.close()
+
+    def tearDown(self):
+        self.server.close()
+
+    def make_manager(self, probes, **kwargs):
+        manager = ConnectivityManager(probes=probes, **kwargs)
+        manager.timeout_seconds = 2
+        return manager
+
+    def test_first_success_short_circuits(self):
+        """Uma sonda local responde e a verificação não espera a lenta"""
+        manager = self.make_manager([slow_probe, TcpProbe("127.0.0.1", self.port)])
+        start = time.monotonic()
+        self.assertEqual(manager.check_connectivity(), ConnectionStatus.ONLINE)
+        self.assertLess(time.monotonic() - start, 1)
+
+    def test_all_failures_are_offline_without_waiting(self):
+        """Falhas rápidas decidem offline sem esperar o timeout"""
+        manager = self.make_manager([TcpProbe("127.0.0.1", self.closed_port), failing_probe])
+        start = time.monotonic()
+        self.assertEqual(manager.check_connectivity(), ConnectionStatus.OFFLINE)
+        self.assertLess(time.monotonic() - start, 1)
+
+    def test_quorum_not_reached_is_limited(self):
+        """Alguns sucessos abaixo do quorum indicam conexão limitada"""
+        manager = self.make_manager([TcpProbe("127.0.0.1", self.port), failing_probe, failing_probe],
+                                    quorum=2)
+        self.assertEqual(manager.check_connectivity(), ConnectionStatus.LIMITED)
+
+    def test_stuck_probe_does_not_block_exit(self):
+        """Uma sonda que nunca responde não segura a saída do programa"""
+        script = (
+            "import time\n"
+            "from src.offline.connectivity_manager import ConnectivityManager, ConnectionStatus\n"
+            "manager = ConnectivityManager(probes=[lambda timeout: time.sleep(60)])\n"
+            "manager.timeout_seconds = 0.2\n"
+            "assert manager.check_connectivity() == ConnectionStatus.OFFLINE\n"
+        )
+        root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+        start = time.monotonic()
+        subprocess.run([sys.executable, "-c", script], cwd=root, check=True, timeout=30)
+        self.assertLess(time.monotonic() - start, 10)
+
+    def test_is_online_never_blocks(self):
+        """is_online usa o resultado em cache e renova em segundo plano"""
+        changed = threading.Event()
+        manager = self.make_manager([lambda timeout: (time.sleep(0.3), 1.0)[1]], verdict_ttl=60)
+        manager.add_observer(lambda event: changed.set())
+
+        start = time.monotonic()
+        self.assertFalse(manager.is_online())
+        self.assertLess(time.monotonic() - start, 0.1)
+
+        self.assertTrue(changed.wait(2))
+        self.assertTrue(manager.is_online())
+
+
+if __name__ == '__main__':
+    unittest.main()
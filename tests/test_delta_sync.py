@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes para o envio de diferenças da sincronização offline
+"""
+
+import unittest
+import os
+import copy
+import tempfile
+import sys
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.offline.delta_sync import DeltaEncoder, LocalSyncServer, apply_patch, diff
+
+
+def make_progress():
+    return {
+        "total_score": 0,
+        "modules_completed": [],
+        "modules_progress": {
+            f"modulo_{i}": {"completed": False, "score": 0, "attempts": 0, "last_access": None}
+            for i in range(1, 31)
+        },
+        "total_time_spent": 0
+    }
+
+
+class TestDeltaSync(unittest.TestCase):
+    """Testes para diff/patch, fallback para snapshot e bases persistidas"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.server = LocalSyncServer()
+        self.encoder = DeltaEncoder(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_diff_roundtrip(self):
+        """apply_patch(base, diff(base, alvo)) reconstrói o alvo"""
+        base = {"a/b": 1, "til~de": [1, 2, 3], "fica": {"x": True}, "sai": None, "tipo": 1}
+        target = {"a/b": 2, "til~de": [1, 5], "fica": {"x": True, "y": [{}]}, "tipo": "1",
+                  "lista": [1, 2]}
+        patch = diff(base, target)
+        self.assertEqual(apply_patch(base, patch), target)
+        self.assertEqual(apply_patch(target, diff(target, base)), base)
+        self.assertEqual(diff(base, copy.deepcopy(base)), [])
+
+    def test_edit_sends_only_the_change(self):
+        """Depois do primeiro snapshot, uma edição envia só o patch"""
+        progress = make_progress()
+        first = self.encoder.push("progress", progress, self.server)
+        self.assertEqual(first["mode"], "snapshot")
+
+        progress["modules_progress"]["modulo_7"]["score"] = 90
+        progress["modules_completed"].append("modulo_7")
+        second = self.encoder.push("progress", progress, self.server)
+
+        self.assertEqual(second["mode"], "delta")
+        self.assertLess(second["bytes"] * 10, first["bytes"])
+        self.assertEqual(self.server.get_document("progress"), progress)
+        self.assertEqual(self.encoder.push("progress", progress, self.server)["mode"], "unchanged")
+
+    def test_unknown_base_falls_back_to_snapshot(self):
+        """Servidor sem a base (reiniciado) recebe o snapshot completo"""
+        progress = make_progress()
+        self.encoder.push("progress", progress, self.server)
+
+        restarted = LocalSyncServer()
+        progress["total_score"] = 10
+        result = self.encoder.push("progress", progress, restarted)
+        self.assertEqual(result["mode"], "snapshot")
+        self.assertEqual(restarted.get_document("progress"), progress)
+
+    def test_base_survives_restart(self):
+        """A base confirmada fica em disco e é usada por um novo encoder"""
+        settings = {"tema": "escuro", "idioma": "pt"}
+        self.encoder.push("settings", settings, self.server)
+
+        reopened = DeltaEncoder(self.temp_dir.name)
+        settings["tema"] = "claro"
+        result = reopened.push("settings", settings, self.server)
+        self.assertEqual((result["mode"], result["version"]), ("delta", 2))
+        self.assertEqual(self.server.get_document("settings"), settings)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes para o índice de busca do glossário
+"""
+
+import unittest
+import os
+import json
+import time
+import random
+import tempfile
+import sys
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.glossary import Glossary
+from src.glossary_index import GlossaryIndex, fold, tokenize
+from src.performance import TieredCache
+
+GLOSSARY_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'glossary.json')
+
+
+class TestGlossaryIndex(unittest.TestCase):
+    """Testes para tokens sem acento, prefixos, trigramas e módulos"""
+
+    def setUp(self):
+        with open(GLOSSARY_FILE, encoding='utf-8') as f:
+            self.terms = json.load(f)['termos']
+        self.terms['dicionário'] = {
+            "definicao": "Coleção de pares chave-valor, com busca rápida pela chave.",
+            "exemplo": "idades = {'Ana': 25}",
+            "modulos_relacionados": ["modulo_12"]
+        }
+        self.index = GlossaryIndex(self.terms)
+
+    def test_fold_removes_accents_and_case(self):
+        """Acentos e maiúsculas não importam"""
+        self.assertEqual(fold("Função"), "funcao")
+        self.assertEqual(tokenize("Concatenação de STRINGS"), ["concatenacao", "de", "strings"])
+
+    def test_exact_name_ranks_first(self):
+        """O termo com o nome buscado vem antes dos que só o citam"""
+        self.assertEqual(self.index.search("função")[0], "funcao")
+        results = self.index.search("lista")
+        self.assertEqual(results[0], "lista")
+        self.assertIn("append", results)
+
+    def test_typos_are_corrected(self):
+        """Trigramas acham o termo mesmo com letras faltando ou trocadas"""
+        self.assertEqual(self.index.search("dicionaro")[0], "dicionário")
+        self.assertEqual(self.index.search("variavl")[0], "variavel")
+        self.assertEqual(self.index.search("concatenasao")[0], "concatenacao")
+
+    def test_typeahead(self):
+        """O autocompletar sugere pelo começo do nome"""
+        self.assertEqual(self.index.complete("dic"), ["dicionário"])
+        self.assertEqual(self.index.complete("f"), ["for", "float", "funcao"])
+        self.assertEqual(self.index.complete("zzz"), [])
+
+    def test_definition_words_and_modules(self):
+        """Busca nas definições e mapa módulo -> termos"""
+        self.assertEqual(self.index.search_definition("memór"), ["variavel"])
+        self.assertEqual(self.index.search_definition("pares chave"), ["dicionário"])
+        self.assertEqual(self.index.terms_for_module("modulo_12"), ["dicionário"])
+
+    def test_replacing_a_term_updates_every_structure(self):
+        """Substituir ou remover um termo não deixa rastros no índice"""
+        self.index.add("dicionário", {"definicao": "Mapa de chaves.", "exemplo": "{}",
+                                      "modulos_relacionados": ["modulo_13"]})
+        self.assertEqual(self.index.search_definition("pares"), [])
+        self.assertEqual(self.index.terms_for_module("modulo_12"), [])
+        self.assertEqual(self.index.terms_for_module("modulo_13"), ["dicionário"])
+
+        self.assertTrue(self.index.remove("dicionário"))
+        self.assertNotIn("dicionário", self.index.search("dicionario"))
+        self.assertEqual(self.index.complete("dic"), [])
+        self.assertNotIn("dicionario", self.index.correct("dicionaro"))
+        self.assertEqual(self.index.search_definition("mapa"), [])
+
+    def test_thousands_of_terms_stay_sub_millisecond(self):
+        """Com milhares de termos as consultas continuam abaixo de 1 ms"""
+        rng = random.Random(3)
+        syllables = ["ba", "ce", "di", "fo", "gu", "la", "me", "ni", "po", "ru", "sa", "te", "vi", "xo",
+                     "bra", "cre", "pri", "tro", "ção", "lhe", "nha", "quê"]
+        vocabulary = sorted({"".join(rng.choice(syllables) for _ in range(rng.randint(2, 4)))
+                             for _ in range(8000)})
+        terms = dict(self.terms)
+        for number in range(3000):
+            name = f"{rng.choice(vocabulary)} {number}"
+            terms[name] = {"definicao": " ".join(rng.choices(vocabulary, k=15)),
+                           "exemplo": f"x = {number}", "modulos_relacionados": [f"modulo_{number % 35}"]}
+        index = GlossaryIndex(terms)
+
+        queries = ["dicionaro", "dicionário", "variavel", "lista", "memória do computador", "zzzz"]
+        start = time.perf_counter()
+        for _ in range(20):
+            for query in queries:
+                index.search(query)
+                index.complete(query[:3])
+        elapsed = (time.perf_counter() - start) / (20 * len(queries) * 2)
+
+        self.assertEqual(index.search("dicionaro")[0], "dicionário")
+        self.assertLess(elapsed, 0.001)
+
+
+class TestGlossary(unittest.TestCase):
+    """Testes para o Glossary usando o índice"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file = os.path.join(self.temp_dir.name, "glossary.json")
+        with open(GLOSSARY_FILE, encoding='utf-8') as f:
+            data = json.load(f)
+        with open(self.file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        self.glossary = Glossary(self.file, cache=TieredCache(l2_factory=None))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_queries_use_the_index(self):
+        """Busca, definição e módulos respondem como antes, sem varrer os termos"""
+        self.assertEqual(self.glossary.get_terms_for_module("modulo_3"),
+                         sorted(term for term, info in self.glossary.terms.items()
+                                if "modulo_3" in info.get("modulos_relacionados", [])))
+        self.assertIn("variavel", self.glossary.search_definition("memória"))
+        self.assertEqual(self.glossary.search("varivel")[0], "variavel")
+        self.assertEqual(self.glossary.suggest("con"), ["continue", "concatenacao"])
+
+    def test_added_term_is_searchable_and_cached(self):
+        """Termos novos entram no índice e a versão nova do arquivo reaproveita o índice"""
+        self.glossary.add_term("Dicionário", "Coleção de pares chave-valor.", "d = {}", ["modulo_12"])
+        self.assertEqual(self.glossary.search("dicionaro")[0], "dicionário")
+        self.assertEqual(self.glossary.get_terms_for_module("modulo_12"), ["dicionário"])
+
+        reloaded = Glossary(self.file, cache=self.glossary._cache)
+        self.assertIs(reloaded.index, self.glossary.index)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes para o IntelligentCacheManager
+"""
+
+import unittest
+import os
+import sys
+import time
+import threading
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.performance.intelligent_cache import IntelligentCacheManager, estimate_size
+
+
+class TestIntelligentCacheManager(unittest.TestCase):
+    """Testes para LRU, expiração e operações em lote"""
+
+    def test_evicts_least_recently_used(self):
+        """A entrada menos usada recentemente sai primeiro"""
+        cache = IntelligentCacheManager(max_size_mb=300 / (1024 * 1024), shards=1)
+        cache.set("a", 1, size=100)
+        cache.set("b", 2, size=100)
+        cache.set("c", 3, size=100)
+        cache.get("a")
+        cache.set("d", 4, size=100)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.batch_get(["a", "c", "d"]), {"a": 1, "c": 3, "d": 4})
+        self.assertEqual(cache.get_stats()["evictions"], 1)
+        self.assertEqual(cache.current_size_bytes, 300)
+
+    def test_value_larger_than_a_shard_evicts_across_shards(self):
+        """Valor maior que a fatia é cacheado e o total continua dentro do orçamento"""
+        cache = IntelligentCacheManager(max_size_mb=800 / (1024 * 1024), shards=2)
+        for index in range(6):
+            cache.set(f"k{index}", index, size=100)
+
+        self.assertTrue(cache.set("grande", "g", size=500))
+        self.assertEqual(cache.get("grande"), "g")
+        self.assertLessEqual(cache.current_size_bytes, 800)
+        for shard in cache.shards:
+            self.assertLessEqual(shard.current_size_bytes, shard.capacity())
+
+        # Voltando a caber na fatia, a chave sai das entradas grandes e a reserva é devolvida
+        self.assertTrue(cache.set("grande", "p", size=50))
+        self.assertEqual(cache.get("grande"), "p")
+        self.assertEqual(cache.get_stats()["large_entries"], 0)
+        self.assertEqual([shard.capacity() for shard in cache.shards], [400, 400])
+
+        stats = cache.get_stats()
+        self.assertEqual((stats["hits"], stats["rejections"]), (2, 0))
+
+    def test_value_larger_than_the_cache_is_rejected(self):
+        """Só valores maiores que o cache inteiro são recusados, sem esvaziá-lo"""
+        cache = IntelligentCacheManager(max_size_mb=800 / (1024 * 1024), shards=2)
+        cache.set("a", "a", size=100)
+        cache.set("b", "b", size=100)
+        self.assertTrue(cache.set("c", "x", size=200))
+        self.assertFalse(cache.set("c", "enorme", size=900))
+
+        self.assertIsNone(cache.get("c"))
+        self.assertEqual(cache.batch_get(["a", "b"]), {"a": "a", "b": "b"})
+        stats = cache.get_stats()
+        self.assertEqual((stats["evictions"], stats["rejections"]), (0, 1))
+        self.assertEqual(cache.max_entry_bytes, 800)
+
+    def test_overwrite_does_not_expire_new_value(self):
+        """Sobrescrever uma chave descarta a expiração antiga"""
+        cache = IntelligentCacheManager(shards=1)
+        cache.set("key", "old", ttl=1)
+        cache.set("key", "new", ttl=3600)
+        cache.shards[0]._cleanup_expired(time.time() + 2)
+
+        self.assertEqual(cache.get("key"), "new")
+
+    def test_heap_garbage_is_purged(self):
+        """Sobrescritas repetidas não fazem o heap crescer sem limite"""
+        cache = IntelligentCacheManager(shards=1)
+        for index in range(10_000):
+            cache.set("key", index)
+
+        self.assertLess(len(cache.shards[0].expiration_queue), 200)
+        self.assertEqual(len(cache), 1)
+
+    def test_expired_entries(self):
+        """Entradas expiradas são tratadas como miss"""
+        cache = IntelligentCacheManager()
+        cache.set("key", "value", ttl=1)
+        for shard in cache.shards:
+            for entry in shard.entries.values():
+                entry.expiration_time = time.time() - 1
+
+        self.assertIsNone(cache.get("key"))
+        self.assertEqual(len(cache), 0)
+
+    def test_batch_operations_do_not_deadlock(self):
+        """batch_set/batch_get funcionam em paralelo com get/set"""
+        cache = IntelligentCacheManager(shards=4)
+        items = {f"k{index}": index for index in range(200)}
+
+        def worker():
+            cache.batch_set(items)
+            cache.batch_get(list(items))
+            cache.set("extra", 1)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+            self.assertFalse(thread.is_alive())
+
+        self.assertEqual(cache.batch_get(["k0", "k199"]), {"k0": 0, "k199": 199})
+
+    def test_estimate_size_without_pickle(self):
+        """A estimativa cresce com o conteúdo"""
+        small = estimate_size({"a": "x"})
+        large = estimate_size({f"k{i}": "x" * 100 for i in range(1000)})
+        self.assertGreater(large, small * 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes para o banco SQLite do aluno
+"""
+
+import unittest
+import os
+import json
+import tempfile
+import sys
+from unittest import mock
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.storage import LearnerStore, StateDocument
+from src.progress_manager import ProgressManager
+from src.gamification_system import GamificationSystem
+from src.code_editor import CodeEditor
+
+
+class TestLearnerStore(unittest.TestCase):
+    """Testes para LearnerStore e StateDocument"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "learner.db")
+        self.store = LearnerStore(self.db_path)
+    
+    def tearDown(self):
+        self.store.close()
+        self.temp_dir.cleanup()
+    
+    def test_wal_mode(self):
+        """Testa que o banco usa WAL"""
+        mode = self.store.conn.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+    
+    def test_only_changed_fields_are_written(self):
+        """Testa que save regrava apenas campos alterados"""
+        document = StateDocument(self.store, "teste")
+        data = document.load(lambda: {"a": 1, "b": {"x": [1, 2]}})
+        self.assertEqual(document.save(data), 2)
+        self.assertEqual(document.save(data), 0)
+        
+        data["a"] = 2
+        self.assertEqual(document.save(data), 1)
+        self.assertEqual(self.store.load_state("teste"), {"a": 2, "b": {"x": [1, 2]}})
+    
+    def test_history_window(self):
+        """Testa histórico append-only com janela em memória"""
+        document = StateDocument(self.store, "teste", history_fields=("eventos",), history_window=3)
+        data = document.load(dict)
+        for i in range(5):
+            document.append(data, "eventos", {"i": i})
+        
+        self.assertEqual([e["i"] for e in data["eventos"]], [2, 3, 4])
+        self.assertEqual(self.store.history_count("teste", "eventos"), 5)
+        reloaded = StateDocument(self.store, "teste", history_fields=("eventos",), history_window=3).load(dict)
+        self.assertEqual(reloaded["eventos"], data["eventos"])
+    
+    def test_interrupted_import_is_redone_without_duplicates(self):
+        """Testa que uma queda antes do registro da migração não duplica o histórico"""
+        legacy = {"erros": [1, 2, 3], "nivel": 2}
+        document = StateDocument(self.store, "teste", history_fields=("erros",))
+        with mock.patch.object(self.store, "mark_migrated", side_effect=RuntimeError("queda")):
+            with self.assertRaises(RuntimeError):
+                document.load(dict, legacy_loader=lambda: legacy)
+        self.assertFalse(self.store.is_migrated("teste"))
+        
+        data = StateDocument(self.store, "teste", history_fields=("erros",)).load(dict, legacy_loader=lambda: legacy)
+        self.assertEqual(data["erros"], [1, 2, 3])
+        self.assertEqual(data["nivel"], 2)
+        self.assertTrue(self.store.is_migrated("teste"))
+    
+    def test_code_history_migration_and_append(self):
+        """Testa que o histórico do editor vai para o banco uma única vez"""
+        cwd = os.getcwd()
+        os.chdir(self.temp_dir.name)
+        try:
+            legacy = [{"code": f"print({i})", "timestamp": "2024-01-01T00:00:00", "filename": None}
+                      for i in range(3)]
+            with open("code_history.json", "w", encoding="utf-8") as f:
+                json.dump(legacy, f)
+            
+            editor = CodeEditor(store=self.store)
+            self.assertEqual(editor.execution_history, legacy)
+            editor.add_execution({"code": "x = 1", "timestamp": "2024-01-02T00:00:00", "filename": None})
+            
+            reloaded = CodeEditor(store=self.store)
+            self.assertEqual([h["code"] for h in reloaded.execution_history],
+                             ["print(0)", "print(1)", "print(2)", "x = 1"])
+            # O arquivo antigo não é reimportado nem regravado
+            with open("code_history.json", encoding="utf-8") as f:
+                self.assertEqual(json.load(f), legacy)
+        finally:
+            os.chdir(cwd)
+    
+    def test_progress_migration_and_persistence(self):
+        """Testa importação do progress.json antigo e persistência no banco"""
+        progress_file = os.path.join(self.temp_dir.name, "progress.json")
+        legacy = ProgressManager(progress_file)
+        legacy.set_user_name("Ana")
+        legacy.mark_module_completed("modulo_1", 40)
+        legacy.close()
+        
+        manager = ProgressManager(progress_file, store=self.store)
+        self.assertEqual(manager.progress_data["user_name"], "Ana")
+        manager.mark_module_completed("modulo_2", 60)
+        
+        # Alterações posteriores nos arquivos antigos não são reimportadas
+        os.remove(progress_file + ".journal")
+        reloaded = ProgressManager(progress_file, store=self.store)
+        self.assertEqual(reloaded.progress_data["total_score"], 100)
+        self.assertEqual(reloaded.progress_data["modules_completed"], ["modulo_1", "modulo_2"])
+    
+    def test_components_share_progress_store(self):
+        """Testa que a gamificação usa o banco do progress_manager"""
+        manager = ProgressManager(os.path.join(self.temp_dir.name, "progress.json"), store=self.store)
+        game = GamificationSystem(manager)
+        xp_inicial = game.game_data["xp_total"]
+        game.adicionar_xp(50, "teste")
+        
+        reloaded = GamificationSystem(manager)
+        self.assertEqual(reloaded.game_data["xp_total"], xp_inicial + 50)
+        self.assertEqual(reloaded.game_data["historico_xp"][-1]["motivo"], "teste")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes para a persistência em lote do LearningAnalytics
+"""
+
+import unittest
+import os
+import json
+import tempfile
+import sys
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.learning_analytics import LearningAnalytics
+
+
+class TestLearningAnalyticsPersistence(unittest.TestCase):
+    """Testes para a gravação em lote dos analytics"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.analytics = LearningAnalytics(progress_manager=None, flush_interval=60, max_pending=5)
+        self.analytics.analytics_file = os.path.join(self.temp_dir.name, "analytics.json")
+    
+    def tearDown(self):
+        self.analytics._cancel_timer()
+        self.temp_dir.cleanup()
+    
+    def test_events_are_batched(self):
+        """Testa que registros não gravam o arquivo até o flush"""
+        self.analytics.registrar_erro("NameError", "modulo_1")
+        self.analytics.registrar_ajuda("modulo_1")
+        self.assertFalse(os.path.exists(self.analytics.analytics_file))
+        
+        self.analytics.flush()
+        with open(self.analytics.analytics_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.assertEqual(data["error_patterns"], {"NameError": 1})
+        self.assertEqual(data["help_requests"], {"modulo_1": 1})
+    
+    def test_size_threshold_forces_flush(self):
+        """Testa que max_pending alterações gravam imediatamente"""
+        for _ in range(5):
+            self.analytics.registrar_tentativa("modulo_2", True, 10)
+        self.assertTrue(os.path.exists(self.analytics.analytics_file))
+        self.assertEqual(self.analytics._pending_changes, 0)
+    
+    def test_reload_keeps_counters_usable(self):
+        """Testa que contadores carregados do JSON aceitam novas chaves"""
+        self.analytics.registrar_erro("TypeError", "modulo_3")
+        self.analytics.flush()
+        
+        cwd = os.getcwd()
+        os.chdir(self.temp_dir.name)
+        try:
+            reloaded = LearningAnalytics(progress_manager=None)
+        finally:
+            os.chdir(cwd)
+        reloaded.analytics_file = self.analytics.analytics_file
+        reloaded.registrar_erro("ValueError", "modulo_4")
+        self.assertEqual(reloaded.analytics_data["error_patterns"]["ValueError"], 1)
+        reloaded.flush()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes para o orçamento de memória do ModuleLoader
+"""
+
+import unittest
+import os
+import threading
+import time
+import sys
+import tempfile
+from unittest import mock
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.modules.module_loader import ModuleLoader
+from src.performance import TieredCache
+from src.offline.resource_cache import ResourceCache
+
+MB = 1024 * 1024
+
+
+class TestModuleLoaderMemory(unittest.TestCase):
+    """Testes para LRU por memória e relatório de tamanho residente"""
+
+    def make_loader(self, **kwargs):
+        return ModuleLoader(cache=TieredCache(l2_factory=None), **kwargs)
+
+    def measure(self, *module_ids):
+        loader = self.make_loader(memory_budget_mb=None)
+        for module_id in module_ids:
+            loader.get_module(module_id)
+        return loader.health_check()['resident_modules']
+
+    def test_browsing_every_module_stays_within_budget(self):
+        """Percorrer o curso inteiro mantém a memória residente no orçamento"""
+        loader = self.make_loader(memory_budget_mb=0.5)
+        for number in range(1, 36):
+            loader.get_module(f"modulo_{number}", quiet=True)
+            report = loader.health_check()
+            self.assertLessEqual(report['resident_bytes'], report['memory_budget_bytes'])
+
+        report = loader.health_check()
+        self.assertGreater(report['evictions'], 0)
+        self.assertIn("modulo_35", report['resident_modules'])
+        self.assertNotIn("modulo_1", report['resident_modules'])
+        self.assertTrue(all(size > 0 for size in report['resident_modules'].values()))
+        self.assertEqual(set(report['resident_modules']), set(loader.get_cached_instances()))
+
+    def test_recently_used_module_survives(self):
+        """O LRU descarta o menos usado, não o mais antigo carregado"""
+        sizes = self.measure("modulo_2", "modulo_3", "modulo_4")
+        budget = sizes["modulo_2"] + sizes["modulo_3"] + sizes["modulo_4"] - 1
+        loader = self.make_loader(memory_budget_mb=budget / MB)
+
+        first = loader.get_module("modulo_2")
+        loader.get_module("modulo_3")
+        self.assertIs(loader.get_module("modulo_2"), first)
+        loader.get_module("modulo_4")
+
+        self.assertEqual(list(loader.health_check()['resident_modules']), ["modulo_2", "modulo_4"])
+
+    def test_prefetched_modules_are_evicted_first(self):
+        """Uma carga especulativa nunca tira do lugar o que o aluno usou"""
+        sizes = self.measure("modulo_2", "modulo_3", "modulo_4")
+        budget = sizes["modulo_2"] + sizes["modulo_4"] + sizes["modulo_3"] // 2
+        loader = self.make_loader(memory_budget_mb=budget / MB)
+
+        loader.get_module("modulo_2")
+        loader.get_module("modulo_3", prefetch=True)
+        loader.get_module("modulo_4")
+
+        self.assertEqual(sorted(loader.health_check()['resident_modules']), ["modulo_2", "modulo_4"])
+
+    def test_eviction_releases_sys_modules_entry(self):
+        """Sem seções, o módulo importado sai de sys.modules ao ser descarregado"""
+        names = ["src.modules.basic.modulo_02_primeiro_programa", "src.modules.basic.modulo_03_variaveis"]
+        for name in names:
+            sys.modules.pop(name, None)
+
+        loader = self.make_loader(sectioned=False, memory_budget_mb=None)
+        loader.get_module("modulo_2")
+        loader.get_module("modulo_3")
+        self.assertTrue(all(name in sys.modules for name in names))
+
+        loader.set_memory_budget(loader.health_check()['resident_modules']["modulo_3"] / MB)
+        self.assertNotIn(names[0], sys.modules)
+        self.assertIn(names[1], sys.modules)
+        self.assertEqual(loader.get_cached_instances(), ["modulo_3"])
+
+    def test_instances_survive_shared_cache_pressure(self):
+        """O L1 compartilhado pode esvaziar sem que o módulo perca o estado da sessão"""
+        cache = TieredCache(l2_factory=None)
+        loader = ModuleLoader(cache=cache, memory_budget_mb=None)
+        instance = loader.get_module("modulo_2")
+        instance.estado_da_sessao = "secao_3"
+
+        cache.l1.clear()
+        self.assertIs(loader.get_module("modulo_2"), instance)
+        self.assertEqual(loader.get_cached_instances(), ["modulo_2"])
+        self.assertIsNotNone(loader.get_module("modulo_3"))
+
+    def test_warm_hit_does_not_measure_or_wait_for_loads(self):
+        """Acerto só reordena o LRU: sem medir e sem esperar o prefetch carregar"""
+        loader = self.make_loader(memory_budget_mb=None)
+        measured = []
+        measure = loader._measure
+        loader._measure = lambda module_id, instance: measured.append(module_id) or measure(module_id, instance)
+
+        instance = loader.get_module("modulo_1")
+        loader.get_module("modulo_2")
+        self.assertEqual(measured, ["modulo_1", "modulo_2"])
+
+        # Outra thread segurando o lock de carga (prefetch importando um módulo)
+        loading, release = threading.Event(), threading.Event()
+
+        def hold_load_lock():
+            with loader._load_lock:
+                loading.set()
+                release.wait(5)
+
+        thread = threading.Thread(target=hold_load_lock)
+        thread.start()
+        loading.wait(5)
+        try:
+            start = time.perf_counter()
+            self.assertIs(loader.get_module("modulo_1"), instance)
+            self.assertLess(time.perf_counter() - start, 0.5)
+        finally:
+            release.set()
+            thread.join()
+
+        self.assertEqual(measured, ["modulo_1", "modulo_2"])
+        self.assertEqual(list(loader.health_check()['resident_modules']), ["modulo_2", "modulo_1"])
+
+    def test_section_compile_remeasures_module(self):
+        """Compilar uma seção atualiza o tamanho residente do módulo"""
+        loader = self.make_loader(memory_budget_mb=None)
+        loader.get_module("modulo_1")
+        sections = loader.get_section_loader("modulo_1")
+        before = loader.health_check()['resident_modules']["modulo_1"]
+
+        section = sections.compile("_secao_onde_usado")
+        self.assertGreater(loader.health_check()['resident_modules']["modulo_1"], before)
+        del section
+
+    def test_sizing_failure_does_not_block_load(self):
+        """Se a estimativa de tamanho falhar, o módulo carrega mesmo assim"""
+        loader = self.make_loader()
+
+        def broken(roots, owner):
+            raise AttributeError("co_exceptiontable")
+
+        with mock.patch.object(sys.modules[ModuleLoader.__module__], "_resident_size", broken):
+            instance = loader.get_module("modulo_1")
+        self.assertIsNotNone(instance)
+        self.assertGreater(loader.health_check()['resident_modules']["modulo_1"], 0)
+
+
+    def test_rebuilt_sections_are_served_from_l2_on_next_start(self):
+        """Seções recalculadas com ast (manifesto desatualizado) vêm do L2 no próximo início"""
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        loader_module = sys.modules[ModuleLoader.__module__]
+        sections_module = sys.modules[loader_module.load_sectioned_class.__module__]
+
+        def start():
+            l2 = ResourceCache(cache_dir=temp_dir.name, close_at_exit=False)
+            cache = TieredCache(l2=l2)
+            with mock.patch.object(loader_module, "load_manifest", return_value={}), \
+                    mock.patch.object(sections_module, "build_entry", wraps=sections_module.build_entry) as build:
+                ModuleLoader(cache=cache, memory_budget_mb=None).get_module("modulo_1")
+            cache.flush()
+            l2.close()
+            return build.call_count
+
+        self.assertEqual(start(), 1)
+        self.assertEqual(start(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
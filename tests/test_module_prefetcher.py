@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes para o prefetch preditivo dos módulos do curso
+"""
+
+import unittest
+import os
+import time
+import sys
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.modules.module_loader import ModuleLoader
+from src.modules.prefetcher import ModulePrefetcher
+from src.performance import TieredCache
+
+
+class FakeProgress:
+    """Só o progress_data que o prefetcher lê"""
+
+    def __init__(self, completed=(), last_access=None):
+        self.progress_data = {
+            "modules_completed": list(completed),
+            "modules_progress": {
+                f"modulo_{i}": {"completed": f"modulo_{i}" in completed,
+                                "last_access": last_access.get(f"modulo_{i}") if last_access else None}
+                for i in range(1, 31)
+            }
+        }
+
+
+class TestModulePrefetcher(unittest.TestCase):
+    """Testes para previsão, carga em segundo plano e cancelamento"""
+
+    def setUp(self):
+        self.loader = ModuleLoader(cache=TieredCache(l2_factory=None))
+        self.prefetchers = []
+
+    def tearDown(self):
+        for prefetcher in self.prefetchers:
+            prefetcher.shutdown()
+
+    def make_prefetcher(self, progress=None, **kwargs):
+        prefetcher = ModulePrefetcher(self.loader, progress, **kwargs)
+        self.prefetchers.append(prefetcher)
+        return prefetcher
+
+    def test_predicts_next_unfinished_modules(self):
+        """Próximos módulos não concluídos, na ordem do curso"""
+        self.assertEqual(self.make_prefetcher(FakeProgress()).predict("modulo_5"),
+                         ["modulo_6", "modulo_7"])
+        self.assertEqual(self.make_prefetcher(FakeProgress(completed=["modulo_6"])).predict("modulo_5"),
+                         ["modulo_7", "modulo_8"])
+        finished = [f"modulo_{i}" for i in range(2, 36)]
+        self.assertEqual(self.make_prefetcher(FakeProgress(completed=finished)).predict("modulo_34"),
+                         ["modulo_1"])
+
+    def test_session_start_resumes_last_module(self):
+        """Sem módulo aberto, prevê o último acessado e o seguinte"""
+        progress = FakeProgress(completed=["modulo_1"],
+                                last_access={"modulo_1": "2026-01-01T10:00:00",
+                                             "modulo_9": "2026-01-02T10:00:00"})
+        self.assertEqual(self.make_prefetcher(progress).predict(), ["modulo_9", "modulo_10"])
+        self.assertEqual(self.make_prefetcher(FakeProgress()).predict(), ["modulo_1", "modulo_2"])
+
+    def test_background_load_makes_next_module_ready(self):
+        """Os módulos previstos ficam prontos sem a UI esperar"""
+        prefetcher = self.make_prefetcher(FakeProgress(), idle_delay=0.01)
+        self.assertEqual(prefetcher.on_module_opened("modulo_1"), ["modulo_2", "modulo_3"])
+
+        deadline = time.monotonic() + 10
+        while not all(map(self.loader.is_module_ready, ["modulo_2", "modulo_3"])):
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+
+        self.assertEqual(prefetcher.prefetched, ["modulo_2", "modulo_3"])
+        self.assertIs(self.loader.get_module("modulo_2"), self.loader.get_module("modulo_2"))
+        self.assertEqual(prefetcher.on_module_opened("modulo_1"), [])
+
+    def test_shutdown_cancels_pending_work(self):
+        """Encerrar cancela o que ainda não começou e para a thread"""
+        prefetcher = self.make_prefetcher(FakeProgress(), idle_delay=30)
+        prefetcher.on_module_opened("modulo_1")
+
+        start = time.monotonic()
+        prefetcher.shutdown()
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertFalse(prefetcher._thread.is_alive())
+        self.assertEqual(prefetcher.prefetched, [])
+        self.assertFalse(self.loader.is_module_ready("modulo_2"))
+        self.assertEqual(prefetcher.on_module_opened("modulo_1"), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
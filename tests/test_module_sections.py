@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes para o carregamento de seções dos módulos sob demanda
+"""
+
+import unittest
+import os
+import io
+import gc
+import tempfile
+import importlib
+import sys
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.modules.module_loader import ModuleLoader
+from src.modules.sections import build_entry, load_manifest, load_sectioned_class
+from src.performance import TieredCache
+
+
+class TestModuleSections(unittest.TestCase):
+    """Testes para a casca dos módulos e a compilação das seções"""
+
+    def setUp(self):
+        self.loader = ModuleLoader(cache=TieredCache(l2_factory=None))
+
+    def test_manifest_is_up_to_date(self):
+        """O manifesto versionado corresponde ao fonte atual dos módulos"""
+        manifest = load_manifest()
+        for module_id, info in self.loader.list_all_modules().items():
+            with self.subTest(module=module_id):
+                self.assertEqual(manifest.get(module_id),
+                                 build_entry(info['file_path'], info['class_name']),
+                                 "rode tools/build_section_manifest.py")
+
+    def test_shell_has_the_same_methods(self):
+        """A casca expõe os mesmos métodos que a classe importada inteira"""
+        for module_id, info in self.loader.list_all_modules().items():
+            with self.subTest(module=module_id):
+                try:
+                    module = importlib.import_module(f"src.modules.{info['path']}")
+                except ImportError as e:
+                    self.skipTest(f"dependência ausente: {e}")
+                full_class = getattr(module, info['class_name'])
+                shell_class = self.loader._load_module_class(module_id)
+                self.assertEqual(sorted(name for name in vars(shell_class) if not name.startswith('__')),
+                                 sorted(name for name in vars(full_class) if not name.startswith('__')))
+
+    def test_section_compiles_on_call_and_is_released(self):
+        """A seção só é compilada quando chamada e sai da memória ao terminar"""
+        instance = self.loader.get_module("modulo_1")
+        instance.set_dependencies(MagicMock(), MagicMock())
+        sections = self.loader.get_section_loader("modulo_1")
+        self.assertIn("_secao_onde_usado", sections.sections)
+        self.assertEqual(sections.compile_count, 0)
+
+        output = io.StringIO()
+        with patch("builtins.input", return_value=""), redirect_stdout(output):
+            instance._secao_onde_usado()
+
+        self.assertIn("Netflix", output.getvalue())
+        self.assertEqual(sections.compile_count, 1)
+        gc.collect()
+        self.assertEqual(sections.live_sections(), [])
+
+    def test_stale_manifest_and_tracebacks(self):
+        """Fonte alterado invalida a entrada; tracebacks apontam a linha real"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = Path(temp_dir) / "modulo_teste.py"
+            body = "".join(f"        total += {i}\n" for i in range(30))
+            file_path.write_text(
+                "class ModuloTeste:\n"
+                "    def __init__(self):\n"
+                "        self.__segredo = 7\n"
+                "\n"
+                "    def _secao_longa(self, extra=0):\n"
+                "        total = self.__segredo + extra\n"
+                f"{body}"
+                "        return total\n"
+                "\n"
+                "    def _secao_erro(self):\n"
+                f"{body.replace('total +=', 'x =')}"
+                "        raise ValueError('linha 70')\n",
+                encoding="utf-8")
+            stale = {"sha1": "0" * 40, "class": "ModuloTeste", "sections": {}}
+
+            shell_class, sections = load_sectioned_class(file_path, "modulo_teste", "ModuloTeste", stale)
+            self.assertEqual(sorted(sections.sections), ["_secao_erro", "_secao_longa"])
+
+            instance = shell_class()
+            self.assertEqual(instance._secao_longa(extra=1), 7 + 1 + sum(range(30)))
+            try:
+                instance._secao_erro()
+                self.fail("ValueError esperado")
+            except ValueError as e:
+                tb = e.__traceback__
+            while tb.tb_next:
+                tb = tb.tb_next
+            self.assertEqual(tb.tb_lineno, 70)
+
+            # Segunda carga usa o bytecode da casca em cache
+            self.assertTrue((Path(temp_dir) / "__pycache__").exists())
+            cached_class, _ = load_sectioned_class(file_path, "modulo_teste", "ModuloTeste")
+            self.assertEqual(cached_class()._secao_longa(), 7 + sum(range(30)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -30,9 +30,11 @@ class TestProgressManager(unittest.TestCase):
     
     def tearDown(self):
         """Limpeza após cada teste"""
-        # Remove arquivo temporário
-        if os.path.exists(self.temp_file.name):
-            os.unlink(self.temp_file.name)
+        # Remove arquivo temporário e journal
+        self.progress_manager.close()
+        for path in (self.temp_file.name, self.temp_file.name + ".journal"):
+            if os.path.exists(path):
+                os.unlink(path)
     
     def test_create_default_progress(self):
         """Testa criação de progresso padrão"""
@@ -145,6 +147,55 @@ class TestProgressManager(unittest.TestCase):
         # Mas deve adicionar à lista de completos
         self.assertIn(invalid_id, self.progress_manager.progress_data['modules_completed'])
 
+    
+    def test_journal_replay_without_snapshot(self):
+        """Testa que alterações sobrevivem sem save_progress (apenas journal)"""
+        self.progress_manager.set_user_name("Ana")
+        self.progress_manager.mark_module_completed("modulo_1", 70)
+        self.progress_manager.mark_mini_project_completed("modulo_1", 30)
+        self.progress_manager.close()
+        
+        new_manager = ProgressManager(self.temp_file.name)
+        self.assertEqual(new_manager.progress_data['user_name'], "Ana")
+        self.assertEqual(new_manager.progress_data['total_score'], 100)
+        self.assertIn("modulo_1_mini_projeto", new_manager.progress_data['mini_projetos_completos'])
+    
+    def test_torn_write_is_discarded(self):
+        """Testa que uma linha parcial no fim do journal não corrompe o progresso"""
+        self.progress_manager.mark_module_completed("modulo_1", 50)
+        self.progress_manager.mark_module_completed("modulo_2", 50)
+        self.progress_manager.close()
+        
+        journal = self.temp_file.name + ".journal"
+        with open(journal, 'rb') as f:
+            content = f.read()
+        with open(journal, 'wb') as f:
+            f.write(content[:-15])
+        
+        new_manager = ProgressManager(self.temp_file.name)
+        self.assertEqual(new_manager.progress_data['modules_completed'], ["modulo_1"])
+        self.assertEqual(new_manager.progress_data['total_score'], 50)
+        
+        # Novos eventos continuam legíveis após a cauda descartada
+        new_manager.add_score(5)
+        new_manager.close()
+        self.assertEqual(ProgressManager(self.temp_file.name).progress_data['total_score'], 55)
+    
+    def test_compaction_is_not_replayed(self):
+        """Testa que eventos já incluídos no snapshot não são reaplicados"""
+        self.progress_manager.add_score(10)
+        journal = self.temp_file.name + ".journal"
+        with open(journal, 'rb') as f:
+            old_events = f.read()
+        
+        # Simula queda entre gravar o snapshot e esvaziar o journal
+        self.progress_manager.save_progress()
+        self.progress_manager.close()
+        with open(journal, 'wb') as f:
+            f.write(old_events)
+        
+        self.assertEqual(ProgressManager(self.temp_file.name).progress_data['total_score'], 10)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
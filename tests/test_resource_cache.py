@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes para o ResourceCache do modo offline
+"""
+
+import unittest
+import os
+import gzip
+import pickle
+import tempfile
+import errno
+import sqlite3
+import sys
+from unittest import mock
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.offline.resource_cache import ResourceCache
+
+
+class TestResourceCache(unittest.TestCase):
+    """Testes para conexão persistente, totais em memória e acessos em lote"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = ResourceCache(cache_dir=self.temp_dir.name, access_flush_interval=60)
+
+    def tearDown(self):
+        self.cache.close()
+        self.temp_dir.cleanup()
+
+    def _db_row(self, key):
+        with sqlite3.connect(self.cache.db_path) as conn:
+            return conn.execute(
+                "SELECT access_count, size_bytes FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+
+    def test_running_totals_match_index(self):
+        """Os totais em memória acompanham store, substituição e remoção"""
+        self.cache.store("a", {"x": 1})
+        self.cache.store("b", "texto" * 100)
+        self.cache.store("a", {"x": list(range(100))})
+        self.cache.remove("b")
+
+        with sqlite3.connect(self.cache.db_path) as conn:
+            count = conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+            total = conn.execute("SELECT SUM(size_bytes) FROM cache_blobs").fetchone()[0]
+        self.assertEqual((self.cache.entry_count, self.cache.total_bytes), (count, total))
+
+        reopened = ResourceCache(cache_dir=self.temp_dir.name)
+        self.assertEqual(reopened.total_bytes, total)
+        reopened.close()
+
+    def test_access_updates_are_batched(self):
+        """Acessos ficam em memória até o flush"""
+        self.cache.store("chave", [1, 2, 3])
+        for _ in range(3):
+            self.assertEqual(self.cache.retrieve("chave"), [1, 2, 3])
+
+        self.assertEqual(self._db_row("chave")[0], 0)
+        self.assertEqual(self.cache.flush_access(), 1)
+        self.assertEqual(self._db_row("chave")[0], 3)
+
+    def test_database_uses_wal(self):
+        """O índice usa WAL"""
+        mode = self.cache.conn.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode.lower(), "wal")
+
+    def test_views_share_one_mapping(self):
+        """Leitores da mesma entrada compartilham um mmap somente leitura"""
+        payload = bytes(range(256)) * 64
+        self.cache.store("pacote", payload)
+        self.assertEqual(self.cache.retrieve("pacote"), payload)
+
+        first = self.cache.open_view("pacote")
+        second = self.cache.open_view("pacote")
+        self.assertIs(first._mapping, second._mapping)
+        self.assertTrue(first.view.readonly)
+        self.assertEqual(bytes(first[256:260]), payload[256:260])
+        with self.assertRaises(TypeError):
+            first.view[0] = 1
+
+        mapping = first._mapping
+        first.release()
+        self.assertFalse(mapping.mmap.closed)
+        second.release()
+        self.assertTrue(mapping.mmap.closed)
+        self.assertEqual(self.cache.open_view("pacote").view.tobytes(), payload)
+
+    def test_view_survives_overwrite(self):
+        """Uma visão aberta mantém o conteúdo antigo quando a entrada é regravada"""
+        self.cache.store("dados", b"antigo")
+        with self.cache.open_view("dados") as view:
+            self.cache.store("dados", b"novo conteudo")
+            self.assertEqual(view.tobytes(), b"antigo")
+            with self.cache.open_view("dados") as fresh:
+                self.assertEqual(fresh.tobytes(), b"novo conteudo")
+
+        self.cache.store("objeto", {1, 2})
+        self.assertIsNone(self.cache.open_view("objeto"))
+
+
+    def _codec(self, key):
+        with sqlite3.connect(self.cache.db_path) as conn:
+            return conn.execute("SELECT codec FROM cache_entries WHERE key = ?", (key,)).fetchone()[0]
+
+    def test_codecs_per_type(self):
+        """JSON grande é comprimido; conteúdo pequeno e blobs ficam crus"""
+        course = {"modulos": [{"id": i, "titulo": "Introdução ao Python"} for i in range(200)]}
+        self.cache.store("curso", course)
+        self.cache.store("curto", "abc")
+        self.cache.store("imagem", b"\x00" * 4096)
+
+        self.assertEqual(self._codec("curso"), "zlib")
+        self.assertEqual(self._codec("curto"), "none")
+        self.assertEqual(self._codec("imagem"), "none")
+        self.assertEqual(self.cache.retrieve("curso"), course)
+        self.assertEqual(self.cache.retrieve("curto"), "abc")
+        self.assertGreater(self.cache.get_statistics()["compression_ratio"], 2)
+
+        for codec in ("lzma", "bz2"):
+            cache = ResourceCache(cache_dir=self.temp_dir.name, codecs={"binary": codec})
+            cache.store(codec, {"dados": list(range(1000))}, data_type="binary")
+            self.assertEqual(cache.retrieve(codec), {"dados": list(range(1000))})
+            cache.close()
+            self.assertEqual(self._codec(codec), codec)
+
+        self.assertIsNone(self.cache.open_view("curso"))
+        with self.assertRaises(ValueError):
+            ResourceCache(cache_dir=self.temp_dir.name, codecs={"json": "rar"})
+
+    def test_legacy_index_is_migrated(self):
+        """Índices antigos ganham as colunas e entradas gzip+pickle continuam legíveis"""
+        legacy_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(legacy_dir.cleanup)
+        data_file = os.path.join(legacy_dir.name, "antigo.bin")
+        with gzip.open(data_file, "wb") as f:
+            pickle.dump({"versao": 1}, f)
+        with sqlite3.connect(os.path.join(legacy_dir.name, "cache_index.db")) as conn:
+            conn.execute("""
+                CREATE TABLE cache_entries (
+                    key TEXT PRIMARY KEY, data_type TEXT NOT NULL, file_path TEXT NOT NULL,
+                    size_bytes INTEGER NOT NULL, created_at TEXT NOT NULL,
+                    last_accessed TEXT NOT NULL, access_count INTEGER DEFAULT 0,
+                    expiry_date TEXT, metadata TEXT)
+            """)
+            conn.execute("INSERT INTO cache_entries VALUES ('antigo', 'binary', ?, ?, '', '', 0, NULL, NULL)",
+                         (data_file, os.path.getsize(data_file)))
+
+        cache = ResourceCache(cache_dir=legacy_dir.name)
+        self.assertEqual(cache.retrieve("antigo"), {"versao": 1})
+        self.assertEqual(cache.get_statistics()["compression_ratio"], 1.0)
+        cache.close()
+
+
+    def test_identical_content_is_stored_once(self):
+        """Chaves com o mesmo conteúdo compartilham um arquivo até a última sair"""
+        snapshot = {"modulo": "modulo_01", "exercicios": list(range(50))}
+        for day in range(3):
+            self.cache.store(f"uploaded_progress_{day}", snapshot)
+        self.cache.store("outro", {"diferente": True})
+
+        files = os.listdir(self.cache.data_dir)
+        self.assertEqual(len(files), 2)
+        self.assertEqual(self.cache.get_statistics()["blobs"], 2)
+        self.assertEqual(self.cache.total_bytes,
+                         sum(os.path.getsize(os.path.join(self.cache.data_dir, f)) for f in files))
+
+        self.cache.remove("uploaded_progress_0")
+        self.cache.store("uploaded_progress_1", {"modulo": "modulo_02"})
+        self.assertEqual(self.cache.retrieve("uploaded_progress_2"), snapshot)
+        self.assertEqual(len(os.listdir(self.cache.data_dir)), 3)
+
+        self.cache.remove("uploaded_progress_2")
+        self.assertEqual(len(os.listdir(self.cache.data_dir)), 2)
+        self.assertEqual(os.listdir(self.cache.temp_dir), [])
+
+
+    def test_failed_move_keeps_previous_value(self):
+        """Se o arquivo novo não pode ser movido, o valor anterior e o blob dele ficam"""
+        self.cache.store("chave", {"versao": 1})
+        before = (self.cache.entry_count, self.cache.total_bytes, self.cache.raw_total_bytes)
+
+        disk_full = OSError(errno.ENOSPC, "No space left on device")
+        with mock.patch("src.offline.resource_cache.os.replace", side_effect=disk_full):
+            self.assertFalse(self.cache.store("chave", {"versao": 2}))
+
+        self.assertEqual(self.cache.retrieve("chave"), {"versao": 1})
+        self.assertEqual((self.cache.entry_count, self.cache.total_bytes, self.cache.raw_total_bytes), before)
+        with sqlite3.connect(self.cache.db_path) as conn:
+            blobs = conn.execute("SELECT file_path, refcount FROM cache_blobs").fetchall()
+        self.assertEqual(len(blobs), 1)
+        self.assertEqual(blobs[0][1], 1)
+        self.assertTrue(os.path.exists(blobs[0][0]))
+        self.assertEqual(os.listdir(self.cache.temp_dir), [])
+
+
+    def test_compression_ratio_ignores_deduplication(self):
+        """Cópias do mesmo conteúdo contam como deduplicação, não como compressão"""
+        payload = os.urandom(64 * 1024)
+        for copy in range(5):
+            self.cache.store(f"copia_{copy}", payload, data_type="binary")
+
+        stats = self.cache.get_statistics()
+        self.assertLessEqual(stats["compression_ratio"], 1.01)
+        self.assertAlmostEqual(stats["dedup_saved_mb"] * 1024 * 1024,
+                               4 * (self.cache.raw_total_bytes / 5))
+
+        self.cache.store("texto", "abc" * 100000, data_type="text")
+        self.assertGreater(self.cache.get_statistics()["compression_ratio"], 4)
+
+        reopened = ResourceCache(cache_dir=self.temp_dir.name)
+        self.assertEqual(reopened.blob_raw_bytes, self.cache.blob_raw_bytes)
+        reopened.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes para o Motor de Exercícios Ricos
+"""
+
+import unittest
+import os
+import io
+import json
+import sys
+import tempfile
+import threading
+import time
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.exercises.rich_exercises import RichExerciseEngine, ExerciseGenerator
+from src.exercises.reference_cache import ReferenceOutputCache
+from src.exercises.exercise_bank import ExerciseBank
+from src.execution import SandboxExecutor
+
+
+class TestRichExerciseEngine(unittest.TestCase):
+    """Testes para a classe RichExerciseEngine"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.executor = SandboxExecutor(workers=2)
+        cls.cache_file = os.path.join(cls.temp_dir.name, 'reference_outputs.json')
+        cls.engine = RichExerciseEngine(executor=cls.executor,
+                                        reference_cache=ReferenceOutputCache(cls.cache_file))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+        cls.temp_dir.cleanup()
+
+    def test_evaluate_batch_matches_single(self):
+        """Testa que a correção em lote dá o mesmo resultado da individual"""
+        exercise = ExerciseGenerator.generate_debugging_exercise("modulo_03", "variables")
+        answers = [exercise.solution, "print(nota)", exercise.code]
+
+        batch = dict(self.engine.evaluate_batch(exercise, answers))
+
+        self.assertEqual(sorted(batch), [0, 1, 2])
+        for index, answer in enumerate(answers):
+            self.assertEqual(batch[index], self.engine.evaluate_exercise(exercise, answer))
+        self.assertFalse(batch[1][0])
+
+    def test_evaluate_batch_output_prediction(self):
+        """Testa predição de output em lote com referência calculada uma vez"""
+        exercise = ExerciseGenerator.generate_output_exercise("modulo_09", "lists")
+        results = dict(self.engine.evaluate_batch(exercise, ["4\n5", "3\n5"]))
+
+        self.assertTrue(results[0][0])
+        self.assertEqual(results[0][2], exercise.points)
+        self.assertFalse(results[1][0])
+
+    def test_reference_cache_skips_execution(self):
+        """Testa que o output de referência persistido evita reexecutar o código"""
+        cache = ReferenceOutputCache(self.cache_file)
+        computed = cache.warm_from_bank(self.engine, modules=[1])
+        self.assertGreater(computed, 0)
+
+        exercise = next(e for e in ExerciseBank.get_exercises_by_module(1)
+                        if e.type.value == "output_prediction")
+        reloaded = ReferenceOutputCache(self.cache_file)
+        engine = RichExerciseEngine(executor=self.executor, reference_cache=reloaded)
+        jobs_before = self.executor.jobs
+        engine.evaluate_exercise(exercise, "qualquer")
+        self.assertEqual(self.executor.jobs, jobs_before)
+        self.assertEqual(reloaded.hits, 1)
+
+    def test_reference_cache_invalidated_on_change(self):
+        """Testa que editar o código do exercício gera nova entrada e descarta a antiga"""
+        cache = ReferenceOutputCache(os.path.join(self.temp_dir.name, 'invalidation.json'))
+        cache.put("print(1)", "1\n", exercise_id="ex_1")
+        cache.put("print(2)", "2\n", exercise_id="ex_1")
+
+        self.assertIsNone(cache.get("print(1)"))
+        self.assertEqual(cache.get("print(2)"), "2\n")
+        self.assertEqual(len(cache.entries), 1)
+
+    def test_reference_cache_concurrent_saves(self):
+        """Gravações simultâneas (warm-up e UI) não corrompem nem perdem o arquivo"""
+        directory = os.path.join(self.temp_dir.name, 'concurrent')
+        cache_file = os.path.join(directory, 'reference_outputs.json')
+        cache = ReferenceOutputCache(cache_file)
+
+        def slow_dump(obj, f, **kwargs):
+            # Grava em duas metades com uma pausa: força a intercalação das threads
+            text = json.dumps(obj, **kwargs)
+            f.write(text[:len(text) // 2])
+            f.flush()
+            time.sleep(0.05)
+            f.write(text[len(text) // 2:])
+
+        threads = [threading.Thread(target=cache.put, args=(f"print({worker})", f"{worker}\n" * 5000))
+                   for worker in range(2)]
+        with patch("src.exercises.reference_cache.json.dump", slow_dump), redirect_stdout(io.StringIO()):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        reloaded = ReferenceOutputCache(cache_file)
+        self.assertEqual(len(reloaded.entries), 2)
+        self.assertEqual(os.listdir(directory), ['reference_outputs.json'])
+
+if __name__ == '__main__':
+    unittest.main()
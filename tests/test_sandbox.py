@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes para o Sandbox de Execução
+"""
+
+import unittest
+import os
+import sys
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.execution import SandboxExecutor, ExecutionLimits
+
+
+class TestSandboxExecutor(unittest.TestCase):
+    """Testes para a classe SandboxExecutor"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Um único pool para todos os testes"""
+        cls.executor = SandboxExecutor(workers=2)
+        cls.executor.warm()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+
+    def test_captures_stdout(self):
+        """Testa captura de stdout e stderr por job"""
+        result = self.executor.run("import sys\nprint('olá')\nprint('aviso', file=sys.stderr)")
+        self.assertTrue(result.success)
+        self.assertEqual(result.stdout, "olá\n")
+        self.assertEqual(result.stderr, "aviso\n")
+
+    def test_error_details(self):
+        """Testa tipo, mensagem e linha do erro"""
+        result = self.executor.run("x = 1\ny = x / 0")
+        self.assertFalse(result.success)
+        self.assertEqual(result.error_type, "ZeroDivisionError")
+        self.assertEqual(result.error_line, 2)
+        self.assertIsInstance(result.rebuild_exception(), ZeroDivisionError)
+
+    def test_wall_clock_limit(self):
+        """Testa que um loop infinito é interrompido e o pool continua funcionando"""
+        limits = ExecutionLimits(cpu_seconds=1, wall_seconds=2)
+        result = self.executor.run("while True:\n    pass", limits=limits)
+        self.assertFalse(result.success)
+        self.assertTrue(result.timed_out or result.cpu_exceeded)
+
+        result = self.executor.run("print('ok')")
+        self.assertEqual(result.stdout, "ok\n")
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), "limite de memória depende de RLIMIT_AS")
+    def test_memory_limit(self):
+        """Testa limite de memória"""
+        result = self.executor.run("dados = ' ' * (2 * 1024 ** 3)", limits=ExecutionLimits(memory_mb=64))
+        self.assertFalse(result.success)
+        self.assertTrue(result.memory_exceeded)
+
+    def test_stdin_and_input_handler(self):
+        """Testa input() com linhas fixas e com callback interativo"""
+        code = "nome = input('Nome: ')\nprint(f'Olá, {nome}!')"
+
+        result = self.executor.run(code, stdin=["Ana"])
+        self.assertEqual(result.stdout, "Nome: Olá, Ana!\n")
+
+        prompts = []
+        result = self.executor.run(code, input_handler=lambda pending: prompts.append(pending) or "Bia")
+        self.assertEqual(prompts, ["Nome: "])
+        self.assertEqual(result.remaining_stdout, "Olá, Bia!\n")
+
+        result = self.executor.run(code)
+        self.assertEqual(result.error_type, "EOFError")
+
+    def test_namespace_roundtrip(self):
+        """Testa namespace inicial e captura de variáveis"""
+        result = self.executor.run("y = x * 2", namespace={'x': 21}, capture_namespace=True)
+        self.assertEqual(result.namespace['y'], 42)
+
+    def test_isolation_between_jobs(self):
+        """Testa que variáveis não vazam entre execuções"""
+        self.executor.run("segredo = 1")
+        result = self.executor.run("print(segredo)")
+        self.assertEqual(result.error_type, "NameError")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes para o encerramento da sessão
+"""
+
+import unittest
+import os
+import signal
+import tempfile
+import sys
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.controllers.session_manager import SessionManager
+from src.module_loader import LazyProxy
+from src.progress_manager import ProgressManager
+
+
+class TestSessionTermination(unittest.TestCase):
+    """Testes para SIGTERM e limpeza da sessão"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.progress_file = os.path.join(self.temp_dir.name, "progress.json")
+        self.progress = ProgressManager(self.progress_file)
+        self.analytics = MagicMock()
+        self.sync_manager = MagicMock()
+        self.created = []
+        self.sync_created = []
+        self.session = SessionManager({
+            'ui': MagicMock(), 'progress': self.progress, 'logger': MagicMock(),
+            'error_tracker': MagicMock(), 'sync_manager': LazyProxy(lambda: self.sync_created.append(True) or self.sync_manager),
+            'secure_input': MagicMock(),
+            'analytics': LazyProxy(lambda: self.created.append(True) or self.analytics),
+        })
+        self.previous_handler = signal.getsignal(signal.SIGTERM)
+
+    def tearDown(self):
+        signal.signal(signal.SIGTERM, self.previous_handler)
+        self.progress.close()
+        self.temp_dir.cleanup()
+
+    def test_sigterm_records_session_time_once(self):
+        """SIGTERM sai por SystemExit e o finally de run() grava o tempo uma vez só"""
+        self.session.session_start = datetime.now() - timedelta(seconds=100)
+        self.session._install_termination_handler()
+
+        with self.assertRaises(SystemExit):
+            try:
+                os.kill(os.getpid(), signal.SIGTERM)
+            finally:
+                # O que PythonCourse.run() faz ao ser atravessado pelo SystemExit
+                self.session.cleanup_session()
+        self.session.cleanup_session()
+
+        reloaded = ProgressManager(self.progress_file)
+        self.addCleanup(reloaded.close)
+        self.assertEqual(reloaded.progress_data["total_time_spent"], 100)
+
+    def test_exit_does_not_create_unused_analytics(self):
+        """Sair sem ter usado o analytics não o cria só para gravar"""
+        self.session.cleanup_session()
+        self.assertFalse(self.session.analytics.is_loaded)
+        self.assertEqual(self.created, [])
+        self.analytics.flush.assert_not_called()
+
+    def test_exit_flushes_analytics_in_use(self):
+        """Analytics já criado na sessão é gravado ao sair"""
+        self.session.analytics.track_event("modulo_aberto")
+        self.assertTrue(self.session.analytics.is_loaded)
+        self.session.handle_interruption()
+        self.analytics.flush.assert_called_once()
+
+
+    def test_initialization_does_not_create_sync_manager(self):
+        """A sincronização inicial não cria o sincronizador adiado"""
+        self.progress.set_user_name("Ana")
+        with patch.object(self.session, '_show_welcome_message'):
+            self.assertTrue(self.session.initialize_session())
+        self.assertFalse(self.session.sync_manager.is_loaded)
+        self.assertEqual(self.sync_created, [])
+        self.sync_manager.sync_up.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
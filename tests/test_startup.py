@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes para o tempo de inicialização do curso (main.py --startup-report)
+"""
+
+import unittest
+import os
+import re
+import subprocess
+import tempfile
+import textwrap
+import sys
+
+# Adiciona o diretório src ao path
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+# Orçamento até o primeiro menu (folgado: máquinas de CI são lentas)
+STARTUP_BUDGET_MS = 1500
+
+# Subsistemas que não podem ser importados só para abrir o menu
+DEFERRED_MODULES = [
+    "src.analytics.advanced_analytics",
+    "src.analytics.analytics_dashboard",
+    "src.offline.connectivity_manager",
+    "src.offline.sync_manager",
+    "src.code_review.analysis_engine",
+    "src.code_review.code_review_dashboard",
+    "src.progressive_projects",
+    "src.methodical_debugging",
+    "src.gamification_system",
+    "src.exercises.interactive_exercises",
+]
+
+
+class TestStartup(unittest.TestCase):
+    """Executa o curso em um diretório temporário e mede a inicialização"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def run_python(self, *args):
+        return subprocess.run([sys.executable, *args], cwd=self.temp_dir.name,
+                              capture_output=True, text=True, timeout=60)
+
+    def test_startup_report_within_budget(self):
+        """--startup-report imprime a árvore e o total fica no orçamento"""
+        result = self.run_python(os.path.join(ROOT, "main.py"), "--startup-report")
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+        match = re.search(r"^\s*([\d.]+) ms  inicialização$", result.stdout, re.MULTILINE)
+        self.assertIsNotNone(match, result.stdout)
+        self.assertIn("import src.controllers", result.stdout)
+        self.assertLess(float(match.group(1)), STARTUP_BUDGET_MS, result.stdout)
+
+    def test_non_essential_subsystems_are_deferred(self):
+        """Construir o PythonCourse não importa os subsistemas opcionais"""
+        script = os.path.join(self.temp_dir.name, "check_deferred.py")
+        with open(script, "w", encoding="utf-8") as f:
+            f.write(textwrap.dedent(f"""
+                import os
+                import sys
+                sys.path.insert(0, {ROOT!r})
+
+                if __name__ == "__main__":
+                    import main
+                    course = main.PythonCourse()
+                    loaded = [m for m in {DEFERRED_MODULES!r} if m in sys.modules]
+                    print(",".join(loaded))
+                    # Usar um componente adiado o cria sob demanda
+                    course.course_controller.glossary.get_term
+                    print("src.glossary" in sys.modules)
+                    sys.stdout.flush()
+                    os._exit(0)
+            """))
+
+        result = self.run_python(script)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        loaded, glossary_loaded = result.stdout.strip().splitlines()[-2:]
+        self.assertEqual(loaded, "")
+        self.assertEqual(glossary_loaded, "True")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes para a fila durável de sincronização offline
+"""
+
+import unittest
+import os
+import json
+import tempfile
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.offline.sync_queue import SyncOperation, SyncQueue
+
+
+def make_op(op_id, operation_type="upload", resource_type="progress", priority=1, data=None):
+    return SyncOperation(id=op_id, operation_type=operation_type, resource_type=resource_type,
+                         data=data or {"id": op_id}, timestamp=datetime.now(), priority=priority)
+
+
+class TestSyncQueue(unittest.TestCase):
+    """Testes para prioridade, journal, coalescência e backoff"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.journal = Path(self.temp_dir.name) / "pending_operations.journal"
+        self.queue = SyncQueue(self.journal)
+
+    def tearDown(self):
+        self.queue.close()
+        self.temp_dir.cleanup()
+
+    def test_priority_order_and_reload(self):
+        """Operações saem por prioridade e sobrevivem a reabrir a fila"""
+        self.queue.put(make_op("d1", "download", "course", priority=3))
+        self.queue.put(make_op("s1", resource_type="settings", priority=2))
+        self.queue.put(make_op("p1", priority=1))
+        self.queue.put(make_op("d2", "download", "course", priority=3))
+
+        first = self.queue.pop_ready(2)
+        self.assertEqual([op.id for op in first], ["p1", "s1"])
+        self.queue.complete(["p1"])
+        self.queue.close()
+
+        # s1 estava em andamento e não foi concluída: volta para a fila
+        reopened = SyncQueue(self.journal)
+        self.assertEqual([op.id for op in reopened.snapshot()], ["s1", "d1", "d2"])
+        self.assertEqual([op.id for op in reopened.pop_ready(10)], ["s1", "d1", "d2"])
+        reopened.close()
+
+    def test_uploads_of_same_resource_are_coalesced(self):
+        """Um upload novo substitui os anteriores do mesmo recurso ainda não enviados"""
+        for index in range(5):
+            self.queue.put(make_op(f"p{index}"))
+        self.queue.put(make_op("a0", resource_type="analytics"))
+        self.queue.put(make_op("d0", "download", "course"))
+        self.queue.put(make_op("d1", "download", "course"))
+
+        self.assertEqual(self.queue.coalesced, 4)
+        self.assertEqual(sorted(op.id for op in self.queue.snapshot()), ["a0", "d0", "d1", "p4"])
+
+        # Em andamento não é descartado; se falhar, o upload mais novo vence
+        in_flight = self.queue.pop_ready(1)[0]
+        self.assertEqual(in_flight.id, "p4")
+        self.queue.put(make_op("p5"))
+        self.assertIsNotNone(self.queue.get("p4"))
+        self.queue.retry(in_flight, delay=0)
+        self.assertIsNone(self.queue.get("p4"))
+
+        self.queue.close()
+        reopened = SyncQueue(self.journal)
+        self.assertEqual(sorted(op.id for op in reopened.snapshot()), ["a0", "d0", "d1", "p5"])
+        reopened.close()
+
+    def test_retry_waits_for_backoff(self):
+        """Uma operação devolvida só fica pronta depois do atraso"""
+        self.queue.put(make_op("p1"))
+        op = self.queue.pop_ready(1)[0]
+        op.retry_count += 1
+        self.queue.retry(op, delay=60)
+
+        self.assertEqual(self.queue.pop_ready(1), [])
+        self.assertEqual(len(self.queue), 1)
+        ready = self.queue.pop_ready(1, now=op.next_attempt + 1)
+        self.assertEqual([(o.id, o.retry_count) for o in ready], [("p1", 1)])
+
+    def test_journal_compaction_and_torn_tail(self):
+        """O journal é compactado e uma linha incompleta no fim é descartada"""
+        queue = SyncQueue(self.journal, compact_min=10)
+        for index in range(30):
+            queue.put(make_op(f"d{index}", "download", "course"))
+            queue.pop_ready(1)
+            queue.complete([f"d{index}"])
+        queue.put(make_op("final", "download", "course"))
+        queue.close()
+        self.assertLess(len(self.journal.read_bytes().splitlines()), 10)
+
+        with open(self.journal, 'ab') as f:
+            f.write(b'0badc0de {"op":"put"')
+        reopened = SyncQueue(self.journal)
+        self.assertEqual([op.id for op in reopened.snapshot()], ["final"])
+        reopened.put(make_op("depois", "download", "course"))
+        reopened.close()
+        self.assertEqual(len(SyncQueue(self.journal)), 2)
+
+    def test_imports_legacy_pending_file(self):
+        """O pending_operations.json antigo é importado uma vez"""
+        legacy = Path(self.temp_dir.name) / "pending_operations.json"
+        item = make_op("antiga", resource_type="settings").to_dict()
+        del item["next_attempt"]
+        legacy.write_text(json.dumps([item]), encoding="utf-8")
+
+        queue = SyncQueue(Path(self.temp_dir.name) / "novo.journal", legacy_file=legacy)
+        self.assertEqual([op.id for op in queue.snapshot()], ["antiga"])
+        self.assertFalse(legacy.exists())
+        queue.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
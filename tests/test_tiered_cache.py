@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes para o TieredCache (L1 em memória + L2 em disco)
+"""
+
+import unittest
+import os
+import tempfile
+import subprocess
+import sys
+import threading
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.performance.tiered_cache import TieredCache
+from src.offline.resource_cache import ResourceCache
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+class TestTieredCache(unittest.TestCase):
+    """Testes para read-through, promoção e write-behind"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.l2 = ResourceCache(cache_dir=self.temp_dir.name)
+        self.cache = TieredCache(l2=self.l2, flush_interval=60)
+
+    def tearDown(self):
+        self.cache.flush()
+        self.temp_dir.cleanup()
+
+    def test_read_through_loader(self):
+        """O loader só roda no primeiro acesso"""
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return {"valor": 42}
+
+        self.assertEqual(self.cache.get("dados", "chave", loader), {"valor": 42})
+        self.assertEqual(self.cache.get("dados", "chave", loader), {"valor": 42})
+        self.assertEqual(len(calls), 1)
+
+        stats = self.cache.get_stats()["namespaces"]["dados"]
+        self.assertEqual((stats["l1_hits"], stats["misses"], stats["loads"]), (1, 1, 1))
+
+    def test_write_behind_and_promotion(self):
+        """Escritas chegam ao L2 no flush e um cache novo é servido pelo L2"""
+        self.cache.set("dados", "chave", {"valor": 1})
+        self.assertFalse(self.l2.exists("dados:chave"))
+        self.assertEqual(self.cache.flush(), 1)
+        self.assertTrue(self.l2.exists("dados:chave"))
+
+        cold = TieredCache(l2=self.l2)
+        self.assertEqual(cold.get("dados", "chave", lambda: self.fail("não deveria recalcular")),
+                         {"valor": 1})
+        self.assertEqual(cold.get_stats()["namespaces"]["dados"]["l2_hits"], 1)
+        self.assertEqual(cold.keys("dados"), ["chave"])
+
+    def test_memory_only_namespace(self):
+        """Namespaces sem persistência nunca tocam o L2"""
+        self.cache.register_namespace("memoria", ttl=None, persist=False)
+        self.cache.set("memoria", "objeto", object)
+        self.cache.flush()
+
+        self.assertIs(self.cache.get("memoria", "objeto"), object)
+        self.assertEqual(self.l2.get_size_info()["entries"], 0)
+
+    def test_invalidate_removes_both_levels(self):
+        """invalidate apaga do L1, das escritas pendentes e do L2"""
+        self.cache.register_namespace("direto", write_behind=False, l2_prefix="")
+        self.assertTrue(self.cache.set("direto", "recurso", [1, 2, 3]))
+        self.assertTrue(self.l2.exists("recurso"))
+
+        self.assertTrue(self.cache.invalidate("direto", "recurso"))
+        self.assertFalse(self.cache.exists("direto", "recurso"))
+        self.assertFalse(self.l2.exists("recurso"))
+
+
+    def test_full_batch_is_written_outside_the_lock(self):
+        """Gravar um lote cheio no L2 não bloqueia leituras de outras threads"""
+        writing, release = threading.Event(), threading.Event()
+
+        class SlowL2:
+            def store(self, key, value, ttl_hours=None):
+                writing.set()
+                release.wait(5)
+                return True
+
+            def retrieve(self, key):
+                return None
+
+            def get_statistics(self):
+                return {}
+
+        cache = TieredCache(l2=SlowL2(), flush_interval=60, max_pending=2)
+        cache.set("dados", "a", 1)
+        writer = threading.Thread(target=cache.set, args=("dados", "b", 2))
+        writer.start()
+        self.assertTrue(writing.wait(5))
+
+        reader = threading.Thread(target=cache.get, args=("dados", "outra"))
+        reader.start()
+        reader.join(1)
+        blocked = reader.is_alive()
+        release.set()
+        writer.join()
+        reader.join()
+        self.assertFalse(blocked)
+        self.assertEqual(cache.get_stats()["namespaces"]["dados"]["misses"], 1)
+
+    def test_pending_write_survives_exit(self):
+        """Na saída, as escritas pendentes vão para o L2 antes de ele ser fechado"""
+        script = (
+            "import sys; sys.path.insert(0, %r)\n"
+            "from src.performance.tiered_cache import TieredCache\n"
+            "cache = TieredCache(flush_interval=60)\n"
+            "if sys.argv[1] == 'grava':\n"
+            "    cache.get('dados', 'chave')\n"
+            "    cache.set('dados', 'chave', {'valor': 1})\n"
+            "else:\n"
+            "    print(cache.get('dados', 'chave'))\n"
+        ) % ROOT
+        with tempfile.TemporaryDirectory() as cwd:
+            writer = subprocess.run([sys.executable, "-c", script, "grava"], cwd=cwd,
+                                    capture_output=True, text=True, timeout=60)
+            reader = subprocess.run([sys.executable, "-c", script, "le"], cwd=cwd,
+                                    capture_output=True, text=True, timeout=60)
+        self.assertNotIn("Erro", writer.stdout + writer.stderr)
+        self.assertEqual(reader.stdout.strip(), "{'valor': 1}")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark da correção em lote do RichExerciseEngine
+Mede submissões por segundo de evaluate_batch para uma turma simulada
+"""
+
+import sys
+import os
+import time
+import argparse
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.exercises.rich_exercises import RichExerciseEngine, ExerciseGenerator
+from src.execution import SandboxExecutor
+
+
+def build_submissions(exercise, total: int):
+    """Gera respostas variadas: corretas, com bug e com erro de execução"""
+    buggy = exercise.code
+    broken = exercise.solution.replace("print(", "prnt(", 1)
+    variants = [exercise.solution, buggy, broken]
+    return [variants[i % len(variants)] for i in range(total)]
+
+
+def run_benchmark(total: int, workers: int) -> None:
+    """Executa o benchmark e imprime o throughput"""
+    executor = SandboxExecutor(workers=workers)
+    executor.warm()
+    engine = RichExerciseEngine(executor=executor)
+
+    exercises = [
+        ExerciseGenerator.generate_debugging_exercise("modulo_03", "variables"),
+        ExerciseGenerator.generate_output_exercise("modulo_09", "lists"),
+    ]
+
+    print(f"🏁 BENCHMARK DE CORREÇÃO EM LOTE ({workers} workers, {total} submissões)")
+    print("=" * 60)
+
+    try:
+        for exercise in exercises:
+            if exercise.type.value == "output_prediction":
+                answers = ["4\n5", "3\n5", "4 5"] * (total // 3 + 1)
+                answers = answers[:total]
+            else:
+                answers = build_submissions(exercise, total)
+
+            start = time.perf_counter()
+            correct = sum(1 for _, (ok, _, _) in engine.evaluate_batch(exercise, answers) if ok)
+            elapsed = time.perf_counter() - start
+
+            print(f"{exercise.type.value:<20} {elapsed:7.3f}s  "
+                  f"{total / elapsed:9.1f} submissões/s  ({correct} corretas)")
+    finally:
+        executor.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--submissions", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+    run_benchmark(args.submissions, args.workers)
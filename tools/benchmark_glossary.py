@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark do índice do glossário
+Gera glossários sintéticos (vocabulário com frequência Zipf, como texto real)
+e mede a montagem do índice e a latência de busca, autocompletar e correção
+"""
+
+import sys
+import os
+import time
+import random
+import argparse
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.glossary_index import GlossaryIndex
+
+CONSONANTS = ["b", "c", "d", "f", "g", "j", "l", "m", "n", "p", "qu", "r", "s", "t", "v", "x", "z",
+              "br", "cr", "pr", "tr", "ch", "lh", "nh"]
+VOWELS = ["a", "e", "i", "o", "u", "á", "ê", "í", "õ", "ão", "ei", "ou"]
+
+
+def synthetic_terms(count: int, seed: int = 42) -> dict:
+    """Termos com nomes inventados e definições de 12 a 30 palavras"""
+    rng = random.Random(seed)
+    vocabulary = sorted({"".join(rng.choice(CONSONANTS) + rng.choice(VOWELS) for _ in range(rng.randint(2, 4)))
+                         for _ in range(count * 4)})
+    rng.shuffle(vocabulary)
+    # Zipf: a palavra de posição r aparece com peso 1/r
+    weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+
+    terms = {}
+    while len(terms) < count:
+        name = " ".join(rng.choice(vocabulary[len(vocabulary) // 10:]) for _ in range(rng.randint(1, 2)))
+        definition = " ".join(rng.choices(vocabulary, weights, k=rng.randint(12, 30)))
+        terms[name] = {
+            "definicao": definition.capitalize() + ".",
+            "exemplo": f"{name.replace(' ', '_')} = {rng.randint(0, 99)}",
+            "modulos_relacionados": [f"modulo_{rng.randint(1, 35)}"],
+        }
+    return terms
+
+
+def typo(word: str, rng: random.Random) -> str:
+    """Apaga uma letra do meio da palavra"""
+    position = rng.randint(1, len(word) - 2)
+    return word[:position] + word[position + 1:]
+
+
+def timed(function, queries) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        function(query)
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+
+def run_benchmark(sizes, queries: int) -> None:
+    print(f"🏁 BENCHMARK DO ÍNDICE DO GLOSSÁRIO ({queries} consultas por tipo)")
+    print("=" * 72)
+    for size in sizes:
+        terms = synthetic_terms(size)
+        start = time.perf_counter()
+        index = GlossaryIndex(terms)
+        build = (time.perf_counter() - start) * 1000
+
+        rng = random.Random(7)
+        names = rng.choices(list(terms), k=queries)
+        # Quem busca um conceito digita a palavra específica, não "de" ou "um"
+        words = [min(terms[name]["definicao"].rstrip(".").lower().split(),
+                     key=lambda word: len(index.search_definition(word)))
+                 for name in names]
+        long_names = [name for name in names if len(name) >= 6] or names
+
+        results = {
+            "exata": timed(index.search, names),
+            "palavra": timed(index.search, words),
+            "prefixo": timed(index.complete, [name[:3] for name in names]),
+            "erro": timed(index.search, [typo(name, rng) for name in long_names]),
+            "definição": timed(index.search_definition, words),
+        }
+        print(f"{size:>7} termos  índice {build:7.1f} ms  " +
+              "  ".join(f"{kind} {ms:.3f}" for kind, ms in results.items()) + "  (ms/consulta)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 5_000, 20_000])
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+    run_benchmark(args.sizes, args.queries)
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+"""
+Gera o manifesto de seções dos módulos do curso
+Registra o intervalo de linhas de cada seção para que o ModuleLoader compile
+só a casca do módulo e as seções escolhidas no menu.
+
+Rode depois de editar um módulo (um manifesto desatualizado ainda funciona,
+mas obriga o loader a reanalisar o arquivo a cada execução).
+"""
+
+import sys
+import os
+import argparse
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.modules.module_loader import ModuleLoader
+from src.modules.sections import MANIFEST_FILE, build_entry, load_manifest, save_manifest
+from src.performance import TieredCache
+
+
+def build_manifest() -> dict:
+    loader = ModuleLoader(cache=TieredCache(l2_factory=None))
+    entries = {}
+    for module_id, info in loader.list_all_modules().items():
+        if not info['exists']:
+            continue
+        entries[module_id] = build_entry(info['file_path'], info['class_name'])
+    return entries
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Gera src/modules/section_manifest.json")
+    parser.add_argument("--check", action="store_true",
+                        help="Só verifica se o manifesto está atualizado (código 1 se não)")
+    args = parser.parse_args()
+
+    entries = build_manifest()
+    if args.check:
+        stale = sorted(module_id for module_id, entry in entries.items()
+                       if load_manifest().get(module_id) != entry)
+        if stale:
+            print(f"❌ Manifesto desatualizado: {', '.join(stale)}")
+            return 1
+        print("✅ Manifesto de seções atualizado")
+        return 0
+
+    save_manifest(entries)
+    sections = sum(len(entry["sections"]) for entry in entries.values())
+    print(f"✅ {len(entries)} módulos, {sections} seções -> {MANIFEST_FILE.resolve()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())